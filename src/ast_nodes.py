@@ -1412,3 +1412,28 @@ class TypeInfo:
             return VarType.STRING
         else:
             raise ValueError(f"Unknown DEF statement token type: {token_type}")
+
+
+# ============================================================================
+# Traversal
+# ============================================================================
+
+def iter_variable_nodes(node):
+    """Yield every VariableNode under an AST node (scalars and arrays).
+
+    Subscript expressions of arrays are searched too. Order is unspecified;
+    callers that need source order should sort by column.
+    """
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, VariableNode):
+            yield node
+            if node.subscripts:
+                pending.extend(node.subscripts)
+            continue
+        for value in vars(node).values():
+            if isinstance(value, list):
+                pending.extend(item for item in value if hasattr(item, '__dataclass_fields__'))
+            elif hasattr(value, '__dataclass_fields__'):
+                pending.append(value)
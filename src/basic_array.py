@@ -0,0 +1,112 @@
+"""
+Storage for BASIC arrays (DIM).
+
+Numeric arrays live in typed buffers from the standard array module instead
+of lists of boxed Python numbers:
+
+- %  (INTEGER): array('h'), 16-bit signed like MBASIC integers
+- !  (SINGLE) and # (DOUBLE): array('d')
+- $  (STRING): list of str
+
+Single precision values are Python floats everywhere else in the
+interpreter, so SINGLE arrays use 'd' as well; an 'f' buffer would make an
+element compare unequal to the scalar it was assigned from.
+
+Row-major strides are computed once at DIM time, so an element access is one
+subscript count check plus one range check per dimension.
+"""
+
+from array import array
+
+
+ARRAY_TYPECODES = {'%': 'h', '!': 'd', '#': 'd'}
+
+
+class BasicArray:
+    """One dimensioned array.
+
+    Attributes:
+        name: Full array name with suffix (lowercase), for error messages
+        dims: Upper bound of each dimension as given to DIM
+        base: OPTION BASE in effect when the array was dimensioned (0 or 1)
+        extents: Number of elements in each dimension
+        strides: Row-major stride of each dimension
+        data: Flat element storage (typed buffer or list)
+    """
+
+    __slots__ = ('name', 'dims', 'base', 'strides', 'extents', 'data')
+
+    def __init__(self, name, dims, base=0):
+        self.name = name
+        self.dims = list(dims)
+        self.base = base
+
+        # Elements per dimension: DIM A(10) is 0..10 with base 0, 1..10 with base 1
+        self.extents = [dim + 1 - base for dim in self.dims]
+        strides = []
+        size = 1
+        for extent in reversed(self.extents):
+            strides.append(size)
+            size *= extent
+        self.strides = strides[::-1]
+
+        typecode = ARRAY_TYPECODES.get(name[-1:])
+        if typecode is None:
+            self.data = [""] * size
+        else:
+            self.data = array(typecode, bytes(array(typecode).itemsize * size))
+
+    def offset(self, subscripts):
+        """Flat index of an element.
+
+        Raises:
+            RuntimeError: Wrong number of subscripts, or a subscript outside
+                its dimension
+        """
+        if len(subscripts) != len(self.extents):
+            raise RuntimeError(f"Wrong number of subscripts: got {len(subscripts)}, expected {len(self.dims)}")
+        base = self.base
+        index = 0
+        for subscript, extent, stride in zip(subscripts, self.extents, self.strides):
+            subscript -= base
+            if not 0 <= subscript < extent:
+                raise RuntimeError(f"Array subscript out of range: {self.name}{list(subscripts)}")
+            index += subscript * stride
+        return index
+
+    def get(self, subscripts):
+        return self.data[self.offset(subscripts)]
+
+    def set(self, subscripts, value):
+        index = self.offset(subscripts)
+        try:
+            self.data[index] = value
+        except (TypeError, OverflowError):
+            self._store(index, value)
+
+    def _store(self, index, value):
+        """Store a value the typed buffer did not accept as is."""
+        if isinstance(value, str) or isinstance(self.data, list):
+            raise TypeError("Type mismatch")
+        try:
+            # INTEGER arrays: non-integral values are truncated like LET does
+            self.data[index] = int(value) if self.data.typecode == 'h' else float(value)
+        except (OverflowError, ValueError):
+            raise OverflowError("Overflow") from None
+
+    def to_state(self):
+        """Plain-data form for session persistence (see from_state())."""
+        return {'dims': list(self.dims), 'base': self.base, 'data': list(self.data)}
+
+    @classmethod
+    def from_state(cls, name, state, default_base=0):
+        """Rebuild an array from to_state() output (or the older {'dims', 'data'} form)."""
+        result = cls(name, state['dims'], state.get('base', default_base))
+        data = state.get('data')
+        if data is not None and len(data) == len(result.data):
+            for index, value in enumerate(data):
+                try:
+                    result.data[index] = value
+                except (TypeError, OverflowError):
+                    result._store(index, value)
+        return result
@@ -8,6 +8,7 @@ Microsoft BASIC-80 as implemented for CP/M systems. This version was chosen as t
 reference implementation for maximum compatibility with classic BASIC programs.
 """
 
+import functools
 import math
 import random
 import sys
@@ -35,6 +36,16 @@ class SpcMarker:
         return f"<SPC({self.count})>"
 
 
+@functools.lru_cache(maxsize=256)
+def get_using_formatter(format_string):
+    """Return the UsingFormatter for a PRINT USING format string.
+
+    Formatters are not changed by formatting, so one instance per format
+    string is shared; report loops reuse a few masks over and over.
+    """
+    return UsingFormatter(format_string)
+
+
 class UsingFormatter:
     """Format strings and numbers according to PRINT USING format strings"""
 
@@ -43,6 +54,7 @@ class UsingFormatter:
         self.format_string = format_string
         self.fields = []  # List of (type, spec) tuples
         self.parse_format()
+        self.compiled = self.compile_fields()
 
     def parse_format(self):
         """Parse format string into field specifications"""
@@ -203,39 +215,124 @@ class UsingFormatter:
         spec['end_pos'] = i
         return spec
 
+    def compile_fields(self):
+        """Compile the parsed fields into (type, item) steps for format_values()
+
+        Runs of literal characters become one 'literal' string; string and
+        numeric fields become callables taking the value.
+        """
+        compiled = []
+        for field_type, field_spec in self.fields:
+            if field_type == 'literal':
+                if compiled and compiled[-1][0] == 'literal':
+                    compiled[-1] = ('literal', compiled[-1][1] + field_spec)
+                else:
+                    compiled.append(('literal', field_spec))
+            elif field_type == 'string':
+                compiled.append(('string', functools.partial(self.format_string_field, spec=field_spec)))
+            else:
+                compiled.append(('numeric', self.compile_numeric_field(field_spec)))
+        return compiled
+
+    def compile_numeric_field(self, spec):
+        """Return a callable that formats a number for a numeric field spec
+
+        Everything that depends only on the spec (precision, widths, fill,
+        $ and sign placement) is worked out once here. The result is the
+        same as format_numeric_field(value, spec).
+        """
+        if spec['exponential']:
+            return functools.partial(self.format_exponential, spec=spec)
+
+        precision = spec['digits_after_decimal'] if spec['decimal_pos'] >= 0 else 0
+        dollar = '$' if spec['dollar_sign'] else ''
+        # Positions for the digits (field width less sign and $)
+        width = spec['digit_count'] + (1 if spec['has_decimal'] else 0) - len(dollar)
+        fill = '*' if spec['asterisk_fill'] and not spec['leading_sign'] else ' '
+
+        # Digits: #, #.## (.## drops the leading zero), with or without commas
+        if precision > 0:
+            number_format = f".{precision}f"
+            strip_zero = spec['decimal_pos'] == 0
+
+            def digits(magnitude):
+                text = format(magnitude, number_format)
+                if strip_zero and magnitude < 1 and text.startswith('0.'):
+                    text = text[1:]
+                return text
+        else:
+            def digits(magnitude):
+                return str(int(magnitude))
+
+        if spec['comma']:
+            plain_digits = digits
+            add_separators = self.add_thousand_separators
+
+            def digits(magnitude):
+                int_part, point, dec_part = plain_digits(magnitude).partition('.')
+                return add_separators(int_part) + point + dec_part
+
+        def number(value):
+            """(digits, is_negative) after rounding; negative values that round to zero stay negative"""
+            rounded = round(value, precision) if precision > 0 else round(value)
+            return digits(abs(rounded)), rounded < 0 or (rounded == 0 and value < 0)
+
+        # Layout: padding, sign, $, digits, sign
+        if spec['leading_sign']:
+            # A trailing sign after +## takes one more position
+            if spec['trailing_sign'] or spec['trailing_minus_only']:
+                trailing_signs = ('+' if spec['trailing_sign'] else ' ', '-')
+            else:
+                trailing_signs = ('', '')
+
+            def format_field(value):
+                text, negative = number(value)
+                if len(text) > width:
+                    return '%' + text
+                return (' ' * (width - len(text)) + ('-' if negative else '+') + dollar + text
+                        + trailing_signs[negative])
+        elif spec['trailing_sign'] or spec['trailing_minus_only']:
+            positive_sign = '+' if spec['trailing_sign'] else ' '
+
+            def format_field(value):
+                text, negative = number(value)
+                if len(text) > width:
+                    return '%' + text
+                return fill * (width - len(text)) + dollar + text + ('-' if negative else positive_sign)
+        else:
+            def format_field(value):
+                text = number(value)[0]
+                if len(text) > width:
+                    return '%' + text
+                return fill * (width - len(text)) + dollar + text
+        return format_field
+
     def format_values(self, values):
-        """Format a list of values using the parsed format fields
+        """Format a list of values using the compiled format fields
 
         Returns formatted string
         """
         result = []
         value_idx = 0
+        value_count = len(values)
 
-        for field_type, field_spec in self.fields:
+        for field_type, item in self.compiled:
             if field_type == 'literal':
-                result.append(field_spec)
-            elif field_type == 'string':
-                if value_idx < len(values):
-                    value = str(values[value_idx])
-                    result.append(self.format_string_field(value, field_spec))
-                    value_idx += 1
+                result.append(item)
+            elif value_idx < value_count:
+                value = values[value_idx]
+                value_idx += 1
+                if field_type == 'string':
+                    result.append(item(str(value)))
                 else:
-                    # No more values, field remains empty
-                    pass
-            elif field_type == 'numeric':
-                if value_idx < len(values):
-                    value = values[value_idx]
                     # Convert to number if needed
                     if isinstance(value, str):
                         try:
                             value = float(value)
                         except ValueError:
                             value = 0
-                    result.append(self.format_numeric_field(value, field_spec))
-                    value_idx += 1
-                else:
-                    # No more values
-                    pass
+                    result.append(item(value))
+            # else: no more values, field remains empty
 
         return ''.join(result)
 
@@ -441,8 +538,9 @@ class UsingFormatter:
 class BuiltinFunctions:
     """MBASIC 5.21 built-in functions"""
 
-    def __init__(self, runtime):
+    def __init__(self, runtime, io_handler=None):
         self.runtime = runtime
+        self.io = io_handler  # For POS, and to flush output before keyboard reads
 
     # ========================================================================
     # Numeric Functions
@@ -810,11 +908,19 @@ class BuiltinFunctions:
         """
         Current print position.
 
-        Returns approximate column (not fully implemented)
+        Returns the 1-based cursor column, or 1 if the I/O handler does not
+        track it.
         """
-        # Would need to track actual print position
-        # For now, return 1
-        return 1
+        get_cursor_position = getattr(self.io, 'get_cursor_position', None)
+        if get_cursor_position is None:
+            return 1
+        return get_cursor_position()[1]
+
+    def _flush_output(self):
+        """Write out buffered console output before reading the keyboard directly"""
+        flush = getattr(self.io, 'flush', None)
+        if flush is not None:
+            flush()
 
     def TAB(self, n):
         """
@@ -845,7 +951,8 @@ class BuiltinFunctions:
 
         Implementation details:
         - execute_open() in interpreter.py stores mode ('I', 'O', 'A', 'R') in file_info['mode']
-        - Mode 'I' (input): Opened in Python binary mode ('rb'), allowing ^Z detection
+        - Mode 'I' (input): Opened in Python binary mode ('rb') and read through a
+          SequentialInputHandle, allowing ^Z detection without seeking
         - Modes 'O' (output), 'A' (append): Use standard Python EOF detection without ^Z
         - See execute_open() in interpreter.py for file opening implementation (search for "execute_open")
         """
@@ -855,34 +962,10 @@ class BuiltinFunctions:
 
         file_info = self.runtime.files[file_num]
 
-        # Check EOF flag (set by input operations or ^Z detection)
-        if file_info['eof']:
-            return -1
-
-        # For mode 'I' files (binary input), check for EOF or ^Z
-        # Mode 'I' files are opened in binary mode ('rb' - see execute_open() in interpreter.py)
-        # which allows ^Z checking for CP/M-style EOF detection
+        # For mode 'I' files, the input buffer knows whether the next byte is
+        # ^Z or the physical end of file (see SequentialInputHandle.at_eof)
         if file_info['mode'] == 'I':
-            file_handle = file_info['handle']
-            current_pos = file_handle.tell()
-
-            # Peek at next byte to check for ^Z or EOF
-            # Binary mode files ('rb'): read(1) returns bytes object
-            # next_byte[0] accesses the first byte value as integer (0-255)
-            next_byte = file_handle.read(1)
-            if not next_byte:
-                # Physical EOF
-                file_info['eof'] = True
-                return -1
-            elif next_byte[0] == 26:  # ^Z (ASCII 26)
-                # CP/M EOF marker - only checked in binary input mode
-                file_info['eof'] = True
-                file_handle.seek(current_pos)  # Restore position
-                return -1
-            else:
-                # Not at EOF, restore position
-                file_handle.seek(current_pos)
-                return 0
+            return -1 if file_info['handle'].at_eof() else 0
 
         # For output/append files, never at EOF
         return 0
@@ -903,6 +986,7 @@ class BuiltinFunctions:
             return self.runtime.field_buffers[file_num]['current_record']
 
         # For sequential files, return approximate block number (byte position / 128)
+        # (an input file's tell() is its buffered read position)
         file_info = self.runtime.files[file_num]
         file_handle = file_info['handle']
         pos = file_handle.tell()
@@ -920,6 +1004,8 @@ class BuiltinFunctions:
 
         file_info = self.runtime.files[file_num]
         file_handle = file_info['handle']
+        if file_info['mode'] in ('I', 'R'):
+            return file_handle.size()
 
         # Save current position
         current_pos = file_handle.tell()
@@ -953,6 +1039,7 @@ class BuiltinFunctions:
 
         Returns a single character if a key is pressed, or empty string if not.
         """
+        self._flush_output()
         # Platform-specific implementation
         if sys.platform == 'win32':
             # Windows implementation
@@ -1019,6 +1106,7 @@ class BuiltinFunctions:
 
         if file_num is None:
             # Read from keyboard
+            self._flush_output()
             result = ""
             for i in range(num):
                 char = sys.stdin.read(1)
@@ -1034,4 +1122,8 @@ class BuiltinFunctions:
 
             file_info = self.runtime.files[file_num]
             file_handle = file_info['handle']
-            return file_handle.read(num)
+            if file_info['mode'] == 'I':
+                # Shares the read position and ^Z handling with INPUT#
+                return file_handle.read_chars(num)
+            data = file_handle.read(num)
+            return data.decode('latin-1') if isinstance(data, bytes) else data
@@ -0,0 +1,317 @@
+"""
+Closure compiler for the MBASIC interpreter.
+
+Compiles statement and expression AST nodes into pre-bound Python closures
+so that execution skips the per-node handler lookup done by
+Interpreter.execute_statement() and Interpreter.evaluate_expression().
+
+The compiled code calls exactly the same runtime methods (get_variable,
+set_array_element, builtins, ...) as the AST walker, so semantics, error
+messages and variable tracking are unchanged. Node types without a
+specialized compiler fall back to the interpreter's bound execute_*/evaluate_*
+handler, resolved once at compile time.
+
+Usage:
+    compiler = ClosureCompiler(interpreter)
+    compiler.install()                        # route interpreter dispatch here
+    compiler.compile_program(runtime.statement_table)
+"""
+
+import operator
+
+from src.tokens import TokenType
+from src.pc import PC
+import src.ast_nodes as ast_nodes
+
+
+def _add(left, right):
+    result = left + right
+    # Enforce 255 character string limit for concatenation (MBASIC 5.21 compatibility)
+    if isinstance(result, str) and len(result) > 255:
+        raise RuntimeError("String too long")
+    return result
+
+
+def _divide(left, right):
+    if right == 0:
+        raise RuntimeError("Division by zero")
+    return left / right
+
+
+def _int_divide(left, right):
+    if right == 0:
+        raise RuntimeError("Division by zero")
+    return int(left // right)
+
+
+# Binary operators - same semantics as Interpreter.evaluate_binaryop()
+BINARY_OPERATORS = {
+    TokenType.PLUS: _add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: _divide,
+    TokenType.BACKSLASH: _int_divide,
+    TokenType.POWER: operator.pow,
+    TokenType.MOD: operator.mod,
+    TokenType.EQUAL: lambda left, right: -1 if left == right else 0,
+    TokenType.NOT_EQUAL: lambda left, right: -1 if left != right else 0,
+    TokenType.LESS_THAN: lambda left, right: -1 if left < right else 0,
+    TokenType.GREATER_THAN: lambda left, right: -1 if left > right else 0,
+    TokenType.LESS_EQUAL: lambda left, right: -1 if left <= right else 0,
+    TokenType.GREATER_EQUAL: lambda left, right: -1 if left >= right else 0,
+    TokenType.AND: lambda left, right: int(left) & int(right),
+    TokenType.OR: lambda left, right: int(left) | int(right),
+    TokenType.XOR: lambda left, right: int(left) ^ int(right),
+    TokenType.EQV: lambda left, right: ~(int(left) ^ int(right)),
+    TokenType.IMP: lambda left, right: (~int(left)) | int(right),
+}
+
+
+def _noop():
+    pass
+
+
+class ClosureCompiler:
+    """Compile AST nodes into closures bound to one Interpreter.
+
+    Compiled closures are cached by node identity. Nodes that were not
+    compiled ahead of time (e.g. lines edited while paused, immediate mode
+    statements) are compiled on first execution.
+    """
+
+    # Statements that do nothing at runtime
+    NOOP_STATEMENTS = (
+        ast_nodes.RemarkStatementNode,
+        ast_nodes.DataStatementNode,
+        ast_nodes.DefTypeStatementNode,
+        ast_nodes.PokeStatementNode,
+    )
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        # id(node) -> (node, closure); the node is kept so its id stays unique
+        self._statements = {}
+        self._expressions = {}
+
+    def install(self):
+        """Route the interpreter's statement and expression dispatch through this compiler."""
+        self.interpreter.execute_statement = self.execute_statement
+        self.interpreter.evaluate_expression = self.evaluate_expression
+
+    def compile_program(self, statement_table):
+        """Compile every statement in a statement table, dropping stale entries."""
+        self._statements.clear()
+        self._expressions.clear()
+        for stmt in statement_table.statements.values():
+            self._statements[id(stmt)] = (stmt, self.compile_statement(stmt))
+
+    # ------------------------------------------------------------------
+    # Cached entry points (installed on the interpreter)
+    # ------------------------------------------------------------------
+
+    def execute_statement(self, stmt):
+        """Execute a statement using its compiled closure"""
+        entry = self._statements.get(id(stmt))
+        if entry is None or entry[0] is not stmt:
+            entry = (stmt, self.compile_statement(stmt))
+            self._statements[id(stmt)] = entry
+        entry[1]()
+
+    def evaluate_expression(self, expr):
+        """Evaluate an expression using its compiled closure"""
+        entry = self._expressions.get(id(expr))
+        if entry is None or entry[0] is not expr:
+            entry = (expr, self.compile_expression(expr))
+            self._expressions[id(expr)] = entry
+        return entry[1]()
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def compile_statement(self, stmt):
+        """Compile a statement node into a zero-argument closure"""
+        if isinstance(stmt, self.NOOP_STATEMENTS):
+            return _noop
+        if isinstance(stmt, ast_nodes.LetStatementNode):
+            return self._compile_let(stmt)
+        if isinstance(stmt, ast_nodes.IfStatementNode):
+            return self._compile_if(stmt)
+        if isinstance(stmt, ast_nodes.GotoStatementNode):
+            return self._compile_goto(stmt)
+
+        stmt_type = type(stmt).__name__
+        handler_name = f"execute_{stmt_type.replace('Node', '').replace('Statement', '').lower()}"
+        handler = getattr(self.interpreter, handler_name, None)
+        if handler is None:
+            def not_implemented():
+                raise NotImplementedError(f"Statement not implemented: {stmt_type}")
+            return not_implemented
+        return lambda: handler(stmt)
+
+    def _compile_let(self, stmt):
+        interp = self.interpreter
+        runtime = interp.runtime
+        variable = stmt.variable
+        name = variable.name
+        suffix = variable.type_suffix
+        token = interp._make_token_info(variable)
+        value_fn = self.compile_expression(stmt.expression)
+
+        if suffix == '%':
+            coerce = int
+        elif suffix == '$':
+            coerce = str
+        else:
+            def coerce(value):
+                if not isinstance(value, (int, float)):
+                    value = float(value) if value else 0
+                return value
+
+        if variable.subscripts:
+            subscript_fns = [self.compile_expression(sub) for sub in variable.subscripts]
+            set_array_element = runtime.set_array_element
+
+            def let_array():
+                value = coerce(value_fn())
+                subscripts = [int(fn()) for fn in subscript_fns]
+                set_array_element(name, suffix, subscripts, value, token=token)
+            return let_array
+
+        original_case = getattr(variable, 'original_case', name)
+        slot = runtime.variable_slot(variable)
+        set_variable = runtime.set_variable
+
+        def let():
+            set_variable(name, suffix, coerce(value_fn()), token=token,
+                         limits=interp.limits, original_case=original_case, slot=slot)
+        return let
+
+    def _compile_if(self, stmt):
+        runtime = self.interpreter.runtime
+        condition_fn = self.compile_expression(stmt.condition)
+
+        def branch(line_number, statements):
+            if line_number is not None:
+                target = PC.from_line(line_number)
+
+                def jump():
+                    runtime.npc = target
+                return jump
+            if statements:
+                statement_fns = [self.compile_statement(s) for s in statements]
+
+                def run_statements():
+                    for fn in statement_fns:
+                        fn()
+                        if runtime.npc is not None:
+                            break
+                return run_statements
+            return _noop
+
+        then_fn = branch(stmt.then_line_number, stmt.then_statements)
+        else_fn = branch(stmt.else_line_number, stmt.else_statements)
+
+        def if_statement():
+            if condition_fn():
+                then_fn()
+            else:
+                else_fn()
+        return if_statement
+
+    def _compile_goto(self, stmt):
+        interp = self.interpreter
+        runtime = interp.runtime
+        target = PC.from_line(stmt.line_number)
+
+        def goto():
+            # If we're in an error handler and GOTOing out, clear the error state
+            if interp.state.error_info is not None:
+                interp.state.error_info = None
+                runtime.set_variable_raw('err%', 0)
+            runtime.npc = target
+        return goto
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def compile_expression(self, expr):
+        """Compile an expression node into a zero-argument closure returning its value"""
+        if isinstance(expr, (ast_nodes.NumberNode, ast_nodes.StringNode)):
+            value = expr.value
+            return lambda: value
+        if isinstance(expr, ast_nodes.VariableNode):
+            return self._compile_variable(expr)
+        if isinstance(expr, ast_nodes.BinaryOpNode):
+            return self._compile_binaryop(expr)
+        if isinstance(expr, ast_nodes.UnaryOpNode):
+            return self._compile_unaryop(expr)
+        if isinstance(expr, ast_nodes.FunctionCallNode):
+            return self._compile_functioncall(expr)
+
+        expr_type = type(expr).__name__
+        handler = getattr(self.interpreter, f"evaluate_{expr_type.replace('Node', '').lower()}", None)
+        if handler is None:
+            def not_implemented():
+                raise NotImplementedError(f"Expression not implemented: {expr_type}")
+            return not_implemented
+        return lambda: handler(expr)
+
+    def _compile_variable(self, expr):
+        interp = self.interpreter
+        runtime = interp.runtime
+        name = expr.name
+        suffix = expr.type_suffix
+        token = interp._make_token_info(expr)
+
+        if expr.subscripts:
+            subscript_fns = [self.compile_expression(sub) for sub in expr.subscripts]
+            get_array_element = runtime.get_array_element
+            if len(subscript_fns) == 1:
+                index_fn = subscript_fns[0]
+                return lambda: get_array_element(name, suffix, [int(index_fn())], token=token)
+            return lambda: get_array_element(name, suffix, [int(fn()) for fn in subscript_fns], token=token)
+
+        original_case = getattr(expr, 'original_case', name)
+        slot = runtime.variable_slot(expr)
+        get_variable = runtime.get_variable
+        return lambda: get_variable(name, suffix, token=token, original_case=original_case, slot=slot)
+
+    def _compile_binaryop(self, expr):
+        op = BINARY_OPERATORS.get(expr.operator)
+        if op is None:
+            # Unknown operator - let the AST evaluator raise its usual error
+            handler = self.interpreter.evaluate_binaryop
+            return lambda: handler(expr)
+        left = self.compile_expression(expr.left)
+        right = self.compile_expression(expr.right)
+        return lambda: op(left(), right())
+
+    def _compile_unaryop(self, expr):
+        operand = self.compile_expression(expr.operand)
+        if expr.operator == TokenType.MINUS:
+            return lambda: -operand()
+        if expr.operator == TokenType.NOT:
+            return lambda: ~int(operand())
+        if expr.operator == TokenType.PLUS:
+            return operand
+        handler = self.interpreter.evaluate_unaryop
+        return lambda: handler(expr)
+
+    def _compile_functioncall(self, expr):
+        interp = self.interpreter
+        # Strip $ suffix for builtin lookup (CHR$ -> CHR, INPUT$ -> INPUT, etc.)
+        func = getattr(interp.builtins, expr.name.rstrip('$'), None)
+        if func is None:
+            # User-defined DEF FN - resolved at call time like the AST evaluator
+            handler = interp.evaluate_functioncall
+            return lambda: handler(expr)
+
+        arg_fns = [self.compile_expression(arg) for arg in expr.arguments]
+        if not arg_fns:
+            return func
+        if len(arg_fns) == 1:
+            arg = arg_fns[0]
+            return lambda: func(arg())
+        return lambda: func(*[fn() for fn in arg_fns])
@@ -0,0 +1,1006 @@
+#!/usr/bin/env python3
+"""
+Python Code Generation Backend
+
+Generates a standalone Python module from a BASIC program. The module embeds
+the interpreter's array storage, builtin functions and a small support
+runtime (src/codegen_py_runtime.py), so it runs with the standard library
+only, and produces the same output as the interpreter.
+
+Generated code:
+- Scalars are local variables of main()
+- The program is split into basic blocks; a while loop dispatches on the
+  block index (pc) through a binary if-tree, and GOTO/GOSUB/NEXT jump by
+  assigning a block index known at compile time
+- FOR loops are variable-indexed like the interpreter's, with the end, step
+  and body block of each loop variable in locals
+- DEF FN functions are nested functions of main()
+
+There is no debugger support (TRON, breakpoints, STOP/CONT) and no file
+I/O, CHAIN or program editing statements; programs using them are
+reported in self.errors.
+"""
+
+from typing import List, Dict, Set, Optional, Any
+from src.ast_nodes import *
+from src.semantic_analyzer import SymbolTable
+from src.codegen_backend import CodeGenBackend
+from src.tokens import TokenType
+import src.basic_array
+import src.basic_builtins
+import src.codegen_py_runtime
+
+
+# Python names for the type suffixes in mangled variable names
+SUFFIX_TAGS = {'%': 'i', '!': 'f', '#': 'd', '$': 's'}
+
+# Builtins returning strings (FunctionCallNode names have the $ stripped)
+STRING_FUNCTIONS = {
+    'CHR', 'HEX', 'INKEY', 'INPUT', 'LEFT', 'MID', 'MKD', 'MKI', 'MKS',
+    'OCT', 'RIGHT', 'SPACE', 'STR', 'STRING',
+}
+
+RELATIONAL_OPERATORS = {
+    TokenType.EQUAL: '==',
+    TokenType.NOT_EQUAL: '!=',
+    TokenType.LESS_THAN: '<',
+    TokenType.GREATER_THAN: '>',
+    TokenType.LESS_EQUAL: '<=',
+    TokenType.GREATER_EQUAL: '>=',
+}
+
+ARITHMETIC_OPERATORS = {
+    TokenType.MINUS: '-',
+    TokenType.MULTIPLY: '*',
+    TokenType.DIVIDE: '/',
+    TokenType.POWER: '**',
+    TokenType.MOD: '%',
+}
+
+BITWISE_OPERATORS = {
+    TokenType.AND: '&',
+    TokenType.OR: '|',
+    TokenType.XOR: '^',
+}
+
+# Statements the interpreter executes as no-ops
+NOOP_STATEMENTS = (
+    RemarkStatementNode,
+    DataStatementNode,
+    DefTypeStatementNode,
+    DefFnStatementNode,
+    PokeStatementNode,
+    WidthStatementNode,
+    CommonStatementNode,
+)
+
+# Statements that never fall through to the next statement
+TERMINATOR_STATEMENTS = (
+    GotoStatementNode,
+    GosubStatementNode,
+    ReturnStatementNode,
+    EndStatementNode,
+    StopStatementNode,
+    SystemStatementNode,
+    WendStatementNode,
+    ResumeStatementNode,
+    ErrorStatementNode,
+)
+
+RUNTIME_MARKER = '# ---- generated programs embed this module from here on ----'
+
+
+class PythonBackend(CodeGenBackend):
+    """
+    Python code generator for running BASIC programs without the interpreter.
+
+    generate() must be given an AST that SemanticAnalyzer has not analyzed:
+    the analyzer rewrites expressions in place (subscript flattening,
+    reassociation) for the C backend. Analyze a copy for the symbol table.
+    """
+
+    def __init__(self, symbols: SymbolTable, config: Optional[Dict[str, Any]] = None):
+        super().__init__(symbols)
+        self.config = config or {}
+        self.indent_level = 0
+
+        # Top-level statements in execution order: (line_number, statement)
+        self.statements: List[tuple] = []
+        # Line number -> index of its first statement in self.statements
+        self.line_index: Dict[int, int] = {}
+        # Statement index -> block index, for statements that start a block
+        self.block_of: Dict[int, int] = {}
+        self.block_count = 0
+
+        self.scalars: Dict[str, VariableNode] = {}  # Resolved name -> first node
+        self.arrays: Set[str] = set()  # Resolved names
+        self.builtins_used: Set[str] = set()
+        self.def_fn_functions: Dict[str, DefFnStatementNode] = {}
+
+        # FOR/NEXT: resolved name -> FOR statements; NEXT without variable -> name
+        self.for_statements: Dict[str, List[ForStatementNode]] = {}
+        self.next_var_map: Dict[int, str] = {}
+        # WHILE/WEND pairing by statement index (both directions)
+        self.while_pairs: Dict[int, int] = {}
+
+        self.data_values: List[Any] = []
+        self.data_lines: List[int] = []
+
+        self.uses_error_handling = False  # ON ERROR anywhere
+        self.uses_resume = False
+
+        # Generated main() and (main line, BASIC line) pairs for error reports
+        self.code: List[str] = []
+        self.line_table: List[tuple] = []
+        self.current_line = 0
+
+    def get_file_extension(self) -> str:
+        """Python modules use .py extension"""
+        return '.py'
+
+    def get_compiler_command(self, source_file: str, output_file: str) -> List[str]:
+        """No compilation needed - the generated module runs with python3"""
+        return []
+
+    def indent(self) -> str:
+        """Return current indentation"""
+        return '    ' * self.indent_level
+
+    def emit(self, line: str):
+        self.code.append(self.indent() + line)
+
+    def generate(self, program: ProgramNode) -> str:
+        """Generate a Python module for the program"""
+        # Analysis passes
+        self._flatten_program(program)
+        self._collect_symbols()
+        self._collect_data_values()
+        self._match_for_next()
+        self._match_while_wend()
+        self._find_blocks()
+
+        # main() first, so the runtime helpers it needs are known
+        self.indent_level = 0
+        self._generate_main()
+        main_code = self.code
+
+        code = []
+        code.append('#!/usr/bin/env python3')
+        code.append('# Generated by MBASIC-2025 Python Backend')
+        code.append(f'# Source: {self.config.get("source_file", "program.bas")}')
+        code.append('')
+        code.append('# ===== Runtime Library =====')
+        code.extend(self._runtime_library())
+        code.append('')
+        code.append('# ===== Program =====')
+        code.append('')
+
+        # Line numbers in the file are 1-based
+        offset = len(code) + 1
+        code.extend(main_code)
+        line_table = [(offset + index, line) for index, line in self.line_table]
+
+        code.append('')
+        code.append(f'DATA = {self._format_tuple(self.data_values)}')
+        code.append(f'DATA_LINES = {self._format_tuple(self.data_lines)}')
+        code.append(f'LINE_TABLE = {self._format_tuple(line_table)}')
+        code.append('')
+        code.append('')
+        code.append('def run(io=None):')
+        code.append('    """Run the program; returns 0, or 1 after an uncaught error"""')
+        code.append('    return run_program(main, ProgramRuntime(io, DATA, DATA_LINES), LINE_TABLE)')
+        code.append('')
+        code.append('')
+        code.append("if __name__ == '__main__':")
+        code.append('    sys.exit(run())')
+        code.append('')
+
+        return '\n'.join(code)
+
+    def _runtime_library(self) -> List[str]:
+        """Sources of the modules a generated program embeds"""
+        code = []
+        for module in (src.basic_array, src.basic_builtins):
+            with open(module.__file__) as f:
+                code.extend(f.read().splitlines())
+            code.append('')
+        with open(src.codegen_py_runtime.__file__) as f:
+            runtime_source = f.read()
+        code.extend(runtime_source.split(RUNTIME_MARKER, 1)[1].splitlines())
+        return code
+
+    def _format_tuple(self, values: List[Any]) -> str:
+        return '(' + ''.join(f'{self._literal(v)}, ' for v in values).rstrip(' ') + ')'
+
+    def _literal(self, value) -> str:
+        if isinstance(value, tuple):
+            return self._format_tuple(list(value))
+        if isinstance(value, float) and (value != value or value in (float('inf'), float('-inf'))):
+            return f"float('{value}')"
+        return repr(value)
+
+    # ========================================================================
+    # Analysis passes
+    # ========================================================================
+
+    def _flatten_program(self, program: ProgramNode):
+        """List top-level statements in order and index lines"""
+        # A line entered twice replaces the earlier one, as in the editor
+        lines = {line.line_number: line for line in program.lines}
+        pending_lines = []
+        for line in sorted(lines.values(), key=lambda line: line.line_number):
+            pending_lines.append(line.line_number)
+            for stmt in line.statements:
+                for line_number in pending_lines:
+                    self.line_index[line_number] = len(self.statements)
+                pending_lines = []
+                self.statements.append((line.line_number, stmt))
+        # Lines without statements jump to the end of the program
+        for line_number in pending_lines:
+            self.line_index[line_number] = len(self.statements)
+
+    def _walk_statements(self, stmt):
+        """Yield a statement and the statements nested in its IF clauses"""
+        yield stmt
+        if isinstance(stmt, IfStatementNode):
+            for nested in (stmt.then_statements or []) + (stmt.else_statements or []):
+                yield from self._walk_statements(nested)
+
+    def _collect_symbols(self):
+        """Collect variables, arrays, DEF FN functions and builtins"""
+        for _, top in self.statements:
+            for stmt in self._walk_statements(top):
+                if isinstance(stmt, DefFnStatementNode):
+                    self.def_fn_functions[stmt.name] = stmt
+                elif isinstance(stmt, OnErrorStatementNode):
+                    self.uses_error_handling = True
+                elif isinstance(stmt, ResumeStatementNode):
+                    self.uses_resume = True
+                elif isinstance(stmt, DimStatementNode):
+                    for array_def in stmt.arrays:
+                        self.arrays.add(self._array_decl_name(array_def.name))
+                for node in iter_variable_nodes(stmt):
+                    if node.subscripts:
+                        self.arrays.add(self._resolved_name(node))
+                    else:
+                        self.scalars.setdefault(self._resolved_name(node), node)
+                self._collect_builtins(stmt)
+
+        if self.uses_error_handling or self.uses_resume:
+            for name in ('err', 'erl'):
+                self.scalars.setdefault(name + '%', VariableNode(name=name, type_suffix='%'))
+
+    def _collect_builtins(self, node):
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, FunctionCallNode) and self._is_builtin(node.name):
+                self.builtins_used.add(node.name.rstrip('$'))
+            for value in vars(node).values():
+                if isinstance(value, list):
+                    pending.extend(item for item in value if hasattr(item, '__dataclass_fields__'))
+                elif hasattr(value, '__dataclass_fields__'):
+                    pending.append(value)
+
+    def _collect_data_values(self):
+        """Collect all DATA values (constants only)"""
+        for line_number, top in self.statements:
+            if not isinstance(top, DataStatementNode):
+                continue
+            for value in top.values:
+                for item in (value if isinstance(value, list) else [value]):
+                    constant = self._constant_value(item)
+                    if constant is None:
+                        self.errors.append(f"Line {line_number}: DATA value is not a constant")
+                        continue
+                    self.data_values.append(constant)
+                    self.data_lines.append(line_number)
+
+    def _constant_value(self, node):
+        if isinstance(node, (NumberNode, StringNode)):
+            return node.value
+        if isinstance(node, UnaryOpNode) and node.operator in (TokenType.MINUS, TokenType.PLUS):
+            operand = self._constant_value(node.operand)
+            if isinstance(operand, (int, float)):
+                return -operand if node.operator == TokenType.MINUS else operand
+        return None
+
+    def _match_for_next(self):
+        """Record FOR statements per variable and pair NEXT without variable"""
+        for_stack = []
+        for _, top in self.statements:
+            for stmt in self._walk_statements(top):
+                if isinstance(stmt, ForStatementNode):
+                    var_name = self._resolved_name(stmt.variable)
+                    self.for_statements.setdefault(var_name, []).append(stmt)
+                    for_stack.append(var_name)
+                elif isinstance(stmt, NextStatementNode):
+                    if stmt.variables:
+                        for var in stmt.variables:
+                            var_name = self._resolved_name(var)
+                            for j in range(len(for_stack) - 1, -1, -1):
+                                if for_stack[j] == var_name:
+                                    del for_stack[j]
+                                    break
+                    elif for_stack:
+                        self.next_var_map[id(stmt)] = for_stack.pop()
+
+    def _match_while_wend(self):
+        """Pair WHILE and WEND statements lexically"""
+        while_stack = []
+        for index, (line_number, top) in enumerate(self.statements):
+            if isinstance(top, WhileStatementNode):
+                while_stack.append(index)
+            elif isinstance(top, WendStatementNode):
+                if not while_stack:
+                    self.errors.append(f"Line {line_number}: WEND without WHILE")
+                    continue
+                while_index = while_stack.pop()
+                self.while_pairs[while_index] = index
+                self.while_pairs[index] = while_index
+        for index in while_stack:
+            self.errors.append(f"Line {self.statements[index][0]}: WHILE without WEND")
+
+    def _find_blocks(self):
+        """Number the statements that start a block (jump targets).
+
+        With ON ERROR every statement is a block, so the block index
+        identifies the failing statement for ERL and RESUME.
+        """
+        starts = {0, len(self.statements)}
+        for index, (line_number, top) in enumerate(self.statements):
+            if self.uses_error_handling:
+                starts.add(index)
+            if isinstance(top, TERMINATOR_STATEMENTS):
+                starts.add(index + 1)
+            if isinstance(top, WhileStatementNode):
+                starts.add(index)
+                starts.add(self.while_pairs.get(index, index) + 1)
+            for stmt in self._walk_statements(top):
+                for target in self._jump_targets(stmt):
+                    if target in self.line_index:
+                        starts.add(self.line_index[target])
+                    else:
+                        self.errors.append(f"Line {line_number}: Undefined line {target}")
+                if isinstance(stmt, (GosubStatementNode, OnGosubStatementNode, ForStatementNode)):
+                    # Return point / loop body: the statement after the top-level one
+                    starts.add(index + 1)
+
+        for block, index in enumerate(sorted(starts)):
+            self.block_of[index] = block
+        self.block_count = len(starts)
+
+    def _jump_targets(self, stmt) -> List[int]:
+        if isinstance(stmt, (GotoStatementNode, GosubStatementNode)):
+            return [stmt.line_number]
+        if isinstance(stmt, (OnGotoStatementNode, OnGosubStatementNode)):
+            return list(stmt.line_numbers)
+        if isinstance(stmt, IfStatementNode):
+            return [n for n in (stmt.then_line_number, stmt.else_line_number) if n is not None]
+        if isinstance(stmt, OnErrorStatementNode) and stmt.line_number != 0:
+            return [stmt.line_number]
+        if isinstance(stmt, ResumeStatementNode) and stmt.line_number not in (None, 0, -1):
+            return [stmt.line_number]
+        return []
+
+    def _block(self, line_number: int) -> int:
+        """Block index of a line (jump target)"""
+        return self.block_of.get(self.line_index.get(line_number), self.block_count - 1)
+
+    # ========================================================================
+    # Names
+    # ========================================================================
+
+    def _resolved_name(self, var: VariableNode) -> str:
+        """Storage name like the runtime's: lowercase name + suffix (default !)"""
+        return var.name.lower() + (var.type_suffix or '!')
+
+    def _array_decl_name(self, name: str) -> str:
+        name = name.lower()
+        return name if name[-1:] in SUFFIX_TAGS else name + '!'
+
+    def _mangle(self, resolved_name: str) -> str:
+        """a.b! -> a_b_f (suffix tag last, so names never collide)"""
+        return resolved_name[:-1].replace('.', '_') + '_' + SUFFIX_TAGS[resolved_name[-1]]
+
+    def _scalar(self, var: VariableNode) -> str:
+        return 'v_' + self._mangle(self._resolved_name(var))
+
+    def _array(self, resolved_name: str) -> str:
+        return 'a_' + self._mangle(resolved_name)
+
+    def _array_ref(self, var: VariableNode) -> str:
+        """Array object, dimensioned to 10 on first use without DIM"""
+        resolved = self._resolved_name(var)
+        name = self._array(resolved)
+        return f'({name} or ({name} := auto_dim({resolved!r}, {len(var.subscripts)})))'
+
+    def _subscripts(self, var: VariableNode) -> str:
+        return '[' + ', '.join(self._int(sub) for sub in var.subscripts) + ']'
+
+    def _is_builtin(self, name: str) -> bool:
+        return hasattr(src.basic_builtins.BuiltinFunctions, name.rstrip('$'))
+
+    # ========================================================================
+    # Expressions
+    # ========================================================================
+
+    def _type(self, expr) -> str:
+        """Static type: 'str', 'int' (always a Python int), 'num' or 'any'"""
+        if isinstance(expr, StringNode):
+            return 'str'
+        if isinstance(expr, NumberNode):
+            return 'int' if isinstance(expr.value, int) else 'num'
+        if isinstance(expr, VariableNode):
+            suffix = expr.type_suffix
+            if suffix == '$':
+                return 'str'
+            # Scalars start as int 0 and arrays of any type hold floats or ints
+            return 'num'
+        if isinstance(expr, BinaryOpNode):
+            op = expr.operator
+            if op in RELATIONAL_OPERATORS or op in BITWISE_OPERATORS or op in (
+                    TokenType.EQV, TokenType.IMP, TokenType.BACKSLASH):
+                return 'int'
+            if op == TokenType.PLUS:
+                left, right = self._type(expr.left), self._type(expr.right)
+                if left == 'str' or right == 'str':
+                    return 'str'
+                if left in ('num', 'int') and right in ('num', 'int'):
+                    return 'num'
+                return 'any'
+            return 'num'
+        if isinstance(expr, UnaryOpNode):
+            if expr.operator == TokenType.NOT:
+                return 'int'
+            return self._type(expr.operand)
+        if isinstance(expr, FunctionCallNode):
+            if self._is_builtin(expr.name):
+                name = expr.name.rstrip('$')
+                if name in STRING_FUNCTIONS:
+                    return 'str'
+                if name in ('TAB', 'SPC'):
+                    return 'any'
+                return 'num'
+            func = self.def_fn_functions.get(expr.name)
+            if func is not None and not getattr(func, '_typing', False):
+                # Guard against recursive definitions while typing the body
+                func._typing = True
+                try:
+                    return self._type(func.expression)
+                finally:
+                    del func._typing
+        return 'any'
+
+    def _int(self, expr) -> str:
+        """Expression converted with int() (subscripts, ON index, bitwise operands)"""
+        code = self._expression(expr)
+        return code if self._type(expr) == 'int' else f'int({code})'
+
+    def _expression(self, expr) -> str:
+        """Generate a Python expression"""
+        if isinstance(expr, NumberNode):
+            return self._literal(expr.value)
+        elif isinstance(expr, StringNode):
+            return repr(expr.value)
+        elif isinstance(expr, VariableNode):
+            if expr.subscripts:
+                return f'{self._array_ref(expr)}.get({self._subscripts(expr)})'
+            return self._scalar(expr)
+        elif isinstance(expr, BinaryOpNode):
+            return self._binary_op(expr)
+        elif isinstance(expr, UnaryOpNode):
+            operand = self._expression(expr.operand)
+            if expr.operator == TokenType.MINUS:
+                return f'(-{operand})'
+            elif expr.operator == TokenType.NOT:
+                return f'(~{self._int(expr.operand)})'
+            return operand
+        elif isinstance(expr, FunctionCallNode):
+            return self._function_call(expr)
+        self.errors.append(f"Line {self.current_line}: Unsupported expression {type(expr).__name__}")
+        return 'None'
+
+    def _binary_op(self, expr: BinaryOpNode) -> str:
+        op = expr.operator
+        left = self._expression(expr.left)
+        right = self._expression(expr.right)
+        if op == TokenType.PLUS:
+            if self._type(expr) == 'num':
+                return f'({left} + {right})'
+            return f'add({left}, {right})'
+        if op in ARITHMETIC_OPERATORS:
+            # Division by zero raises ZeroDivisionError (error 11, reported
+            # as "Division by zero" like the interpreter)
+            return f'({left} {ARITHMETIC_OPERATORS[op]} {right})'
+        if op == TokenType.BACKSLASH:
+            return f'int({left} // {right})'
+        if op in RELATIONAL_OPERATORS:
+            return f'(-1 if {left} {RELATIONAL_OPERATORS[op]} {right} else 0)'
+        left, right = self._int(expr.left), self._int(expr.right)
+        if op in BITWISE_OPERATORS:
+            return f'({left} {BITWISE_OPERATORS[op]} {right})'
+        if op == TokenType.EQV:
+            return f'(~({left} ^ {right}))'
+        if op == TokenType.IMP:
+            return f'((~{left}) | {right})'
+        self.errors.append(f"Line {self.current_line}: Unsupported operator {op}")
+        return 'None'
+
+    def _condition(self, expr) -> str:
+        """Expression for IF/WHILE, where only truthiness matters.
+
+        Comparisons stay Python bools instead of -1/0; AND/OR/XOR/NOT of
+        comparisons become &, |, ^ and not on bools, which evaluate both
+        operands like the interpreter.
+        """
+        if isinstance(expr, BinaryOpNode):
+            op = expr.operator
+            if op in RELATIONAL_OPERATORS:
+                return (f'({self._expression(expr.left)} {RELATIONAL_OPERATORS[op]} '
+                        f'{self._expression(expr.right)})')
+            if op in BITWISE_OPERATORS and self._is_comparison(expr.left) and self._is_comparison(expr.right):
+                return f'({self._condition(expr.left)} {BITWISE_OPERATORS[op]} {self._condition(expr.right)})'
+        if isinstance(expr, UnaryOpNode) and expr.operator == TokenType.NOT and self._is_comparison(expr.operand):
+            return f'(not {self._condition(expr.operand)})'
+        return self._expression(expr)
+
+    def _is_comparison(self, expr) -> bool:
+        """True if the expression is -1/0 valued (comparisons and logic on them)"""
+        if isinstance(expr, BinaryOpNode):
+            if expr.operator in RELATIONAL_OPERATORS:
+                return True
+            if expr.operator in BITWISE_OPERATORS:
+                return self._is_comparison(expr.left) and self._is_comparison(expr.right)
+        if isinstance(expr, UnaryOpNode) and expr.operator == TokenType.NOT:
+            return self._is_comparison(expr.operand)
+        return False
+
+    def _function_call(self, func: FunctionCallNode) -> str:
+        """Generate builtin or DEF FN call"""
+        args = ', '.join(self._expression(arg) for arg in func.arguments)
+        if self._is_builtin(func.name):
+            return f'b_{func.name.rstrip("$")}({args})'
+        info = self.symbols.functions.get(func.name.upper())
+        if info is None or func.name not in self.def_fn_functions:
+            self.errors.append(f"Line {self.current_line}: Undefined function {func.name.upper()}")
+            return 'None'
+        if len(func.arguments) != len(info.parameters):
+            self.errors.append(f"Line {self.current_line}: Wrong number of arguments to {info.name}")
+        return f'fn_{self._mangle(func.name + "!")}({args})'
+
+    # ========================================================================
+    # Program
+    # ========================================================================
+
+    def _generate_main(self):
+        """Generate main(rt): variables, DEF FN functions and the dispatch loop"""
+        self.emit('def main(rt):')
+        self.indent_level += 1
+
+        # Runtime helpers and builtins as locals
+        self.emit('output = rt.output')
+        self.emit('print_items = rt.print_items')
+        self.emit('auto_dim = rt.auto_dim')
+        if self.builtins_used:
+            self.emit('builtins = BuiltinFunctions(rt)')
+            for name in sorted(self.builtins_used):
+                self.emit(f'b_{name} = builtins.{name}')
+        self.emit('')
+
+        # Variables
+        self._emit_variable_reset()
+        for var_name in sorted(self.for_statements):
+            loop = self._mangle(var_name)
+            self.emit(f'for_end_{loop} = for_step_{loop} = 0')
+            self.emit(f'for_body_{loop} = -1')
+        for index in sorted(self.while_pairs):
+            if isinstance(self.statements[index][1], WhileStatementNode):
+                self.emit(f'while_open_{index} = False')
+        self.emit('gosub_stack = []')
+        if self.uses_error_handling or self.uses_resume:
+            self.emit('error_handler = -1')
+            self.emit('error_handler_gosub = False')
+            self.emit('error_block = -1')
+        if self.uses_error_handling:
+            block_lines = [self.statements[index][0] if index < len(self.statements) else 0
+                           for index in sorted(self.block_of)]
+            self.emit(f'block_lines = {self._format_tuple(block_lines)}')
+        self.emit('')
+
+        # DEF FN functions
+        for name, def_fn in self.def_fn_functions.items():
+            self._emit_def_fn(name, def_fn)
+
+        # Dispatch loop
+        self.emit('pc = 0')
+        self.emit('while True:')
+        self.indent_level += 1
+        if self.uses_error_handling:
+            self.emit('try:')
+            self.indent_level += 1
+        block_starts = sorted(self.block_of)
+        self._emit_dispatch(block_starts, 0, len(block_starts))
+        if self.uses_error_handling:
+            self.indent_level -= 1
+            self._emit_error_dispatch()
+        self.indent_level -= 2
+
+    def _emit_variable_reset(self):
+        """Set every scalar to its initial value and drop every array (start, CLEAR)"""
+        for var_name in sorted(self.scalars):
+            initial = '""' if var_name.endswith('$') else '0'
+            self.emit(f'v_{self._mangle(var_name)} = {initial}')
+        for var_name in sorted(self.arrays):
+            self.emit(f'{self._array(var_name)} = None')
+
+    def _emit_def_fn(self, name: str, def_fn: DefFnStatementNode):
+        self.current_line = self._def_line(def_fn)
+        params = ', '.join(self._scalar(p) for p in def_fn.parameters)
+        self.emit(f'def fn_{self._mangle(name + "!")}({params}):')
+        self.indent_level += 1
+        arrays = sorted({self._array(self._resolved_name(node))
+                         for node in iter_variable_nodes(def_fn.expression) if node.subscripts})
+        if arrays:
+            # Auto-dimensioning assigns the array variables of main()
+            self.emit(f'nonlocal {", ".join(arrays)}')
+        self.emit(f'return {self._expression(def_fn.expression)}')
+        self.indent_level -= 1
+        self.emit('')
+
+    def _def_line(self, def_fn) -> int:
+        for line_number, top in self.statements:
+            if any(stmt is def_fn for stmt in self._walk_statements(top)):
+                return line_number
+        return 0
+
+    def _emit_dispatch(self, block_starts: List[int], low: int, high: int):
+        """Binary if-tree selecting block low..high-1 by pc"""
+        if high - low == 1:
+            self._emit_block(block_starts, low)
+            return
+        middle = (low + high) // 2
+        self.emit(f'if pc < {middle}:')
+        self.indent_level += 1
+        self._emit_dispatch(block_starts, low, middle)
+        self.indent_level -= 1
+        self.emit('else:')
+        self.indent_level += 1
+        self._emit_dispatch(block_starts, middle, high)
+        self.indent_level -= 1
+
+    def _emit_block(self, block_starts: List[int], block: int):
+        start = block_starts[block]
+        if start == len(self.statements):
+            self.emit('return')  # End of program
+            return
+        end = block_starts[block + 1]
+        for index in range(start, end):
+            line_number, stmt = self.statements[index]
+            if index == start or line_number != self.statements[index - 1][0]:
+                self.emit(f'# {line_number}')
+            self.current_line = line_number
+            self.line_table.append((len(self.code), line_number))
+            self._generate_statement(stmt, index)
+        if not isinstance(self.statements[end - 1][1], TERMINATOR_STATEMENTS):
+            self.emit(f'pc = {block + 1}')
+
+    def _emit_error_dispatch(self):
+        """Pass exceptions to the ON ERROR handler (see Interpreter._handle_statement_error)"""
+        self.emit('except Exception as e:')
+        self.indent_level += 1
+        self.emit('if error_handler < 0 or error_block >= 0:')
+        self.emit('    raise')
+        self.emit('error_block = pc')
+        self.emit('v_err_i = error_code(e)')
+        self.emit('v_erl_i = block_lines[pc]')
+        self.emit('if error_handler_gosub:')
+        self.emit('    gosub_stack.append(pc + 1)')
+        self.emit('pc = error_handler')
+        self.indent_level -= 1
+
+    def _jump(self, block: int):
+        self.emit(f'pc = {block}')
+        self.emit('continue')
+
+    def _leave_error_handler(self):
+        """GOTO and RETURN out of an error handler clear the error state"""
+        if self.uses_error_handling:
+            self.emit('if error_block >= 0:')
+            self.emit('    error_block = -1')
+            self.emit('    v_err_i = 0')
+
+    # ========================================================================
+    # Statements
+    # ========================================================================
+
+    def _generate_statement(self, stmt, index: int):
+        """Generate code for a statement at top-level position index"""
+        if isinstance(stmt, NOOP_STATEMENTS):
+            self.emit('pass')
+        elif isinstance(stmt, PrintStatementNode) and stmt.file_number is None:
+            values = ''.join(f'{self._expression(e)}, ' for e in stmt.expressions).rstrip(' ')
+            self.emit(f'print_items(({values}), {tuple(stmt.separators)!r})')
+        elif isinstance(stmt, PrintUsingStatementNode) and stmt.file_number is None:
+            values = ''.join(f'{self._expression(e)}, ' for e in stmt.expressions).rstrip(' ')
+            self.emit(f'rt.print_using({self._expression(stmt.format_string)}, ({values}))')
+        elif isinstance(stmt, WriteStatementNode) and stmt.file_number is None:
+            values = ''.join(f'{self._expression(e)}, ' for e in stmt.expressions).rstrip(' ')
+            self.emit(f'rt.write_items(({values}))')
+        elif isinstance(stmt, LetStatementNode):
+            self._generate_assignment(stmt.variable, stmt.expression)
+        elif isinstance(stmt, IfStatementNode):
+            self._generate_if(stmt, index)
+        elif isinstance(stmt, GotoStatementNode):
+            self._leave_error_handler()
+            self._jump(self._block(stmt.line_number))
+        elif isinstance(stmt, GosubStatementNode):
+            self._generate_gosub(self._block(stmt.line_number), index)
+        elif isinstance(stmt, OnGotoStatementNode):
+            self._generate_on_goto(stmt)
+        elif isinstance(stmt, OnGosubStatementNode):
+            self._generate_on_gosub(stmt, index)
+        elif isinstance(stmt, ReturnStatementNode):
+            self.emit('if not gosub_stack:')
+            self.emit('    raise RuntimeError("RETURN without GOSUB")')
+            self._leave_error_handler()
+            self.emit('pc = gosub_stack.pop()')
+            self.emit('continue')
+        elif isinstance(stmt, ForStatementNode):
+            self._generate_for(stmt, index)
+        elif isinstance(stmt, NextStatementNode):
+            self._generate_next(stmt)
+        elif isinstance(stmt, WhileStatementNode) and index in self.while_pairs and stmt is self.statements[index][1]:
+            self.emit(f'if {self._condition(stmt.condition)}:')
+            self.emit(f'    while_open_{index} = True')
+            self.emit('else:')
+            self.indent_level += 1
+            self.emit(f'while_open_{index} = False')
+            self._jump(self.block_of[self.while_pairs[index] + 1])
+            self.indent_level -= 1
+        elif isinstance(stmt, WendStatementNode) and index in self.while_pairs and stmt is self.statements[index][1]:
+            # GOTO into a loop body reaches WEND without an open WHILE
+            while_index = self.while_pairs[index]
+            self.emit(f'if not while_open_{while_index}:')
+            self.emit(f'    raise RuntimeError("WEND without matching WHILE at line {self.current_line}")')
+            self._jump(self.block_of[while_index])
+        elif isinstance(stmt, EndStatementNode):
+            self.emit('return')
+        elif isinstance(stmt, StopStatementNode):
+            self.emit(f'rt.stop({self.current_line})')
+            self.emit('return')
+        elif isinstance(stmt, SystemStatementNode):
+            self.emit('output("Goodbye")')
+            self.emit('return')
+        elif isinstance(stmt, InputStatementNode) and stmt.file_number is None:
+            self._generate_input(stmt)
+        elif isinstance(stmt, LineInputStatementNode) and stmt.file_number is None:
+            prompt = self._expression(stmt.prompt) if stmt.prompt else 'None'
+            self._store(stmt.variable, f'rt.line_input({prompt})')
+        elif isinstance(stmt, ReadStatementNode):
+            for var in stmt.variables:
+                if var.type_suffix == '$':
+                    value = 'str(rt.read_data())'
+                elif var.type_suffix == '%':
+                    value = 'int(rt.read_data())'
+                else:
+                    value = 'data_number(rt.read_data())'
+                self._store(var, value)
+        elif isinstance(stmt, RestoreStatementNode):
+            line_number = getattr(stmt, 'line_number', None)
+            self.emit(f'rt.restore_data({line_number!r})')
+        elif isinstance(stmt, DimStatementNode):
+            for array_def in stmt.arrays:
+                name = self._array_decl_name(array_def.name)
+                dims = ', '.join(self._int(dim) for dim in array_def.dimensions)
+                self.emit(f'{self._array(name)} = rt.dim({name!r}, [{dims}])')
+        elif isinstance(stmt, EraseStatementNode):
+            for array_name in stmt.array_names:
+                # Same lookup as Interpreter.execute_erase: the name as written
+                name = array_name.lower()
+                if name in self.arrays:
+                    self.emit(f'{self._array(name)} = None')
+                    self.emit(f'rt.erase({name!r})')
+                else:
+                    self.emit('pass')
+        elif isinstance(stmt, ClearStatementNode):
+            self._emit_variable_reset()
+            self.emit('rt.array_names.clear()')
+        elif isinstance(stmt, OptionBaseStatementNode):
+            self.emit(f'rt.option_base({stmt.base})')
+        elif isinstance(stmt, RandomizeStatementNode):
+            seed = self._expression(stmt.seed) if stmt.seed else ''
+            self.emit(f'rt.randomize({seed})')
+        elif isinstance(stmt, SwapStatementNode):
+            self.emit(f'swap_value = {self._expression(stmt.var1)}')
+            self._store(stmt.var1, self._expression(stmt.var2))
+            self._store(stmt.var2, 'swap_value')
+        elif isinstance(stmt, MidAssignmentStatementNode) and isinstance(stmt.string_var, VariableNode):
+            length = self._expression(stmt.length) if stmt.length else 'None'
+            self._store(stmt.string_var,
+                        f'mid_assign({self._expression(stmt.string_var)}, {self._expression(stmt.start)}, '
+                        f'{self._expression(stmt.value)}, {length})')
+        elif isinstance(stmt, OnErrorStatementNode):
+            handler = self._block(stmt.line_number) if stmt.line_number != 0 else -1
+            self.emit(f'error_handler = {handler}')
+            self.emit(f'error_handler_gosub = {bool(stmt.is_gosub and stmt.line_number != 0)}')
+        elif isinstance(stmt, ResumeStatementNode):
+            self._generate_resume(stmt)
+        elif isinstance(stmt, ErrorStatementNode):
+            self.emit(f'error_number = {self._int(stmt.error_code)}')
+            if 'err%' in self.scalars:
+                self.emit('v_err_i = error_number')
+                self.emit(f'v_erl_i = {self.current_line}')
+            self.emit('raise RuntimeError(f"ERROR {error_number}")')
+        else:
+            keyword = type(stmt).__name__.replace('StatementNode', '').upper()
+            self.errors.append(f"Line {self.current_line}: {keyword} is not supported by the Python backend")
+            self.emit(f'raise RuntimeError("{keyword} is not supported in compiled programs")')
+
+    def _store(self, var: VariableNode, value: str):
+        """Assign an already converted value to a scalar or array element"""
+        if var.subscripts:
+            self.emit(f'{self._array_ref(var)}.set({self._subscripts(var)}, {value})')
+        else:
+            self.emit(f'{self._scalar(var)} = {value}')
+
+    def _generate_assignment(self, var: VariableNode, expr):
+        """LET with the interpreter's conversion for the variable type"""
+        value = self._expression(expr)
+        value_type = self._type(expr)
+        if var.type_suffix == '%':
+            if value_type != 'int':
+                value = f'int({value})'
+        elif var.type_suffix == '$':
+            if value_type != 'str':
+                value = f'str({value})'
+        elif value_type not in ('num', 'int'):
+            value = f'to_number({value})'
+        if var.subscripts:
+            # The interpreter evaluates the value before the subscripts
+            self.emit(f'value = {value}')
+            value = 'value'
+        self._store(var, value)
+
+    def _generate_if(self, stmt: IfStatementNode, index: int):
+        """Generate IF statement; THEN/ELSE statements are generated inline"""
+        self.emit(f'if {self._condition(stmt.condition)}:')
+        self._generate_clause(stmt.then_line_number, stmt.then_statements, index)
+        if stmt.else_line_number is not None or stmt.else_statements:
+            self.emit('else:')
+            self._generate_clause(stmt.else_line_number, stmt.else_statements, index)
+
+    def _generate_clause(self, line_number, statements, index: int):
+        self.indent_level += 1
+        if line_number is not None:
+            self._jump(self._block(line_number))
+        elif statements:
+            for nested in statements:
+                if isinstance(nested, (WhileStatementNode, WendStatementNode)):
+                    self.errors.append(f"Line {self.current_line}: WHILE/WEND inside IF is not supported "
+                                       f"by the Python backend")
+                self._generate_statement(nested, index)
+        else:
+            self.emit('pass')
+        self.indent_level -= 1
+
+    def _return_block(self, index: int) -> int:
+        """Block after the top-level statement at index (GOSUB return, FOR body)"""
+        return self.block_of[index + 1]
+
+    def _generate_gosub(self, target: int, index: int):
+        self.emit('if len(gosub_stack) >= MAX_GOSUB_DEPTH:')
+        self.emit('    raise RuntimeError(f"GOSUB stack overflow (limit: {MAX_GOSUB_DEPTH})")')
+        self.emit(f'gosub_stack.append({self._return_block(index)})')
+        self._jump(target)
+
+    def _generate_on_goto(self, stmt: OnGotoStatementNode):
+        targets = self._format_tuple([self._block(n) for n in stmt.line_numbers])
+        self.emit(f'on_index = {self._int(stmt.expression)}')
+        self.emit(f'if 1 <= on_index <= {len(stmt.line_numbers)}:')
+        self.indent_level += 1
+        self._leave_error_handler()
+        self.emit(f'pc = {targets}[on_index - 1]')
+        self.emit('continue')
+        self.indent_level -= 1
+
+    def _generate_on_gosub(self, stmt: OnGosubStatementNode, index: int):
+        targets = self._format_tuple([self._block(n) for n in stmt.line_numbers])
+        self.emit(f'on_index = {self._int(stmt.expression)}')
+        self.emit(f'if 1 <= on_index <= {len(stmt.line_numbers)}:')
+        self.indent_level += 1
+        self.emit('if len(gosub_stack) >= MAX_GOSUB_DEPTH:')
+        self.emit('    raise RuntimeError(f"GOSUB stack overflow (limit: {MAX_GOSUB_DEPTH})")')
+        self.emit(f'gosub_stack.append({self._return_block(index)})')
+        self.emit(f'pc = {targets}[on_index - 1]')
+        self.emit('continue')
+        self.indent_level -= 1
+
+    def _generate_for(self, stmt: ForStatementNode, index: int):
+        """FOR: set the variable (unconverted, like the interpreter) and bind the loop"""
+        loop = self._mangle(self._resolved_name(stmt.variable))
+        self.emit(f'for_start = {self._expression(stmt.start_expr)}')
+        self.emit(f'for_end_{loop} = {self._expression(stmt.end_expr)}')
+        step = self._expression(stmt.step_expr) if stmt.step_expr else '1'
+        self.emit(f'for_step_{loop} = {step}')
+        self.emit(f'{self._scalar(stmt.variable)} = for_start')
+        self.emit(f'for_body_{loop} = {self._return_block(index)}')
+
+    def _constant_step(self, var_name: str):
+        """Step shared by every FOR of a variable, if all are the same constant"""
+        steps = set()
+        for stmt in self.for_statements.get(var_name, []):
+            step = self._constant_value(stmt.step_expr) if stmt.step_expr else 1
+            if step is None:
+                return None
+            steps.add(step)
+        return steps.pop() if len(steps) == 1 else None
+
+    def _generate_next(self, stmt: NextStatementNode):
+        """NEXT: increment and jump back to the loop body, or unbind the loop"""
+        if stmt.variables:
+            var_names = [(self._resolved_name(var), var.name + (var.type_suffix or ''))
+                         for var in stmt.variables]
+        elif id(stmt) in self.next_var_map:
+            var_names = [(self.next_var_map[id(stmt)], None)]
+        else:
+            self.emit('raise RuntimeError("NEXT without FOR")')
+            return
+
+        for var_name, display_name in var_names:
+            if var_name not in self.for_statements:
+                message = f"NEXT without FOR: {display_name}" if display_name else "NEXT without FOR"
+                self.emit(f'raise RuntimeError({message!r})')
+                return
+            loop = self._mangle(var_name)
+            variable = 'v_' + loop
+            message = f"NEXT without FOR: {display_name}" if display_name else "NEXT without FOR"
+            self.emit(f'if for_body_{loop} < 0:')
+            self.emit(f'    raise RuntimeError({message!r})')
+
+            step = self._constant_step(var_name)
+            if step is None:
+                self.emit(f'next_value = {variable} + for_step_{loop}')
+                condition = (f'(for_step_{loop} > 0 and next_value <= for_end_{loop}) or '
+                             f'(for_step_{loop} < 0 and next_value >= for_end_{loop})')
+            else:
+                self.emit(f'next_value = {variable} + {self._literal(step)}')
+                if step > 0:
+                    condition = f'next_value <= for_end_{loop}'
+                elif step < 0:
+                    condition = f'next_value >= for_end_{loop}'
+                else:
+                    condition = 'False'
+            self.emit(f'if {condition}:')
+            self.indent_level += 1
+            self.emit(f'{variable} = next_value')
+            self.emit(f'pc = for_body_{loop}')
+            self.emit('continue')
+            self.indent_level -= 1
+            self.emit(f'for_body_{loop} = -1')
+
+    def _generate_input(self, stmt: InputStatementNode):
+        prompt = self._expression(stmt.prompt) if stmt.prompt else 'None'
+        self.emit(f'input_fields = rt.input_values({prompt}, {stmt.suppress_question}, {len(stmt.variables)})')
+        for i, var in enumerate(stmt.variables):
+            if var.type_suffix == '$':
+                self._store(var, f'input_fields[{i}]')
+            else:
+                self._store(var, f'input_number(input_fields[{i}])')
+
+    def _generate_resume(self, stmt: ResumeStatementNode):
+        """RESUME [0], RESUME NEXT (-1) and RESUME line (see Interpreter.execute_resume)"""
+        if not self.uses_error_handling:
+            self.emit('raise RuntimeError("RESUME without error")')
+            return
+        self.emit('if error_block < 0:')
+        self.emit('    raise RuntimeError("RESUME without error")')
+        self.emit('v_err_i = 0')
+        if stmt.line_number is None or stmt.line_number == 0:
+            self.emit('pc = error_block')
+        elif stmt.line_number == -1:
+            self.emit('pc = error_block + 1')
+        else:
+            self.emit(f'pc = {self._block(stmt.line_number)}')
+        self.emit('error_block = -1')
+        self.emit('continue')
@@ -0,0 +1,316 @@
+"""
+Support runtime for programs generated by the Python backend.
+
+PythonBackend (src/codegen_py_backend.py) copies the part of this module
+below the marker line into every generated program, after the sources of
+src/basic_array.py and src/basic_builtins.py, so a compiled program runs with
+nothing but the standard library.
+
+Everything here mirrors the interpreter: PRINT/WRITE formatting and INPUT,
+READ and LET conversions follow the corresponding Interpreter.execute_*
+methods, and error_code() is Interpreter._map_exception_to_error_code().
+Resource limits other than the GOSUB depth are not enforced.
+"""
+
+from src.basic_array import BasicArray
+from src.basic_builtins import TabMarker, SpcMarker, get_using_formatter
+
+# ---- generated programs embed this module from here on ----
+
+import sys
+import time
+import random
+from bisect import bisect_right
+
+
+# Same default as create_local_limits()
+MAX_GOSUB_DEPTH = 500
+
+
+class ConsoleIO:
+    """Console I/O for compiled programs run without an IOHandler"""
+
+    def output(self, text, end='\n'):
+        sys.stdout.write(str(text) + end)
+
+    def input(self, prompt=''):
+        if prompt:
+            self.output(prompt, end='')
+        self.flush()
+        return input()
+
+    def flush(self):
+        sys.stdout.flush()
+
+
+class ProgramRuntime:
+    """State a compiled program shares with BuiltinFunctions.
+
+    Scalars, FOR loops and the GOSUB stack live in the generated main()
+    function; this object holds what the builtins need (rnd_last, files,
+    field_buffers), the DATA pointer, OPTION BASE and the console.
+
+    Args:
+        io: Object with output(text, end) and input(prompt) (an IOHandler),
+            or None for stdin/stdout
+        data: Values of all DATA statements in program order
+        data_lines: Line number of each DATA value (for RESTORE line)
+    """
+
+    def __init__(self, io=None, data=(), data_lines=()):
+        self.io = io if io is not None else ConsoleIO()
+        self.rnd_last = 0.5
+        self.files = {}
+        self.field_buffers = {}
+        self.data = data
+        self.data_lines = data_lines
+        self.data_pointer = 0
+        self.array_base = 0
+        self.option_base_executed = False
+        self.array_names = set()
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def output(self, text, end='\n'):
+        self.io.output(text, end=end)
+
+    def flush(self):
+        """Write out output the console still buffers (IOHandler.flush())"""
+        flush = getattr(self.io, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def print_items(self, values, separators):
+        """PRINT values with their separators (see Interpreter.execute_print)"""
+        output = ""
+        for i, value in enumerate(values):
+            if isinstance(value, TabMarker):
+                current_col = len(output) + 1
+                if current_col < value.column:
+                    output += " " * (value.column - current_col)
+            elif isinstance(value, SpcMarker):
+                output += " " * value.count
+            elif isinstance(value, float):
+                s = str(int(value)) if value == int(value) else str(value)
+                if value >= 0:
+                    s = " " + s
+                output += s + " "
+            else:
+                output += str(value)
+            if i < len(separators):
+                sep = separators[i]
+                if sep == ',':
+                    current_len = len(output)
+                    output += " " * (((current_len // 14) + 1) * 14 - current_len)
+                elif sep == '\n':
+                    output += '\n'
+        if separators and separators[-1] in (';', ',', '\n'):
+            self.io.output(output, end='')
+        else:
+            self.io.output(output)
+
+    def print_using(self, format_str, values):
+        """PRINT USING (see Interpreter.execute_printusing)"""
+        format_str = str(format_str)
+        if not format_str:
+            raise RuntimeError("Illegal function call")
+        self.io.output(get_using_formatter(format_str).format_values(list(values)))
+
+    def write_items(self, values):
+        """WRITE values, strings quoted (see Interpreter.execute_write)"""
+        parts = []
+        for value in values:
+            if isinstance(value, str):
+                parts.append(f'"{value}"')
+            elif isinstance(value, float) and value == int(value):
+                parts.append(str(int(value)))
+            else:
+                parts.append(str(value))
+        self.io.output(','.join(parts))
+
+    def stop(self, line_number):
+        self.io.output(f"Break in {line_number}")
+
+    # ------------------------------------------------------------------
+    # Input
+    # ------------------------------------------------------------------
+
+    def input_values(self, prompt, suppress_question, count):
+        """INPUT: show the prompt, read a line and split it into count fields"""
+        if prompt is not None:
+            self.io.output(prompt, end='')
+        if not suppress_question:
+            self.io.output("? ", end='')
+        values = [v.strip() for v in self.io.input('').split(',')]
+        if len(values) < count:
+            raise RuntimeError("Input past end of file")
+        return values
+
+    def line_input(self, prompt):
+        """LINE INPUT: show the prompt and return the whole line"""
+        if prompt is not None:
+            self.io.output(prompt, end='')
+        return self.io.input('')
+
+    # ------------------------------------------------------------------
+    # DATA
+    # ------------------------------------------------------------------
+
+    def read_data(self):
+        if self.data_pointer >= len(self.data):
+            raise RuntimeError("Out of DATA")
+        value = self.data[self.data_pointer]
+        self.data_pointer += 1
+        return value
+
+    def restore_data(self, line_number=None):
+        """RESTORE to the first DATA value at or after line_number"""
+        if line_number is None:
+            self.data_pointer = 0
+        else:
+            self.data_pointer = len(self.data)
+            for index, data_line in enumerate(self.data_lines):
+                if data_line >= line_number:
+                    self.data_pointer = index
+                    break
+
+    # ------------------------------------------------------------------
+    # Arrays
+    # ------------------------------------------------------------------
+
+    def dim(self, name, dimensions):
+        self.array_names.add(name)
+        return BasicArray(name, dimensions, self.array_base)
+
+    def auto_dim(self, name, subscript_count):
+        """Array used before DIM: dimension it to 10 in every subscript"""
+        return self.dim(name, [10] * subscript_count)
+
+    def erase(self, name):
+        self.array_names.discard(name)
+
+    def option_base(self, base):
+        if self.option_base_executed or self.array_names:
+            raise RuntimeError("Duplicate Definition")
+        self.array_base = base
+        self.option_base_executed = True
+
+    def randomize(self, seed=None):
+        random.seed(time.time() if seed is None else int(seed))
+
+
+def add(left, right):
+    """+ on operands that may be strings (255 character limit)"""
+    result = left + right
+    if isinstance(result, str) and len(result) > 255:
+        raise RuntimeError("String too long")
+    return result
+
+
+def to_number(value):
+    """Value assigned to a SINGLE/DOUBLE variable (see Interpreter.execute_let)"""
+    if not isinstance(value, (int, float)):
+        value = float(value) if value else 0
+    return value
+
+
+def data_number(value):
+    """DATA value read into a numeric variable (see Interpreter.execute_read)"""
+    if not isinstance(value, (int, float)):
+        try:
+            value = float(value)
+        except (ValueError, TypeError):
+            value = 0
+    return value
+
+
+def input_number(text):
+    """INPUT field read into a numeric variable"""
+    try:
+        return float(text)
+    except ValueError:
+        return 0
+
+
+def mid_assign(current, start, value, length):
+    """Result of MID$(var, start[, length]) = value (see Interpreter.execute_midassignment)"""
+    if not isinstance(current, str):
+        current = str(current)
+    start = int(start) - 1
+    value = str(value)
+    length = len(value) if length is None else int(length)
+    if start < 0 or start >= len(current):
+        return current
+    count = min(length, len(value), len(current) - start)
+    return current[:start] + value[:count] + current[start + count:]
+
+
+def error_code(exception):
+    """MBASIC error code for an exception (same as the interpreter)"""
+    error_msg = str(exception).lower()
+    if isinstance(exception, ZeroDivisionError) or "division by zero" in error_msg:
+        return 11
+    if isinstance(exception, (TypeError, ValueError)):
+        if "type mismatch" in error_msg or "invalid literal" in error_msg:
+            return 13
+        return 5
+    if isinstance(exception, IndexError) or "subscript out of range" in error_msg:
+        return 9
+    if isinstance(exception, KeyError) or "undefined" in error_msg:
+        if "function" in error_msg:
+            return 18
+        return 8
+    if "out of data" in error_msg:
+        return 4
+    if "next without for" in error_msg:
+        return 1
+    if "return without gosub" in error_msg:
+        return 3
+    if isinstance(exception, OverflowError):
+        return 6
+    return 5
+
+
+def basic_line(main, traceback, line_table):
+    """BASIC line main() was executing in a traceback.
+
+    Errors inside a DEF FN are reported at the line calling it, like the
+    interpreter. line_table is a sorted tuple of (generated line, BASIC line)
+    pairs for the statements of main().
+    """
+    while traceback is not None:
+        if traceback.tb_frame.f_code is main.__code__:
+            index = bisect_right(line_table, (traceback.tb_lineno, float('inf'))) - 1
+            return line_table[index][1] if index >= 0 else None
+        traceback = traceback.tb_next
+    return None
+
+
+def run_program(main, runtime, line_table):
+    """Run a compiled main(), reporting errors the way the interpreter does.
+
+    Returns:
+        0 on normal termination, 1 after an uncaught error
+    """
+    try:
+        main(runtime)
+    except EOFError:
+        runtime.output("")
+    except KeyboardInterrupt:
+        line = basic_line(main, sys.exc_info()[2], line_table)
+        runtime.output(f"Break in {line if line is not None else '?'}")
+    except Exception as e:
+        line = basic_line(main, e.__traceback__, line_table)
+        if isinstance(e, ZeroDivisionError):
+            # Raised by inlined / and \ where the interpreter raises its own error
+            e = RuntimeError("Division by zero")
+        if line is not None:
+            runtime.output(f"?{type(e).__name__} in {line}: {e}")
+        else:
+            runtime.output(f"?{type(e).__name__}: {e}")
+        return 1
+    finally:
+        runtime.flush()
+    return 0
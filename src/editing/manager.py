@@ -8,6 +8,7 @@ Web UI LOAD/SAVE commands are not yet implemented (would require FileIO integrat
 FILE I/O ARCHITECTURE:
 This manager provides direct Python file I/O methods (load_from_file, save_to_file)
 for loading/saving .BAS program files. Used by both UI menus and BASIC commands.
+Files may be ASCII or MBASIC tokenized binary (see src/tokenized_program.py).
 
 Current implementation (LOCAL UIs):
 - LOAD/SAVE/MERGE commands (interactive.py) call ProgramManager methods directly
@@ -45,7 +46,9 @@ from pathlib import Path
 from src.input_sanitizer import sanitize_and_clear_parity
 from src.lexer import tokenize
 from src.parser import Parser
+from src.tokenized_program import encode_program, is_tokenized, read_program
 from src.debug_logger import debug_log
+from src.variable_case import VariableCaseTable, CaseConflictError
 
 
 class ProgramManager:
@@ -55,6 +58,7 @@ class ProgramManager:
     - Line storage (line_number -> text)
     - AST storage (line_number -> parsed LineNode)
     - Parsing (with error handling)
+    - Variable name case resolution (settings.case_conflict), updated per edited line
     - File operations (SAVE, LOAD, MERGE)
     - Line editing (NEW, DELETE, RENUM)
 
@@ -74,17 +78,37 @@ class ProgramManager:
         program_ast = manager.get_program_ast()
     """
 
-    def __init__(self, def_type_map: dict):
+    def __init__(self, def_type_map: dict, settings_manager=None):
         """Initialize program manager.
 
         Args:
             def_type_map: Dictionary mapping first letter to TypeInfo
                          (from DEFINT/DEFSNG/DEFDBL/DEFSTR statements)
+            settings_manager: Optional SettingsManager for the case_conflict policy
+                             (defaults to the global settings manager)
         """
         self.lines: Dict[int, str] = {}  # line_number -> line_text
         self.line_asts: Dict[int, 'LineNode'] = {}  # line_number -> parsed AST
         self.def_type_map = def_type_map
         self.current_file: Optional[str] = None
+        self.settings_manager = settings_manager
+        # Canonical variable name case, kept current as lines are edited
+        self.variable_case = VariableCaseTable()
+
+    def _sync_case_policy(self) -> None:
+        """Pick up case_conflict setting changes, rebuilding the case table if needed."""
+        settings_manager = self.settings_manager
+        if settings_manager is None:
+            from src.settings import get_settings_manager
+            settings_manager = get_settings_manager()
+        policy = self.variable_case.policy
+        self.variable_case.policy = settings_manager.get('case_conflict', 'first_wins')
+        if self.variable_case.policy != policy:
+            try:
+                self.variable_case.build(self.line_asts[ln] for ln in sorted(self.line_asts))
+            except CaseConflictError:
+                # Existing conflicts are reported when the program is run
+                pass
 
     def add_line(self, line_number: int, line_text: str) -> Tuple[bool, Optional[str]]:
         """Add or replace a program line.
@@ -100,11 +124,22 @@ class ProgramManager:
         """
         # Parse the line
         line_ast, error = self.parse_single_line(line_text, line_number)
+        return self._store_line(line_number, line_text, line_ast, error)
 
+    def _store_line(self, line_number: int, line_text: str, line_ast: Optional['LineNode'],
+                    error: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """Add or replace a line that has already been parsed (see add_line)."""
         if line_ast is None:
             # Parse error - don't add the line
             return (False, error)
 
+        # Resolve variable name case for this line ('error' policy rejects conflicts)
+        self._sync_case_policy()
+        try:
+            self.variable_case.set_line(line_number, line_ast)
+        except CaseConflictError as e:
+            return (False, str(e))
+
         # Store line text and AST
         self.lines[line_number] = line_text
         self.line_asts[line_number] = line_ast
@@ -123,6 +158,11 @@ class ProgramManager:
             del self.lines[line_number]
             if line_number in self.line_asts:
                 del self.line_asts[line_number]
+            try:
+                self.variable_case.set_line(line_number, None)
+            except CaseConflictError:
+                # Conflicts elsewhere in the program are reported when it is run
+                pass
             return True
         return False
 
@@ -148,6 +188,7 @@ class ProgramManager:
         """Clear all lines (NEW command)."""
         self.lines.clear()
         self.line_asts.clear()
+        self.variable_case.clear()
         self.current_file = None
 
     def get_line(self, line_number: int) -> Optional[str]:
@@ -240,24 +281,36 @@ class ProgramManager:
         # Replace dictionaries
         self.lines = new_lines
         self.line_asts = new_line_asts
+        try:
+            self.variable_case.renumber(renum_map)
+        except CaseConflictError:
+            # Conflicts are reported when the program is run
+            pass
 
-    def save_to_file(self, filename: str) -> None:
+    def save_to_file(self, filename: str, tokenized: bool = False) -> None:
         """Save program to file.
 
         Args:
             filename: Path to file
+            tokenized: Write MBASIC's binary format (SAVE without ,A)
+                instead of ASCII text
 
         Raises:
             IOError: If file cannot be written
         """
-        with open(filename, 'w') as f:
-            for line_number in sorted(self.lines.keys()):
-                f.write(self.lines[line_number] + '\n')
+        if tokenized:
+            data = encode_program(self.lines[line_number] for line_number in sorted(self.lines.keys()))
+            with open(filename, 'wb') as f:
+                f.write(data)
+        else:
+            with open(filename, 'w') as f:
+                for line_number in sorted(self.lines.keys()):
+                    f.write(self.lines[line_number] + '\n')
 
         self.current_file = filename
 
     def load_from_file(self, filename: str) -> Tuple[bool, List[Tuple[int, str]]]:
-        """Load program from file.
+        """Load program from an ASCII or tokenized file.
 
         Args:
             filename: Path to file
@@ -270,34 +323,23 @@ class ProgramManager:
         Raises:
             FileNotFoundError: If file doesn't exist
             IOError: If file cannot be read
+            RuntimeError: If a tokenized file is protected or damaged
         """
+        program_text = read_program(filename)
+
         # Clear existing program
         self.clear()
 
         errors = []
         success_count = 0
 
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # Sanitize input: clear parity bits and filter control characters
-                line, was_modified = sanitize_and_clear_parity(line)
-
-                # Extract line number
-                match = re.match(r'^(\d+)\s', line)
-                if not match:
-                    continue  # Skip lines without line numbers
-
-                line_num = int(match.group(1))
-                success, error = self.add_line(line_num, line)
+        for line_num, line, line_ast, error in self.parse_program_text(program_text):
+            success, error = self._store_line(line_num, line, line_ast, error)
 
-                if success:
-                    success_count += 1
-                else:
-                    errors.append((line_num, error))
+            if success:
+                success_count += 1
+            else:
+                errors.append((line_num, error))
 
         if success_count > 0:
             self.current_file = filename
@@ -324,11 +366,17 @@ class ProgramManager:
         Raises:
             FileNotFoundError: If file doesn't exist
             IOError: If file cannot be read
+            RuntimeError: "Bad file mode" if the file is not ASCII
         """
         errors = []
         lines_added = 0
         lines_replaced = 0
 
+        # Like MBASIC, MERGE needs a file saved with ,A
+        with open(filename, 'rb') as f:
+            if is_tokenized(f.read(1)):
+                raise RuntimeError("Bad file mode")
+
         with open(filename, 'r') as f:
             for line in f:
                 line = line.strip()
@@ -378,6 +426,59 @@ class ProgramManager:
 
         return ProgramNode(lines=lines, def_type_statements=self.def_type_map)
 
+    def parse_program_text(self, program_text: str) -> List[Tuple[int, str, Optional['LineNode'], Optional[str]]]:
+        """Sanitize and parse every numbered line of a program file.
+
+        Results are kept in the on-disk program cache (src/program_cache.py),
+        keyed by the file contents and the DEF type map, so loading or
+        CHAINing an unchanged file skips lexing and parsing.
+
+        Args:
+            program_text: Contents of a .BAS file
+
+        Returns:
+            List of (line_number, line_text, LineNode, error_message) in file
+            order; LineNode is None and error_message set for lines that fail
+            to parse. Lines without a line number are skipped.
+        """
+        from src.program_cache import get_program_cache
+        from src.settings import get as get_setting
+
+        cache = get_program_cache()
+        # Keyword case is applied by the lexer, so it is part of the key
+        kind = f"lines:{get_setting('case_style', 'force_lower')}"
+        # DEFINT/DEFSTR/... lines update def_type_map while parsing; key on
+        # the map before, and replay the update on a hit
+        initial_def_type_map = dict(self.def_type_map)
+        if cache is not None:
+            cached = cache.get(kind, program_text, initial_def_type_map)
+            if cached is not None:
+                parsed, def_type_map = cached
+                self.def_type_map.update(def_type_map)
+                return parsed
+
+        parsed = []
+        for line in program_text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+
+            # Sanitize input: clear parity bits and filter control characters
+            line, was_modified = sanitize_and_clear_parity(line)
+
+            # Extract line number
+            match = re.match(r'^(\d+)\s', line)
+            if not match:
+                continue  # Skip lines without line numbers
+
+            line_num = int(match.group(1))
+            line_ast, error = self.parse_single_line(line, line_num)
+            parsed.append((line_num, line, line_ast, error))
+
+        if cache is not None:
+            cache.put(kind, program_text, initial_def_type_map, (parsed, dict(self.def_type_map)))
+        return parsed
+
     def parse_single_line(self, line_text: str, basic_line_num: Optional[int] = None) -> Tuple[Optional['LineNode'], Optional[str]]:
         """Parse a single line into a LineNode AST.
 
@@ -5,6 +5,7 @@ Provides pluggable filesystem implementations for different UI backends.
 """
 
 from .base import FileHandle, FileSystemProvider
+from .buffered import SequentialInputHandle, WriteBufferedHandle, RandomAccessHandle
 from .real_fs import RealFileSystemProvider
 from .sandboxed_fs import SandboxedFileSystemProvider
 
@@ -13,4 +14,7 @@ __all__ = [
     'FileSystemProvider',
     'RealFileSystemProvider',
     'SandboxedFileSystemProvider',
+    'SequentialInputHandle',
+    'WriteBufferedHandle',
+    'RandomAccessHandle',
 ]
@@ -0,0 +1,440 @@
+"""
+Buffered file handles for BASIC file I/O.
+
+SequentialInputHandle wraps the FileHandle of a file OPENed for input ("I")
+and reads it in large chunks. INPUT#, LINE INPUT#, INPUT$, EOF(), LOC() and
+LOF() all go through the same handle, so they share one read position and
+one end-of-file state.
+
+WriteBufferedHandle wraps output ("O") and append ("A") files, so PRINT#
+and WRITE# don't cost a system call each. RandomAccessHandle serves GET and
+PUT on random ("R") files from a cache of fixed-size pages and writes back
+only the pages PUT has changed. The interpreter flushes every open file
+when a program stops for any reason (END, STOP, Break, an error or running
+off the end) and before CHAIN and SYSTEM; CLOSE, RESET, CLEAR, RUN and NEW
+close the files. The file_durable_writes setting restores a flush after
+every write.
+
+CP/M end of file:
+CP/M stored files in 128-byte sectors, so text files were padded with ^Z
+(Control-Z, ASCII 26) after the last line. A ^Z ends the file for every
+input operation, exactly as a physical end of file does.
+"""
+
+import io
+from collections import OrderedDict
+from typing import Optional, Union
+
+from .base import FileHandle
+
+CTRL_Z = 26
+CHUNK_SIZE = 64 * 1024
+PAGE_SIZE = 4096
+
+
+class SequentialInputHandle(FileHandle):
+    """Read buffer over the FileHandle of a sequential input file.
+
+    The buffer holds data[pos:] not yet consumed; data[0] is at file offset
+    `offset`. The wrapped handle is always positioned just past the buffer.
+
+    Args:
+        handle: FileHandle opened in binary read mode
+        chunk_size: Bytes to read from the handle at a time
+    """
+
+    def __init__(self, handle: FileHandle, chunk_size: int = CHUNK_SIZE):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.data = b''
+        self.pos = 0
+        self.offset = handle.tell()
+        self.exhausted = False  # The handle has returned all its data
+        self.eof = False        # A read reached ^Z or the physical end of file
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False at the physical end of file"""
+        if self.exhausted:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        if isinstance(chunk, str):
+            chunk = chunk.encode('latin-1', errors='replace')
+        if not chunk:
+            self.exhausted = True
+            return False
+        if self.pos:
+            self.offset += self.pos
+            self.data = self.data[self.pos:] + chunk
+            self.pos = 0
+        else:
+            self.data += chunk
+        return True
+
+    def read_line(self) -> Optional[str]:
+        """Read one line for INPUT# and LINE INPUT#.
+
+        Lines end with LF, CR+LF or a lone CR. ^Z or the physical end of
+        file ends the file: the partial line before it is returned, and
+        every later read returns None.
+
+        Returns:
+            Line without its terminator (decoded as latin-1), or None at end
+            of file
+        """
+        if self.eof:
+            return None
+        while True:
+            data = self.data
+            pos = self.pos
+            end = data.find(b'\n', pos)
+            limit = len(data) if end < 0 else end
+            cr = data.find(b'\r', pos, limit)
+            if cr >= 0:
+                limit = cr
+            ctrl_z = data.find(b'\x1a', pos, limit)
+            if ctrl_z >= 0:
+                self.eof = True
+                self.pos = ctrl_z + 1
+                return data[pos:ctrl_z].decode('latin-1') if ctrl_z > pos else None
+            if cr >= 0:
+                if cr + 1 == len(data) and self._fill():
+                    continue  # Rescan with the byte after the CR
+                self.pos = cr + 2 if data[cr + 1:cr + 2] == b'\n' else cr + 1
+                return data[pos:cr].decode('latin-1')
+            if end >= 0:
+                self.pos = end + 1
+                return data[pos:end].decode('latin-1')
+            if not self._fill():
+                self.eof = True
+                self.pos = len(self.data)
+                return data[pos:].decode('latin-1') if len(data) > pos else None
+
+    def read_chars(self, count: int) -> str:
+        """Read exactly count characters for INPUT$(count, #n).
+
+        Raises:
+            RuntimeError: If ^Z or the end of file comes first
+        """
+        while len(self.data) - self.pos < count and self._fill():
+            pass
+        data = self.data[self.pos:self.pos + count]
+        ctrl_z = data.find(b'\x1a')
+        if ctrl_z >= 0 or len(data) < count or self.eof:
+            self.eof = True
+            self.pos += ctrl_z + 1 if ctrl_z >= 0 else len(data)
+            raise RuntimeError("Input past end of file")
+        self.pos += count
+        return data.decode('latin-1')
+
+    def at_eof(self) -> bool:
+        """EOF(): True at ^Z or the physical end of file (nothing is consumed)"""
+        if self.eof:
+            return True
+        if self.pos >= len(self.data) and not self._fill():
+            self.eof = True
+        elif self.data[self.pos] == CTRL_Z:
+            self.eof = True
+        return self.eof
+
+    def size(self) -> int:
+        """LOF(): length of the file in bytes"""
+        position = self.handle.tell()
+        self.handle.seek(0, 2)
+        size = self.handle.tell()
+        self.handle.seek(position)
+        return size
+
+    # ------------------------------------------------------------------
+    # FileHandle interface
+    # ------------------------------------------------------------------
+
+    def read(self, size: int = -1) -> bytes:
+        """Read raw bytes (^Z is not special here)"""
+        if size is None or size < 0:
+            while self._fill():
+                pass
+            size = len(self.data) - self.pos
+        else:
+            while len(self.data) - self.pos < size and self._fill():
+                pass
+        data = self.data[self.pos:self.pos + size]
+        self.pos += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        """Read raw bytes up to and including the next LF"""
+        while True:
+            end = self.data.find(b'\n', self.pos)
+            if end >= 0:
+                return self.read(end + 1 - self.pos)
+            if not self._fill():
+                return self.read()
+
+    def write(self, data: Union[str, bytes]) -> int:
+        """Input files cannot be written."""
+        raise io.UnsupportedOperation("File not open for output")
+
+    def close(self):
+        """Close the file."""
+        self.handle.close()
+
+    def seek(self, offset: int, whence: int = 0):
+        """Seek to position in file, dropping the buffer."""
+        if whence == 1:
+            offset += self.tell()
+            whence = 0
+        self.handle.seek(offset, whence)
+        self.offset = self.handle.tell()
+        self.data = b''
+        self.pos = 0
+        self.exhausted = False
+        self.eof = False
+
+    def tell(self) -> int:
+        """Get current file position (of the next unread byte)."""
+        return self.offset + self.pos
+
+    def is_eof(self) -> bool:
+        """Check if at end of file (^Z counts as the end)."""
+        return self.at_eof()
+
+    def flush(self):
+        """Flush write buffers (nothing to do for an input file)."""
+        pass
+
+
+class WriteBufferedHandle(FileHandle):
+    """Write-back buffer over the FileHandle of an output, append or random file.
+
+    Writes are collected until buffer_size characters (or bytes) are
+    pending, then passed to the wrapped handle in one call. Anything that
+    needs the file contents to be current - read, readline, tell, is_eof,
+    flush, close, or a seek away from where the pending data ends - writes
+    the buffer out first, so a read after a write always sees the data.
+
+    Args:
+        handle: FileHandle to write to
+        buffer_size: Pending characters/bytes before writing them out
+        durable: Flush the wrapped handle after every write (no buffering)
+    """
+
+    def __init__(self, handle: FileHandle, buffer_size: int = CHUNK_SIZE, durable: bool = False):
+        self.handle = handle
+        self.buffer_size = buffer_size
+        self.durable = durable
+        self.pending = []
+        self.pending_size = 0
+        self.position = None  # Offset after the pending data, when known
+
+    def _drain(self):
+        """Write pending data to the wrapped handle."""
+        if self.pending:
+            pending = self.pending
+            self.pending = []
+            self.pending_size = 0
+            self.handle.write(pending[0][:0].join(pending))
+
+    def write(self, data: Union[str, bytes]) -> int:
+        """Write to file."""
+        self.pending.append(data)
+        self.pending_size += len(data)
+        if self.position is not None:
+            self.position += len(data)
+        if self.durable:
+            self.flush()
+        elif self.pending_size >= self.buffer_size:
+            self._drain()
+        return len(data)
+
+    def read(self, size: int = -1) -> Union[str, bytes]:
+        """Read from file (after writing out pending data)."""
+        self._drain()
+        data = self.handle.read(size)
+        if self.position is not None:
+            self.position += len(data)
+        return data
+
+    def readline(self) -> Union[str, bytes]:
+        """Read one line from file (after writing out pending data)."""
+        self._drain()
+        data = self.handle.readline()
+        if self.position is not None:
+            self.position += len(data)
+        return data
+
+    def flush(self):
+        """Write out pending data and flush the wrapped handle."""
+        self._drain()
+        self.handle.flush()
+
+    def close(self):
+        """Write out pending data and close the file."""
+        try:
+            self._drain()
+        finally:
+            self.handle.close()
+
+    def seek(self, offset: int, whence: int = 0):
+        """Seek to position in file."""
+        if whence == 0 and self.pending and offset == self.position:
+            return  # Continues the pending data (PUT of the next record)
+        self._drain()
+        self.handle.seek(offset, whence)
+        self.position = offset if whence == 0 else None
+
+    def tell(self) -> int:
+        """Get current file position."""
+        self._drain()
+        return self.handle.tell()
+
+    def is_eof(self) -> bool:
+        """Check if at end of file."""
+        self._drain()
+        return self.handle.is_eof()
+
+
+class RandomAccessHandle(FileHandle):
+    """Page cache over the FileHandle of a random file (OPEN "R").
+
+    GET and PUT use read_record() and write_record(), which copy between
+    the record buffer and cached pages; the wrapped handle is only used to
+    load a page on a miss and to write back dirty pages. Pages are
+    PAGE_SIZE bytes at PAGE_SIZE-aligned offsets. When more than max_pages
+    are cached the least recently used page is dropped, and written back
+    first if a PUT changed it.
+
+    Args:
+        handle: FileHandle opened in binary read/write mode
+        cache_size: Bytes of pages to keep cached
+        durable: Write back and flush after every write (no caching of changes)
+    """
+
+    def __init__(self, handle: FileHandle, cache_size: int = 64 * PAGE_SIZE, durable: bool = False):
+        self.handle = handle
+        self.max_pages = max(1, cache_size // PAGE_SIZE)
+        self.durable = durable
+        self.pages = OrderedDict()  # page number -> bytearray(PAGE_SIZE), oldest first
+        self.dirty = set()          # Numbers of pages changed since written back
+        handle.seek(0, 2)
+        self.length = handle.tell()  # File size including changes not written back
+        self.position = 0
+
+    def _page(self, number: int) -> bytearray:
+        """Return cached page `number`, loading it on a miss"""
+        page = self.pages.get(number)
+        if page is not None:
+            self.pages.move_to_end(number)
+            return page
+        page = bytearray(PAGE_SIZE)
+        start = number * PAGE_SIZE
+        if start < self.length:
+            self.handle.seek(start)
+            data = self.handle.read(PAGE_SIZE)
+            page[:len(data)] = data
+        self.pages[number] = page
+        if len(self.pages) > self.max_pages:
+            old_number, old_page = self.pages.popitem(last=False)
+            if old_number in self.dirty:
+                self._write_back(old_number, old_page)
+        return page
+
+    def _write_back(self, number: int, page: bytearray):
+        """Write a dirty page (up to the end of file) to the wrapped handle"""
+        start = number * PAGE_SIZE
+        self.handle.seek(start)
+        self.handle.write(bytes(page[:min(PAGE_SIZE, self.length - start)]))
+        self.dirty.discard(number)
+
+    def read_record(self, offset: int, size: int) -> bytes:
+        """Read size bytes at offset (fewer at the end of file)"""
+        end = min(offset + size, self.length)
+        parts = []
+        while offset < end:
+            number, start = divmod(offset, PAGE_SIZE)
+            count = min(PAGE_SIZE - start, end - offset)
+            parts.append(self._page(number)[start:start + count])
+            offset += count
+        return b''.join(parts)
+
+    def write_record(self, offset: int, data: bytes):
+        """Write data at offset, extending the file if needed"""
+        done = 0
+        while done < len(data):
+            number, start = divmod(offset + done, PAGE_SIZE)
+            count = min(PAGE_SIZE - start, len(data) - done)
+            self._page(number)[start:start + count] = data[done:done + count]
+            self.dirty.add(number)
+            done += count
+        if offset + done > self.length:
+            self.length = offset + done
+        if self.durable:
+            self.flush()
+
+    def size(self) -> int:
+        """LOF(): length of the file in bytes"""
+        return self.length
+
+    # ------------------------------------------------------------------
+    # FileHandle interface
+    # ------------------------------------------------------------------
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from file."""
+        if size is None or size < 0:
+            size = self.length - self.position
+        data = self.read_record(self.position, size)
+        self.position += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        """Read bytes up to and including the next LF."""
+        parts = []
+        while self.position < self.length:
+            number, start = divmod(self.position, PAGE_SIZE)
+            stop = min(PAGE_SIZE, self.length - number * PAGE_SIZE)
+            page = self._page(number)
+            end = page.find(b'\n', start, stop)
+            if end >= 0:
+                stop = end + 1
+            parts.append(bytes(page[start:stop]))
+            self.position += stop - start
+            if end >= 0:
+                break
+        return b''.join(parts)
+
+    def write(self, data: Union[str, bytes]) -> int:
+        """Write to file."""
+        if isinstance(data, str):
+            data = data.encode('latin-1', errors='replace')
+        self.write_record(self.position, data)
+        self.position += len(data)
+        return len(data)
+
+    def flush(self):
+        """Write back dirty pages (in file order) and flush the wrapped handle."""
+        for number in sorted(self.dirty):
+            self._write_back(number, self.pages[number])
+        self.handle.flush()
+
+    def close(self):
+        """Write back dirty pages and close the file."""
+        try:
+            self.flush()
+        finally:
+            self.handle.close()
+
+    def seek(self, offset: int, whence: int = 0):
+        """Seek to position in file."""
+        if whence == 1:
+            offset += self.position
+        elif whence == 2:
+            offset += self.length
+        self.position = offset
+
+    def tell(self) -> int:
+        """Get current file position."""
+        return self.position
+
+    def is_eof(self) -> bool:
+        """Check if at end of file."""
+        return self.position >= self.length
@@ -156,6 +156,25 @@ class SandboxedFileSystemProvider(FileSystemProvider):
         if user_id in cls._user_filesystems:
             del cls._user_filesystems[user_id]
 
+    def export_files(self) -> Dict[str, Union[str, bytes]]:
+        """
+        Return a copy of this user's files (for session hibernation).
+
+        Returns:
+            Dict of filename -> content (empty if the files were released)
+        """
+        return dict(self._user_filesystems.get(self.user_id, {}))
+
+    def import_files(self, files: Dict[str, Union[str, bytes]]):
+        """
+        Restore files saved by export_files(), recreating the user's
+        filesystem if it was released with clear_user_filesystem().
+
+        Args:
+            files: Dict of filename -> content
+        """
+        self._user_filesystems.setdefault(self.user_id, {}).update(files)
+
     def _normalize_filename(self, filename: str) -> str:
         """
         Normalize and validate filename.
@@ -26,6 +26,7 @@ from src.runtime import Runtime
 from src.interpreter import Interpreter, ChainException
 import src.ast_nodes as ast_nodes
 from src.input_sanitizer import sanitize_and_clear_parity
+from src.tokenized_program import read_program
 from src.debug_logger import debug_log_error, is_debug_mode
 from src.ui.keybinding_loader import KeybindingLoader
 
@@ -405,6 +406,7 @@ class InteractiveMode:
         Args:
             start_line: Optional line number to start execution at (for RUN line_number)
         """
+        self.io.flush()  # Messages below are print()ed; program output goes first
         if not self.lines:
             print("?No program")
             return
@@ -480,6 +482,7 @@ class InteractiveMode:
         or renumbered) by using pc.is_valid() to check if the PC position still exists in
         the program. Shows "?Can't continue" after editing, matching MBASIC 5.21 behavior.
         """
+        self.io.flush()  # Messages below are print()ed; program output goes first
         # Check if we have a stopped program
         if not self.program_runtime or self.program_runtime.pc.is_running():
             print("?Can't continue")
@@ -521,6 +524,7 @@ class InteractiveMode:
 
     def cmd_list(self, args):
         """LIST [start][-][end] - List program lines"""
+        self.io.flush()  # Messages below are print()ed; program output goes first
         if not self.lines:
             return
 
@@ -562,8 +566,9 @@ class InteractiveMode:
         self.clear_execution_state()
         print("Ready")
 
-    def cmd_save(self, filename):
-        """SAVE "filename" - Save program to file"""
+    def cmd_save(self, filename, tokenized=False):
+        """SAVE "filename"[,A] - Save program to file (tokenized unless ,A)"""
+        self.io.flush()  # Messages below are print()ed; program output goes first
         if not filename:
             print("?Syntax error")
             return
@@ -580,7 +585,7 @@ class InteractiveMode:
             if not filename.endswith('.bas'):
                 filename += '.bas'
 
-            self.program.save_to_file(filename)
+            self.program.save_to_file(filename, tokenized=tokenized)
             self.current_file = filename
             print(f"Saved to {filename}")
 
@@ -589,6 +594,7 @@ class InteractiveMode:
 
     def cmd_load(self, filename):
         """LOAD "filename" - Load program from file"""
+        self.io.flush()  # Messages below are print()ed; program output goes first
         if not filename:
             print("?Syntax error")
             return
@@ -634,6 +640,7 @@ class InteractiveMode:
         - If merge is successful AND program_runtime exists, updates runtime's statement_table
           (for CONT support). Runtime update only happens after successful merge.
         """
+        self.io.flush()  # Messages below are print()ed; program output goes first
         if not filename:
             print("?Syntax error")
             return
@@ -688,6 +695,7 @@ class InteractiveMode:
         run() loop to restart with the new program. This avoids recursive run() calls.
         When called from command line (not during execution), runs the program directly.
         """
+        self.io.flush()  # Messages below are print()ed; program output goes first
         if not filename:
             print("?Syntax error")
             return
@@ -704,8 +712,7 @@ class InteractiveMode:
             if not filename.endswith('.bas'):
                 filename += '.bas'
 
-            with open(filename, 'r') as f:
-                program_text = f.read()
+            program_text = read_program(filename)
 
             # Save variables based on CHAIN options:
             # - ALL: passes all variables to the chained program
@@ -737,44 +744,18 @@ class InteractiveMode:
                                 break
                         # Skip uninitialized variables
 
-            # Load or merge program
-            if merge:
-                # MERGE mode - keep existing lines
-                for line in program_text.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    # Sanitize input: clear parity bits and filter control characters
-                    line, _ = sanitize_and_clear_parity(line)
-
-                    match = re.match(r'^(\d+)\s', line)
-                    if match:
-                        line_num = int(match.group(1))
-                        self.lines[line_num] = line
-                        line_ast = self.parse_single_line(line)
-                        if line_ast:
-                            self.line_asts[line_num] = line_ast
-            else:
-                # Normal mode - clear and load
+            # Load or merge program (MERGE mode keeps existing lines).
+            # Parsed lines come from the program cache when the file is unchanged.
+            if not merge:
                 self.lines.clear()
                 self.line_asts.clear()
 
-                for line in program_text.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    # Sanitize input: clear parity bits and filter control characters
-                    line, _ = sanitize_and_clear_parity(line)
-
-                    match = re.match(r'^(\d+)\s', line)
-                    if match:
-                        line_num = int(match.group(1))
-                        self.lines[line_num] = line
-                        line_ast = self.parse_single_line(line)
-                        if line_ast:
-                            self.line_asts[line_num] = line_ast
+            for line_num, line, line_ast, error in self.program.parse_program_text(program_text):
+                self.lines[line_num] = line
+                if line_ast:
+                    self.line_asts[line_num] = line_ast
+                else:
+                    print(error)
 
             # Handle DELETE range if specified
             if delete_range and merge:
@@ -881,6 +862,7 @@ class InteractiveMode:
         Raises:
             ValueError: Invalid syntax or line range
         """
+        self.io.flush()  # Messages below are print()ed; program output goes first
         from src.ui.ui_helpers import delete_lines_from_program
 
         try:
@@ -917,6 +899,7 @@ class InteractiveMode:
             RENUM 100,50    -> 100,50,10 (renumber from line 50 onwards)
             RENUM 100,50,20 -> 100,50,20 (full control)
         """
+        self.io.flush()  # Messages below are print()ed; program output goes first
         from src.ui.ui_helpers import renum_program
 
         try:
@@ -1398,6 +1381,7 @@ class InteractiveMode:
 
     def cmd_system(self):
         """SYSTEM - Exit to operating system"""
+        self.io.flush()  # Messages below are print()ed; program output goes first
         print("Goodbye")
         self.file_io.system_exit()
 
@@ -1502,9 +1486,11 @@ class InteractiveMode:
                 # Restore previous PC to maintain stopped program position
                 # This reverts any GOTO/GOSUB PC changes from above execution
                 runtime.pc = old_pc
+                self.io.flush()
 
         except Exception as e:
             # Use helper function for consistent error reporting
+            self.io.flush()
             print_error(e, runtime)
 
     def get_program_text(self):
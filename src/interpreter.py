@@ -9,9 +9,11 @@ import signal
 from dataclasses import dataclass, field
 from typing import Literal, Optional, Callable, Any, Union
 from src.runtime import Runtime
-from src.basic_builtins import BuiltinFunctions, TabMarker, SpcMarker, UsingFormatter
+from src.basic_builtins import BuiltinFunctions, TabMarker, SpcMarker, get_using_formatter
 from src.tokens import TokenType
 from src.pc import PC
+from src.filesystem import SequentialInputHandle, WriteBufferedHandle, RandomAccessHandle
+from src.debug_logger import debug_log, get_debug_level
 import src.ast_nodes as ast_nodes
 
 
@@ -25,6 +27,16 @@ class ChainException(Exception):
     pass
 
 
+class TokenInfo:
+    """Source location of a variable reference, passed to the runtime for access tracking"""
+
+    __slots__ = ('line', 'position')
+
+    def __init__(self, line, position):
+        self.line = line
+        self.position = position
+
+
 @dataclass
 class ErrorInfo:
     """Information about a runtime error"""
@@ -53,6 +65,8 @@ class InterpreterState:
     6. statement execution (with error handling in try/except) - sets input_prompt or error_info
     7. input_prompt check - pauses if waiting for input
     8. PC advancement - moves to next statement or jumps to branch target
+    In 'run' mode without breakpoints or TRON, _tick_fast() runs only steps 6-8
+    per statement and checks 1-4 every INTERRUPT_CHECK_INTERVAL statements.
 
     Also tracks: input buffering, debugging flags, performance metrics, and
     provides computed properties for current line/statement position.
@@ -141,7 +155,7 @@ class InterpreterState:
 class Interpreter:
     """Execute MBASIC AST with tick-based execution for UI integration"""
 
-    def __init__(self, runtime, io_handler=None, breakpoint_callback=None, filesystem_provider=None, limits=None, settings_manager=None, file_io=None):
+    def __init__(self, runtime, io_handler=None, breakpoint_callback=None, filesystem_provider=None, limits=None, settings_manager=None, file_io=None, engine=None):
         self.runtime = runtime
         self.builtins = BuiltinFunctions(runtime)
 
@@ -177,6 +191,19 @@ class Interpreter:
             settings_manager = get_settings_manager()
         self.settings_manager = settings_manager
 
+        # Execution engine: 'ast' walks the AST, 'compiled' runs pre-bound closures
+        # (see src/closure_compiler.py). Defaults to the 'engine' setting.
+        if engine is None:
+            engine = settings_manager.get('engine', 'ast')
+        if engine not in ('ast', 'compiled'):
+            raise ValueError(f"Unknown execution engine: {engine}")
+        self.engine = engine
+        self.compiler = None
+        if engine == 'compiled':
+            from src.closure_compiler import ClosureCompiler
+            self.compiler = ClosureCompiler(self)
+            self.compiler.install()
+
         # Breakpoint callback - called when a breakpoint is hit
         # Callback should take (line_number, statement_index) and return True to continue, False to stop
         self.breakpoint_callback = breakpoint_callback
@@ -184,28 +211,39 @@ class Interpreter:
         # Execution state for tick-based execution
         self.state = InterpreterState(_interpreter=self)
 
+    @property
+    def io(self):
+        """I/O handler for the program (UIs swap it when a program starts)"""
+        return self._io
+
+    @io.setter
+    def io(self, io_handler):
+        # POS, INKEY$ and INPUT$ need the handler too
+        self._io = io_handler
+        self.builtins.io = io_handler
+
     @staticmethod
     def _make_token_info(node):
-        """Create a token info object from an AST node for variable tracking.
+        """Get the token info object of an AST node for variable tracking.
+
+        The TokenInfo is created on first use and kept on the node, so
+        executing a statement again does not allocate one.
 
         Args:
             node: AST node with line_num and column attributes
 
         Returns:
-            Object with line and position attributes, or None if node is None
+            TokenInfo with line and position attributes, or None if node is None
         """
         if node is None:
             return None
-
-        class TokenInfo:
-            def __init__(self, line, position):
-                self.line = line
-                self.position = position
-
-        return TokenInfo(
-            getattr(node, 'line_num', 0),
-            getattr(node, 'column', 0)
-        )
+        token = node.__dict__.get('_token_info')
+        if token is None:
+            token = node._token_info = TokenInfo(
+                getattr(node, 'line_num', 0),
+                getattr(node, 'column', 0)
+            )
+        return token
 
     def _setup_break_handler(self):
         """Setup Ctrl+C handler to set break flag"""
@@ -233,9 +271,14 @@ class Interpreter:
             InterpreterState: Initial state (typically 'idle' or 'error' if setup fails)
         """
         try:
-            # Setup runtime tables
+            # Setup runtime tables (variable name case is resolved here, once per load)
+            self.runtime.case_conflict = self.settings_manager.get('case_conflict', 'first_wins')
             self.runtime.setup()
 
+            # Compile program to closures (compiled engine only)
+            if self.compiler is not None:
+                self.compiler.compile_program(self.runtime.statement_table)
+
             # Initialize state
             self.state = InterpreterState(_interpreter=self)
             # PC is already set to running state by setup(), no need to set halted flag
@@ -264,7 +307,7 @@ class Interpreter:
         """
         return self.runtime.pc.is_running()
 
-    def tick(self, mode='run', max_statements=100):
+    def tick(self, mode='run', max_statements=100, time_budget=None):
         """Execute a quantum of work and return updated state.
 
         Args:
@@ -273,25 +316,36 @@ class Interpreter:
                 - 'step_line': Execute next line, then pause
                 - 'step_statement': Execute next statement, then pause
             max_statements: Maximum statements to execute before yielding (for 'run' mode)
+            time_budget: Optional seconds after which a 'run' quantum yields early
 
         Returns:
             InterpreterState: Updated state after execution quantum
         """
         # Use new PC-based execution
-        return self.tick_pc(mode, max_statements)
+        return self.tick_pc(mode, max_statements, time_budget)
+
+    # In the run-mode fast path, pause/Ctrl+C/breakpoint requests and the
+    # time budget are checked once per this many statements
+    INTERRUPT_CHECK_INTERVAL = 256
 
-    def tick_pc(self, mode='run', max_statements=100):
+    def tick_pc(self, mode='run', max_statements=100, time_budget=None):
         """Execute a quantum of work using PC-based execution (NEW).
 
         This is the new PC-based execution loop that replaces the old
         line_index/line_table iteration with direct PC navigation.
 
+        In 'run' mode with no breakpoints and no TRON, statements are run by
+        _tick_fast() first, which skips the per-statement debugger checks;
+        this loop takes over when one of them becomes active.
+
         Args:
             mode: Execution mode:
                 - 'run': Execute up to max_statements
                 - 'step_line': Execute next line, then pause
                 - 'step_statement': Execute next statement, then pause
             max_statements: Maximum statements to execute before yielding (for 'run' mode)
+            time_budget: Optional seconds after which a 'run' quantum yields early
+                (checked by the fast path every INTERRUPT_CHECK_INTERVAL statements)
 
         Returns:
             InterpreterState: Updated state after execution quantum
@@ -301,7 +355,20 @@ class Interpreter:
         statements_in_tick = 0
         last_traced_line = None
 
+        fast_path = (mode == 'run' and not self.runtime.trace_on and not self.runtime.breakpoints
+                     and not self.state.pause_requested and self.runtime.pc.is_running())
+        stepping = mode in ('step_statement', 'step_line')
+        # Step tracing (MBASIC_DEBUG_LEVEL=2) is decided once per quantum; in
+        # run mode none of its messages are ever formatted
+        trace_steps = stepping and get_debug_level() >= 2
+
         try:
+            if fast_path:
+                deadline = time.monotonic() + time_budget if time_budget is not None else None
+                statements_in_tick, done = self._tick_fast(max_statements, deadline)
+                if done:
+                    return self.state
+
             while statements_in_tick < max_statements:
                 # Check for pause request
                 if self.state.pause_requested:
@@ -312,24 +379,23 @@ class Interpreter:
                 # Get current PC
                 pc = self.runtime.pc
 
-                import sys
-                if mode in ('step_statement', 'step_line'):
-                    print(f"DEBUG tick: Starting tick() with PC={pc}, is_running={pc.is_running()}, stop_reason={pc.stop_reason}", file=sys.stderr)
+                if trace_steps:
+                    debug_log(f"tick: Starting tick() with PC={pc}, is_running={pc.is_running()}, stop_reason={pc.stop_reason}", level=2)
 
                 # Check if not running (stopped/halted/error)
                 # Allow execution to continue in step mode even if stopped at BREAK/USER
-                if not pc.is_running() and not (mode in ('step_statement', 'step_line') and pc.stop_reason in ('BREAK', 'USER')):
+                if not pc.is_running() and not (stepping and pc.stop_reason in ('BREAK', 'USER')):
                     # Already stopped - PC has stop_reason set
                     self._restore_break_handler()
                     return self.state
 
                 # In step mode from breakpoint: clear stop_reason without messing with flags
-                if mode in ('step_statement', 'step_line') and not pc.is_running():
-                    print(f"DEBUG tick: Step from stopped PC {pc}, resuming", file=sys.stderr)
+                if stepping and not pc.is_running():
                     # Just clear the stop_reason to allow execution, don't touch flags
-                    pc = pc.resume()
+                    pc = self.runtime.statement_table.pc_at(pc.line, pc.statement)
                     self.runtime.pc = pc
-                    print(f"DEBUG tick: After resume, PC={pc}", file=sys.stderr)
+                    if trace_steps:
+                        debug_log(f"tick: Step from stopped PC, resuming at {pc}", level=2)
 
                 # Check for Ctrl+C break
                 if self.runtime.break_requested:
@@ -340,21 +406,9 @@ class Interpreter:
                     # PC keeps current position for resume via CONT
                     return self.state
 
-                # Check for breakpoint (supports both line-level and statement-level)
-                # Check exact PC first (statement-level), then line-level
-                at_breakpoint = False
-                if mode == 'run':
-                    if pc in self.runtime.breakpoints:
-                        # Exact PC match (statement-level breakpoint)
-                        at_breakpoint = True
-                    else:
-                        # Check if any breakpoint is set at this line (line-level match)
-                        for bp in self.runtime.breakpoints:
-                            if bp.line == pc.line_num:
-                                at_breakpoint = True
-                                break
-
-                if at_breakpoint:
+                # Check for breakpoint: a breakpoint (line-level or statement-level)
+                # halts every statement of its line
+                if mode == 'run' and self.runtime.breakpoints.has_line(pc.line_num):
                     if not self.state.skip_next_breakpoint_check:
                         self.runtime.pc = pc.stop("BREAK")
                         self.state.skip_next_breakpoint_check = True
@@ -379,9 +433,8 @@ class Interpreter:
 
                 # Execute statement
                 try:
-                    import sys
-                    if mode in ('step_statement', 'step_line'):
-                        print(f"DEBUG tick: Executing statement at {pc}: {type(stmt).__name__}", file=sys.stderr)
+                    if trace_steps:
+                        debug_log(f"tick: Executing statement at {pc}: {type(stmt).__name__}", level=2)
                     self.execute_statement(stmt)
                     statements_in_tick += 1
                     self.state.statements_executed += 1
@@ -393,34 +446,11 @@ class Interpreter:
                     return self.state
 
                 except Exception as e:
-                    # Check if we're already in an error handler (prevent recursive errors)
-                    already_in_error_handler = (self.state.error_info is not None)
-
-                    # Set ErrorInfo for both handler and no-handler cases (needed by RESUME)
-                    error_code = self._map_exception_to_error_code(e)
-                    self.state.error_info = ErrorInfo(
-                        error_code=error_code,
-                        pc=pc,
-                        error_message=str(e)
-                    )
-
-                    # Check if we have an error handler and not already handling an error
-                    if self.runtime.has_error_handler() and not already_in_error_handler:
-                        self._invoke_error_handler(error_code, pc)
-                        # Error handler set npc - apply it and continue execution
-                        # (don't use continue here - we need to let normal flow handle NPC)
-                        statements_in_tick += 1
-                        self.state.statements_executed += 1
-                        # Fall through to NPC handling below
-                    else:
-                        # No error handler (or recursive error) - set PC to error state and raise
-                        self.runtime.pc = pc.with_error(
-                            error_code,
-                            str(e),
-                            self.runtime.on_error_goto if self.runtime.has_error_handler() else None
-                        )
-                        self._restore_break_handler()
-                        raise
+                    # Raises unless an ON ERROR handler takes over (it sets npc)
+                    self._handle_statement_error(e, pc)
+                    statements_in_tick += 1
+                    self.state.statements_executed += 1
+                    # Fall through to NPC handling below
 
                 # Check if we're waiting for input
                 if self.state.input_prompt is not None:
@@ -431,22 +461,22 @@ class Interpreter:
                 if self.runtime.npc is not None:
                     next_pc = self.runtime.npc
                     self.runtime.npc = None
-                    import sys
-                    if mode in ('step_statement', 'step_line'):
-                        print(f"DEBUG tick: NPC was set to {next_pc}", file=sys.stderr)
+                    if trace_steps:
+                        debug_log(f"tick: NPC was set to {next_pc}", level=2)
+                elif mode == 'run' and not self.runtime.trace_on and not self.runtime.breakpoints:
+                    # Nothing can observe REM/DATA statements - skip straight past them
+                    next_pc = self.runtime.statement_table.next_executable_pc(pc)
                 else:
                     next_pc = self.runtime.statement_table.next_pc(pc)
-                    import sys
-                    if mode in ('step_statement', 'step_line'):
-                        print(f"DEBUG tick: next_pc from statement_table: {next_pc}", file=sys.stderr)
+                    if trace_steps:
+                        debug_log(f"tick: next_pc from statement_table: {next_pc}", level=2)
 
                 # Check for step mode before updating PC
                 if mode == 'step_statement':
                     # Stop at next PC for stepping
-                    import sys
-                    print(f"DEBUG tick: Step mode, stopping at next_pc={next_pc}, is_running={next_pc.is_running()}", file=sys.stderr)
                     self.runtime.pc = next_pc.stop("BREAK") if next_pc.is_running() else next_pc
-                    print(f"DEBUG tick: Final PC set to {self.runtime.pc}", file=sys.stderr)
+                    if trace_steps:
+                        debug_log(f"tick: Step mode, stopped at {self.runtime.pc}", level=2)
                     return self.state
                 elif mode == 'step_line' and pc.is_step_point(next_pc, 'step_line'):
                     # Stop at next line for stepping
@@ -476,9 +506,119 @@ class Interpreter:
             # Update execution time
             elapsed = (time.time() - start_time) * 1000
             self.state.execution_time_ms += elapsed
+            if self.runtime.files and not self.runtime.pc.is_running():
+                self.flush_files()
+            # Buffered console output must not lag behind the program
+            flush_output = getattr(self._io, 'flush', None)
+            if flush_output is not None:
+                flush_output()
 
         return self.state
 
+    def _tick_fast(self, max_statements, deadline):
+        """Run-mode inner loop for when no debugger feature is active.
+
+        Same statement semantics as tick_pc(), without its per-statement
+        checks: pause requests, Ctrl+C and newly set breakpoints are noticed
+        every INTERRUPT_CHECK_INTERVAL statements, when the quantum also
+        yields if the monotonic deadline has passed.
+
+        Args:
+            max_statements: Maximum statements to execute
+            deadline: time.monotonic() value after which to yield, or None
+
+        Returns:
+            (statements executed, done): done is True if tick_pc() should
+            return the state as is; False hands the rest of the quantum to
+            tick_pc()'s own loop (stopped PC, TRON, pause, break, breakpoint).
+        """
+        import time
+        runtime = self.runtime
+        state = self.state
+        statement_table = runtime.statement_table
+        next_executable_pc = statement_table.next_executable_pc
+        get_statement = statement_table.get
+        interval = self.INTERRUPT_CHECK_INTERVAL
+        check_at = min(interval, max_statements)
+        executed = 0
+        pc = runtime.pc
+
+        try:
+            while True:
+                if executed >= check_at:
+                    if executed >= max_statements:
+                        return executed, True
+                    if state.pause_requested or runtime.break_requested or runtime.breakpoints:
+                        return executed, False
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return executed, True
+                    check_at = min(executed + interval, max_statements)
+
+                stmt = get_statement(pc)
+                if stmt is None:
+                    raise RuntimeError(f"Invalid PC: {pc}")
+
+                try:
+                    self.execute_statement(stmt)
+                except BreakException:
+                    # User pressed Ctrl+C during INPUT
+                    runtime.pc = pc.stop("BREAK")
+                    self.io.output(f"Break in {pc}")
+                    return executed, True
+                except Exception as e:
+                    self._handle_statement_error(e, pc)
+                executed += 1
+
+                if state.input_prompt is not None:
+                    return executed, True
+
+                next_pc = runtime.npc
+                if next_pc is not None:
+                    runtime.npc = None
+                else:
+                    next_pc = next_executable_pc(pc)
+
+                if not runtime.pc.is_running():
+                    # END/STOP - tick_pc() reports the stopped PC
+                    return executed, executed >= max_statements
+                runtime.pc = pc = next_pc
+                if runtime.trace_on or not pc.is_running():
+                    # TRON (tracing is done by tick_pc()'s loop) or end of program
+                    return executed, executed >= max_statements
+        finally:
+            state.statements_executed += executed
+
+    def _handle_statement_error(self, e, pc):
+        """Record a statement's exception and pass control to ON ERROR GOTO.
+
+        Sets state.error_info (used by ERR, ERL and RESUME). With an active
+        error handler, and not already inside one, jumps to it (sets npc);
+        otherwise puts the PC in error state and re-raises.
+        """
+        # Check if we're already in an error handler (prevent recursive errors)
+        already_in_error_handler = (self.state.error_info is not None)
+
+        # Set ErrorInfo for both handler and no-handler cases (needed by RESUME)
+        error_code = self._map_exception_to_error_code(e)
+        self.state.error_info = ErrorInfo(
+            error_code=error_code,
+            pc=pc,
+            error_message=str(e)
+        )
+
+        # Check if we have an error handler and not already handling an error
+        if self.runtime.has_error_handler() and not already_in_error_handler:
+            self._invoke_error_handler(error_code, pc)
+        else:
+            # No error handler (or recursive error) - set PC to error state and raise
+            self.runtime.pc = pc.with_error(
+                error_code,
+                str(e),
+                self.runtime.on_error_goto if self.runtime.has_error_handler() else None
+            )
+            self._restore_break_handler()
+            raise e
+
     def provide_input(self, value: str):
         """Provide input when state.input_prompt is set.
 
@@ -670,6 +810,10 @@ class Interpreter:
         if "return without gosub" in error_msg:
             return 3  # RETURN without GOSUB
 
+        # GET/PUT record number below 1
+        if "bad record number" in error_msg:
+            return 63  # Bad record number
+
         # Overflow
         if isinstance(exception, OverflowError):
             return 6  # Overflow
@@ -696,7 +840,7 @@ class Interpreter:
                 self.runtime.push_gosub(next_pc.line_num, next_pc.stmt_offset)
 
         # Jump to error handler line
-        self.runtime.npc = PC.from_line(self.runtime.error_handler)
+        self.runtime.npc = self.runtime.statement_table.line_pc(self.runtime.error_handler)
 
     def find_matching_wend(self, start_line, start_stmt):
         """Find the matching WEND for a WHILE statement
@@ -708,56 +852,33 @@ class Interpreter:
         Returns:
             (line_number, stmt_index) of matching WEND, or None if not found
         """
-        # Start searching from the statement after the WHILE
-        depth = 1  # Track nesting depth
-
-        # Get all line numbers from statement_table
-        line_numbers = sorted(set(pc.line_num for pc in self.runtime.statement_table.statements.keys()))
-        try:
-            line_idx = line_numbers.index(start_line)
-        except ValueError:
+        # WHILE/WEND pairs are precomputed with the statement table's execution plan
+        statement_table = self.runtime.statement_table
+        wend_pc = statement_table.matching_wend(statement_table.pc_at(start_line, start_stmt))
+        if wend_pc is None:
             return None
+        return (wend_pc.line, wend_pc.statement)
 
-        # Start from the next statement in the same line
-        stmt_idx = start_stmt + 1
-
-        while line_idx < len(line_numbers):
-            line_num = line_numbers[line_idx]
-            line_statements = self.runtime.statement_table.get_line_statements(line_num)
-
-            # Search through statements in this line
-            while stmt_idx < len(line_statements):
-                stmt = line_statements[stmt_idx]
-
-                if isinstance(stmt, ast_nodes.WhileStatementNode):
-                    depth += 1
-                elif isinstance(stmt, ast_nodes.WendStatementNode):
-                    depth -= 1
-                    if depth == 0:
-                        # Found matching WEND
-                        return (line_num, stmt_idx)
-
-                stmt_idx += 1
-
-            # Move to next line
-            line_idx += 1
-            stmt_idx = 0  # Start from first statement in next line
-
-        return None
+    # Node type -> handler method name, filled in on first use of each type
+    _statement_handler_names = {}
+    _expression_handler_names = {}
 
     def execute_statement(self, stmt):
         """Execute a single statement"""
-        # Get statement type name
-        stmt_type = type(stmt).__name__
-
-        # Dispatch to appropriate handler
-        handler_name = f"execute_{stmt_type.replace('Node', '').replace('Statement', '').lower()}"
+        handler_name = self._statement_handler_names.get(type(stmt))
+        if handler_name is None:
+            stmt_type = type(stmt).__name__
+            handler_name = f"execute_{stmt_type.replace('Node', '').replace('Statement', '').lower()}"
+            self._statement_handler_names[type(stmt)] = handler_name
+
+        # Dispatch to appropriate handler (looked up on the instance: debuggers
+        # may wrap individual handlers)
         handler = getattr(self, handler_name, None)
 
         if handler:
             handler(stmt)
         else:
-            raise NotImplementedError(f"Statement not implemented: {stmt_type}")
+            raise NotImplementedError(f"Statement not implemented: {type(stmt).__name__}")
 
     # ========================================================================
     # Statement Execution
@@ -809,7 +930,7 @@ class Interpreter:
                 token=self._make_token_info(stmt.variable),
                 limits=self.limits,
                 original_case=getattr(stmt.variable, 'original_case', stmt.variable.name),
-                settings_manager=self.settings_manager
+                slot=self.runtime.variable_slot(stmt.variable)
             )
 
     def execute_swap(self, stmt):
@@ -905,37 +1026,45 @@ class Interpreter:
                 s = str(value)
                 output_parts.append(s)
 
-        # Handle separators and build output
-        output = ""
+        # Handle separators and build output. TAB and the print zones count
+        # from the cursor column the previous PRINT left on the screen.
+        pieces = []
+        column = 0 if file_handle else self.builtins.POS(0) - 1  # 0-based
+        separator_count = len(stmt.separators)
         for i, part in enumerate(output_parts):
             # Handle TAB and SPC markers
             if isinstance(part, TabMarker):
                 # TAB(n) - move to column n (1-based)
-                target_col = part.column
-                current_col = len(output) + 1  # 1-based column
-                if current_col < target_col:
+                target_col = part.column - 1
+                if column < target_col:
                     # Add spaces to reach target column
-                    output += " " * (target_col - current_col)
+                    pieces.append(" " * (target_col - column))
+                    column = target_col
                 # If already past target, don't move backwards
             elif isinstance(part, SpcMarker):
                 # SPC(n) - print n spaces
-                output += " " * part.count
+                pieces.append(" " * part.count)
+                column += part.count
             else:
                 # Regular string
-                output += part
-            if i < len(stmt.separators):
+                pieces.append(part)
+                newline = part.rfind('\n')
+                column = column + len(part) if newline < 0 else len(part) - newline - 1
+            if i < separator_count:
                 sep = stmt.separators[i]
                 if sep == ',':
                     # Tab to next zone (14-character zones in MBASIC)
-                    current_len = len(output)
-                    next_zone = ((current_len // 14) + 1) * 14
-                    output += " " * (next_zone - current_len)
+                    next_zone = ((column // 14) + 1) * 14
+                    pieces.append(" " * (next_zone - column))
+                    column = next_zone
                 elif sep == ';':
                     # No spacing (already handled in number formatting)
                     pass
                 elif sep == '\n':
                     # Newline
-                    output += '\n'
+                    pieces.append('\n')
+                    column = 0
+        output = ''.join(pieces)
 
         # Output to file or screen
         if file_handle:
@@ -944,7 +1073,6 @@ class Interpreter:
                 file_handle.write(output)
             else:
                 file_handle.write(output + '\n')
-            file_handle.flush()  # Ensure data is written
         else:
             # Print to screen (don't add newline if last separator was ; or , or \n)
             if stmt.separators and stmt.separators[-1] in [';', ',', '\n']:
@@ -979,14 +1107,12 @@ class Interpreter:
             value = self.evaluate_expression(expr)
             values.append(value)
 
-        # Create formatter and format values
-        formatter = UsingFormatter(format_str)
-        output = formatter.format_values(values)
+        # Format values (formatters are cached per format string)
+        output = get_using_formatter(format_str).format_values(values)
 
         # Output to file or screen
         if file_handle:
             file_handle.write(output + '\n')
-            file_handle.flush()
         else:
             self.io.output(output)
 
@@ -999,7 +1125,7 @@ class Interpreter:
             # Execute THEN clause
             if stmt.then_line_number is not None:
                 # THEN line_number
-                self.runtime.npc = PC.from_line(stmt.then_line_number)
+                self.runtime.npc = self.runtime.statement_table.line_pc(stmt.then_line_number)
             elif stmt.then_statements:
                 # THEN statement(s)
                 for then_stmt in stmt.then_statements:
@@ -1010,7 +1136,7 @@ class Interpreter:
             # Execute ELSE clause
             if stmt.else_line_number is not None:
                 # ELSE line_number
-                self.runtime.npc = PC.from_line(stmt.else_line_number)
+                self.runtime.npc = self.runtime.statement_table.line_pc(stmt.else_line_number)
             elif stmt.else_statements:
                 # ELSE statement(s)
                 for else_stmt in stmt.else_statements:
@@ -1025,7 +1151,7 @@ class Interpreter:
             self.state.error_info = None
             self.runtime.set_variable_raw('err%', 0)
         # Set both old and new PC
-        self.runtime.npc = PC.from_line(stmt.line_number)
+        self.runtime.npc = self.runtime.statement_table.line_pc(stmt.line_number)
 
     def execute_gosub(self, stmt):
         """Execute GOSUB statement"""
@@ -1041,7 +1167,7 @@ class Interpreter:
         )
 
         # Jump to subroutine
-        self.runtime.npc = PC.from_line(stmt.line_number)
+        self.runtime.npc = self.runtime.statement_table.line_pc(stmt.line_number)
 
     def execute_ongoto(self, stmt):
         """Execute ON...GOTO statement - computed GOTO
@@ -1064,7 +1190,7 @@ class Interpreter:
             if self.state.error_info is not None:
                 self.state.error_info = None
                 self.runtime.set_variable_raw('err%', 0)
-            self.runtime.npc = PC.from_line(stmt.line_numbers[index - 1])
+            self.runtime.npc = self.runtime.statement_table.line_pc(stmt.line_numbers[index - 1])
         # If index is out of range, just continue to next statement (no jump)
 
     def execute_ongosub(self, stmt):
@@ -1094,7 +1220,7 @@ class Interpreter:
                 return_pc.stmt_offset if return_pc.is_running() else 0
             )
             # Jump to subroutine
-            self.runtime.npc = PC.from_line(stmt.line_numbers[index - 1])
+            self.runtime.npc = self.runtime.statement_table.line_pc(stmt.line_numbers[index - 1])
         # If index is out of range, just continue to next statement (no jump)
 
     def execute_return(self, stmt):
@@ -1111,10 +1237,10 @@ class Interpreter:
             self.runtime.set_variable_raw('err%', 0)
 
         # Validate that the return address still exists
-        if not self.runtime.statement_table.line_exists(return_line):
+        statement_table = self.runtime.statement_table
+        if not statement_table.line_exists(return_line):
             raise RuntimeError(f"RETURN error: line {return_line} no longer exists")
 
-        line_statements = self.runtime.statement_table.get_line_statements(return_line)
         # return_stmt is 0-indexed offset into statements array.
         # Valid range: 0 to len(statements) (inclusive).
         # - 0 to len(statements)-1: Normal statement positions
@@ -1122,11 +1248,11 @@ class Interpreter:
         #   This occurs when GOSUB is the last statement on a line. When RETURN jumps back,
         #   statement_table.next_pc() creates this sentinel value to indicate the next sequential PC.
         # Values > len(statements) indicate the statement was deleted (validation error).
-        if return_stmt > len(line_statements):
+        if return_stmt > statement_table.statement_count(return_line):
             raise RuntimeError(f"RETURN error: statement {return_stmt} in line {return_line} no longer exists")
 
         # Jump back to the line and statement after GOSUB
-        self.runtime.npc = PC.running_at(return_line, return_stmt)
+        self.runtime.npc = statement_table.pc_at(return_line, return_stmt)
 
     def execute_for(self, stmt):
         """Execute FOR statement - initialize loop variable and register loop.
@@ -1155,7 +1281,7 @@ class Interpreter:
             token=self._make_token_info(stmt.variable),
             limits=self.limits,
             original_case=getattr(stmt.variable, 'original_case', stmt.variable.name),
-            settings_manager=self.settings_manager
+            slot=self.runtime.variable_slot(stmt.variable)
         )
 
         # Register loop - use PC for position
@@ -1198,14 +1324,9 @@ class Interpreter:
             var_name = self._find_most_recent_for_variable()
             if not var_name:
                 raise RuntimeError("NEXT without FOR")
-            # Create a dummy list with just this variable
-            class DummyVarNode:
-                def __init__(self, name, suffix):
-                    self.name = name
-                    self.type_suffix = suffix
-            base_name = var_name.rstrip('$%!#')
-            type_suffix = var_name[-1] if var_name and var_name[-1] in '$%!#' else None
-            var_list = [DummyVarNode(base_name, type_suffix)]
+            # The NEXT statement itself locates the access for tracking
+            self._execute_next_single(var_name, var_node=stmt)
+            return
 
         # Process each variable in order
         for var_node in var_list:
@@ -1217,44 +1338,38 @@ class Interpreter:
                 return
 
     def _find_most_recent_for_variable(self):
-        """Find the variable of the most recent FOR loop by scanning back lexically.
+        """Find the variable of the FOR loop closed by a NEXT without variable.
+
+        Uses the FOR/NEXT pairing precomputed by the statement table. If the
+        NEXT is not paired (e.g. inside IF...THEN) or its loop is not active,
+        falls back to the most recently entered active FOR loop.
 
         Returns:
             Variable name with suffix (e.g., 'i!') or None if no FOR found
         """
-        # Scan backward from current PC to find most recent FOR statement
         current_pc = self.runtime.pc
         if not current_pc.is_running():
             return None
 
-        # Walk backward through statements
-        pc = PC.running_at(current_pc.line, current_pc.statement - 1)
-        while True:
-            # Try to get previous statement
-            pc = self.runtime.statement_table.prev_pc(pc)
-            if pc is None or not pc.is_running():
-                return None
-
-            # Check if this statement is a FOR
-            stmt = self.runtime.statement_table.get_statement(pc)
-            if stmt and hasattr(stmt, '__class__') and stmt.__class__.__name__ == 'ForStatementNode':
-                # Found a FOR statement - return its variable name
-                var_name = stmt.variable.name + (stmt.variable.type_suffix or "")
-                return var_name
+        var_name = self.runtime.statement_table.paired_for_variable(current_pc)
+        if var_name is not None and var_name in self.runtime.for_loop_states:
+            return var_name
+
+        return next(reversed(self.runtime.for_loop_states), None)
 
     def _execute_next_single(self, var_name, var_node=None):
         """Execute NEXT for a single variable.
 
         Args:
             var_name: Full variable name with suffix
-            var_node: Optional VariableNode for token info
+            var_node: Optional node (VariableNode or the NEXT statement) for token info
 
         Returns:
             True if loop continues (jumped back), False if loop finished
         """
-        # Get loop info
-        loop_info = self.runtime.get_for_loop(var_name)
-        if not loop_info:
+        # Get loop state
+        loop_state = self.runtime.get_for_loop_state(var_name)
+        if not loop_state:
             raise RuntimeError(f"NEXT without FOR: {var_name}")
 
         # Create token info for tracking
@@ -1264,47 +1379,43 @@ class Interpreter:
         base_name = var_name.rstrip('$%!#')
         type_suffix = var_name[-1] if var_name[-1] in '$%!#' else None
 
-        if token:
-            current = self.runtime.get_variable(base_name, type_suffix, token=token)
-        else:
-            # NEXT without variable - use current line for token
-            class TokenInfo:
-                def __init__(self, line):
-                    self.line = line
-                    self.position = 0
-            token = TokenInfo(self.runtime.pc.line_num if self.runtime.pc.is_running() else 0)
-            current = self.runtime.get_variable(base_name, type_suffix, token=token)
-
-        step = loop_info['step']
+        if token is None:
+            token = TokenInfo(self.runtime.pc.line_num if self.runtime.pc.is_running() else 0, 0)
+        current = self.runtime.get_variable(base_name, type_suffix, token=token)
+
+        step = loop_state['step']
         new_value = current + step
 
         # Check if loop should continue
-        if (step > 0 and new_value <= loop_info['end']) or (step < 0 and new_value >= loop_info['end']):
-            # Validate that the FOR return address still exists
-            return_line = loop_info['return_line']
-            return_stmt = loop_info['return_stmt']
-
-            if not self.runtime.statement_table.line_exists(return_line):
-                raise RuntimeError(f"NEXT error: FOR loop line {return_line} no longer exists")
-
-            line_statements = self.runtime.statement_table.get_line_statements(return_line)
-            # return_stmt is 0-indexed offset into statements array.
-            # Valid range:
-            #   - 0 to len(statements)-1: Normal statement positions (existing statements)
-            #   - len(statements): Special sentinel value - FOR was last statement on line,
-            #                      continue execution at next line (no more statements to execute on current line)
-            #   - > len(statements): Invalid - indicates the statement was deleted
-            #
-            # Validation: Check for strictly greater than (== len is OK as sentinel)
-            if return_stmt > len(line_statements):
-                raise RuntimeError(f"NEXT error: FOR statement in line {return_line} no longer exists")
+        if (step > 0 and new_value <= loop_state['end']) or (step < 0 and new_value >= loop_state['end']):
+            statement_table = self.runtime.statement_table
+            if loop_state['generation'] != statement_table.generation:
+                # Program was edited since the FOR executed - validate that the
+                # FOR return address still exists, then re-resolve the loop body
+                return_line = loop_state['pc'].line
+                return_stmt = loop_state['pc'].statement
+
+                if not statement_table.line_exists(return_line):
+                    raise RuntimeError(f"NEXT error: FOR loop line {return_line} no longer exists")
+
+                line_statements = statement_table.get_line_statements(return_line)
+                # return_stmt is 0-indexed offset into statements array.
+                # Valid range:
+                #   - 0 to len(statements)-1: Normal statement positions (existing statements)
+                #   - len(statements): Special sentinel value - FOR was last statement on line,
+                #                      continue execution at next line (no more statements to execute on current line)
+                #   - > len(statements): Invalid - indicates the statement was deleted
+                #
+                # Validation: Check for strictly greater than (== len is OK as sentinel)
+                if return_stmt > len(line_statements):
+                    raise RuntimeError(f"NEXT error: FOR statement in line {return_line} no longer exists")
+
+                loop_state['body_pc'] = statement_table.next_pc(loop_state['pc'])
+                loop_state['generation'] = statement_table.generation
 
             # Continue loop - update variable and jump to statement AFTER the FOR
             self.runtime.set_variable(base_name, type_suffix, new_value, token=token, limits=self.limits)
-            # Jump back to statement AFTER the FOR
-            for_pc = PC.running_at(return_line, return_stmt)
-            next_pc = self.runtime.statement_table.next_pc(for_pc)
-            self.runtime.npc = next_pc
+            self.runtime.npc = loop_state['body_pc']
             return True  # Loop continues
         else:
             # Loop finished - unbind the variable from this loop
@@ -1313,59 +1424,72 @@ class Interpreter:
             return False  # Loop finished
 
     def execute_while(self, stmt):
-        """Execute WHILE statement"""
+        """Execute WHILE statement
+
+        The loop's stack entry is pushed on first entry and reused on every
+        iteration (WEND marks it as 'iterating' and jumps back here), so an
+        iteration costs no stack or resource-limit bookkeeping.
+        """
+        runtime = self.runtime
+        pc = runtime.pc
+
+        # Coming back from WEND? Then our loop entry is on top of the stack
+        loop_entry = runtime.execution_stack[-1] if runtime.execution_stack else None
+        if loop_entry is not None and loop_entry.get('iterating') and loop_entry['pc'] == pc:
+            loop_entry['iterating'] = False
+        else:
+            loop_entry = None
+
         # Evaluate the condition
-        condition = self.evaluate_expression(stmt.condition)
+        try:
+            condition = self.evaluate_expression(stmt.condition)
+        except Exception:
+            if loop_entry is not None:
+                # Leave the stack as it was before this loop was entered
+                self.limits.pop_while_loop()
+                runtime.pop_while_loop()
+            raise
 
         if not condition:
-            # Condition is false - skip to after matching WEND
-            wend_pos = self.find_matching_wend(
-                self.runtime.pc.line_num,
-                self.runtime.pc.stmt_offset
-            )
-
-            if wend_pos is None:
-                raise RuntimeError(f"WHILE without matching WEND at line {self.runtime.pc.line_num}")
+            if loop_entry is not None:
+                # Loop finished
+                self.limits.pop_while_loop()
+                runtime.pop_while_loop()
 
-            wend_line, wend_stmt = wend_pos
+            # Condition is false - skip to after matching WEND
+            wend_pc = runtime.statement_table.matching_wend(pc)
+            if wend_pc is None:
+                raise RuntimeError(f"WHILE without matching WEND at line {pc.line_num}")
 
             # Jump to the statement AFTER the WEND using statement_table
-            wend_pc = PC.running_at(wend_line, wend_stmt)
-            next_pc = self.runtime.statement_table.next_pc(wend_pc)
+            next_pc = runtime.statement_table.next_pc(wend_pc)
             if not next_pc.is_running():
                 # No more statements - program ends
-                self.runtime.pc = PC.halted()
+                runtime.pc = PC.halted()
             else:
-                self.runtime.npc = next_pc
-        else:
+                runtime.npc = next_pc
+        elif loop_entry is None:
             # Condition is true - enter the loop
             # Check resource limits
             self.limits.push_while_loop()
 
             # Push loop info so WEND knows where to return (use PC)
-            self.runtime.push_while_loop(
-                self.runtime.pc.line_num,
-                self.runtime.pc.stmt_offset
-            )
+            runtime.push_while_loop(pc.line_num, pc.stmt_offset)
 
     def execute_wend(self, stmt):
         """Execute WEND statement"""
-        # Pop the matching WHILE loop info
-        loop_info = self.runtime.peek_while_loop()
-
-        if loop_info is None:
-            raise RuntimeError(f"WEND without matching WHILE at line {self.runtime.pc.line_num}")
-
-        # Jump back to the WHILE statement to re-evaluate the condition
-        self.runtime.npc = PC.running_at(loop_info['while_line'], loop_info['while_stmt'])
-
-        # Pop the loop from the stack (after setting npc above, before WHILE re-executes).
-        # Timing: We pop NOW so the stack is clean before WHILE condition re-evaluation.
-        # The WHILE will re-push if its condition is still true, or skip the loop body
-        # if false. This ensures clean stack state and proper error handling if the
-        # WHILE condition evaluation fails (loop already popped, won't corrupt stack).
-        self.limits.pop_while_loop()
-        self.runtime.pop_while_loop()
+        execution_stack = self.runtime.execution_stack
+        if not execution_stack or execution_stack[-1]['type'] != 'WHILE':
+            if self.runtime.peek_while_loop() is None:
+                raise RuntimeError(f"WEND without matching WHILE at line {self.runtime.pc.line_num}")
+            # A WHILE is open but something else (GOSUB) is on top - raises the nesting error
+            self.runtime.pop_while_loop()
+
+        # Jump back to the WHILE statement to re-evaluate the condition.
+        # The loop stays on the stack; WHILE pops it when the condition fails.
+        loop_entry = execution_stack[-1]
+        loop_entry['iterating'] = True
+        self.runtime.npc = loop_entry['pc']
 
     def execute_onerror(self, stmt):
         """Execute ON ERROR GOTO/GOSUB statement"""
@@ -1410,12 +1534,22 @@ class Interpreter:
                 self.runtime.npc = next_pc
         else:
             # RESUME line_number - jump to specific line
-            self.runtime.npc = PC.from_line(stmt.line_number)
+            self.runtime.npc = self.runtime.statement_table.line_pc(stmt.line_number)
 
     def execute_end(self, stmt):
         """Execute END statement"""
         self.runtime.pc = self.runtime.pc.stop("END")
 
+    def flush_files(self):
+        """Write out buffered output of all open files.
+
+        tick_pc() calls this whenever a quantum leaves the program stopped
+        (END, STOP, Break, an error or the end of the program); CHAIN and
+        SYSTEM call it before leaving the program.
+        """
+        for file_info in self.runtime.files.values():
+            file_info['handle'].flush()
+
     def execute_remark(self, stmt):
         """Execute REM statement (do nothing)"""
         pass
@@ -1484,8 +1618,7 @@ class Interpreter:
                     value,
                     token=self._make_token_info(var_node),
                     limits=self.limits,
-                    original_case=getattr(var_node, 'original_case', var_node.name),
-                    settings_manager=self.settings_manager
+                    original_case=getattr(var_node, 'original_case', var_node.name)
                 )
 
     def execute_restore(self, stmt):
@@ -1563,9 +1696,7 @@ class Interpreter:
         # hiding programming errors.
         for file_num in list(self.runtime.files.keys()):
             try:
-                file_obj = self.runtime.files[file_num]
-                if hasattr(file_obj, 'close'):
-                    file_obj.close()
+                self.runtime.files[file_num]['handle'].close()
             except (OSError, IOError):
                 # Silently ignore OS-level file close errors (e.g., already closed, permission denied)
                 pass
@@ -1761,8 +1892,7 @@ class Interpreter:
                     value,
                     token=self._make_token_info(var_node),
                     limits=self.limits,
-                    original_case=getattr(var_node, 'original_case', var_node.name),
-                    settings_manager=self.settings_manager
+                    original_case=getattr(var_node, 'original_case', var_node.name)
                 )
 
         # Clear input state after successful completion
@@ -1786,59 +1916,14 @@ class Interpreter:
         not necessarily the CHARACTER MEANING for non-ASCII CP/M text.
         Future enhancement: Add optional encoding conversion setting for CP437/CP850 display.
 
-        EOF Detection (three methods):
-        1. EOF flag already set (file_info['eof'] == True) → returns None immediately
-        2. read() returns empty bytes (physical EOF) → sets EOF flag, returns partial line or None
-        3. Byte value 26 (^Z) encountered → sets EOF flag, returns partial line or None
-
-        Line Ending Handling:
-        - LF (byte 10): Line complete, return
-        - CR+LF (bytes 13+10): Line complete, consume both, return
-        - CR alone (byte 13): Line complete (old Mac format), return
+        Input files are read through a SequentialInputHandle (see
+        src/filesystem/buffered.py), which scans its buffer for LF, CR+LF,
+        a lone CR or ^Z and keeps the EOF state shared with EOF(), INPUT$,
+        LOC() and LOF().
 
         Returns: line string or None if EOF
         """
-        file_info = self.runtime.files[file_num]
-        file_handle = file_info['handle']
-
-        if file_info['eof']:
-            return None
-
-        # Read bytes until newline or ^Z
-        line_bytes = bytearray()
-        while True:
-            byte = file_handle.read(1)
-            if not byte:
-                # End of file
-                file_info['eof'] = True
-                if line_bytes:
-                    # Return partial line
-                    return line_bytes.decode('latin-1', errors='replace').rstrip('\r\n')
-                return None
-
-            b = byte[0]
-            if b == 26:  # ^Z (EOF marker in CP/M)
-                file_info['eof'] = True
-                if line_bytes:
-                    return line_bytes.decode('latin-1', errors='replace').rstrip('\r\n')
-                return None
-            elif b == 10:  # LF
-                # End of line - LF or CRLF (CR already consumed)
-                return line_bytes.decode('latin-1', errors='replace')
-            elif b == 13:  # CR
-                # Peek ahead to see if next byte is LF
-                next_byte = file_handle.read(1)
-                if next_byte and next_byte[0] == 10:  # LF
-                    # CRLF sequence - return line, LF already consumed
-                    return line_bytes.decode('latin-1', errors='replace')
-                else:
-                    # CR alone (old Mac format) - return line
-                    # Put back the peeked byte if it exists
-                    if next_byte:
-                        file_handle.seek(-1, 1)  # Seek back one byte from current position
-                    return line_bytes.decode('latin-1', errors='replace')
-            else:
-                line_bytes.append(b)
+        return self.runtime.files[file_num]['handle'].read_line()
 
     def execute_lineinput(self, stmt):
         """Execute LINE INPUT statement - read entire line
@@ -1895,8 +1980,7 @@ class Interpreter:
                 line,
                 token=self._make_token_info(var_node),
                 limits=self.limits,
-                original_case=getattr(var_node, 'original_case', var_node.name),
-                settings_manager=self.settings_manager
+                original_case=getattr(var_node, 'original_case', var_node.name)
             )
 
         # Clear input state after successful completion
@@ -1945,7 +2029,6 @@ class Interpreter:
         # Output to file or screen
         if file_handle:
             file_handle.write(output + '\n')
-            file_handle.flush()
         else:
             self.io.output(output)
 
@@ -1971,7 +2054,8 @@ class Interpreter:
 
         # Delegate to interactive mode if available
         if hasattr(self, 'interactive_mode') and self.interactive_mode:
-            self.interactive_mode.cmd_save(filename)
+            # Without ,A MBASIC saves in its compressed binary format
+            self.interactive_mode.cmd_save(filename, tokenized=not stmt.ascii_flag)
         else:
             raise RuntimeError("SAVE not available in this context")
 
@@ -2005,7 +2089,7 @@ class Interpreter:
                     self.runtime.clear_variables()
                     # Set NPC to target line (like GOTO)
                     # On next tick(), NPC will be moved to PC
-                    self.runtime.npc = PC.from_line(line_num)
+                    self.runtime.npc = self.runtime.statement_table.line_pc(line_num)
                     # PC stays running - execution continues at new line
         else:
             # RUN without arguments - CLEAR + signal restart needed
@@ -2056,6 +2140,8 @@ class Interpreter:
         if stmt.start_line:
             start_line = int(self.evaluate_expression(stmt.start_line))
 
+        self.flush_files()
+
         # Delegate to interactive mode if available
         if hasattr(self, 'interactive_mode') and self.interactive_mode:
             self.interactive_mode.cmd_chain(
@@ -2070,6 +2156,7 @@ class Interpreter:
 
     def execute_system(self, stmt):
         """Execute SYSTEM statement - exit to OS"""
+        self.flush_files()
         if hasattr(self, 'interactive_mode') and self.interactive_mode:
             self.interactive_mode.cmd_system()
         else:
@@ -2164,8 +2251,7 @@ class Interpreter:
         UI should serialize the empty AST back to text after this executes.
         """
         # Clear the statement table
-        self.runtime.statement_table.statements.clear()
-        self.runtime.statement_table._keys_cache = None
+        self.runtime.statement_table.clear()
 
         # Clear the line text map
         self.runtime.line_text_map.clear()
@@ -2405,8 +2491,8 @@ class Interpreter:
         # Any other mode raises error listing valid modes
         try:
             if mode == "I":
-                # Open for input - binary mode so we can detect ^Z
-                file_handle = self.fs.open(filename, "r", binary=True)
+                # Open for input - binary mode so we can detect ^Z, read in chunks
+                file_handle = SequentialInputHandle(self.fs.open(filename, "r", binary=True))
             elif mode == "O":
                 # Open for output
                 file_handle = self.fs.open(filename, "w", binary=False)
@@ -2423,12 +2509,25 @@ class Interpreter:
             else:
                 raise RuntimeError(f"Invalid OPEN mode: {mode} (valid modes: I, O, A, R)")
 
+            durable = self.settings_manager.get('file_durable_writes', False)
+            if mode == "R":
+                # GET and PUT are served from a page cache
+                file_handle = RandomAccessHandle(
+                    file_handle,
+                    cache_size=self.settings_manager.get('random_file_cache_kb', 4096) * 1024,
+                    durable=durable)
+            elif mode != "I":
+                # PRINT# and WRITE# write back in large blocks
+                file_handle = WriteBufferedHandle(
+                    file_handle,
+                    buffer_size=self.settings_manager.get('file_buffer_size_kb', 64) * 1024,
+                    durable=durable)
+
             # Store file handle and mode
             self.runtime.files[file_num] = {
                 'handle': file_handle,
                 'mode': mode,
-                'filename': filename,
-                'eof': False
+                'filename': filename
             }
 
         except (OSError, IOError, PermissionError) as e:
@@ -2503,6 +2602,7 @@ class Interpreter:
             self.runtime.field_buffers[file_num] = {
                 'buffer': bytearray(),
                 'fields': {},  # var_name -> (offset, width)
+                'layout': [],  # (slot, start, end, is_string) per field, for GET
                 'current_record': 0
             }
 
@@ -2518,6 +2618,12 @@ class Interpreter:
             buffer_info['fields'][var_name] = (offset, width)
             offset += width
 
+        # Compile the mapping into variable slots and record slices
+        buffer_info['layout'] = [
+            (self.runtime.field_variable_slot(var_name), start, start + width, var_name.endswith('$'))
+            for var_name, (start, width) in buffer_info['fields'].items()
+        ]
+
         # Initialize buffer to appropriate size
         buffer_info['buffer'] = bytearray(offset)
 
@@ -2550,12 +2656,12 @@ class Interpreter:
             # Use next record
             record_num = buffer_info['current_record'] + 1
 
-        # Seek to record position (records are 1-based)
-        record_size = len(buffer_info['buffer'])
-        file_handle.seek((record_num - 1) * record_size)
+        if record_num < 1:
+            raise RuntimeError("Bad record number")
 
-        # Read data into buffer
-        data = file_handle.read(record_size)
+        # Read record (records are 1-based)
+        record_size = len(buffer_info['buffer'])
+        data = file_handle.read_record((record_num - 1) * record_size, record_size)
         if len(data) < record_size:
             # Pad with spaces if we read past EOF
             data += b' ' * (record_size - len(data))
@@ -2563,18 +2669,8 @@ class Interpreter:
         buffer_info['buffer'] = bytearray(data)
         buffer_info['current_record'] = record_num
 
-        # Update field variables from buffer
-        for var_name, (offset, width) in buffer_info['fields'].items():
-            value = buffer_info['buffer'][offset:offset+width].decode('latin-1')
-            # Strip variable name to get base name and suffix
-            if var_name.endswith('$'):
-                self.runtime.set_variable_raw(var_name, value)
-            else:
-                # For non-string fields (unusual but possible), convert to number
-                try:
-                    self.runtime.set_variable_raw(var_name, float(value.strip()))
-                except ValueError:
-                    self.runtime.set_variable_raw(var_name, 0.0)
+        # Update all field variables from the record
+        self.runtime.set_field_variables(buffer_info['layout'], data.decode('latin-1'))
 
     def execute_put(self, stmt):
         """Execute PUT statement - write record to random-access file
@@ -2605,13 +2701,12 @@ class Interpreter:
             # Use next record
             record_num = buffer_info['current_record'] + 1
 
-        # Seek to record position (records are 1-based)
-        record_size = len(buffer_info['buffer'])
-        file_handle.seek((record_num - 1) * record_size)
+        if record_num < 1:
+            raise RuntimeError("Bad record number")
 
-        # Write buffer to file
-        file_handle.write(buffer_info['buffer'])
-        file_handle.flush()
+        # Write record (records are 1-based)
+        record_size = len(buffer_info['buffer'])
+        file_handle.write_record((record_num - 1) * record_size, buffer_info['buffer'])
 
         buffer_info['current_record'] = record_num
 
@@ -2959,15 +3054,16 @@ class Interpreter:
 
     def evaluate_expression(self, expr):
         """Evaluate an expression node"""
-        expr_type = type(expr).__name__
-
-        handler_name = f"evaluate_{expr_type.replace('Node', '').lower()}"
+        handler_name = self._expression_handler_names.get(type(expr))
+        if handler_name is None:
+            handler_name = f"evaluate_{type(expr).__name__.replace('Node', '').lower()}"
+            self._expression_handler_names[type(expr)] = handler_name
         handler = getattr(self, handler_name, None)
 
         if handler:
             return handler(expr)
         else:
-            raise NotImplementedError(f"Expression not implemented: {expr_type}")
+            raise NotImplementedError(f"Expression not implemented: {type(expr).__name__}")
 
     def evaluate_number(self, expr):
         """Evaluate number literal"""
@@ -2990,7 +3086,7 @@ class Interpreter:
                 expr.type_suffix,
                 token=self._make_token_info(expr),
                 original_case=getattr(expr, 'original_case', expr.name),
-                settings_manager=self.settings_manager
+                slot=self.runtime.variable_slot(expr)
             )
 
     def evaluate_binaryop(self, expr):
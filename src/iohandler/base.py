@@ -130,6 +130,14 @@ class IOHandler(ABC):
         """
         pass
 
+    def flush(self) -> None:
+        """Write out buffered output.
+
+        Called before reading input and when the interpreter finishes a tick.
+        Default implementation does nothing (output is not buffered).
+        """
+        pass
+
     def locate(self, row: int, col: int) -> None:
         """Move cursor to specific position (LOCATE statement).
 
@@ -3,12 +3,50 @@
 This module provides a console implementation of IOHandler that uses
 standard Python input() and print() functions. This is the default
 I/O handler for the command-line MBASIC interpreter.
+
+Output is buffered and written out in blocks:
+- On a terminal, when LINE_THRESHOLD lines are pending or the oldest
+  pending output is FLUSH_INTERVAL seconds old
+- When stdout is a pipe or file, when BUFFER_SIZE characters are pending
+- Always before input (INPUT, LINE INPUT, INKEY$, INPUT$), before error
+  messages, when the interpreter finishes a tick or the program stops, and
+  at exit
+- When the handler is garbage-collected with output still pending
+
+The handler tracks the cursor column, so POS, TAB and the comma print
+zones stay correct across PRINT statements ending in ; or ,.
 """
 
+import atexit
 import sys
 import os
+import time
+import weakref
 from .base import IOHandler
 
+LINE_THRESHOLD = 24
+FLUSH_INTERVAL = 0.05
+BUFFER_SIZE = 64 * 1024
+
+# Live handlers, flushed at exit (weak, so handlers can still be collected)
+_handlers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_handlers():
+    for handler in list(_handlers):
+        handler.flush()
+
+
+def _write_pending(pending, stream):
+    """Write and clear a handler's pending output (also run when it is collected)."""
+    if pending:
+        text = ''.join(pending)
+        pending.clear()
+        stream = stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
 
 class ConsoleIOHandler(IOHandler):
     """Console-based I/O handler using stdin/stdout.
@@ -17,24 +55,63 @@ class ConsoleIOHandler(IOHandler):
     It uses Python's built-in input() and print() functions.
     """
 
-    def __init__(self, debug_enabled: bool = False):
+    def __init__(self, debug_enabled: bool = False, stream=None):
         """Initialize console I/O handler.
 
         Args:
             debug_enabled: If True, debug() will output messages
+            stream: Output stream (default: sys.stdout at the time of each write)
         """
         self.debug_enabled = debug_enabled
+        self.stream = stream
+        self.column = 0            # 0-based cursor column
+        self.pending = []          # Output not yet written
+        self.pending_size = 0
+        self.pending_lines = 0
+        self.pending_since = 0.0   # time.monotonic() of the oldest pending output
+        try:
+            self.interactive = (stream or sys.stdout).isatty()
+        except (AttributeError, ValueError):
+            self.interactive = False
+        _handlers.add(self)
+        weakref.finalize(self, _write_pending, self.pending, stream).atexit = False
 
     def output(self, text: str, end: str = '\n') -> None:
         """Output text to console."""
-        print(text, end=end)
-        sys.stdout.flush()
+        text = f"{text}{end}"
+        if not text:
+            return
+        newline = text.rfind('\n')
+        if newline < 0:
+            self.column += len(text)
+        else:
+            self.column = len(text) - newline - 1
+        if not self.pending:
+            self.pending_since = time.monotonic()
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.interactive:
+            if newline >= 0:
+                self.pending_lines += text.count('\n')
+            if (self.pending_lines >= LINE_THRESHOLD or
+                    time.monotonic() - self.pending_since >= FLUSH_INTERVAL):
+                self.flush()
+        elif self.pending_size >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending output to the console."""
+        if self.pending:
+            self.pending_size = 0
+            self.pending_lines = 0
+            _write_pending(self.pending, self.stream)
 
     def input(self, prompt: str = '') -> str:
         """Input text from console."""
         if prompt:
-            print(prompt, end='')
-            sys.stdout.flush()
+            self.output(prompt, end='')
+        self.flush()
+        self.column = 0
         return input()
 
     def input_line(self, prompt: str = '') -> str:
@@ -57,6 +134,7 @@ class ConsoleIOHandler(IOHandler):
         Note: Non-blocking input is complex on different platforms.
         This implementation provides basic support.
         """
+        self.flush()
         if not blocking:
             # Non-blocking: check if input is available
             # This is platform-specific and simplified here
@@ -117,6 +195,8 @@ class ConsoleIOHandler(IOHandler):
 
     def clear_screen(self) -> None:
         """Clear the console screen."""
+        self.flush()
+        self.column = 0
         if sys.platform == 'win32':
             os.system('cls')
         else:
@@ -124,12 +204,14 @@ class ConsoleIOHandler(IOHandler):
 
     def error(self, message: str) -> None:
         """Output error message to console."""
+        self.flush()
         print(f"Error: {message}", file=sys.stderr)
         sys.stderr.flush()
 
     def debug(self, message: str) -> None:
         """Output debug message if debugging is enabled."""
         if self.debug_enabled:
+            self.flush()
             print(f"DEBUG: {message}", file=sys.stderr)
             sys.stderr.flush()
 
@@ -141,15 +223,14 @@ class ConsoleIOHandler(IOHandler):
             col: Column number (1-based)
         """
         # ANSI escape sequence for cursor positioning
-        print(f'\033[{row};{col}H', end='')
-        sys.stdout.flush()
+        self.pending.append(f'\033[{row};{col}H')
+        self.flush()
+        self.column = col - 1
 
     def get_cursor_position(self) -> tuple[int, int]:
         """Get current cursor position.
 
-        Note: This is difficult to implement portably in console.
-        Returns (1, 1) by default.
+        Note: The row is difficult to get portably in a console, so it is
+        always 1. The column is tracked from the output.
         """
-        # Getting cursor position in console is complex and platform-specific
-        # Return default position
-        return (1, 1)
+        return (1, self.column + 1)
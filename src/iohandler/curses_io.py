@@ -2,11 +2,24 @@
 
 This module provides an IOHandler that redirects all I/O to curses windows,
 enabling full-screen terminal UIs.
+
+Output is written a line at a time with addnstr() and only the rows that
+stay visible are drawn, so a burst of output costs one screen of drawing.
+Refreshes use noutrefresh() and a single doupdate() at most once per
+FRAME_INTERVAL; flush() (called before input and at the end of every
+interpreter tick) brings the screen up to date. The last SCROLLBACK_LINES
+output lines are kept for scrollback viewing (see get_scrollback()).
 """
 
+from collections import deque
+import time
+
 from .base import IOHandler
 import curses
 
+SCROLLBACK_LINES = 10000
+FRAME_INTERVAL = 1 / 30
+
 
 class CursesIOHandler(IOHandler):
     """I/O handler that uses curses windows.
@@ -15,18 +28,24 @@ class CursesIOHandler(IOHandler):
     prompts and dialogs.
     """
 
-    def __init__(self, output_win=None, input_win=None, debug_enabled=False):
+    def __init__(self, output_win=None, input_win=None, debug_enabled=False,
+                 scrollback_lines=SCROLLBACK_LINES):
         """Initialize curses I/O handler.
 
         Args:
             output_win: Curses window for output (can be set later)
             input_win: Curses window for input prompts (optional)
             debug_enabled: Enable debug output
+            scrollback_lines: Number of output lines kept for scrollback
         """
         self.output_win = output_win
         self.input_win = input_win
         self.debug_enabled = debug_enabled
         self.output_buffer = []  # Buffer output before window is set
+        self.scrollback = deque(maxlen=scrollback_lines)  # Completed output lines
+        self.current_line = ''   # Output after the last newline
+        self.update_pending = False
+        self.last_update = 0.0
 
     def set_output_window(self, window):
         """Set the output window after initialization.
@@ -36,11 +55,11 @@ class CursesIOHandler(IOHandler):
         """
         self.output_win = window
 
-        # Flush buffered output
+        # Draw buffered output (already recorded in the scrollback)
         if self.output_buffer:
-            for text in self.output_buffer:
-                self._write_to_window(text)
+            text = ''.join(self.output_buffer)
             self.output_buffer = []
+            self._draw(text.split('\n'))
 
     def set_input_window(self, window):
         """Set the input window after initialization.
@@ -50,55 +69,109 @@ class CursesIOHandler(IOHandler):
         """
         self.input_win = window
 
-    def _write_to_window(self, text):
+    def get_scrollback(self):
+        """Return the output kept for scrollback, oldest line first.
+
+        Returns:
+            List of lines; the last one is the unfinished current line
+        """
+        return list(self.scrollback) + [self.current_line]
+
+    def _record(self, lines):
+        """Add output (split at newlines) to the scrollback ring"""
+        if len(lines) == 1:
+            self.current_line += lines[0]
+            return
+        self.scrollback.append(self.current_line + lines[0])
+        self.scrollback.extend(lines[1:-1])
+        self.current_line = lines[-1]
+
+    def _newline(self, max_y):
+        """Move the cursor to the start of the next row, scrolling at the bottom"""
+        y, x = self.output_win.getyx()
+        if y < max_y - 1:
+            self.output_win.move(y + 1, 0)
+        else:
+            self.output_win.scroll(1)
+            self.output_win.move(max_y - 1, 0)
+
+    def _write_line(self, text, max_y, max_x, attr):
+        """Write text without newlines at the cursor, wrapping at the right edge"""
+        while text:
+            room = max_x - self.output_win.getyx()[1]
+            try:
+                self.output_win.addnstr(text, room, attr)
+            except curses.error:
+                # Writing the bottom-right cell cannot advance the cursor
+                pass
+            if len(text) < room:
+                return
+            # The row is full: curses wraps the cursor, except in the bottom-right corner
+            text = text[room:]
+            if self.output_win.getyx()[1] != 0:
+                self._newline(max_y)
+
+    def _write_to_window(self, text, attr=0):
         """Write text to output window.
 
         Args:
             text: Text to write
+            attr: Curses attribute for the text
         """
+        lines = text.split('\n')
+        self._record(lines)
+
         if self.output_win is None:
             # Buffer if window not set yet
             self.output_buffer.append(text)
             return
+        self._draw(lines, attr)
 
+    def _draw(self, lines, attr=0):
+        """Draw output lines (text split at newlines) in the output window"""
         try:
             # Get window dimensions
             max_y, max_x = self.output_win.getmaxyx()
 
-            # Write text, handling newlines and scrolling
-            for char in text:
-                if char == '\n':
-                    # Move to next line
-                    y, x = self.output_win.getyx()
-                    if y < max_y - 1:
-                        self.output_win.move(y + 1, 0)
-                    else:
-                        # Scroll window
-                        self.output_win.scroll(1)
-                        self.output_win.move(max_y - 1, 0)
-                else:
-                    # Write character
-                    try:
-                        self.output_win.addch(char)
-                    except curses.error:
-                        # Handle line wrap or window edge
-                        y, x = self.output_win.getyx()
-                        if x >= max_x - 1:
-                            # At right edge, wrap to next line
-                            if y < max_y - 1:
-                                self.output_win.move(y + 1, 0)
-                            else:
-                                self.output_win.scroll(1)
-                                self.output_win.move(max_y - 1, 0)
-                            self.output_win.addch(char)
-
-            # Refresh window to show output
-            self.output_win.refresh()
+            if len(lines) > max_y:
+                # Everything before the last screenful scrolls away: draw only that
+                lines = lines[-max_y:]
+                self.output_win.erase()
+                self.output_win.move(0, 0)
+
+            self._write_line(lines[0], max_y, max_x, attr)
+            for line in lines[1:]:
+                self._newline(max_y)
+                self._write_line(line, max_y, max_x, attr)
+
+            self.output_win.noutrefresh()
+            self._schedule_update()
 
         except curses.error:
             # Ignore errors (window too small, etc.)
             pass
 
+    def _schedule_update(self):
+        """Update the terminal now, or on the next flush() within the frame interval"""
+        if time.monotonic() - self.last_update >= FRAME_INTERVAL:
+            self._update()
+        else:
+            self.update_pending = True
+
+    def _update(self):
+        """Send pending window changes to the terminal"""
+        self.update_pending = False
+        self.last_update = time.monotonic()
+        try:
+            curses.doupdate()
+        except curses.error:
+            pass
+
+    def flush(self) -> None:
+        """Bring the terminal up to date with the output window."""
+        if self.update_pending:
+            self._update()
+
     def output(self, text: str, end: str = '\n') -> None:
         """Output text to curses window.
 
@@ -119,6 +192,7 @@ class CursesIOHandler(IOHandler):
         """
         if prompt:
             self.output(prompt, end='')
+        self.flush()
 
         # Use curses text input
         if self.output_win:
@@ -135,8 +209,11 @@ class CursesIOHandler(IOHandler):
                 curses.noecho()
                 curses.curs_set(0)
 
-                # Add newline to output
-                self.output('\n', end='')
+                # The typed text is on screen; keep it in the scrollback too
+                self._record([result, ''])
+                self._newline(self.output_win.getmaxyx()[0])
+                self.output_win.noutrefresh()
+                self._schedule_update()
 
                 return result
 
@@ -172,6 +249,7 @@ class CursesIOHandler(IOHandler):
         Returns:
             Single character as string, or empty string if no input
         """
+        self.flush()
         if self.output_win:
             try:
                 if not blocking:
@@ -204,7 +282,8 @@ class CursesIOHandler(IOHandler):
         if self.output_win:
             self.output_win.clear()
             self.output_win.move(0, 0)
-            self.output_win.refresh()
+            self.output_win.noutrefresh()
+            self._update()
 
     def error(self, message: str) -> None:
         """Output error message to curses window.
@@ -213,18 +292,15 @@ class CursesIOHandler(IOHandler):
             message: Error message
         """
         # Try to use red color for errors
+        attr = 0
         if self.output_win:
             try:
                 if curses.has_colors():
-                    self.output_win.addstr(message, curses.color_pair(4))
-                    self.output_win.addch('\n')
-                    self.output_win.refresh()
-                else:
-                    self._write_to_window(message + '\n')
+                    attr = curses.color_pair(4)
             except curses.error:
-                self._write_to_window(message + '\n')
-        else:
-            self._write_to_window(message + '\n')
+                pass
+        self._write_to_window(message + '\n', attr)
+        self.flush()
 
     def debug(self, message: str) -> None:
         """Output debug message if debugging is enabled.
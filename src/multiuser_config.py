@@ -5,6 +5,9 @@ Centralizes all multi-user related configuration including:
 - Error logging (stderr/MySQL)
 - Rate limiting
 - Autosave settings
+- Idle session hibernation
+- Program scheduling (event-loop latency target)
+- Worker process pool for running programs
 
 Configuration is loaded from config/multiuser.json if it exists,
 otherwise uses sensible defaults for single-user mode.
@@ -52,6 +55,8 @@ class RateLimitConfig:
     enabled: bool = False
     max_requests_per_minute: int = 60
     max_concurrent_sessions: int = 100
+    retry_after_seconds: int = 15      # Retry delay on the "server busy" page
+    max_event_loop_lag_ms: float = 250.0  # Pause the heaviest programs above this
 
 
 @dataclass
@@ -61,6 +66,28 @@ class AutosaveConfig:
     interval_seconds: int = 60
 
 
+@dataclass
+class HibernationConfig:
+    """Configuration for idle session hibernation."""
+    enabled: bool = False
+    idle_seconds: int = 900  # No user events (and no program running) for this long
+    check_interval_seconds: int = 60
+
+
+@dataclass
+class SchedulerConfig:
+    """Configuration for the scheduler that runs all sessions' programs."""
+    target_latency_ms: float = 20.0  # Longest a program may block the event loop
+    min_slice_ms: float = 2.0        # Shortest time slice for a CPU-heavy session
+
+
+@dataclass
+class ProcessPoolConfig:
+    """Configuration for running programs in worker processes."""
+    enabled: bool = False
+    workers: int = 0  # 0 = one worker per CPU core
+
+
 @dataclass
 class MultiUserConfig:
     """Complete multi-user configuration."""
@@ -69,6 +96,9 @@ class MultiUserConfig:
     error_logging: ErrorLoggingConfig = None
     rate_limiting: RateLimitConfig = None
     autosave: AutosaveConfig = None
+    hibernation: HibernationConfig = None
+    scheduler: SchedulerConfig = None
+    process_pool: ProcessPoolConfig = None
 
     def __post_init__(self):
         if self.session_storage is None:
@@ -79,6 +109,12 @@ class MultiUserConfig:
             self.rate_limiting = RateLimitConfig()
         if self.autosave is None:
             self.autosave = AutosaveConfig()
+        if self.hibernation is None:
+            self.hibernation = HibernationConfig()
+        if self.scheduler is None:
+            self.scheduler = SchedulerConfig()
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolConfig()
 
 
 def load_config() -> MultiUserConfig:
@@ -186,7 +222,9 @@ def _parse_config_dict(data: Dict[str, Any]) -> MultiUserConfig:
         config.rate_limiting = RateLimitConfig(
             enabled=rl.get('enabled', False),
             max_requests_per_minute=rl.get('max_requests_per_minute', 60),
-            max_concurrent_sessions=rl.get('max_concurrent_sessions', 100)
+            max_concurrent_sessions=rl.get('max_concurrent_sessions', 100),
+            retry_after_seconds=rl.get('retry_after_seconds', 15),
+            max_event_loop_lag_ms=rl.get('max_event_loop_lag_ms', 250.0)
         )
 
     # Autosave
@@ -197,6 +235,31 @@ def _parse_config_dict(data: Dict[str, Any]) -> MultiUserConfig:
             interval_seconds=a.get('interval_seconds', 60)
         )
 
+    # Idle session hibernation
+    if 'hibernation' in data:
+        h = data['hibernation']
+        config.hibernation = HibernationConfig(
+            enabled=h.get('enabled', False),
+            idle_seconds=h.get('idle_seconds', 900),
+            check_interval_seconds=h.get('check_interval_seconds', 60)
+        )
+
+    # Program scheduling
+    if 'scheduler' in data:
+        sc = data['scheduler']
+        config.scheduler = SchedulerConfig(
+            target_latency_ms=sc.get('target_latency_ms', 20.0),
+            min_slice_ms=sc.get('min_slice_ms', 2.0)
+        )
+
+    # Worker process pool
+    if 'process_pool' in data:
+        pp = data['process_pool']
+        config.process_pool = ProcessPoolConfig(
+            enabled=pp.get('enabled', False),
+            workers=pp.get('workers', 0)
+        )
+
     return config
 
 
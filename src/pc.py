@@ -20,6 +20,7 @@ This eliminates entire classes of bugs:
 - Clear semantics (is_running() is the only question)
 """
 
+from collections.abc import MutableSet
 from dataclasses import dataclass
 from typing import Optional
 
@@ -64,6 +65,10 @@ class PC:
     stop_reason: Optional[str] = None
     error: Optional[ErrorInfo] = None
 
+    def __post_init__(self):
+        # PCs are dictionary keys on every executed statement; hash once
+        object.__setattr__(self, '_hash', hash((self.line, self.statement)))
+
     def is_running(self) -> bool:
         """
         Check if execution is running.
@@ -114,7 +119,11 @@ class PC:
 
         Must match __eq__ per Python's hash/equality contract.
         """
-        return hash((self.line, self.statement))
+        try:
+            return self._hash
+        except AttributeError:
+            # Unpickled from a version that did not cache the hash
+            return hash((self.line, self.statement))
 
     def __repr__(self):
         """String representation for debugging"""
@@ -299,18 +308,167 @@ class PC:
         return False
 
 
+class BreakpointSet(MutableSet):
+    """
+    Breakpoints, with an index of the lines that have at least one.
+
+    A breakpoint halts every statement of its line, so the interpreter only
+    asks has_line() - one dictionary lookup, however many breakpoints are set.
+    Bare line numbers are accepted and stored as PC(line, 0).
+    """
+
+    def __init__(self, items=()):
+        self._pcs = set()
+        self._line_counts = {}  # line number -> number of breakpoints on that line
+        for item in items:
+            self.add(item)
+
+    @staticmethod
+    def _as_pc(item):
+        return item if isinstance(item, PC) else PC(item, 0)
+
+    def __contains__(self, item):
+        return self._as_pc(item) in self._pcs
+
+    def __iter__(self):
+        return iter(self._pcs)
+
+    def __len__(self):
+        return len(self._pcs)
+
+    def __repr__(self):
+        return f"BreakpointSet({sorted(self._pcs, key=lambda pc: (pc.line, pc.statement))})"
+
+    def add(self, item):
+        pc = self._as_pc(item)
+        if pc not in self._pcs:
+            self._pcs.add(pc)
+            self._line_counts[pc.line] = self._line_counts.get(pc.line, 0) + 1
+
+    def discard(self, item):
+        pc = self._as_pc(item)
+        if pc in self._pcs:
+            self._pcs.discard(pc)
+            remaining = self._line_counts[pc.line] - 1
+            if remaining:
+                self._line_counts[pc.line] = remaining
+            else:
+                del self._line_counts[pc.line]
+
+    def clear(self):
+        self._pcs.clear()
+        self._line_counts.clear()
+
+    def has_line(self, line_num):
+        """True if any breakpoint is set on the line"""
+        return line_num in self._line_counts
+
+
 class StatementTable:
     """
     Ordered collection of statements indexed by PC.
 
-    Uses regular dict which maintains insertion order (Python 3.7+).
-    Provides navigation methods (first_pc, next_pc) for sequential execution.
+    Statements are stored in a PC -> stmt dict (kept in line order so UIs can
+    iterate it directly). Navigation uses a dense execution plan that is built
+    lazily from the dict and rebuilt after edits:
+
+    - _plan_pcs: statement array in program order (integer-indexed)
+    - _plan_index: PC -> index into the statement array
+    - _plan_next_exec: index of the next statement that is not a no-op
+      (REM/DATA), or -1 at end of program
+    - _plan_lines: line number -> (first index, end index)
+    - _plan_next_for: PC of a NEXT without variable -> variable of the FOR
+      it closes (static pairing in program order)
+    - _plan_wend: PC of a WHILE -> PC of its matching WEND
+
+    generation is incremented on every change to the table. Anything cached
+    against the program's structure (loop tables, compiled code) can store the
+    generation it was built for and compare it to detect edits.
     """
 
+    # Statement types that do nothing when executed
+    NOOP_STATEMENT_TYPES = ('RemarkStatementNode', 'DataStatementNode')
+
     def __init__(self):
         """Initialize empty statement table"""
-        self.statements = {}  # PC -> stmt_node (insertion-ordered)
-        self._keys_cache = None  # Cache for next_pc() lookups
+        self.statements = {}  # PC -> stmt_node (in line order)
+        self.generation = 0  # Incremented on every structural change
+        self._plan_pcs = None  # None = plan must be rebuilt
+        self._plan_index = None
+        self._plan_next_exec = None
+        self._plan_lines = None
+        self._plan_next_for = None
+        self._plan_wend = None
+
+    def _invalidate(self):
+        """Mark the execution plan stale after a structural change"""
+        self.generation += 1
+        self._plan_pcs = None
+
+    def _build_plan(self):
+        """Build the execution plan from the statements dict"""
+        pcs = sorted(self.statements, key=lambda pc: (pc.line, pc.statement))
+        if pcs != list(self.statements):
+            # Restore line order in place (callers may hold a reference to the dict)
+            ordered = [(pc, self.statements[pc]) for pc in pcs]
+            self.statements.clear()
+            self.statements.update(ordered)
+
+        index = {}
+        lines = {}
+        for i, pc in enumerate(pcs):
+            index[pc] = i
+            if pc.line in lines:
+                lines[pc.line] = (lines[pc.line][0], i + 1)
+            else:
+                lines[pc.line] = (i, i + 1)
+
+        # Successor links skipping no-op statements, computed back to front
+        next_exec = [-1] * len(pcs)
+        following = -1
+        for i in range(len(pcs) - 1, -1, -1):
+            next_exec[i] = following
+            if type(self.statements[pcs[i]]).__name__ not in self.NOOP_STATEMENT_TYPES:
+                following = i
+
+        # Pair NEXT without variable with its FOR. Open loops are tracked in
+        # program order; a FOR that reuses an open variable closes it and any
+        # loops opened after it (same rule as MBASIC's FOR stack).
+        # WHILE/WEND are matched by nesting depth, like a forward scan from
+        # each WHILE would; unmatched WHILEs have no entry.
+        next_for = {}
+        open_loops = []
+        wend = {}
+        open_whiles = []
+        for pc in pcs:
+            stmt = self.statements[pc]
+            stmt_type = type(stmt).__name__
+            if stmt_type == 'WhileStatementNode':
+                open_whiles.append(pc)
+            elif stmt_type == 'WendStatementNode':
+                if open_whiles:
+                    wend[open_whiles.pop()] = pc
+            elif stmt_type == 'ForStatementNode':
+                var_name = stmt.variable.name + (stmt.variable.type_suffix or "")
+                if var_name in open_loops:
+                    del open_loops[open_loops.index(var_name):]
+                open_loops.append(var_name)
+            elif stmt_type == 'NextStatementNode':
+                if not stmt.variables:
+                    if open_loops:
+                        next_for[pc] = open_loops.pop()
+                    continue
+                for var in stmt.variables:
+                    var_name = var.name + (var.type_suffix or "")
+                    if var_name in open_loops:
+                        del open_loops[open_loops.index(var_name):]
+
+        self._plan_index = index
+        self._plan_lines = lines
+        self._plan_next_exec = next_exec
+        self._plan_next_for = next_for
+        self._plan_wend = wend
+        self._plan_pcs = pcs
 
     def add(self, pc, stmt_node):
         """
@@ -321,7 +479,53 @@ class StatementTable:
             stmt_node: AST node for the statement
         """
         self.statements[pc] = stmt_node
-        self._keys_cache = None  # Invalidate cache when table changes
+        self._invalidate()
+
+    def clear(self):
+        """Remove all statements (NEW, or before rebuilding from the editor)"""
+        self.statements.clear()
+        self._invalidate()
+
+    def line_pc(self, line_num):
+        """
+        Get the PC of the first statement of a line (GOTO/GOSUB targets).
+
+        Returns the table's own PC object, so jumping to it allocates nothing
+        and later lookups match by identity.
+
+        Args:
+            line_num: Target line number
+
+        Returns:
+            PC at statement 0 of the line (a new PC if the line does not exist,
+            which fails when executed like any invalid PC)
+        """
+        if self._plan_pcs is None:
+            self._build_plan()
+        line_range = self._plan_lines.get(line_num)
+        if line_range is None:
+            return PC.from_line(line_num)
+        return self._plan_pcs[line_range[0]]
+
+    def pc_at(self, line_num, statement):
+        """
+        Get the table's PC for a position (RETURN addresses, loop entries).
+
+        Args:
+            line_num: Line number
+            statement: Statement index on the line
+
+        Returns:
+            The interned PC, or a new running PC if the position is not in the table
+        """
+        if self._plan_pcs is None:
+            self._build_plan()
+        line_range = self._plan_lines.get(line_num)
+        if line_range is not None and 0 <= statement < line_range[1] - line_range[0]:
+            pc = self._plan_pcs[line_range[0] + statement]
+            if pc.statement == statement:
+                return pc
+        return PC.running_at(line_num, statement)
 
     def get(self, pc):
         """
@@ -342,10 +546,11 @@ class StatementTable:
         Returns:
             PC of first statement, or halted PC if table is empty
         """
-        try:
-            return next(iter(self.statements))
-        except StopIteration:
-            return PC.halted()
+        if self._plan_pcs is None:
+            self._build_plan()
+        if self._plan_pcs:
+            return self._plan_pcs[0]
+        return PC.halted()
 
     def next_pc(self, pc):
         """
@@ -361,18 +566,35 @@ class StatementTable:
         Returns:
             Next PC in sequence, or halted PC if at end or PC not found in table
         """
-        # Build/rebuild keys cache if needed
-        if self._keys_cache is None:
-            self._keys_cache = list(self.statements.keys())
+        if self._plan_pcs is None:
+            self._build_plan()
+        idx = self._plan_index.get(pc)
+        if idx is not None and idx + 1 < len(self._plan_pcs):
+            return self._plan_pcs[idx + 1]
+        return PC.halted()
 
-        try:
-            idx = self._keys_cache.index(pc)
-            if idx + 1 < len(self._keys_cache):
-                return self._keys_cache[idx + 1]
-        except ValueError:
-            # PC not found in table
-            pass
+    def next_executable_pc(self, pc):
+        """
+        Get next PC after given PC, skipping REM and DATA statements.
+
+        Executing a skipped statement would do nothing, so the result is the
+        same as stepping through it with next_pc() - except that trace output,
+        breakpoints and single-stepping never see the skipped statements.
+        Callers use next_pc() when any of those are active.
 
+        Args:
+            pc: Current program counter
+
+        Returns:
+            Next executable PC, or halted PC if at end or PC not found in table
+        """
+        if self._plan_pcs is None:
+            self._build_plan()
+        idx = self._plan_index.get(pc)
+        if idx is not None:
+            idx = self._plan_next_exec[idx]
+            if idx >= 0:
+                return self._plan_pcs[idx]
         return PC.halted()
 
     def prev_pc(self, pc):
@@ -388,19 +610,40 @@ class StatementTable:
         Returns:
             Previous PC in sequence, or None if at beginning or PC not found in table
         """
-        # Build/rebuild keys cache if needed
-        if self._keys_cache is None:
-            self._keys_cache = list(self.statements.keys())
+        if self._plan_pcs is None:
+            self._build_plan()
+        idx = self._plan_index.get(pc)
+        if idx is not None and idx > 0:
+            return self._plan_pcs[idx - 1]
+        return None
 
-        try:
-            idx = self._keys_cache.index(pc)
-            if idx > 0:
-                return self._keys_cache[idx - 1]
-        except ValueError:
-            # PC not found in table
-            pass
+    def paired_for_variable(self, pc):
+        """
+        Get the FOR loop variable that a NEXT without variable closes.
 
-        return None
+        Args:
+            pc: PC of the NEXT statement
+
+        Returns:
+            Variable name with suffix (e.g., 'i!'), or None if not paired
+        """
+        if self._plan_pcs is None:
+            self._build_plan()
+        return self._plan_next_for.get(pc)
+
+    def matching_wend(self, pc):
+        """
+        Get the WEND that closes the WHILE at pc.
+
+        Args:
+            pc: PC of the WHILE statement
+
+        Returns:
+            PC of the matching WEND, or None if there is none
+        """
+        if self._plan_pcs is None:
+            self._build_plan()
+        return self._plan_wend.get(pc)
 
     def __contains__(self, pc):
         """Check if PC exists in table (for breakpoint checks)"""
@@ -424,11 +667,26 @@ class StatementTable:
         Returns:
             List of statement nodes for that line, in order by statement index
         """
-        result = []
-        for pc, stmt in self.statements.items():
-            if pc.line == line_num:
-                result.append(stmt)
-        return result
+        if self._plan_pcs is None:
+            self._build_plan()
+        line_range = self._plan_lines.get(line_num)
+        if line_range is None:
+            return []
+        statements = self.statements
+        return [statements[pc] for pc in self._plan_pcs[line_range[0]:line_range[1]]]
+
+    def statement_count(self, line_num):
+        """
+        Number of statements on a line (0 if the line does not exist).
+
+        Same as len(get_line_statements(line_num)) without building the list.
+        """
+        if self._plan_pcs is None:
+            self._build_plan()
+        line_range = self._plan_lines.get(line_num)
+        if line_range is None:
+            return 0
+        return line_range[1] - line_range[0]
 
     def line_exists(self, line_num):
         """
@@ -440,7 +698,9 @@ class StatementTable:
         Returns:
             True if line has any statements
         """
-        return any(pc.line == line_num for pc in self.statements.keys())
+        if self._plan_pcs is None:
+            self._build_plan()
+        return line_num in self._plan_lines
 
     def delete_line(self, line_num):
         """
@@ -449,16 +709,26 @@ class StatementTable:
         Args:
             line_num: Line number to delete
         """
-        # Remove all PCs for this line
-        to_remove = [pc for pc in self.statements.keys() if pc.line == line_num]
+        if self._plan_pcs is not None:
+            line_range = self._plan_lines.get(line_num)
+            if line_range is None:
+                return
+            to_remove = self._plan_pcs[line_range[0]:line_range[1]]
+        else:
+            to_remove = [pc for pc in self.statements if pc.line == line_num]
+            if not to_remove:
+                return
         for pc in to_remove:
             del self.statements[pc]
-        self._keys_cache = None  # Invalidate cache
+        self._invalidate()
 
     def replace_line(self, line_num, line_node):
         """
         Replace all statements for a given line with new statements from LineNode.
 
+        The line keeps its place in line-number order (a new line is inserted
+        between its neighbours rather than appended at the end).
+
         Args:
             line_num: Line number to replace
             line_node: LineNode containing new statements
@@ -469,4 +739,5 @@ class StatementTable:
         # Add new statements
         for stmt_offset, stmt in enumerate(line_node.statements):
             pc = PC.running_at(line_num, stmt_offset)
-            self.add(pc, stmt)
+            self.statements[pc] = stmt
+        self._invalidate()
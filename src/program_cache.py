@@ -0,0 +1,243 @@
+"""On-disk cache of parsed programs and semantic analysis results.
+
+Entries are content-addressed: the key is a hash of the program source, the
+DEF type map it was parsed with, the MBASIC version and the parser/analyzer
+sources themselves, so an edited program or an upgraded (or locally
+modified) parser never sees a stale entry. Each entry is one pickle file
+under the user cache directory:
+
+- Linux/Mac: $XDG_CACHE_HOME/mbasic or ~/.cache/mbasic
+- Windows: %LOCALAPPDATA%/mbasic/cache
+
+Two kinds of entries are stored:
+- 'lines': per-line parse results used by LOAD and CHAIN
+  (see ProgramManager.parse_program_text)
+- 'analysis': the program AST, the analyzed AST and the SemanticAnalyzer
+  used by the compilers (see analyze_program)
+
+The cache is bounded by the program_cache_size_mb setting. The least
+recently used entries (by file modification time, refreshed on every hit)
+are evicted when a new entry pushes it over the limit. Set program_cache to
+false to disable it, or MBASIC_CACHE_DIR to move it.
+"""
+
+import copy
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.version import VERSION
+
+# Modules whose classes or behavior end up in cached entries
+_KEY_MODULES = ('tokens.py', 'lexer.py', 'parser.py', 'ast_nodes.py', 'semantic_analyzer.py')
+
+# Evict down to this fraction of the size limit, so stores don't evict every time
+_EVICT_TO = 0.8
+
+
+def _default_cache_dir() -> Path:
+    override = os.getenv('MBASIC_CACHE_DIR')
+    if override:
+        return Path(override)
+    if os.name == 'nt':  # Windows
+        local_appdata = os.getenv('LOCALAPPDATA', os.path.expanduser('~'))
+        return Path(local_appdata) / 'mbasic' / 'cache'
+    xdg_cache = os.getenv('XDG_CACHE_HOME')
+    base_dir = Path(xdg_cache) if xdg_cache else Path.home() / '.cache'
+    return base_dir / 'mbasic'
+
+
+def _code_fingerprint() -> str:
+    """Version plus size and mtime of the modules that produce cached objects"""
+    src_dir = Path(__file__).parent
+    parts = [VERSION, str(pickle.HIGHEST_PROTOCOL)]
+    for name in _KEY_MODULES:
+        try:
+            stat = (src_dir / name).stat()
+            parts.append(f'{name}:{stat.st_size}:{stat.st_mtime_ns}')
+        except OSError:
+            parts.append(f'{name}:missing')
+    return '|'.join(parts)
+
+
+class ProgramCache:
+    """Size-bounded, content-addressed pickle cache.
+
+    Usage:
+        cache = ProgramCache()
+        value = cache.get('lines', source, def_type_map)
+        if value is None:
+            value = expensive_parse(source)
+            cache.put('lines', source, def_type_map, value)
+
+    Every get() returns freshly unpickled objects, so callers may mutate
+    them (RENUM, the semantic analyzer and the interpreter all do).
+    Cache I/O errors are never fatal: a broken entry is a miss and a failed
+    store is ignored.
+    """
+
+    def __init__(self, directory: Optional[os.PathLike] = None, max_bytes: int = 64 * 1024 * 1024):
+        """Initialize cache.
+
+        Args:
+            directory: Cache directory (default: the user cache directory)
+            max_bytes: Total size of entries before LRU eviction
+        """
+        self.directory = Path(directory) if directory is not None else _default_cache_dir()
+        self.max_bytes = max_bytes
+        self._fingerprint = _code_fingerprint()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, kind: str, source: str, def_type_map: Optional[Dict[str, Any]] = None) -> str:
+        """Content hash identifying an entry"""
+        digest = hashlib.sha256()
+        digest.update(self._fingerprint.encode())
+        digest.update(b'\0' + kind.encode() + b'\0')
+        if def_type_map:
+            for letter in sorted(def_type_map):
+                type_info = def_type_map[letter]
+                digest.update(f'{letter}={getattr(type_info, "name", type_info)},'.encode())
+        digest.update(b'\0')
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.pickle'
+
+    def get(self, kind: str, source: str, def_type_map: Optional[Dict[str, Any]] = None) -> Any:
+        """Cached value, or None on a miss"""
+        path = self._path(self.key(kind, source, def_type_map))
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated or incompatible entry
+            self.misses += 1
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, kind: str, source: str, def_type_map: Optional[Dict[str, Any]], value: Any) -> None:
+        """Store a value (atomically), then evict old entries if over the size limit"""
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return  # Unpicklable (e.g. an AST holding a UI object) - just don't cache
+        if len(data) > self.max_bytes:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(self.key(kind, source, def_type_map)))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the size limit"""
+        try:
+            entries = []
+            total = 0
+            for path in self.directory.glob('*.pickle'):
+                stat = path.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+        except OSError:
+            return
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes * _EVICT_TO:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Delete all entries"""
+        for path in self.directory.glob('*.pickle'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+_global_program_cache: Optional[ProgramCache] = None
+
+
+def get_program_cache() -> Optional[ProgramCache]:
+    """Global program cache, or None if disabled by the program_cache setting"""
+    global _global_program_cache
+    from src.settings import get_settings_manager
+    settings = get_settings_manager()
+    if not settings.get('program_cache', True):
+        return None
+    max_bytes = settings.get('program_cache_size_mb', 64) * 1024 * 1024
+    if _global_program_cache is None:
+        _global_program_cache = ProgramCache(max_bytes=max_bytes)
+    _global_program_cache.max_bytes = max_bytes
+    return _global_program_cache
+
+
+def analyze_program(source: str, cache: Optional[ProgramCache] = None) -> Tuple[Any, Any, Any]:
+    """Lex, parse and semantically analyze a whole program, through the cache.
+
+    The analyzer rewrites the AST it analyzes, so both versions are returned:
+    backends that generate from analyzed code (C, JavaScript) use the second,
+    the Python backend uses the first.
+
+    Args:
+        source: Program source text
+        cache: Cache to use (default: the global cache, if enabled)
+
+    Returns:
+        Tuple of (program, analyzed_program, analyzer); check
+        analyzer.errors for the analysis result
+
+    Raises:
+        Lexer and parser errors (these are not cached)
+    """
+    from src.lexer import Lexer
+    from src.parser import Parser
+    from src.semantic_analyzer import SemanticAnalyzer
+
+    if cache is None:
+        cache = get_program_cache()
+    if cache is not None:
+        cached = cache.get('analysis', source)
+        if cached is not None:
+            return cached
+
+    program = Parser(Lexer(source).tokenize()).parse()
+    analyzed_program = copy.deepcopy(program)
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(analyzed_program)
+    result = (program, analyzed_program, analyzer)
+
+    if cache is not None:
+        cache.put('analysis', source, None, result)
+    return result
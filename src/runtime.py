@@ -12,9 +12,13 @@ This module manages:
 - Program counter (PC) based execution
 """
 
-import time
-from src.ast_nodes import DataStatementNode, DefFnStatementNode
-from src.pc import PC, StatementTable
+from src.ast_nodes import (DataStatementNode, DefFnStatementNode, PrintUsingStatementNode, StringNode,
+                           TypeInfo, iter_variable_nodes)
+from src.basic_builtins import get_using_formatter
+from src.variable_tracker import VariableTracker
+from src.variable_case import VariableCaseTable
+from src.basic_array import BasicArray
+from src.pc import PC, StatementTable, BreakpointSet
 
 
 def split_variable_name_and_suffix(full_name):
@@ -52,25 +56,38 @@ class Runtime:
         self._ast_or_line_table = ast_or_line_table
 
         # Variable storage (PRIVATE - use get_variable/set_variable methods)
-        # Each variable is stored as: name_with_suffix -> {'value': val, 'last_read': {...}, 'last_write': {...}, 'original_case': str}
-        # Note: The 'original_case' field stores the canonical case for display (determined by case_conflict policy).
-        #       Despite its misleading name, this field contains the policy-resolved canonical case variant,
-        #       not the original case as first typed. See _check_case_conflict() for resolution logic.
-        # Note: line -1 in last_write indicates non-program execution sources:
-        #       1. System/internal variables (ERR%, ERL%) via set_variable_raw() with FakeToken(line=-1)
-        #       2. Debugger/interactive prompt via set_variable() with debugger_set=True (always uses line=-1)
-        #       Both use line=-1, making them indistinguishable from each other in last_write alone.
-        #       However, line=-1 distinguishes these special sources from normal program execution (line >= 0).
-        self._variables = {}
-        self._arrays = {}             # name_with_suffix -> {'dims': [...], 'data': [...]}
-
-        # Case tracking for conflict detection (settings.case_conflict)
-        # Stored separately from variable entries for efficient tracking:
-        # Maps normalized name (lowercase) to list of all case variants seen: {'targetangle': [('TargetAngle', line, col), ('targetangle', line, col)]}
-        self._variable_case_variants = {}
-
-        # Array element tracking for per-element read/write timestamps
-        self._array_element_tracking = {}
+        # Each scalar variable is resolved once to an integer slot; values live in a
+        # compact list indexed by slot. Slots are assigned for every variable the
+        # program references when it is loaded (setup()), and on first use for
+        # variables created any other way (debugger, CHAIN, system variables).
+        # setup() also binds each scalar VariableNode of the program to its slot
+        # (see variable_slot()), so executing it needs no name lookup at all.
+        # A value of None means the slot exists but the variable has not been
+        # assigned or read yet (it does not appear in get_all_variables()).
+        self._var_slots = {}          # name_with_suffix -> slot
+        self._var_names = []          # slot -> name_with_suffix
+        self._var_values = []         # slot -> value (None = not yet created)
+        # slot -> canonical case for display (determined by case_conflict policy,
+        # see variable_case below); exported as 'original_case'
+        self._var_case = []
+        # (name, type_suffix) -> slot for accesses by name, so resolution
+        # (lowercasing, default suffix) happens once per distinct reference
+        self._slot_cache = {}
+        # Marks node bindings made by this runtime; a node last loaded by
+        # another runtime (same cached AST) is resolved by name instead
+        self._slot_owner = object()
+        self._arrays = {}             # name_with_suffix -> BasicArray
+        self._array_name_cache = {}   # (name, type_suffix) -> name_with_suffix
+
+        # Optional access-tracking observer (see src/variable_tracker.py).
+        # None = no tracking; the variables windows attach one while visible.
+        self.variable_tracker = None
+
+        # Variable name case handling (settings.case_conflict). The policy is set
+        # by the interpreter before setup(); setup() resolves the canonical case
+        # of every variable name in the program once (see src/variable_case.py).
+        self.case_conflict = 'first_wins'
+        self.variable_case = VariableCaseTable()
 
         self.common_vars = []         # List of variable names declared in COMMON (order matters!)
         self.array_base = 0           # Array index base (0 or 1, set by OPTION BASE)
@@ -105,7 +122,7 @@ class Runtime:
         # _resolve_variable_name() to determine variable types when no explicit suffix is present
 
         # File I/O
-        self.files = {}               # file_number -> file_handle
+        self.files = {}               # file_number -> {'handle', 'mode', 'filename'}
         self.field_buffers = {}       # file_number -> buffer_dict
 
         # Error handling registration (ON ERROR GOTO/GOSUB)
@@ -120,7 +137,7 @@ class Runtime:
         self.rnd_last = 0.5
 
         # Breakpoints - persist across runs (not cleared by RUN/CLEAR)
-        self.breakpoints = set()          # Set of PC objects for breakpoints
+        self.breakpoints = BreakpointSet()  # PCs of breakpoints, indexed by line
 
         # Break handling (Ctrl+C)
         self.break_requested = False      # True when Ctrl+C pressed during execution
@@ -147,12 +164,17 @@ class Runtime:
             # Old style: ProgramNode AST - extract lines
             lines_to_process = self._ast_or_line_table.lines
 
+        # Resolve variable name case once per load ('error' policy raises here)
+        self.variable_case.policy = self.case_conflict
+        self.variable_case.build(lines_to_process)
+
         # Build statement table and extract DATA values and DEF FN definitions
         for line in lines_to_process:
             for stmt_offset, stmt in enumerate(line.statements):
                 # Add to statement table with PC
                 pc = PC(line.line_number, stmt_offset)
                 self.statement_table.add(pc, stmt)
+                self._allocate_variable_slots(stmt)
 
                 # Extract DATA and DEF FN
                 if isinstance(stmt, DataStatementNode):
@@ -169,6 +191,16 @@ class Runtime:
                             self.data_items.append(value)
                 elif isinstance(stmt, DefFnStatementNode):
                     self.user_functions[stmt.name] = stmt
+                elif isinstance(stmt, PrintUsingStatementNode) and isinstance(stmt.format_string, StringNode):
+                    # Parse constant PRINT USING masks now rather than in the loop
+                    get_using_formatter(stmt.format_string.value)
+
+        # Apply canonical case to the program's variables
+        canonical = self.variable_case.canonical
+        for full_name, slot in self._var_slots.items():
+            case = canonical.get(full_name[:-1])
+            if case is not None:
+                self._var_case[slot] = case
 
         # Initialize PC to first statement
         self.pc = self.statement_table.first_pc()
@@ -244,103 +276,73 @@ class Runtime:
         # No DEF type map or not found - default to single precision
         return (name + '!', '!')
 
-    def _check_case_conflict(self, name, original_case, token, settings_manager=None):
+    def _variable_slot(self, name, type_suffix, def_type_map=None):
         """
-        Check for variable name case conflicts and handle according to settings.
+        Return the storage slot for a scalar variable, allocating it if needed.
 
-        Args:
-            name: Normalized lowercase name (e.g., 'targetangle')
-            original_case: Original case from source (e.g., 'TargetAngle')
-            token: Token with line and position info
-            settings_manager: Optional SettingsManager for getting case_conflict setting
+        Resolution goes through _resolve_variable_name() the first time a given
+        (name, type_suffix) pair is seen; afterwards it is a single dict lookup.
+        Lookups with a def_type_map are not cached since the map can change
+        the resolved type.
+        """
+        if def_type_map is None:
+            slot = self._slot_cache.get((name, type_suffix))
+            if slot is not None:
+                return slot
 
-        Returns:
-            str: The canonical case to use for this variable (might differ from original_case)
+        full_name, _ = self._resolve_variable_name(name, type_suffix, def_type_map)
+        slot = self._var_slots.get(full_name)
+        if slot is None:
+            slot = len(self._var_names)
+            self._var_slots[full_name] = slot
+            self._var_names.append(full_name)
+            self._var_values.append(None)
+            self._var_case.append(self.variable_case.get(full_name[:-1]))
 
-        Raises:
-            RuntimeError: If case_conflict setting is 'error' and conflict detected
-        """
-        # Get the case conflict setting
-        case_conflict_policy = "first_wins"  # Default
-        if settings_manager:
-            case_conflict_policy = settings_manager.get("case_conflict", "first_wins")
-
-        # Track this case variant
-        if name not in self._variable_case_variants:
-            self._variable_case_variants[name] = []
-
-        variants = self._variable_case_variants[name]
-
-        # Check if this exact case already exists
-        for existing_case, existing_line, existing_col in variants:
-            if existing_case == original_case:
-                # Same case - no conflict
-                return original_case
-
-        # New case variant detected
-        line_num = getattr(token, 'line', None)
-        col_num = getattr(token, 'column', None)
-
-        # If this is the first variant, just store it
-        if not variants:
-            variants.append((original_case, line_num, col_num))
-            return original_case
-
-        # Conflict detected! Handle according to policy
-        if case_conflict_policy == "error":
-            # Raise error showing all variants
-            first_case, first_line, first_col = variants[0]
-            error_msg = f"Variable name case conflict: '{first_case}' at line {first_line}"
-            error_msg += f" vs '{original_case}' at line {line_num}"
-            raise RuntimeError(error_msg)
-
-        elif case_conflict_policy == "first_wins":
-            # Use the first case seen (silent)
-            first_case, _, _ = variants[0]
-            # Still track this variant for inspection/debugging
-            variants.append((original_case, line_num, col_num))
-            return first_case
-
-        elif case_conflict_policy == "prefer_upper":
-            # Choose version with most uppercase letters
-            all_cases = variants + [(original_case, line_num, col_num)]
-            best_case = max(all_cases, key=lambda x: sum(1 for c in x[0] if c.isupper()))
-            if (original_case, line_num, col_num) not in variants:
-                variants.append((original_case, line_num, col_num))
-            return best_case[0]
-
-        elif case_conflict_policy == "prefer_lower":
-            # Choose version with most lowercase letters
-            all_cases = variants + [(original_case, line_num, col_num)]
-            best_case = max(all_cases, key=lambda x: sum(1 for c in x[0] if c.islower()))
-            if (original_case, line_num, col_num) not in variants:
-                variants.append((original_case, line_num, col_num))
-            return best_case[0]
-
-        elif case_conflict_policy == "prefer_mixed":
-            # Prefer mixed case (camelCase/PascalCase)
-            # Mixed case = has both upper and lower
-            all_cases = variants + [(original_case, line_num, col_num)]
-
-            def mixed_score(case_str):
-                has_upper = any(c.isupper() for c in case_str)
-                has_lower = any(c.islower() for c in case_str)
-                if has_upper and has_lower:
-                    return 1  # Mixed case
-                return 0  # All upper or all lower
-
-            best_case = max(all_cases, key=lambda x: mixed_score(x[0]))
-            if (original_case, line_num, col_num) not in variants:
-                variants.append((original_case, line_num, col_num))
-            return best_case[0]
+        if def_type_map is None:
+            self._slot_cache[(name, type_suffix)] = slot
+        return slot
 
-        else:
-            # Unknown policy - default to first_wins
-            first_case, _, _ = variants[0]
-            variants.append((original_case, line_num, col_num))
-            return first_case
+    def _allocate_variable_slots(self, stmt):
+        """Assign slots to every scalar variable referenced by a statement and bind them to its nodes."""
+        for node in iter_variable_nodes(stmt):
+            if node.name and not node.subscripts:
+                node._slot = (self._slot_owner, self._variable_slot(node.name, node.type_suffix))
+
+    def variable_slot(self, node):
+        """
+        Return the storage slot of a scalar VariableNode, for get_variable(slot=...).
+
+        Nodes of the loaded program were bound to their slot by setup(); other
+        nodes (immediate mode, or bound by another runtime) are resolved by name.
+        """
+        binding = node.__dict__.get('_slot')
+        if binding is not None and binding[0] is self._slot_owner:
+            return binding[1]
+        return self._variable_slot(node.name, node.type_suffix)
+
+    def _token_location(self, token):
+        """Return (line, position) of an access for the variable tracker."""
+        return (getattr(token, 'line', self.pc.line_num if self.pc and not self.pc.halted() else None),
+                getattr(token, 'position', None))
+
+    def enable_variable_tracking(self):
+        """
+        Start recording variable access locations.
 
-    def get_variable(self, name, type_suffix=None, def_type_map=None, token=None, original_case=None, settings_manager=None):
+        Called by the variables windows when they become visible. Returns the
+        attached VariableTracker (an existing one is kept).
+        """
+        if self.variable_tracker is None:
+            self.variable_tracker = VariableTracker()
+        return self.variable_tracker
+
+    def disable_variable_tracking(self):
+        """Stop recording variable access locations and drop what was recorded."""
+        self.variable_tracker = None
+
+    def get_variable(self, name, type_suffix=None, def_type_map=None, token=None, original_case=None, settings_manager=None,
+                     slot=None):
         """
         Get variable value for program execution, tracking read access.
 
@@ -362,6 +364,10 @@ class Runtime:
                    itself is mandatory to distinguish intentional program execution (which must
                    provide a token) from debugging/inspection (which should use get_variable_for_debugger()).
                    This design prevents accidental omission of tracking during normal execution.
+            original_case: Original case from source, used for display only if the
+                           loaded program does not mention this variable
+            settings_manager: Unused; the case_conflict policy is applied at load time
+            slot: Slot from variable_slot(); skips resolving name and type_suffix
 
         Returns:
             Variable value (default 0 for numeric, "" for string)
@@ -372,40 +378,28 @@ class Runtime:
         if token is None:
             raise ValueError("get_variable() requires token parameter. Use get_variable_for_debugger() for debugging.")
 
-        # Resolve full variable name
-        full_name, resolved_suffix = self._resolve_variable_name(name, type_suffix, def_type_map)
+        if slot is None:
+            slot = self._variable_slot(name, type_suffix, def_type_map)
 
-        # Check for case conflicts and get canonical case
-        if original_case is None:
-            original_case = name  # Fallback if not provided
-        canonical_case = self._check_case_conflict(name, original_case, token, settings_manager)
-
-        # Initialize variable entry if needed
-        if full_name not in self._variables:
-            # Create with default value
-            default_value = "" if resolved_suffix == '$' else 0
-            self._variables[full_name] = {
-                'value': default_value,
-                'last_read': None,
-                'last_write': None,
-                'original_case': canonical_case  # Canonical case for display (field name is misleading, see module header)
-            }
-        else:
-            # Always update to canonical case (for prefer_upper/prefer_lower/prefer_mixed policies)
-            # Note: The field name is misleading - it stores canonical case not original (see module header)
-            self._variables[full_name]['original_case'] = canonical_case
-
-        # Track read access
-        self._variables[full_name]['last_read'] = {
-            'line': getattr(token, 'line', self.pc.line_num if self.pc and not self.pc.halted() else None),
-            'position': getattr(token, 'position', None),
-            'timestamp': time.perf_counter()  # High precision timestamp for debugging
-        }
+        # Canonical case was resolved at load time; variables the loaded program
+        # does not mention (e.g. immediate mode) keep the first case seen
+        if self._var_case[slot] is None:
+            self._var_case[slot] = original_case or name
 
-        # Return value
-        return self._variables[full_name]['value']
+        # Reading a variable creates it with the default value
+        value = self._var_values[slot]
+        if value is None:
+            value = "" if self._var_names[slot][-1] == '$' else 0
+            self._var_values[slot] = value
 
-    def set_variable(self, name, type_suffix, value, def_type_map=None, token=None, debugger_set=False, limits=None, original_case=None, settings_manager=None):
+        tracker = self.variable_tracker
+        if tracker is not None:
+            tracker.variable_read(self._var_names[slot], *self._token_location(token))
+
+        return value
+
+    def set_variable(self, name, type_suffix, value, def_type_map=None, token=None, debugger_set=False, limits=None, original_case=None, settings_manager=None,
+                     slot=None):
         """
         Set variable value for program execution, tracking write access.
 
@@ -420,8 +414,10 @@ class Runtime:
             token: REQUIRED (unless debugger_set=True) - Token with line and position
             debugger_set: True if this set is from debugger/interactive prompt, not program execution
             limits: Optional ResourceLimits object for tracking
-            original_case: Original case from source (for case preservation)
-            settings_manager: Optional SettingsManager for case conflict handling
+            original_case: Original case from source, used for display only if the
+                           loaded program does not mention this variable
+            settings_manager: Unused; the case_conflict policy is applied at load time
+            slot: Slot from variable_slot(); skips resolving name and type_suffix
 
         Raises:
             ValueError: If token is None and debugger_set is False
@@ -429,19 +425,10 @@ class Runtime:
         if token is None and not debugger_set:
             raise ValueError("set_variable() requires token parameter. Use debugger_set=True for debugger writes.")
 
-        # Resolve full variable name
-        full_name, resolved_suffix = self._resolve_variable_name(name, type_suffix, def_type_map)
-
-        # Check for case conflicts and get canonical case (skip for debugger sets)
-        # Note: If not debugger_set, token is guaranteed to be non-None by the ValueError check above.
-        # Debugger sets skip case conflict checking because they don't have source location context
-        # and are used for internal/system variables that don't need case consistency enforcement.
-        if not debugger_set:
-            if original_case is None:
-                original_case = name  # Fallback if not provided
-            canonical_case = self._check_case_conflict(name, original_case, token, settings_manager)
-        else:
-            canonical_case = original_case or name
+        if slot is None:
+            slot = self._variable_slot(name, type_suffix, def_type_map)
+        full_name = self._var_names[slot]
+        resolved_suffix = full_name[-1]
 
         # Enforce 255 byte string limit (MBASIC 5.21 compatibility)
         if resolved_suffix == '$' and isinstance(value, str) and len(value) > 255:
@@ -453,42 +440,23 @@ class Runtime:
 
         # Track variable memory if limits provided
         if limits and not debugger_set:
-            from src.ast_nodes import TypeInfo
             var_type = TypeInfo.from_suffix(resolved_suffix)
             limits.allocate_variable(full_name, value, var_type)
 
-        # Initialize variable entry if needed
-        if full_name not in self._variables:
-            self._variables[full_name] = {
-                'value': None,
-                'last_read': None,
-                'last_write': None,
-                'original_case': canonical_case  # Canonical case for display (field name is misleading, see module header)
-            }
-        else:
-            # Always update to canonical case (for prefer_upper/prefer_lower/prefer_mixed policies)
-            # Note: The field name is misleading - it stores canonical case not original (see module header)
-            self._variables[full_name]['original_case'] = canonical_case
-
-        # Set value
-        self._variables[full_name]['value'] = value
-
-        # Update last_write tracking
-        if debugger_set:
-            # Debugger/prompt set: use line -1 as sentinel
-            self._variables[full_name]['last_write'] = {
-                'line': -1,
-                'position': None,
-                'timestamp': time.perf_counter()
-            }
-        elif token is not None:
-            # Non-debugger path: normal program execution (token.line >= 0) OR internal/system set (token.line = -1)
-            # Both use this branch; line value from token distinguishes them
-            self._variables[full_name]['last_write'] = {
-                'line': getattr(token, 'line', self.pc.line_num if self.pc and not self.pc.halted() else None),
-                'position': getattr(token, 'position', None),
-                'timestamp': time.perf_counter()  # High precision timestamp for debugging
-            }
+        self._var_values[slot] = value
+        # Canonical case was resolved at load time; variables the loaded program
+        # does not mention (debugger, immediate mode) keep the first case seen
+        if self._var_case[slot] is None:
+            self._var_case[slot] = original_case or name
+
+        tracker = self.variable_tracker
+        if tracker is not None:
+            if debugger_set:
+                # Debugger/prompt set: use line -1 as sentinel
+                tracker.variable_written(full_name, -1, None)
+            else:
+                # Normal program execution (token.line >= 0) OR internal/system set (token.line = -1)
+                tracker.variable_written(full_name, *self._token_location(token))
 
     def get_variable_for_debugger(self, name, type_suffix=None, def_type_map=None):
         """
@@ -510,8 +478,9 @@ class Runtime:
         full_name, resolved_suffix = self._resolve_variable_name(name, type_suffix, def_type_map)
 
         # Return existing value or default (no tracking)
-        if full_name in self._variables:
-            return self._variables[full_name]['value']
+        slot = self._var_slots.get(full_name)
+        if slot is not None and self._var_values[slot] is not None:
+            return self._var_values[slot]
 
         # Default values
         if resolved_suffix == '$':
@@ -532,8 +501,8 @@ class Runtime:
         Returns:
             Variable value or None if not found
         """
-        var_entry = self._variables.get(full_name)
-        return var_entry['value'] if var_entry else None
+        slot = self._var_slots.get(full_name)
+        return self._var_values[slot] if slot is not None else None
 
     def set_variable_raw(self, full_name, value):
         """
@@ -559,7 +528,7 @@ class Runtime:
         name, type_suffix = split_variable_name_and_suffix(full_name)
 
         # Create a fake token with line=-1 to indicate internal/system setting
-        # (see _variables comment in __init__ for details on line=-1 usage)
+        # (see src/variable_tracker.py for details on line=-1 usage)
         class FakeToken:
             def __init__(self):
                 self.line = -1
@@ -570,13 +539,48 @@ class Runtime:
         # Call set_variable for uniform handling
         self.set_variable(name, type_suffix, value, token=fake_token)
 
+    def field_variable_slot(self, full_name):
+        """Return the storage slot of a FIELD variable (full name with suffix, lowercase)."""
+        name, type_suffix = split_variable_name_and_suffix(full_name)
+        slot = self._variable_slot(name, type_suffix)
+        if self._var_case[slot] is None:
+            self._var_case[slot] = name
+        return slot
+
+    def set_field_variables(self, layout, record):
+        """
+        Assign every FIELD variable of a random file from the record GET just read.
+
+        Args:
+            layout: (slot, start, end, is_string) per field, slots from field_variable_slot()
+            record: Record contents decoded as latin-1
+        """
+        values = self._var_values
+        tracker = self.variable_tracker
+        for slot, start, end, is_string in layout:
+            if is_string:
+                values[slot] = record[start:end]
+            else:
+                # For non-string fields (unusual but possible), convert to number
+                try:
+                    values[slot] = float(record[start:end].strip())
+                except ValueError:
+                    values[slot] = 0.0
+            if tracker is not None:
+                tracker.variable_written(self._var_names[slot], -1, None)
+
     def clear_variables(self):
-        """Clear all variables."""
-        self._variables.clear()
+        """Clear all variables (slots and their display case are kept, values are reset)."""
+        # Reset in place: compiled code may hold references to this list
+        self._var_values[:] = [None] * len(self._var_names)
+        if self.variable_tracker is not None:
+            self.variable_tracker.clear_variables()
 
     def clear_arrays(self):
         """Clear all arrays."""
         self._arrays.clear()
+        if self.variable_tracker is not None:
+            self.variable_tracker.clear_arrays()
 
     def bind_for_loop(self, var_name, pc, end_value, step_value):
         """
@@ -587,12 +591,23 @@ class Runtime:
             pc: PC object pointing to the FOR statement
             end_value: Loop end value (evaluated once at FOR time)
             step_value: Loop step value (evaluated once at FOR time)
-        """
-        self.for_loop_states[var_name] = {
-            'pc': pc,
-            'end': end_value,
-            'step': step_value
-        }
+
+        The loop body entry point (statement after the FOR) is resolved here,
+        together with the statement table generation it was resolved for, so
+        NEXT can jump without looking anything up until the program is edited.
+        """
+        # Re-binding moves the loop to the end (most recently entered loop last).
+        # An inner loop is re-entered on every outer iteration, so its state
+        # dict is reused rather than rebuilt.
+        state = self.for_loop_states.pop(var_name, None)
+        if state is None:
+            state = {}
+        state['pc'] = pc
+        state['end'] = end_value
+        state['step'] = step_value
+        state['body_pc'] = self.statement_table.next_pc(pc)
+        state['generation'] = self.statement_table.generation
+        self.for_loop_states[var_name] = state
 
     def get_for_loop_state(self, var_name):
         """
@@ -602,7 +617,8 @@ class Runtime:
             var_name: Variable name with suffix (lowercase)
 
         Returns:
-            dict with keys 'pc', 'end', 'step' or None if not bound to a loop
+            dict with keys 'pc', 'end', 'step', 'body_pc', 'generation'
+            or None if not bound to a loop
         """
         return self.for_loop_states.get(var_name)
 
@@ -631,29 +647,79 @@ class Runtime:
             full_name = var_info['name'] + var_info['type_suffix']
 
             if var_info['is_array']:
-                # Restore array
-                self._arrays[full_name] = {
-                    'dims': var_info['dimensions'],
-                    'data': [0] * self._calculate_array_size(var_info['dimensions'])
-                }
+                # Restore array (dimensions only, elements are not exported)
+                self._arrays[full_name] = BasicArray(
+                    full_name, var_info['dimensions'], var_info.get('base', self.array_base))
             else:
                 # Restore scalar variable with original_case preservation
-                self._variables[full_name] = {
-                    'value': var_info['value'],
-                    'last_read': var_info.get('last_read'),
-                    'last_write': var_info.get('last_write'),
-                    'original_case': var_info.get('original_case', var_info['name'])  # Preserve canonical case
-                }
+                slot = self._variable_slot(var_info['name'], var_info['type_suffix'])
+                self._var_values[slot] = var_info['value']
+                self._var_case[slot] = var_info.get('original_case', var_info['name'])  # Preserve canonical case
+                if self.variable_tracker is not None:
+                    self.variable_tracker.restore_variable(
+                        full_name, var_info.get('last_read'), var_info.get('last_write'))
 
     def update_arrays(self, arrays):
         """
         Bulk update arrays.
 
         Args:
-            arrays: dict of array_name -> array_info
+            arrays: dict of array_name -> BasicArray
         """
         self._arrays.update(arrays)
 
+    def get_array_state(self):
+        """
+        Export arrays for session persistence.
+
+        Returns:
+            dict: full_name -> {'dims': [...], 'base': int, 'data': [...]}
+        """
+        return {full_name: array.to_state() for full_name, array in self._arrays.items()}
+
+    def restore_array_state(self, state):
+        """
+        Restore arrays exported by get_array_state().
+
+        Args:
+            state: dict full_name -> {'dims': [...], 'base': int, 'data': [...]}
+                   ('base' may be missing in older saves)
+        """
+        self._arrays = {
+            full_name: BasicArray.from_state(full_name, entry, self.array_base)
+            for full_name, entry in state.items()
+        }
+
+    def get_variable_state(self):
+        """
+        Export scalar variables for session persistence.
+
+        Returns:
+            dict: full_name -> {'value': value, 'original_case': str}
+        """
+        return {
+            full_name: {'value': self._var_values[slot], 'original_case': self._var_case[slot]}
+            for full_name, slot in self._var_slots.items()
+            if self._var_values[slot] is not None
+        }
+
+    def restore_variable_state(self, state):
+        """
+        Restore scalar variables exported by get_variable_state().
+
+        Existing slots keep their numbers, so code compiled against this
+        runtime stays valid.
+
+        Args:
+            state: dict full_name -> {'value': value, 'original_case': str}
+        """
+        self.clear_variables()
+        for full_name, entry in state.items():
+            name, type_suffix = split_variable_name_and_suffix(full_name)
+            slot = self._variable_slot(name, type_suffix)
+            self._var_values[slot] = entry['value']
+            self._var_case[slot] = entry.get('original_case')
+
     def variable_exists(self, full_name):
         """
         Check if a variable exists.
@@ -664,7 +730,8 @@ class Runtime:
         Returns:
             bool: True if variable exists
         """
-        return full_name in self._variables
+        slot = self._var_slots.get(full_name)
+        return slot is not None and self._var_values[slot] is not None
 
     def array_exists(self, full_name):
         """
@@ -697,52 +764,14 @@ class Runtime:
         Returns:
             Array element value
         """
-        # Resolve full array name
-        full_name, _ = self._resolve_variable_name(name, type_suffix, def_type_map)
-
-        # Auto-dimension array to (10) if not explicitly dimensioned (MBASIC behavior)
-        if full_name not in self._arrays:
-            # Determine number of dimensions from subscripts
-            num_dims = len(subscripts)
-            # Default dimension size is 10 for each dimension
-            default_dims = [10] * num_dims
-            self.dimension_array(name, type_suffix, default_dims, def_type_map)
-
-        array_info = self._arrays[full_name]
-        dims = array_info['dims']
-        data = array_info['data']
-
-        # Calculate flat index using global array_base
-        index = self._calculate_array_index(subscripts, dims, self.array_base)
-
-        # Bounds check
-        if index < 0 or index >= len(data):
-            raise RuntimeError(f"Array subscript out of range: {full_name}{subscripts}")
+        array = self._array_for(name, type_suffix, subscripts, def_type_map)
+        value = array.data[array.offset(subscripts)]
 
         # Track read access if token is provided
-        if token is not None:
-            # Track at array level (for variables window display)
-            tracking_info = {
-                'line': getattr(token, 'line', self.pc.line_num if self.pc and not self.pc.halted() else None),
-                'position': getattr(token, 'position', None),
-                'timestamp': time.perf_counter()
-            }
-            array_info['last_read_subscripts'] = list(subscripts)  # Store copy of subscripts
-            array_info['last_read'] = tracking_info
-
-            # Create tracking key for this array element (for per-element tracking)
-            element_key = f"{full_name}[{','.join(map(str, subscripts))}]"
-
-            if element_key not in self._array_element_tracking:
-                self._array_element_tracking[element_key] = {
-                    'last_read': None,
-                    'last_write': None
-                }
+        if token is not None and self.variable_tracker is not None:
+            self.variable_tracker.array_read(array.name, subscripts, *self._token_location(token))
 
-            # Update per-element read tracking
-            self._array_element_tracking[element_key]['last_read'] = tracking_info
-
-        return data[index]
+        return value
 
     def set_array_element(self, name, type_suffix, subscripts, value, def_type_map=None, token=None):
         """
@@ -761,51 +790,12 @@ class Runtime:
             token: Optional token object with line and position info for tracking.
                    If None, write access is not tracked.
         """
-        # Resolve full array name
-        full_name, _ = self._resolve_variable_name(name, type_suffix, def_type_map)
-
-        # Auto-dimension array to (10) if not explicitly dimensioned (MBASIC behavior)
-        if full_name not in self._arrays:
-            # Determine number of dimensions from subscripts
-            num_dims = len(subscripts)
-            # Default dimension size is 10 for each dimension
-            default_dims = [10] * num_dims
-            self.dimension_array(name, type_suffix, default_dims, def_type_map)
-
-        array_info = self._arrays[full_name]
-        dims = array_info['dims']
-        data = array_info['data']
-
-        # Calculate flat index using global array_base
-        index = self._calculate_array_index(subscripts, dims, self.array_base)
-
-        if index < 0 or index >= len(data):
-            raise RuntimeError(f"Array subscript out of range: {full_name}{subscripts}")
-
-        data[index] = value
+        array = self._array_for(name, type_suffix, subscripts, def_type_map)
+        array.set(subscripts, value)
 
         # Track write access if token is provided
-        if token is not None:
-            # Track at array level (for variables window display)
-            tracking_info = {
-                'line': getattr(token, 'line', self.pc.line_num if self.pc and not self.pc.halted() else None),
-                'position': getattr(token, 'position', None),
-                'timestamp': time.perf_counter()
-            }
-            array_info['last_write_subscripts'] = list(subscripts)  # Store copy of subscripts
-            array_info['last_write'] = tracking_info
-
-            # Create tracking key for this array element (for per-element tracking)
-            element_key = f"{full_name}[{','.join(map(str, subscripts))}]"
-
-            if element_key not in self._array_element_tracking:
-                self._array_element_tracking[element_key] = {
-                    'last_read': None,
-                    'last_write': None
-                }
-
-            # Update per-element write tracking
-            self._array_element_tracking[element_key]['last_write'] = tracking_info
+        if token is not None and self.variable_tracker is not None:
+            self.variable_tracker.array_written(array.name, subscripts, *self._token_location(token))
 
     def get_array_element_for_debugger(self, name, type_suffix, subscripts, def_type_map=None):
         """
@@ -827,36 +817,27 @@ class Runtime:
         # Simply call get_array_element without a token (no tracking)
         return self.get_array_element(name, type_suffix, subscripts, def_type_map, token=None)
 
-    def _calculate_array_index(self, subscripts, dims, base=0):
-        """
-        Calculate flat array index from multi-dimensional subscripts.
-
-        MBASIC uses row-major order.
-
-        Args:
-            subscripts: User-provided subscript values
-            dims: Array dimension sizes
-            base: Array base (0 or 1)
+    def _array_for(self, name, type_suffix, subscripts, def_type_map=None):
         """
-        if len(subscripts) != len(dims):
-            raise RuntimeError(f"Wrong number of subscripts: got {len(subscripts)}, expected {len(dims)}")
-
-        index = 0
-        multiplier = 1
-
-        # Calculate index (row-major order)
-        for i in range(len(dims) - 1, -1, -1):
-            # Adjust subscript by base
-            adjusted_subscript = subscripts[i] - base
-            index += adjusted_subscript * multiplier
+        Return the BasicArray for an element access, auto-dimensioning it if needed.
 
-            # Multiplier depends on base
-            if base == 0:
-                multiplier *= (dims[i] + 1)  # 0-based: 0 to dim inclusive
-            else:
-                multiplier *= dims[i]  # 1-based: 1 to dim inclusive
+        Auto-dimensioning: If the array has not been explicitly dimensioned via DIM,
+        it is dimensioned to (10, 10, ...) with one dimension per subscript
+        (MBASIC-80 5.21 behavior).
+        """
+        if def_type_map is None:
+            full_name = self._array_name_cache.get((name, type_suffix))
+            if full_name is None:
+                full_name, _ = self._resolve_variable_name(name, type_suffix)
+                self._array_name_cache[(name, type_suffix)] = full_name
+        else:
+            full_name, _ = self._resolve_variable_name(name, type_suffix, def_type_map)
 
-        return index
+        array = self._arrays.get(full_name)
+        if array is None:
+            self.dimension_array(name, type_suffix, [10] * len(subscripts), def_type_map)
+            array = self._arrays[full_name]
+        return array
 
     def dimension_array(self, name, type_suffix, dimensions, def_type_map=None, token=None):
         """
@@ -869,51 +850,21 @@ class Runtime:
             def_type_map: Optional DEF type mapping
             token: Optional token for tracking DIM statement location
         """
-        import time
-
         # Resolve full array name
-        full_name, resolved_suffix = self._resolve_variable_name(name, type_suffix, def_type_map)
+        full_name, _ = self._resolve_variable_name(name, type_suffix, def_type_map)
 
-        # Calculate total size based on array_base
         # If base is 0: DIM A(10) creates indices 0-10 (11 elements)
         # If base is 1: DIM A(10) creates indices 1-10 (10 elements)
-        total_size = 1
-        for dim in dimensions:
-            if self.array_base == 0:
-                total_size *= (dim + 1)  # 0-based: 0 to dim inclusive
+        # Numeric arrays get typed buffers (see src/basic_array.py)
+        self._arrays[full_name] = BasicArray(full_name, dimensions, self.array_base)
+
+        # Track DIM location (as both read and write, see VariableTracker.array_dimensioned)
+        tracker = self.variable_tracker
+        if tracker is not None:
+            if token is not None:
+                tracker.array_dimensioned(full_name, *self._token_location(token))
             else:
-                total_size *= dim  # 1-based: 1 to dim inclusive
-
-        # Default value based on type
-        if resolved_suffix == '$':
-            default_value = ""
-        else:
-            default_value = 0
-
-        # Track DIM as a write operation
-        tracking_info = None
-        if token is not None:
-            tracking_info = {
-                'line': getattr(token, 'line', self.pc.line_num if self.pc and not self.pc.halted() else None),
-                'position': getattr(token, 'position', None),
-                'timestamp': time.perf_counter()
-            }
-
-        # Create array with access tracking
-        self._arrays[full_name] = {
-            'dims': dimensions,
-            'data': [default_value] * total_size,
-            'last_read_subscripts': None,  # Last accessed subscripts for read
-            'last_write_subscripts': None,  # Last accessed subscripts for write
-            'last_read': tracking_info,  # Track DIM location (initialization sets read timestamp for debugger)
-            'last_write': tracking_info  # Track DIM location (array initialization counts as write)
-        }
-        # Note: DIM is tracked as both read and write to provide consistent debugger display.
-        # While DIM is technically allocation/initialization (write-only operation), setting
-        # last_read to the DIM location ensures that debuggers/inspectors can show "Last accessed"
-        # information even for arrays that have never been explicitly read. Without this, an
-        # unaccessed array would show no last_read info, which could be confusing. The DIM location
-        # provides useful context about where the array was created.
+                tracker.array_erased(full_name)
 
     def delete_array(self, name, type_suffix=None, def_type_map=None):
         """
@@ -929,6 +880,8 @@ class Runtime:
 
         if full_name in self._arrays:
             del self._arrays[full_name]
+        if self.variable_tracker is not None:
+            self.variable_tracker.array_erased(full_name)
 
     def delete_array_raw(self, full_name):
         """
@@ -941,6 +894,8 @@ class Runtime:
         """
         if full_name in self._arrays:
             del self._arrays[full_name]
+        if self.variable_tracker is not None:
+            self.variable_tracker.array_erased(full_name)
 
     def read_data(self):
         """
@@ -1026,27 +981,13 @@ class Runtime:
 
         When NEXT executes, it looks up the loop state and does increment logic.
         """
-        from src.debug_logger import debug_log
-        from src.pc import PC
-
-        # Verbose debug logging (only if MBASIC_DEBUG_LEVEL=2)
-        debug_log(
-            f"push_for_loop({var_name}) at line {return_line}",
-            level=2
-        )
-
-        # Create PC pointing to the FOR statement
-        for_pc = PC.running_at(return_line, return_stmt_index)
+        # PC of the FOR statement (the statement table's own object)
+        for_pc = self.statement_table.pc_at(return_line, return_stmt_index)
 
         # Bind variable to this FOR loop
         # If variable already bound (jumped out of previous loop), this just overwrites it
         self.bind_for_loop(var_name, for_pc, end_value, step_value)
 
-        debug_log(
-            f"push_for_loop({var_name}) complete - bound to PC({return_line},{return_stmt_index})",
-            level=2
-        )
-
     def pop_for_loop(self, var_name):
         """Remove a FOR loop binding from the variable."""
         self.unbind_for_loop(var_name)
@@ -1071,13 +1012,21 @@ class Runtime:
         }
 
     def push_while_loop(self, while_line, while_stmt_index):
-        """Register a WHILE loop on the unified execution stack"""
+        """Register a WHILE loop on the unified execution stack.
+
+        The entry stays on the stack for the whole loop: WEND marks it as
+        'iterating' and jumps back to the WHILE at 'pc', which reuses it
+        while the condition holds and pops it when the condition fails.
+        """
         loop_entry = {
             'type': 'WHILE',
             'while_line': while_line,
-            'while_stmt': while_stmt_index
+            'while_stmt': while_stmt_index,
+            'pc': self.statement_table.pc_at(while_line, while_stmt_index),
+            'iterating': False
         }
         self.execution_stack.append(loop_entry)
+        return loop_entry
 
     def pop_while_loop(self):
         """Remove most recent WHILE loop - verifies it's actually a WHILE"""
@@ -1207,7 +1156,7 @@ class Runtime:
         - Type suffix character
         - For scalars: current value
         - For arrays: dimensions and base
-        - Access tracking: last_read and last_write info
+        - Access tracking: last_read and last_write info (None unless a variable_tracker is attached)
 
         Returns:
             list: List of dictionaries with variable information
@@ -1250,24 +1199,30 @@ class Runtime:
                 return full_name[:-1], last_char
             else:
                 # No explicit suffix - default to single precision (!)
-                # Note: In normal operation, all names in _variables have resolved type suffixes
+                # Note: In normal operation, all variable slot names have resolved type suffixes
                 # from _resolve_variable_name() which applies DEF type rules. This fallback
                 # is defensive programming for robustness - it should not occur in practice,
                 # but protects against potential edge cases in legacy code or future changes.
                 return full_name, '!'
 
+        tracker = self.variable_tracker
+
         # Process scalar variables
-        for full_name, var_entry in self._variables.items():
+        for full_name, slot in self._var_slots.items():
+            value = self._var_values[slot]
+            if value is None:
+                continue  # Referenced by the program but not created yet
             base_name, type_suffix = parse_name(full_name)
+            tracking = tracker.get_variable(full_name) if tracker is not None else None
 
             var_info = {
                 'name': base_name,
                 'type_suffix': type_suffix,
                 'is_array': False,
-                'value': var_entry['value'],
-                'last_read': var_entry['last_read'],
-                'last_write': var_entry['last_write'],
-                'original_case': var_entry.get('original_case', base_name)  # Include canonical case for display
+                'value': value,
+                'last_read': tracking['last_read'] if tracking else None,
+                'last_write': tracking['last_write'] if tracking else None,
+                'original_case': self._var_case[slot] or base_name  # Include canonical case for display
             }
 
             result.append(var_info)
@@ -1275,22 +1230,23 @@ class Runtime:
         # Process arrays
         for full_name, array_data in self._arrays.items():
             base_name, type_suffix = parse_name(full_name)
+            tracking = (tracker.get_array(full_name) if tracker is not None else None) or {}
 
             var_info = {
                 'name': base_name,
                 'type_suffix': type_suffix,
                 'is_array': True,
-                'dimensions': array_data['dims'],
-                'base': self.array_base,  # Global OPTION BASE setting
-                'original_case': array_data.get('original_case', base_name),  # Include canonical case for display
-                'last_read': array_data.get('last_read'),  # Tracking info for array access
-                'last_write': array_data.get('last_write'),
-                'last_read_subscripts': array_data.get('last_read_subscripts'),  # Last accessed indexes
-                'last_write_subscripts': array_data.get('last_write_subscripts')
+                'dimensions': array_data.dims,
+                'base': array_data.base,  # OPTION BASE in effect at DIM
+                'original_case': self.variable_case.get(base_name, base_name),  # Include canonical case for display
+                'last_read': tracking.get('last_read'),  # Tracking info for array access
+                'last_write': tracking.get('last_write'),
+                'last_read_subscripts': tracking.get('last_read_subscripts'),  # Last accessed indexes
+                'last_write_subscripts': tracking.get('last_write_subscripts')
             }
 
             # Get value of last accessed cell (prefer write over read)
-            last_subscripts = array_data.get('last_write_subscripts') or array_data.get('last_read_subscripts')
+            last_subscripts = tracking.get('last_write_subscripts') or tracking.get('last_read_subscripts')
             if last_subscripts:
                 try:
                     # Use debugger method to avoid updating tracking
@@ -1491,6 +1447,16 @@ class Runtime:
         """Clear all breakpoints."""
         self.breakpoints.clear()
 
+    @property
+    def breakpoints(self):
+        """Breakpoints (BreakpointSet of PCs)"""
+        return self._breakpoints
+
+    @breakpoints.setter
+    def breakpoints(self, items):
+        # UIs assign whole sets (of PCs or bare line numbers); keep the line index
+        self._breakpoints = BreakpointSet(items)
+
     def reset_for_run(self, ast_or_line_table, line_text_map=None):
         """Reset runtime for RUN command - like CLEAR + reload program.
 
@@ -1511,10 +1477,11 @@ class Runtime:
         self._ast_or_line_table = ast_or_line_table
         self.line_text_map = line_text_map or {}
 
-        # Clear variables and arrays
-        self._variables.clear()
+        # Clear variables and arrays (slots are kept; setup below adds new ones)
+        self.clear_variables()
         self._arrays.clear()
-        self._variable_case_variants.clear()
+        if self.variable_tracker is not None:
+            self.variable_tracker.clear()
 
         # Reset array base (can be set again by OPTION BASE)
         self.array_base = 0
@@ -1535,9 +1502,7 @@ class Runtime:
         # Close all files
         for file_num in list(self.files.keys()):
             try:
-                file_obj = self.files[file_num]
-                if hasattr(file_obj, 'close'):
-                    file_obj.close()
+                self.files[file_num]['handle'].close()
             except:
                 pass
         self.files.clear()
@@ -1576,6 +1541,7 @@ class Runtime:
             for stmt_offset, stmt in enumerate(line.statements):
                 pc = PC(line.line_number, stmt_offset)
                 self.statement_table.add(pc, stmt)
+                self._allocate_variable_slots(stmt)
 
                 # Extract DATA and DEF FN
                 if isinstance(stmt, DataStatementNode):
@@ -1590,6 +1556,9 @@ class Runtime:
                             self.data_items.append(value)
                 elif isinstance(stmt, DefFnStatementNode):
                     self.user_functions[stmt.name] = stmt
+                elif isinstance(stmt, PrintUsingStatementNode) and isinstance(stmt.format_string, StringNode):
+                    # Parse constant PRINT USING masks now rather than in the loop
+                    get_using_formatter(stmt.format_string.value)
 
         # Initialize PC to first statement
         self.pc = self.statement_table.first_pc()
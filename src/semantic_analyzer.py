@@ -4745,8 +4745,7 @@ class SemanticAnalyzer:
 
             elif isinstance(stmt, ForStatementNode):
                 # stmt.variable is a VariableNode
-                from parser import VariableNode as VarNode
-                if isinstance(stmt.variable, VarNode):
+                if isinstance(stmt.variable, VariableNode):
                     modified.add(stmt.variable.name.upper())
                 elif isinstance(stmt.variable, str):
                     modified.add(stmt.variable.upper())
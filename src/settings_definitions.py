@@ -101,9 +101,9 @@ SETTING_DEFINITIONS: Dict[str, SettingDefinition] = {
         key="case_conflict",
         type=SettingType.ENUM,
         default="first_wins",
-        choices=["first_wins", "error", "upper", "lower"],
+        choices=["first_wins", "error", "prefer_upper", "prefer_lower", "prefer_mixed"],
         description="How to handle variable name case conflicts",
-        help_text="When same var has different cases: first_wins (order), error (flag), upper/lower (style)",
+        help_text="When same var has different cases: first_wins (order), error (flag when the program is loaded/edited), prefer_upper/prefer_lower/prefer_mixed (style)",
         scope=SettingScope.GLOBAL,
     ),
 
@@ -159,6 +159,79 @@ SETTING_DEFINITIONS: Dict[str, SettingDefinition] = {
         scope=SettingScope.PROJECT,
     ),
 
+    # Interpreter settings
+    "engine": SettingDefinition(
+        key="engine",
+        type=SettingType.ENUM,
+        default="ast",
+        choices=["ast", "compiled"],
+        description="Program execution engine",
+        help_text="ast (walk the parsed program) or compiled (pre-bound closures, less dispatch overhead)",
+        scope=SettingScope.GLOBAL,
+    ),
+
+    "program_cache": SettingDefinition(
+        key="program_cache",
+        type=SettingType.BOOLEAN,
+        default=True,
+        description="Cache parsed programs on disk",
+        help_text="Reuse parse and analysis results for unchanged files in LOAD, CHAIN and the compilers",
+        scope=SettingScope.GLOBAL,
+    ),
+
+    "program_cache_size_mb": SettingDefinition(
+        key="program_cache_size_mb",
+        type=SettingType.INTEGER,
+        default=64,
+        min_value=1,
+        max_value=4096,
+        description="Program cache size limit in megabytes",
+        help_text="Least recently used entries are removed beyond this size",
+        scope=SettingScope.GLOBAL,
+    ),
+
+    # File I/O settings
+    "file_buffer_size_kb": SettingDefinition(
+        key="file_buffer_size_kb",
+        type=SettingType.INTEGER,
+        default=64,
+        min_value=1,
+        max_value=16384,
+        description="Write buffer size for output and random files in kilobytes",
+        help_text="PRINT#, WRITE# and PUT output is written to disk in blocks of this size",
+        scope=SettingScope.GLOBAL,
+    ),
+    "file_durable_writes": SettingDefinition(
+        key="file_durable_writes",
+        type=SettingType.BOOLEAN,
+        default=False,
+        description="Flush files after every PRINT#, WRITE# and PUT",
+        help_text="Slower, but another program sees each write immediately",
+        scope=SettingScope.GLOBAL,
+    ),
+    "random_file_cache_kb": SettingDefinition(
+        key="random_file_cache_kb",
+        type=SettingType.INTEGER,
+        default=4096,
+        min_value=4,
+        max_value=1048576,
+        description="Page cache size for each random file in kilobytes",
+        help_text="GET and PUT on records in cached pages don't touch the disk",
+        scope=SettingScope.GLOBAL,
+    ),
+
+    # Output pane settings
+    "output_max_lines": SettingDefinition(
+        key="output_max_lines",
+        type=SettingType.INTEGER,
+        default=10000,
+        min_value=100,
+        max_value=1000000,
+        description="Maximum number of lines kept in the output pane",
+        help_text="The oldest lines are removed when programs print more than this",
+        scope=SettingScope.GLOBAL,
+    ),
+
     # Note: editor.tab_size setting not included - BASIC uses line numbers for program structure,
     # not indentation, so tab size is not a meaningful setting for BASIC source code
 
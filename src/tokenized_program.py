@@ -0,0 +1,529 @@
+"""MBASIC tokenized (binary) program files.
+
+SAVE "X" without ,A writes a program in MBASIC's compressed binary format,
+and LOAD, RUN and CHAIN read either format. A tokenized file is:
+
+    0xFF                              file type (0xFE is a protected file)
+    per line:
+      link (2 bytes)                  address of the next line; 0 ends the file
+      line number (2 bytes, little endian)
+      tokens ...                      see below
+      0x00                            end of line
+
+Inside a line, bytes 0x80-0xFE are keywords and operators, 0xFF xx is a
+function keyword, and bytes below 0x20 introduce numeric constants:
+
+    0x0B lo hi     &O octal constant
+    0x0C lo hi     &H hex constant
+    0x0E lo hi     line number (after GOTO, GOSUB, THEN, ...)
+    0x0F n         integer 10-255
+    0x11-0x1A      integer 0-9
+    0x1C lo hi     integer 256-32767
+    0x1D 4 bytes   single precision, Microsoft Binary Format (MBF)
+    0x1F 8 bytes   double precision, MBF
+
+Everything else, including the contents of strings, REM and DATA, is plain
+ASCII. ELSE is stored as ":ELSE" and ' as ":REM'"; the colons are not listed.
+
+Decoding runs over 256-entry tables built once at import, and produces the
+same line text LIST shows, which the normal parser then turns into LineNodes
+(ProgramManager.parse_program_text). Encoding only tokenizes a constant when
+decoding gives back exactly the same text, and only tokenizes upper case
+keywords, so SAVE followed by LOAD reproduces the program text. Control
+characters are stored as they are in strings, REM and DATA (except 0x00,
+which ends a line) and as "?" elsewhere, where they would read back as
+constants.
+
+See utils/detokenizer.py for the standalone dump utility these tables come
+from.
+"""
+
+import io
+import math
+import re
+from typing import Iterable, List, Optional, Tuple
+
+TOKENIZED_MARKER = 0xFF
+PROTECTED_MARKER = 0xFE
+
+# One-byte tokens (0x80-0xFE)
+KEYWORDS = {
+    0x81: 'END', 0x82: 'FOR', 0x83: 'NEXT', 0x84: 'DATA', 0x85: 'INPUT',
+    0x86: 'DIM', 0x87: 'READ', 0x88: 'LET', 0x89: 'GOTO', 0x8A: 'RUN',
+    0x8B: 'IF', 0x8C: 'RESTORE', 0x8D: 'GOSUB', 0x8E: 'RETURN', 0x8F: 'REM',
+    0x90: 'STOP', 0x91: 'PRINT', 0x92: 'CLEAR', 0x93: 'LIST', 0x94: 'NEW',
+    0x95: 'ON', 0x96: 'NULL', 0x97: 'WAIT', 0x98: 'DEF', 0x99: 'POKE',
+    0x9A: 'CONT', 0x9B: 'LPRINT', 0x9D: 'OUT', 0x9F: 'LLIST', 0xA1: 'WIDTH',
+    0xA2: 'ELSE', 0xA3: 'TRON', 0xA4: 'TROFF', 0xA5: 'SWAP', 0xA6: 'ERASE',
+    0xA7: 'EDIT', 0xA8: 'ERROR', 0xA9: 'RESUME', 0xAA: 'DELETE', 0xAB: 'AUTO',
+    0xAC: 'RENUM', 0xAD: 'DEFSTR', 0xAE: 'DEFINT', 0xAF: 'DEFSNG',
+    0xB0: 'DEFDBL', 0xB1: 'LINE', 0xB2: 'WRITE', 0xB3: 'COMMON', 0xB4: 'WHILE',
+    0xB5: 'WEND', 0xB6: 'CALL', 0xB7: 'WRITE', 0xB8: 'COMMON', 0xB9: 'CHAIN',
+    0xBA: 'OPTION', 0xBB: 'RANDOMIZE', 0xBD: 'SYSTEM', 0xBE: 'MERGE',
+    0xBF: 'OPEN', 0xC0: 'FIELD', 0xC1: 'GET', 0xC2: 'PUT', 0xC3: 'CLOSE',
+    0xC4: 'LOAD', 0xC5: 'MERGE', 0xC6: 'FILES', 0xC7: 'NAME', 0xC8: 'KILL',
+    0xC9: 'LSET', 0xCA: 'RSET', 0xCB: 'SAVE', 0xCC: 'RESET', 0xCE: 'TO',
+    0xCF: 'THEN', 0xD0: 'TAB(', 0xD1: 'STEP', 0xD2: 'USR', 0xD3: 'FN',
+    0xD4: 'SPC(', 0xD5: 'NOT', 0xD6: 'ERL', 0xD7: 'ERR', 0xD8: 'STRING$',
+    0xD9: 'USING', 0xDA: 'INSTR', 0xDB: "'", 0xDC: 'VARPTR', 0xDD: 'INKEY$',
+    0xEF: '>', 0xF0: '=', 0xF1: '<', 0xF2: '+', 0xF3: '-', 0xF4: '*',
+    0xF5: '/', 0xF6: '^', 0xF7: 'AND', 0xF8: 'OR', 0xF9: 'XOR', 0xFA: 'EQV',
+    0xFB: 'IMP', 0xFC: '\\', 0xFD: 'MOD',
+}
+
+# Two-byte tokens (0xFF xx)
+FUNCTIONS = {
+    0x81: 'LEFT$', 0x82: 'RIGHT$', 0x83: 'MID$', 0x84: 'SGN', 0x85: 'INT',
+    0x86: 'ABS', 0x87: 'SQR', 0x88: 'RND', 0x89: 'SIN', 0x8A: 'LOG',
+    0x8B: 'EXP', 0x8C: 'COS', 0x8D: 'TAN', 0x8E: 'ATN', 0x8F: 'FRE',
+    0x90: 'INP', 0x91: 'POS', 0x92: 'LEN', 0x93: 'STR$', 0x94: 'VAL',
+    0x95: 'ASC', 0x96: 'CHR$', 0x97: 'PEEK', 0x98: 'SPACE$', 0x99: 'OCT$',
+    0x9A: 'HEX$', 0x9B: 'LPOS', 0x9C: 'CINT', 0x9D: 'CSNG', 0x9E: 'CDBL',
+    0x9F: 'FIX', 0xAB: 'CVI', 0xAC: 'CVS', 0xAD: 'CVD', 0xAE: 'EOF',
+    0xB0: 'LOC', 0xB1: 'LOF', 0xB2: 'MKI$', 0xB3: 'MKS$', 0xB4: 'MKD$',
+}
+
+_REM, _DATA, _ELSE, _APOSTROPHE, _FN = 0x8F, 0x84, 0xA2, 0xDB, 0xD3
+
+# Keywords followed by line numbers (stored as 0x0E constants)
+_LINE_NUMBER_KEYWORDS = {'GOTO', 'GOSUB', 'THEN', 'ELSE', 'RESTORE', 'RESUME', 'RUN',
+                         'LIST', 'LLIST', 'DELETE', 'EDIT', 'RENUM', 'AUTO'}
+
+# Byte classes for the decoder's dispatch table
+(_CHAR, _KEYWORD, _FUNCTION, _DIGIT, _INT8, _INT16, _LINE_NUMBER, _HEX, _OCTAL,
+ _SINGLE, _DOUBLE, _SPACE, _SKIP, _END) = range(14)
+
+
+def _build_decode_tables():
+    kinds = [_CHAR] * 256
+    texts = [chr(b) for b in range(256)]
+    for b in range(0x80, 0xFF):
+        kinds[b] = _KEYWORD
+        texts[b] = KEYWORDS.get(b, f'[{b:02X}]')
+    kinds[0xFF] = _FUNCTION
+    for b in range(0x11, 0x1B):
+        kinds[b] = _DIGIT
+        texts[b] = str(b - 0x11)
+    kinds[0x0F] = _INT8
+    kinds[0x1C] = _INT16
+    kinds[0x0E] = _LINE_NUMBER
+    kinds[0x0C] = _HEX
+    kinds[0x0B] = _OCTAL
+    kinds[0x1D] = _SINGLE
+    kinds[0x1F] = _DOUBLE
+    kinds[0x0A] = _SPACE  # LF is a line continuation in MBASIC
+    kinds[0x0D] = _SKIP
+    kinds[0x00] = _END
+    functions = [FUNCTIONS.get(b, f'[FF{b:02X}]') for b in range(256)]
+    return kinds, texts, functions
+
+
+_KINDS, _TEXTS, _FUNCTION_TEXTS = _build_decode_tables()
+
+# A keyword or constant between two of these needs a space (FORI=1TO9)
+_WORD_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.')
+
+
+def is_tokenized(data: bytes) -> bool:
+    """True if file contents are a tokenized (not ASCII) program"""
+    return data[:1] in (bytes([TOKENIZED_MARKER]), bytes([PROTECTED_MARKER]))
+
+
+# ----------------------------------------------------------------------
+# Microsoft Binary Format numbers
+# ----------------------------------------------------------------------
+
+def mbf_to_float(data: bytes) -> float:
+    """Decode a 4 or 8 byte MBF number (mantissa little endian, exponent last)"""
+    exponent = data[-1]
+    if exponent == 0:
+        return 0.0
+    mantissa = int.from_bytes(data[:-1], 'little')
+    bits = 8 * (len(data) - 1)
+    sign = mantissa >> (bits - 1)
+    mantissa |= 1 << (bits - 1)  # Hidden leading 1
+    value = math.ldexp(mantissa, exponent - 128 - bits)
+    return -value if sign else value
+
+
+def float_to_mbf(value: float, size: int) -> Optional[bytes]:
+    """Encode a number as 4 or 8 byte MBF, or None if out of range"""
+    if value == 0:
+        return bytes(size)
+    if math.isinf(value) or math.isnan(value):
+        return None
+    bits = 8 * (size - 1)
+    fraction, exponent = math.frexp(abs(value))
+    mantissa = round(fraction * (1 << bits))
+    if mantissa >> bits:
+        mantissa >>= 1
+        exponent += 1
+    exponent += 128
+    if not 0 < exponent < 256:
+        return None
+    mantissa &= ~(1 << (bits - 1))
+    if value < 0:
+        mantissa |= 1 << (bits - 1)
+    return mantissa.to_bytes(size - 1, 'little') + bytes([exponent])
+
+
+def _format_digits(value: float, digits: int, fixed_limit: int) -> str:
+    """value to `digits` significant digits, the way LIST shows constants"""
+    mantissa, exponent = f'{abs(value):.{digits - 1}E}'.split('E')
+    significant = mantissa.replace('.', '').rstrip('0') or '0'
+    exponent = int(exponent)
+    if -3 <= exponent < fixed_limit:
+        if exponent >= 0:
+            whole = significant[:exponent + 1].ljust(exponent + 1, '0')
+            fraction = significant[exponent + 1:]
+            text = whole + ('.' + fraction if fraction else '')
+        else:
+            text = '.' + '0' * (-exponent - 1) + significant
+    else:
+        text = significant[0] + ('.' + significant[1:] if len(significant) > 1 else '')
+        text += f'E{exponent:+03d}'
+    return '-' + text if value < 0 else text
+
+
+def _format_single(data: bytes) -> str:
+    value = mbf_to_float(data)
+    for digits in range(1, 10):
+        text = _format_digits(value, digits, 7)
+        if float_to_mbf(float(text), 4) == data:
+            break
+    # A whole number that would read back as an integer constant keeps its type
+    if re.fullmatch(r'\d+', text) and int(text) <= 32767:
+        text += '!'
+    return text
+
+
+def _format_double(data: bytes) -> str:
+    value = mbf_to_float(data)
+    for digits in range(1, 18):
+        text = _format_digits(value, digits, 16)
+        if float(text) == value:
+            break
+    # Up to 7 digits would read back as single precision
+    if len(re.sub(r'E.*|[^0-9]', '', text).lstrip('0')) <= 7:
+        text += '#'
+    return text
+
+
+# ----------------------------------------------------------------------
+# Decoding
+# ----------------------------------------------------------------------
+
+def decode_line(data: bytes, pos: int = 0) -> Tuple[str, int]:
+    """Decode the tokens of one line, starting at data[pos].
+
+    Returns:
+        Tuple of (line text without the line number, position after the
+        terminating 0x00)
+    """
+    kinds = _KINDS
+    texts = _TEXTS
+    out: List[str] = []
+    last = ' '            # Last character output
+    after_token = False   # Last output was a keyword or constant
+    quoted = False
+    literal = False       # REM or ' : rest of the line is text
+    data_statement = False
+    end = len(data)
+
+    def word(text: str, token: bool) -> None:
+        nonlocal last, after_token
+        if (token or after_token) and last in _WORD_CHARS and text[0] in _WORD_CHARS:
+            out.append(' ')
+        out.append(text)
+        last = text[-1]
+        after_token = token
+
+    while pos < end:
+        b = data[pos]
+        pos += 1
+        if b == 0:
+            break
+        if quoted or literal or (data_statement and b != 0x3A):
+            if b == 0x22:
+                quoted = not quoted
+            text = ' ' if b == 0x0A else chr(b)
+            if after_token:
+                word(text, False)
+            else:
+                out.append(text)
+                last = text
+            continue
+        kind = kinds[b]
+        if kind == _CHAR:
+            if b == 0x22:
+                quoted = True
+            elif b == 0x3A:
+                data_statement = False
+            text = chr(b)
+            if after_token:
+                word(text, False)
+            else:
+                out.append(text)
+                last = text
+        elif kind == _KEYWORD:
+            if b == _REM and pos < end and data[pos] == _APOSTROPHE:
+                pos += 1
+                b = _APOSTROPHE
+            if b == _ELSE or b == _APOSTROPHE:
+                # Stored as ":ELSE" and ":REM'"
+                if out and out[-1] == ':':
+                    out.pop()
+                    last = out[-1][-1] if out else ' '
+            if b == _APOSTROPHE:
+                out.append("'")
+                last = "'"
+                after_token = False
+                literal = True
+                continue
+            word(texts[b], b != _FN)
+            if b == _REM:
+                literal = True
+            elif b == _DATA:
+                data_statement = True
+        elif kind == _FUNCTION:
+            word(_FUNCTION_TEXTS[data[pos]], True)
+            pos += 1
+        elif kind == _DIGIT:
+            word(texts[b], True)
+        elif kind == _INT8:
+            word(str(data[pos]), True)
+            pos += 1
+        elif kind == _INT16 or kind == _LINE_NUMBER:
+            word(str(data[pos] | data[pos + 1] << 8), True)
+            pos += 2
+        elif kind == _HEX:
+            word(f'&H{data[pos] | data[pos + 1] << 8:X}', True)
+            pos += 2
+        elif kind == _OCTAL:
+            word(f'&O{data[pos] | data[pos + 1] << 8:o}', True)
+            pos += 2
+        elif kind == _SINGLE:
+            word(_format_single(data[pos:pos + 4]), True)
+            pos += 4
+        elif kind == _DOUBLE:
+            word(_format_double(data[pos:pos + 8]), True)
+            pos += 8
+        elif kind == _SPACE:
+            out.append(' ')
+            last = ' '
+            after_token = False
+        # _SKIP: ignored
+    if pos > end:
+        raise IndexError("constant runs past the end of the data")
+    return ''.join(out), pos
+
+
+def decode_program(data: bytes) -> str:
+    """Decode a tokenized program file to program text (one line per line)
+
+    Raises:
+        RuntimeError: If the file is protected or not a tokenized program
+    """
+    if data[:1] == bytes([PROTECTED_MARKER]):
+        raise RuntimeError("Protected file")
+    if data[:1] != bytes([TOKENIZED_MARKER]):
+        raise RuntimeError("Bad file mode")
+    lines = []
+    pos = 1
+    end = len(data)
+    while pos + 4 <= end:
+        link = data[pos] | data[pos + 1] << 8
+        if link == 0:
+            break
+        line_number = data[pos + 2] | data[pos + 3] << 8
+        try:
+            text, pos = decode_line(data, pos + 4)
+        except IndexError:
+            raise RuntimeError("Bad file mode") from None  # Truncated constant
+        lines.append(f'{line_number} {text}')
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def read_program(filename: str) -> str:
+    """Text of a program file in either ASCII or tokenized format"""
+    with open(filename, 'rb') as f:
+        data = f.read()
+    if is_tokenized(data):
+        return decode_program(data)
+    # Same decoding and newline handling as open(filename, 'r')
+    return io.TextIOWrapper(io.BytesIO(data)).read()
+
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+def _build_encode_tables():
+    words = {}
+    for table, prefix in ((KEYWORDS, b''), (FUNCTIONS, b'\xff')):
+        for b, text in sorted(table.items()):
+            # Several codes decode to WRITE, COMMON and MERGE; encode the last
+            words[text] = prefix + bytes([b])
+    operators = {text: code for text, code in words.items() if not text[0].isalpha()}
+    del operators["'"]
+    return words, operators
+
+
+_ENCODE_WORDS, _ENCODE_OPERATORS = _build_encode_tables()
+
+_WORD_RE = re.compile(r'[A-Za-z][A-Za-z0-9._]*\$?')
+_NUMBER_RE = re.compile(r'(?:\d+\.?\d*|\.\d+)(?:[EeDd][+-]?\d+)?[%!#]?')
+_RADIX_RE = re.compile(r'&[Hh][0-9A-Fa-f]+|&[Oo]?[0-7]+')
+
+
+def _decodes_to(encoded: bytes, text: str) -> bool:
+    return decode_line(encoded + b'\x00')[0] == text
+
+
+def _encode_number(text: str, line_number: bool) -> Optional[bytes]:
+    """Tokenized form of a constant, or None to store it as text"""
+    if text.isdigit():
+        value = int(text)
+        if str(value) != text:
+            return None
+        if line_number and value <= 65529:
+            return b'\x0e' + value.to_bytes(2, 'little')
+        if value < 10:
+            return bytes([0x11 + value])
+        if value < 256:
+            return bytes([0x0F, value])
+        if value <= 32767:
+            return b'\x1c' + value.to_bytes(2, 'little')
+    try:
+        value = float(text.rstrip('%!#').replace('D', 'E').replace('d', 'e'))
+    except ValueError:
+        return None
+    for prefix, size in ((b'\x1d', 4), (b'\x1f', 8)):
+        mbf = float_to_mbf(value, size)
+        if mbf is not None and _decodes_to(prefix + mbf, text):
+            return prefix + mbf
+    return None
+
+
+def encode_line(text: str) -> bytes:
+    """Tokenize the text of one line (without its line number)"""
+    out = bytearray()
+    pos = 0
+    end = len(text)
+    line_numbers = False  # After GOTO, GOSUB, THEN, ...
+
+    def raw(chars: str, literal: bool = False) -> None:
+        # Control characters would read back as constants, except in strings,
+        # REM and DATA, which are read back byte for byte (0x00 ends the line)
+        low = 0x01 if literal else 0x20
+        out.extend(ord(c) if low <= ord(c) < 256 and c != '\n' or c == '\t' else 0x3F
+                   for c in chars)
+
+    while pos < end:
+        c = text[pos]
+        glued = pos > 0 and text[pos - 1] in _WORD_CHARS
+        if c == '"':
+            close = text.find('"', pos + 1)
+            close = end if close < 0 else close + 1
+            raw(text[pos:close], True)
+            pos = close
+            line_numbers = False
+        elif c.isalpha():
+            match = _WORD_RE.match(text, pos)
+            word = match.group()
+            pos = match.end()
+            if word.endswith('$') and word not in _ENCODE_WORDS:
+                word = word[:-1]
+                pos -= 1
+            if word in ('TAB', 'SPC') and text.startswith('(', pos):
+                word += '('
+                pos += 1
+            # Glued to a number ("1PRINT") it would read back with a space
+            code = None if glued else _ENCODE_WORDS.get(word)
+            if code is None and word.startswith('FN') and len(word) > 2:
+                # FN name: the FN is a token, the name is text
+                out.append(_FN)
+                raw(word[2:])
+            elif code is None:
+                raw(word)
+            elif word == 'ELSE':
+                out.extend(b':' + code)
+            elif word == 'REM':
+                out.extend(code)
+                raw(text[pos:], True)
+                pos = end
+            elif word == 'DATA':
+                out.extend(code)
+                quoted = False
+                start = pos
+                while pos < end and (quoted or text[pos] != ':'):
+                    quoted ^= text[pos] == '"'
+                    pos += 1
+                raw(text[start:pos], True)
+            else:
+                out.extend(code)
+            line_numbers = word in _LINE_NUMBER_KEYWORDS
+        elif c == "'":
+            out.extend(b':' + bytes([_REM, _APOSTROPHE]))
+            raw(text[pos + 1:], True)
+            pos = end
+        elif c.isdigit() or (c == '.' and text[pos + 1:pos + 2].isdigit()):
+            match = _NUMBER_RE.match(text, pos)
+            number = match.group()
+            pos = match.end()
+            code = None
+            if not glued and text[pos:pos + 1] not in _WORD_CHARS:
+                code = _encode_number(number, line_numbers)
+            if code is None:
+                raw(number)
+            else:
+                out.extend(code)
+        elif c == '&' and _RADIX_RE.match(text, pos):
+            match = _RADIX_RE.match(text, pos)
+            number = match.group()
+            pos = match.end()
+            digits = number[2:] if number[1] in 'HhOo' else number[1:]
+            value = int(digits, 16 if number[1] in 'Hh' else 8)
+            code = None
+            if value < 65536:
+                code = (b'\x0c' if number[1] in 'Hh' else b'\x0b') + value.to_bytes(2, 'little')
+                if not _decodes_to(code, number):
+                    code = None
+            if code is None:
+                raw(number)
+            else:
+                out.extend(code)
+            line_numbers = False
+        else:
+            if c in _ENCODE_OPERATORS:
+                out.extend(_ENCODE_OPERATORS[c])
+            else:
+                raw(c)
+            if c not in ' ,-':
+                line_numbers = False
+            pos += 1
+    return bytes(out)
+
+
+def encode_program(lines: Iterable[str]) -> bytes:
+    """Tokenize program lines ("10 PRINT X", ...) into a file image.
+
+    Link fields hold file offsets; MBASIC recomputes links on LOAD, so only
+    their being non-zero matters.
+
+    Raises:
+        ValueError: If a line has no line number
+    """
+    out = bytearray([TOKENIZED_MARKER])
+    for line in lines:
+        match = re.match(r'\s*(\d+)\s?', line)
+        if not match:
+            raise ValueError(f"Line without line number: {line!r}")
+        tokens = encode_line(line[match.end():])
+        next_line = len(out) + 4 + len(tokens) + 1
+        out += (next_line & 0xFFFF or 1).to_bytes(2, 'little')
+        out += (int(match.group(1)) & 0xFFFF).to_bytes(2, 'little')
+        out += tokens
+        out.append(0)
+    out += b'\x00\x00'
+    return bytes(out)
@@ -80,11 +80,12 @@ class UIBackend(ABC):
         """Execute NEW command - clear program."""
         pass
 
-    def cmd_save(self, filename: str) -> None:
+    def cmd_save(self, filename: str, tokenized: bool = False) -> None:
         """Execute SAVE command - save to file.
 
         Args:
             filename: File to save to
+            tokenized: Save in MBASIC's binary format (SAVE without ,A)
         """
         pass
 
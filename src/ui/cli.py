@@ -72,9 +72,9 @@ class CLIBackend(UIBackend):
         """Execute NEW command."""
         self.interactive.cmd_new()
 
-    def cmd_save(self, filename: str) -> None:
+    def cmd_save(self, filename: str, tokenized: bool = False) -> None:
         """Execute SAVE command."""
-        self.interactive.cmd_save(filename)
+        self.interactive.cmd_save(filename, tokenized=tokenized)
 
     def cmd_load(self, filename: str) -> None:
         """Execute LOAD command."""
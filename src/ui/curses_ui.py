@@ -2889,6 +2889,9 @@ class CursesBackend(UIBackend):
         self.variables_window_visible = not self.variables_window_visible
 
         if self.variables_window_visible:
+            # Record variable accesses only while the window is shown
+            self.runtime.enable_variable_tracking()
+
             # Add variables window to the pile (position 2, between editor and output)
             # Layout: menu (0), editor (1), variables (2), output (3), status (4)
             self.pile.contents.insert(2, (self.variables_frame, ('weight', 1)))
@@ -2896,6 +2899,8 @@ class CursesBackend(UIBackend):
             # Update variables display
             self._update_variables_window()
         else:
+            self.runtime.disable_variable_tracking()
+
             # Remove variables window from pile
             # Find and remove the variables frame
             for i, (widget, options) in enumerate(self.pile.contents):
@@ -3803,8 +3808,7 @@ class CursesBackend(UIBackend):
         old_pc = self.runtime.pc
 
         # Clear and rebuild statement table
-        self.runtime.statement_table.statements.clear()
-        self.runtime.statement_table._keys_cache = None
+        self.runtime.statement_table.clear()
 
         # Update line text map
         self.runtime.line_text_map = dict(self.program.lines)
@@ -4493,7 +4497,7 @@ class CursesBackend(UIBackend):
         """Execute LOAD command."""
         self._load_program_file(filename)
 
-    def cmd_save(self, filename):
+    def cmd_save(self, filename, tokenized=False):
         """Execute SAVE command."""
         try:
             if not filename:
@@ -4504,7 +4508,7 @@ class CursesBackend(UIBackend):
             filename = filename.strip().strip('"').strip("'")
 
             # Use program manager's save_to_file
-            self.program.save_to_file(filename)
+            self.program.save_to_file(filename, tokenized=tokenized)
             self._append_to_output(f"Saved to {filename}")
 
         except Exception as e:
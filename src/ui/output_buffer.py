@@ -0,0 +1,106 @@
+"""Line ring buffer for UI output panes.
+
+Output is kept as a deque of complete lines plus the line still being
+written, so appending costs O(appended text) and the oldest lines fall off
+the front without rescanning the whole buffer. The web UI sends only the
+appended text to the browser; the browser trims its copy the same way
+(see OUTPUT_APPEND_JS) so both sides always hold the same text.
+"""
+
+import json
+from collections import deque
+
+
+TRUNCATION_MARKER = '[... output truncated ...]\n'
+
+# Installed once per page; mbasicAppendOutput(text, maxLines) appends to the
+# output textarea, trims it to maxLines lines with the truncation marker on
+# top (matching OutputBuffer.text), and keeps it scrolled to the bottom
+# unless the user has scrolled up.
+OUTPUT_APPEND_JS = '''
+<script>
+window.mbasicAppendOutput = function(text, maxLines) {
+    let textarea = document.querySelector('[data-marker="output"] textarea');
+    if (!textarea) {
+        const textareas = document.querySelectorAll('textarea[readonly]');
+        textarea = textareas[textareas.length - 1];
+    }
+    if (!textarea) return;
+
+    if (!textarea.dataset.scrollTrackerInstalled) {
+        textarea.dataset.scrollTrackerInstalled = 'true';
+        textarea.dataset.userScrolledUp = 'false';
+        textarea.addEventListener('scroll', function() {
+            // Check if user is within 50px of bottom
+            const isAtBottom = this.scrollTop >= this.scrollHeight - this.clientHeight - 50;
+            this.dataset.userScrolledUp = isAtBottom ? 'false' : 'true';
+        });
+    }
+
+    const marker = %s;
+    let value = textarea.value;
+    let truncated = value.startsWith(marker);
+    if (truncated) value = value.slice(marker.length);
+    value += text;
+    const lines = value.split('\\n');
+    if (lines.length > maxLines) {
+        value = lines.slice(-maxLines).join('\\n');
+        truncated = true;
+    }
+    textarea.value = truncated ? marker + value : value;
+
+    if (textarea.dataset.userScrolledUp !== 'true') {
+        textarea.scrollTop = textarea.scrollHeight;
+    }
+};
+</script>
+''' % json.dumps(TRUNCATION_MARKER)
+
+
+class OutputBuffer:
+    """Output text limited to the last max_lines lines.
+
+    Lines are counted the way text.split('\\n') counts them, so the line
+    being written (possibly empty) is one of the max_lines. Once lines have
+    been dropped, text starts with TRUNCATION_MARKER.
+    """
+
+    def __init__(self, max_lines=1000, text=''):
+        self.max_lines = max(1, max_lines)
+        self.lines = deque(maxlen=self.max_lines - 1)
+        self.current = ''
+        self.truncated = False
+        if text.startswith(TRUNCATION_MARKER):
+            self.truncated = True
+            text = text[len(TRUNCATION_MARKER):]
+        self.append(text)
+
+    def append(self, text):
+        """Append text; cost is proportional to len(text)."""
+        if '\n' not in text:
+            self.current += text
+            return
+        parts = text.split('\n')
+        parts[0] = self.current + parts[0]
+        self.current = parts.pop()
+        if len(self.lines) + len(parts) > self.lines.maxlen:
+            self.truncated = True
+        self.lines.extend(parts)
+
+    def clear(self):
+        self.lines.clear()
+        self.current = ''
+        self.truncated = False
+
+    @property
+    def text(self):
+        """Full buffer text (O(buffer); used only for full refreshes)."""
+        text = '\n'.join(self.lines)
+        if self.lines:
+            text += '\n'
+        text += self.current
+        return TRUNCATION_MARKER + text if self.truncated else text
+
+    def __len__(self):
+        """Number of lines, counting the line being written."""
+        return len(self.lines) + 1
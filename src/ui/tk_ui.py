@@ -21,6 +21,9 @@ from src.ast_nodes import EndStatementNode
 import tkinter as tk
 from tkinter import filedialog, messagebox, font, scrolledtext, ttk, simpledialog
 
+# Queued program output is drawn at most this often (milliseconds)
+OUTPUT_FRAME_MS = 33
+
 
 class _ImmediateModeToken:
     """Token for variable edits from immediate mode or variable editor.
@@ -119,6 +122,12 @@ class TkBackend(UIBackend):
         self.auto_number_start = get('auto_number_start')
         self.auto_number_increment = get('auto_number_step')
 
+        # Output pane: fragments are queued and drawn once per frame, and the
+        # widget keeps at most output_max_lines lines
+        self.output_max_lines = get('output_max_lines')
+        self.output_queue = []
+        self.output_flush_id = None  # Pending root.after() id
+
         # Tkinter widgets (created in start())
         self.root = None
         self.editor_text = None
@@ -1069,7 +1078,10 @@ class TkBackend(UIBackend):
                 # If that fails, toggle visibility
                 self.variables_window.withdraw()
                 self.variables_visible = False
+                self.runtime.disable_variable_tracking()
         else:
+            # Record variable accesses only while the window is shown
+            self.runtime.enable_variable_tracking()
             self.variables_window.deiconify()
             self.variables_window.lift()
             self.variables_window.focus_force()
@@ -1080,6 +1092,7 @@ class TkBackend(UIBackend):
         """Close variables window (called from X button)."""
         self.variables_window.withdraw()
         self.variables_visible = False
+        self.runtime.disable_variable_tracking()
 
     def _on_variable_heading_click(self, event):
         """Handle clicks on variable list column headings.
@@ -1271,7 +1284,7 @@ class TkBackend(UIBackend):
         full_name, _ = self.runtime._resolve_variable_name(base_name, suffix, None)
         dimensions = []
         if full_name in self.runtime._arrays:
-            dimensions = self.runtime._arrays[full_name]['dims']
+            dimensions = self.runtime._arrays[full_name].dims
 
         # If no default subscripts, use first element based on array_base
         # OPTION BASE only allows 0 or 1 (validated by OPTION statement parser).
@@ -1734,6 +1747,7 @@ class TkBackend(UIBackend):
 
     def _menu_clear_output(self):
         """Run > Clear Output"""
+        self.output_queue = []
         self.output_text.config(state=tk.NORMAL)
         self.output_text.delete(1.0, tk.END)
         self.output_text.config(state=tk.DISABLED)
@@ -2115,8 +2129,7 @@ class TkBackend(UIBackend):
         old_pc = self.runtime.pc
 
         # Clear and rebuild statement table
-        self.runtime.statement_table.statements.clear()
-        self.runtime.statement_table._keys_cache = None
+        self.runtime.statement_table.clear()
 
         # Update line text map
         self.runtime.line_text_map = dict(self.program.lines)
@@ -3015,16 +3028,30 @@ class TkBackend(UIBackend):
                 break
 
     def _add_output(self, text):
-        """Add text to output widget."""
+        """Queue text for the output widget (drawn on the next frame)."""
+        self.output_queue.append(text)
+        if self.output_flush_id is None:
+            self.output_flush_id = self.root.after(OUTPUT_FRAME_MS, self._flush_output)
+
+    def _flush_output(self):
+        """Insert all queued output in one go and trim the widget to output_max_lines."""
+        if self.output_flush_id is not None:
+            self.root.after_cancel(self.output_flush_id)
+            self.output_flush_id = None
+        if not self.output_queue:
+            return
+        text = ''.join(self.output_queue)
+        self.output_queue = []
 
         self.output_text.config(state=tk.NORMAL)
         self.output_text.insert(tk.END, text)
+        # 'end-1c' is on the last line; drop whole lines from the top beyond the limit
+        line_count = int(self.output_text.index('end-1c').split('.')[0])
+        if line_count > self.output_max_lines:
+            self.output_text.delete('1.0', f'{line_count - self.output_max_lines + 1}.0')
         self.output_text.see(tk.END)
         self.output_text.config(state=tk.DISABLED)
 
-        # Force Tk to process the update immediately
-        self.output_text.update_idletasks()
-
     def _set_status(self, text):
         """Set status bar text."""
         self.status_label.config(text=text)
@@ -3350,10 +3377,10 @@ class TkBackend(UIBackend):
             interval=30
         )
 
-    def cmd_save(self, filename: str) -> None:
+    def cmd_save(self, filename: str, tokenized: bool = False) -> None:
         """Execute SAVE command - save to file."""
         try:
-            self.program.save_to_file(filename)
+            self.program.save_to_file(filename, tokenized=tokenized)
             self._set_status(f"Saved to {filename}")
 
             # Clean up autosave after successful save
@@ -4037,6 +4064,11 @@ class TkIOHandler(IOHandler):
         if self.output_callback:
             self.output_callback(full_text)
 
+    def _flush_output(self):
+        """Draw queued output now (before waiting for the user)."""
+        if self.backend and hasattr(self.backend, '_flush_output'):
+            self.backend._flush_output()
+
     def input(self, prompt: str = '') -> str:
         """Input from user via inline input field (with fallback to modal dialog).
 
@@ -4050,6 +4082,7 @@ class TkIOHandler(IOHandler):
         # Show prompt in output first
         if prompt:
             self.output(prompt, end='')
+        self._flush_output()
 
         # Use inline input if backend available
         if self.backend and hasattr(self.backend, '_show_input_row'):
@@ -4092,6 +4125,7 @@ class TkIOHandler(IOHandler):
         # Show prompt in output first
         if prompt:
             self.output(prompt, end='')
+        self._flush_output()
 
         # Show modal input dialog
         result = simpledialog.askstring(
@@ -4119,6 +4153,7 @@ class TkIOHandler(IOHandler):
             # Non-blocking: no key available (would need background monitoring)
             return ""
 
+        self._flush_output()
 
         # Show modal input dialog
         result = simpledialog.askstring(
@@ -669,8 +669,7 @@ def renum_program(program_manager, args: str, renum_callback, runtime=None):
     if runtime:
         if hasattr(runtime, 'statement_table'):
             # Rebuild statement table from new line_asts
-            runtime.statement_table.statements.clear()
-            runtime.statement_table._keys_cache = None
+            runtime.statement_table.clear()
             for line_node in new_line_asts.values():
                 for stmt_offset, stmt in enumerate(line_node.statements):
                     from src.pc import PC
@@ -136,10 +136,10 @@ class VisualBackend(UIBackend):
         self.program.clear()
         self.io.output("Program cleared")
 
-    def cmd_save(self, filename: str) -> None:
+    def cmd_save(self, filename: str, tokenized: bool = False) -> None:
         """Execute SAVE command - save to file."""
         try:
-            self.program.save_to_file(filename)
+            self.program.save_to_file(filename, tokenized=tokenized)
             self.io.output(f"Saved to {filename}")
         except Exception as e:
             error_msg = debug_log_error("Save error", exception=e, context={'filename': filename})
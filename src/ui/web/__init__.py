@@ -3,6 +3,11 @@
 This module provides a web-based UI using NiceGUI.
 """
 
-from .nicegui_backend import NiceGUIBackend
+# Session state helpers do not need NiceGUI; the backend does
+try:
+    from .nicegui_backend import NiceGUIBackend
+except ImportError:
+    # Web UI not available (requires nicegui: pip install nicegui)
+    NiceGUIBackend = None
 
 __all__ = ['NiceGUIBackend']
@@ -0,0 +1,188 @@
+"""Session admission control and load shedding for the web UI.
+
+With rate_limiting.enabled in multiuser.json, each server process admits
+at most rate_limiting.max_concurrent_sessions IDE sessions. A page request
+over the limit gets a small "server busy" page instead of the IDE (no
+backend or UI elements are built) that retries after retry_after_seconds.
+A session holds its slot until its client is deleted; a page whose client
+never opens its websocket gives the slot back after CONNECT_TIMEOUT.
+
+A monitor task measures event-loop lag (how late a short sleep wakes up).
+While lag is above max_event_loop_lag_ms, the scheduler pauses the running
+program with the most recent CPU use, one more per check. Once lag has
+stayed below half the threshold for RESUME_CHECKS checks in a row, paused
+programs resume one per check, longest paused first. Programs in worker
+processes and programs waiting for INPUT are never paused.
+
+Like the scheduler, this module does not depend on NiceGUI.
+"""
+
+import asyncio
+import html
+import time
+from typing import Dict, Optional, Set
+
+# Seconds between event-loop lag measurements
+CHECK_INTERVAL = 0.5
+
+# Consecutive low-lag checks before paused programs start resuming
+RESUME_CHECKS = 4
+
+# Seconds an admitted page may take to connect before its slot is freed
+CONNECT_TIMEOUT = 30.0
+
+
+class AdmissionController:
+    """Counts live sessions and sheds program load when the event loop lags.
+
+    Args:
+        max_sessions: Sessions admitted at once (0 = unlimited)
+        max_lag: Event-loop lag in seconds that triggers load shedding
+            (0 = never shed)
+        retry_after: Seconds the busy page waits before retrying
+        scheduler: SessionScheduler whose programs are paused
+            (default: the server-wide scheduler)
+    """
+
+    def __init__(self, max_sessions: int = 0, max_lag: float = 0.0,
+                 retry_after: int = 15, scheduler=None):
+        self.max_sessions = max_sessions
+        self.max_lag = max_lag
+        self.retry_after = retry_after
+        self._scheduler = scheduler
+        self.sessions: Set[str] = set()
+        self._pending: Dict[str, float] = {}    # Admitted, not yet connected
+        self.rejected = 0
+        self.lag = 0.0           # Last measured event-loop lag in seconds
+        self.paused_total = 0
+        self._calm_checks = 0
+        self._monitor: Optional[asyncio.Task] = None
+
+    @property
+    def scheduler(self):
+        if self._scheduler is None:
+            from src.ui.web.scheduler import get_scheduler
+            self._scheduler = get_scheduler()
+        return self._scheduler
+
+    def admit(self, session_id: str) -> bool:
+        """Register a new session if there is room.
+
+        The slot is held until release(); call connected() once the client's
+        websocket is open, or the slot expires after CONNECT_TIMEOUT.
+
+        Returns:
+            bool: False if the server is full (serve busy_page_html())
+        """
+        self._expire_pending()
+        if self.max_sessions and len(self.sessions) >= self.max_sessions \
+                and session_id not in self.sessions:
+            self.rejected += 1
+            return False
+        if session_id not in self.sessions:
+            self._pending[session_id] = time.monotonic()
+        self.sessions.add(session_id)
+        if self.max_lag and (self._monitor is None or self._monitor.done()):
+            self._monitor = asyncio.get_event_loop().create_task(self._run_monitor())
+        return True
+
+    def connected(self, session_id: str) -> None:
+        """Keep an admitted session's slot until release() (client connected)."""
+        self._pending.pop(session_id, None)
+
+    def release(self, session_id: str) -> None:
+        """Forget a session (client deleted, or its page failed to build)."""
+        self.sessions.discard(session_id)
+        self._pending.pop(session_id, None)
+
+    def _expire_pending(self) -> None:
+        """Free the slots of admitted pages that never connected."""
+        deadline = time.monotonic() - CONNECT_TIMEOUT
+        for session_id, admitted in list(self._pending.items()):
+            if admitted < deadline:
+                self.release(session_id)
+
+    def running_programs(self) -> int:
+        """Programs running in this process and in its worker processes."""
+        from src.worker_pool import get_worker_pool
+        pool = get_worker_pool()
+        running = sum(1 for task in self.scheduler.tasks if not task.paused)
+        return running + (len(pool.busy) if pool is not None else 0)
+
+    def check_lag(self, lag: float) -> None:
+        """Pause or resume one program based on a lag measurement."""
+        self.lag = lag
+        if lag > self.max_lag:
+            self._calm_checks = 0
+            if self.scheduler.pause_heaviest() is not None:
+                self.paused_total += 1
+        elif lag < self.max_lag / 2:
+            self._calm_checks += 1
+            if self._calm_checks >= RESUME_CHECKS:
+                self.scheduler.resume_one()
+        else:
+            self._calm_checks = 0
+
+    async def _run_monitor(self) -> None:
+        while self.sessions:
+            start = time.perf_counter()
+            await asyncio.sleep(CHECK_INTERVAL)
+            self.check_lag(time.perf_counter() - start - CHECK_INTERVAL)
+        # No sessions left: nothing may stay paused
+        while self.scheduler.resume_one() is not None:
+            pass
+
+    def stats(self) -> Dict[str, object]:
+        """Admission and load-shedding counters, for monitoring."""
+        self._expire_pending()
+        return {
+            'sessions': len(self.sessions),
+            'max_sessions': self.max_sessions,
+            'rejected': self.rejected,
+            'running_programs': self.running_programs(),
+            'paused_programs': sum(1 for task in self.scheduler.tasks if task.paused),
+            'paused_total': self.paused_total,
+            'event_loop_lag_ms': round(self.lag * 1000, 3),
+            'max_event_loop_lag_ms': self.max_lag * 1000,
+        }
+
+    def busy_page_html(self) -> str:
+        """Page served instead of the IDE when the server is full."""
+        target = html.escape(str(self.retry_after))
+        return f'''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<meta http-equiv="refresh" content="{target}">
+<title>MBASIC - Server busy</title>
+</head>
+<body style="font-family: sans-serif; text-align: center; margin-top: 15%;">
+<h2>MBASIC 5.21 Web IDE</h2>
+<p>The server is at capacity ({len(self.sessions)} active sessions).</p>
+<p>This page will retry in <span id="wait">{target}</span> seconds.</p>
+<script>
+let wait = {target};
+setInterval(() => {{ if (wait > 0) document.getElementById('wait').textContent = --wait; }}, 1000);
+</script>
+</body>
+</html>
+'''
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide controller (created on first use from MultiUserConfig)."""
+    global _controller
+    if _controller is None:
+        from src.multiuser_config import get_config
+        limits = get_config().rate_limiting
+        if limits.enabled:
+            _controller = AdmissionController(max_sessions=limits.max_concurrent_sessions,
+                                              max_lag=limits.max_event_loop_lag_ms / 1000,
+                                              retry_after=limits.retry_after_seconds)
+        else:
+            _controller = AdmissionController()
+    return _controller
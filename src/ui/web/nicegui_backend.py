@@ -6,8 +6,10 @@ Provides a modern web-based UI for the MBASIC interpreter using NiceGUI.
 import re
 import sys
 import asyncio
+import json
 import traceback
 import signal
+import time
 from typing import Dict
 from nicegui import ui, app
 from pathlib import Path
@@ -18,11 +20,38 @@ from src.iohandler.base import IOHandler
 from src.version import VERSION
 from src.pc import PC
 from src.ui.web.codemirror5_editor import CodeMirror5Editor
+from src.ui.output_buffer import OutputBuffer, OUTPUT_APPEND_JS
+from src.ui.web.session_state import SessionState, SessionStore, SECTION_FIELDS
+from src.ui.web.scheduler import get_scheduler
+from src.ui.web.admission import get_admission_controller
+from src.worker_pool import get_worker_pool, runs_in_worker
 from src.ui.variable_sorting import sort_variables, get_sort_mode_label, cycle_sort_mode, get_default_reverse_for_mode
 from src.error_logger import log_web_error
 from src.usage_tracker import init_usage_tracker, get_usage_tracker
 
 
+# Reports user activity (key presses, clicks, touches) to the server as the
+# 'mbasic_activity' event, at most every 30 seconds - or at once when the
+# session is hibernated, so it is restored before the event's own handler runs.
+ACTIVITY_JS = '''
+<script>
+(function() {
+    let last = 0;
+    function report() {
+        const now = Date.now();
+        if (!window.mbasicHibernated && now - last < 30000) return;
+        last = now;
+        window.mbasicHibernated = false;
+        if (window.emitEvent) emitEvent('mbasic_activity');
+    }
+    ['keydown', 'pointerdown', 'touchstart'].forEach(function(type) {
+        document.addEventListener(type, report, true);
+    });
+})();
+</script>
+'''
+
+
 def get_client_ip(request) -> str:
     """Get real client IP address from request, handling nginx ingress forwarding.
 
@@ -132,6 +161,17 @@ class VariablesDialog(ui.dialog):
         # Sort state (matches Tk UI defaults: see sort_mode and sort_reverse in src/ui/tk_ui.py)
         self.sort_mode = 'accessed'  # Current sort mode
         self.sort_reverse = True  # Sort direction
+        # Variable access tracking runs only while the dialog is open
+        self.on('hide', self._on_hide)
+
+    def _on_hide(self):
+        """Stop tracking variable accesses once the dialog is really closed."""
+        # _toggle_direction/_cycle_mode close and immediately reopen the dialog
+        if self.value:
+            return
+        runtime = self.backend.interpreter.runtime if self.backend.interpreter else None
+        if runtime:
+            runtime.disable_variable_tracking()
 
     def _toggle_direction(self):
         """Toggle sort direction and refresh display."""
@@ -155,6 +195,9 @@ class VariablesDialog(ui.dialog):
             self.backend._notify('No program running', type='warning')
             return
 
+        # Record variable accesses from now on (until the dialog is hidden)
+        runtime.enable_variable_tracking()
+
         # Clear any previous content
         self.clear()
 
@@ -1149,6 +1192,8 @@ class NiceGUIBackend(UIBackend):
         from src.settings_backend import create_settings_backend
         settings_backend = create_settings_backend(session_id=session_id)
         self.settings_manager = SettingsManager(backend=settings_backend)
+        # Resolve variable name case with this session's settings
+        self.program.settings_manager = self.settings_manager
 
         # Configuration
         self.max_recent_files = 10
@@ -1156,6 +1201,17 @@ class NiceGUIBackend(UIBackend):
         self.auto_save_interval = 30        # Auto-save every 30 seconds
         self.output_max_lines = 1000  # Maximum lines to keep in output buffer (reduced for web performance)
 
+        # Session persistence: state sections changed since the last
+        # save_state() (all of them until the first save). The 'files'
+        # section is only written by hibernate().
+        self._dirty_sections = set(SECTION_FIELDS) - {'files'}
+        self._saved_editor_content = None
+        self.session_store = None  # SessionStore, set by the page (used by hibernate/wake)
+
+        # Idle hibernation (see hibernate_if_idle())
+        self.hibernated = False
+        self.last_activity = time.monotonic()
+
         # UI elements (created in build_ui())
         self.editor = None
         self.output = None
@@ -1178,7 +1234,8 @@ class NiceGUIBackend(UIBackend):
         self.interpreter = Interpreter(self.runtime, immediate_io,
                                       limits=create_local_limits(),
                                       file_io=sandboxed_file_io,
-                                      filesystem_provider=self.sandboxed_fs)
+                                      filesystem_provider=self.sandboxed_fs,
+                                      settings_manager=self.settings_manager)
 
         self.running = False
         self.paused = False
@@ -1189,6 +1246,7 @@ class NiceGUIBackend(UIBackend):
         self.input_future = None
         self.last_save_content = ''
         self.exec_timer = None
+        self.remote_run = None  # RemoteRun while RUN executes in a worker process
         self.auto_save_timer = None
 
         # Output batching to reduce DOM updates
@@ -1275,6 +1333,13 @@ class NiceGUIBackend(UIBackend):
         ui.add_head_html('<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.2/codemirror.min.css">')
         ui.add_head_html('<script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.2/codemirror.min.js"></script>')
 
+        # Client-side output append (output is sent as deltas, see _flush_output_batch)
+        ui.add_head_html(OUTPUT_APPEND_JS)
+
+        # User activity reports (idle hibernation)
+        ui.add_head_html(ACTIVITY_JS)
+        ui.on('mbasic_activity', lambda e: self.note_activity())
+
         # Remove body margins/padding to eliminate space around top menu
         ui.add_head_html('''
             <style>
@@ -1800,6 +1865,7 @@ class NiceGUIBackend(UIBackend):
         - If cursor is on first statement: sets line-level breakpoint (PC with stmt_offset=0)
         - If cursor is within multi-statement line: sets statement-level breakpoint (PC with stmt_offset>0)
         """
+        self._mark_dirty('runtime')
         try:
             # Get cursor position from CodeMirror editor via run_method
             cursor_info = await self.editor.run_method('getCursorPosition')
@@ -1944,6 +2010,7 @@ class NiceGUIBackend(UIBackend):
 
     async def _do_toggle_breakpoint(self, line_num_str, dialog):
         """Actually toggle the breakpoint."""
+        self._mark_dirty('runtime')
         try:
             line_num = int(line_num_str)
 
@@ -1971,6 +2038,7 @@ class NiceGUIBackend(UIBackend):
 
     def _clear_all_breakpoints(self):
         """Clear all breakpoints."""
+        self._mark_dirty('runtime')
         try:
             count = len(self.runtime.breakpoints)
             self.runtime.breakpoints.clear()
@@ -2001,6 +2069,7 @@ class NiceGUIBackend(UIBackend):
 
     def cmd_new(self) -> None:
         """Execute NEW command - clear program and variables (called by interpreter)."""
+        self._mark_dirty('runtime')
         # Clear the program
         self.program.clear()
 
@@ -2181,6 +2250,7 @@ class NiceGUIBackend(UIBackend):
         Breakpoints: User can set_breakpoint via Toggle Breakpoint menu (_toggle_breakpoint).
         Breakpoints are stored in runtime.breakpoints and honored during execution.
         """
+        self._mark_dirty('runtime')
         try:
             # Stop any existing execution timer first (defensive programming - prevents multiple timers)
             # Note: This pattern is applied uniformly across all timer management (see _menu_continue,
@@ -2188,6 +2258,10 @@ class NiceGUIBackend(UIBackend):
             if self.exec_timer:
                 self.exec_timer.cancel()
                 self.exec_timer = None
+            if self.remote_run:
+                # Results of the previous run are discarded
+                self.remote_run.stop()
+                self.remote_run = None
 
             # Save editor content to program first
             if not self._save_editor_to_program():
@@ -2224,7 +2298,8 @@ class NiceGUIBackend(UIBackend):
 
             # Check if RUN was called with a line number (e.g., RUN 120)
             # This is set by immediate_executor when user types "RUN 120"
-            if hasattr(self, '_run_start_line') and self._run_start_line:
+            start_line = getattr(self, '_run_start_line', None)
+            if start_line:
                 # Set PC to start at the specified line
                 from src.pc import PC
                 self.runtime.npc = PC.from_line(self._run_start_line)
@@ -2245,8 +2320,13 @@ class NiceGUIBackend(UIBackend):
             self._exec_start_time = time.time()
             self._exec_start_line_count = len(self.program.lines) if self.program else 0
 
-            # Start async execution - store timer handle so we can cancel it
-            self.exec_timer = ui.timer(0.01, self._execute_tick, once=False)
+            # Without breakpoints or a start line the program can run in a
+            # worker process (debugging and stepping always run in-process)
+            if not start_line and not len(self.runtime.breakpoints) and self._start_remote_run():
+                return
+
+            # Start async execution - store scheduler handle so we can cancel it
+            self.exec_timer = self._schedule_execution()
 
         except Exception as e:
             self._log_error("_menu_run", e)
@@ -2254,16 +2334,109 @@ class NiceGUIBackend(UIBackend):
             self._set_status(f'Error: {e}')
             self.running = False
 
-    def _execute_tick(self):
+    def _start_remote_run(self) -> bool:
+        """Run the program in a worker process from the pool (src/worker_pool.py).
+
+        The worker gets the program text, the session's files and settings;
+        output and INPUT prompts stream back and the final variables, arrays
+        and files are copied into this session when the program ends.
+
+        Programs containing STOP run in-process, so that CONT can resume
+        them (see runs_in_worker()).
+
+        Returns:
+            bool: False if the pool is disabled, all workers are busy or the
+            program contains STOP
+        """
+        pool = get_worker_pool()
+        if pool is None or not runs_in_worker(self.program.line_asts):
+            return False
+        job = {
+            'lines': dict(self.program.lines),
+            'files': self.sandboxed_fs.export_files(),
+            'user_id': self.sandboxed_fs.user_id,
+            'settings': self.settings_manager.get_all_settings(),
+        }
+        handlers = {
+            'output': lambda run, text: self._append_output(text) if run is self.remote_run else None,
+            'input': self._on_remote_input,
+            'finished': self._on_remote_finished,
+        }
+        self.remote_run = pool.run(job, handlers, context=ui.context.client)
+        return self.remote_run is not None
+
+    def _on_remote_input(self, run, prompt):
+        """Worker program is waiting for INPUT (prompt already in output)."""
+        if run is not self.remote_run:
+            return
+        self.waiting_for_input = True
+        self.input_prompt_text = prompt
+        self.immediate_entry.props('placeholder="Input: "')
+        self.immediate_entry.run_method('focus')
+        self._set_status(f"at line {run.line}: {prompt}")
+        if self.current_line_label and run.line:
+            self.current_line_label.set_text(f'>>> INPUT at line {run.line}')
+            self.current_line_label.visible = True
+
+    def _on_remote_finished(self, run, result):
+        """Copy a worker run's results into this session and report the outcome."""
+        if run is not self.remote_run:
+            return  # Superseded by a newer RUN
+        self.remote_run = None
+        self._mark_dirty('runtime')
+        self.runtime.pc = PC.halted()
+        if result['variables'] is not None:
+            self.runtime.restore_variable_state(result['variables'])
+            self.runtime.restore_array_state(result['arrays'])
+        if result['files'] is not None:
+            from src.filesystem import SandboxedFileSystemProvider
+            SandboxedFileSystemProvider.clear_user_filesystem(self.sandboxed_fs.user_id)
+            self.sandboxed_fs.import_files(result['files'])
+        if result['stopped']:
+            return  # _menu_stop already reported it
+
+        self.running = False
+        self.waiting_for_input = False
+        self.input_prompt_text = None
+        if self.current_line_label:
+            self.current_line_label.visible = False
+        if result['error']:
+            self._append_output(f"\n--- Error: {result['error']} ---\n")
+            self._set_status("Error")
+            self._track_program_execution(success=False, error_message=result['error'])
+        else:
+            self._append_output("\n--- Program finished ---\n")
+            self._set_status("Ready")
+            self._track_program_execution(success=True)
+
+    def _schedule_execution(self):
+        """Hand this session's program to the server-wide scheduler.
+
+        Returns:
+            ScheduledTask: Handle stored in exec_timer; cancel() stops ticking
+        """
+        return get_scheduler().add(self.sandboxed_fs.user_id, self._execute_tick,
+                                   context=ui.context.client, on_pause=self._on_load_shed)
+
+    def _on_load_shed(self, paused):
+        """Scheduler paused or resumed this program because the server is overloaded."""
+        self._set_status('Paused: server busy' if paused else 'Running...')
+
+    def _execute_tick(self, time_budget=0.05):
         """Execute one tick of the interpreter.
 
-        This method is called every 10ms by ui.timer() during program execution.
+        This method is called by the session scheduler (src/ui/web/scheduler.py)
+        in round-robin with other sessions' programs during program execution.
+
+        Args:
+            time_budget: Seconds this tick may run (the scheduler's time slice)
 
         Note: In the web UI, Ctrl+C in the browser does not send interrupt signals to
         the Python backend process. To stop a running program, users must use the Stop
         menu item or the server-side interrupt mechanism (if running from terminal).
         This differs from terminal-based UIs where Ctrl+C works directly.
         """
+        self._mark_dirty('runtime')
         # Check if we have an interpreter before proceeding
         # Note: self.running is also set/cleared elsewhere but may not persist reliably in async callbacks
         if not self.interpreter:
@@ -2300,8 +2473,9 @@ class NiceGUIBackend(UIBackend):
                         self.editor.set_current_statement(state.current_line, char_start, char_end)
                 return
 
-            # Execute one tick (up to 1000 statements)
-            state = self.interpreter.tick(mode='run', max_statements=1000)
+            # Execute one tick (up to 1000 statements, yielding early when the
+            # slice is used up so the event loop stays responsive)
+            state = self.interpreter.tick(mode='run', max_statements=1000, time_budget=time_budget)
 
             # Handle state using microprocessor model
             if state.error_info:
@@ -2389,10 +2563,15 @@ class NiceGUIBackend(UIBackend):
 
     async def _menu_stop(self):
         """Run > Stop - Stop execution."""
+        self._mark_dirty('runtime')
         # Cancel the execution timer first
         if self.exec_timer:
             self.exec_timer.cancel()
             self.exec_timer = None
+        remote_run = self.remote_run
+        if remote_run:
+            # The worker stops and still sends its results (see _on_remote_finished)
+            remote_run.stop()
 
         # Stop the interpreter
         # Note: PC handles halted state - no need to set flags
@@ -2429,7 +2608,9 @@ class NiceGUIBackend(UIBackend):
 
         # Get current line before stopping
         current_line = None
-        if self.interpreter and self.interpreter.runtime:
+        if remote_run:
+            current_line = remote_run.line
+        elif self.interpreter and self.interpreter.runtime:
             pc = self.interpreter.runtime.pc
             if pc and pc.line:
                 current_line = pc.line
@@ -2460,6 +2641,7 @@ class NiceGUIBackend(UIBackend):
 
     async def _menu_step_line(self):
         """Run > Step Line - Execute all statements on current line and pause."""
+        self._mark_dirty('runtime')
         try:
             if not self.running and not self.paused:
                 # Not running - start program and step one line
@@ -2526,6 +2708,7 @@ class NiceGUIBackend(UIBackend):
 
     async def _menu_step_stmt(self):
         """Run > Step Statement - Execute one statement and pause."""
+        self._mark_dirty('runtime')
         try:
             import sys
             pc = self.runtime.pc if self.runtime else None
@@ -2687,6 +2870,7 @@ class NiceGUIBackend(UIBackend):
 
     async def _menu_continue(self):
         """Run > Continue - Continue from breakpoint/pause."""
+        self._mark_dirty('runtime')
         try:
             if self.running and self.paused:
                 self.paused = False
@@ -2696,7 +2880,7 @@ class NiceGUIBackend(UIBackend):
                     self.exec_timer.cancel()
                     self.exec_timer = None
                 # Start timer to continue execution in run mode
-                self.exec_timer = ui.timer(0.01, self._execute_tick, once=False)
+                self.exec_timer = self._schedule_execution()
             else:
                 self._notify('Not paused', type='warning')
 
@@ -2942,8 +3126,7 @@ class NiceGUIBackend(UIBackend):
         old_pc = self.runtime.pc
 
         # Clear and rebuild statement table
-        self.runtime.statement_table.statements.clear()
-        self.runtime.statement_table._keys_cache = None
+        self.runtime.statement_table.clear()
 
         # Update line text map
         self.runtime.line_text_map = dict(self.program.lines)
@@ -3351,7 +3534,8 @@ class NiceGUIBackend(UIBackend):
             self.output_batch_timer = None
 
         # Clear output
-        self.output_text = ''
+        self.output_buffer.clear()
+        self._mark_dirty('output')
         if self.output:
             self.output.value = ''
             self.output.update()
@@ -3396,52 +3580,32 @@ class NiceGUIBackend(UIBackend):
             self.output_batch_timer.cancel()
             self.output_batch_timer = None
 
-        # Update our internal buffer
-        self.output_text += batch_text
+        # Ring buffer of lines: O(batch) append, oldest lines dropped from the front
+        self.output_buffer.append(batch_text)
+        self._mark_dirty('output')
 
-        # Limit output buffer by number of lines to prevent infinite growth
-        lines = self.output_text.split('\n')
-        if len(lines) > self.output_max_lines:
-            # Keep last N lines, add indicator at start
-            lines = lines[-self.output_max_lines:]
-            self.output_text = '\n'.join(lines)
-            # Add truncation indicator if not already present
-            if not self.output_text.startswith('[... output truncated'):
-                self.output_text = '[... output truncated ...]\n' + self.output_text
+        # Send only the new text; the client appends, trims and scrolls
+        # (mbasicAppendOutput from OUTPUT_APPEND_JS). self.output.value is
+        # not updated here, so full refreshes go through _refresh_output().
+        if self.output:
+            ui.run_javascript(f'mbasicAppendOutput({json.dumps(batch_text)}, {self.output_max_lines})')
 
-        # Update the textarea directly
+    def _refresh_output(self):
+        """Resend the whole output buffer to the textarea."""
+        self._mark_dirty('output')
         if self.output:
             self.output.value = self.output_text
             self.output.update()
 
-            # Auto-scroll to bottom with smart scroll tracking
-            ui.run_javascript('''
-                (function() {
-                    let textarea = document.querySelector('[data-marker="output"] textarea');
-                    if (!textarea) {
-                        const textareas = document.querySelectorAll('textarea[readonly]');
-                        textarea = textareas[textareas.length - 1];
-                    }
-                    if (!textarea) return;
-
-                    // Set up scroll event listener if not already done
-                    if (!textarea.dataset.scrollTrackerInstalled) {
-                        textarea.dataset.scrollTrackerInstalled = 'true';
-                        textarea.dataset.userScrolledUp = 'false';
+    @property
+    def output_text(self):
+        """Output pane text (built from output_buffer)."""
+        return self.output_buffer.text
 
-                        textarea.addEventListener('scroll', function() {
-                            // Check if user is within 50px of bottom
-                            const isAtBottom = this.scrollTop >= this.scrollHeight - this.clientHeight - 50;
-                            this.dataset.userScrolledUp = isAtBottom ? 'false' : 'true';
-                        });
-                    }
-
-                    // Only auto-scroll if user hasn't manually scrolled up
-                    if (textarea.dataset.userScrolledUp !== 'true') {
-                        textarea.scrollTop = textarea.scrollHeight;
-                    }
-                })();
-            ''')
+    @output_text.setter
+    def output_text(self, text):
+        self.output_buffer = OutputBuffer(self.output_max_lines, text)
+        self._mark_dirty('output')
 
     def _handle_output_enter(self, e):
         """Handle Enter key in output textarea for inline input."""
@@ -3469,8 +3633,9 @@ class NiceGUIBackend(UIBackend):
         # Clean up the input (remove trailing whitespace)
         user_input = user_input.strip()
 
-        # Add newline after input to move to next line
-        self.output.value = current_text + '\n'
+        # Echo the input into the output buffer and move to the next line
+        self.output_buffer.append(user_input + '\n')
+        self._refresh_output()
 
         # Make output readonly again - use JavaScript to set readonly attribute
         self.output.run_method('() => { const el = this.$el.querySelector("textarea"); if (el) { el.setAttribute("readonly", "readonly"); } }')
@@ -3499,7 +3664,9 @@ class NiceGUIBackend(UIBackend):
         # Provide input to interpreter via TWO mechanisms (we check both in case either is active):
         # 1. interpreter.provide_input() - Used when interpreter is waiting synchronously
         #    (checked via interpreter.state.input_prompt). Stores input for retrieval.
-        if self.interpreter and self.interpreter.state.input_prompt:
+        if self.remote_run and self.remote_run.waiting_for_input:
+            self.remote_run.provide_input(user_input)
+        elif self.interpreter and self.interpreter.state.input_prompt:
             self.interpreter.provide_input(user_input)
 
         # 2. input_future.set_result() - Used when async code is waiting via asyncio.Future
@@ -3513,12 +3680,12 @@ class NiceGUIBackend(UIBackend):
 
     def _enable_inline_input(self, prompt=''):
         """Enable inline input in output textarea."""
-        # Append prompt to output without newline
-        current_text = self.output.value or ''
-        if not current_text.endswith('\n') and current_text:
-            self.output.value = current_text + '\n' + prompt
-        else:
-            self.output.value = current_text + prompt
+        # Append prompt to output without newline (pending output goes first)
+        self._flush_output_batch()
+        if self.output_buffer.current:
+            self.output_buffer.append('\n')
+        self.output_buffer.append(prompt)
+        self._refresh_output()
 
         # Store prompt for later extraction of user input
         self.input_prompt_text = prompt
@@ -3571,7 +3738,8 @@ class NiceGUIBackend(UIBackend):
     def _on_immediate_enter(self, e):
         """Handle Enter key in immediate mode input."""
         # Check if we're waiting for LINE INPUT
-        if self.waiting_for_input and self.interpreter and self.interpreter.state.input_prompt:
+        remote_input = self.remote_run is not None and self.remote_run.waiting_for_input
+        if self.waiting_for_input and (remote_input or (self.interpreter and self.interpreter.state.input_prompt)):
             # Submit the input to the running program
             user_input = self.immediate_entry.value
             self.immediate_entry.value = ''
@@ -3579,8 +3747,11 @@ class NiceGUIBackend(UIBackend):
             # Echo the input to output
             self._append_output(user_input + '\n')
 
-            # Provide input to interpreter
-            self.interpreter.provide_input(user_input)
+            # Provide input to interpreter (or the worker process running it)
+            if remote_input:
+                self.remote_run.provide_input(user_input)
+            else:
+                self.interpreter.provide_input(user_input)
 
             # Clear waiting state and restore placeholder
             self.waiting_for_input = False
@@ -3606,6 +3777,7 @@ class NiceGUIBackend(UIBackend):
 
     def _execute_immediate(self):
         """Execute immediate mode command."""
+        self._mark_dirty('runtime')
         try:
             command = self.immediate_entry.value.strip()
             if not command:
@@ -3671,7 +3843,7 @@ class NiceGUIBackend(UIBackend):
                     # Start execution timer if not already running
                     if not self.exec_timer:
                         self._set_status('Running...')
-                        self.exec_timer = ui.timer(0.01, self._execute_tick, once=False)
+                        self.exec_timer = self._schedule_execution()
             else:
                 self._set_status('Immediate command error')
 
@@ -3758,6 +3930,54 @@ class NiceGUIBackend(UIBackend):
     # Session State Serialization (for Redis storage support)
     # =========================================================================
 
+    def _mark_dirty(self, *sections) -> None:
+        """Mark state sections (see SECTION_FIELDS) as changed since the last save."""
+        self._dirty_sections.update(sections)
+
+    def _collect_state(self, sections) -> dict:
+        """Build the SessionState fields of the given sections.
+
+        Only the requested sections are computed, so saving output alone does
+        not resync the editor or serialize the runtime.
+        """
+        values = {}
+        if 'session' in sections:
+            values.update(
+                version=SessionState.version,
+                session_id=self.sandboxed_fs.user_id,
+                recent_files=self.recent_files.copy() if self.recent_files else [],
+                max_recent_files=self.max_recent_files,
+                auto_save_enabled=self.auto_save_enabled,
+                auto_save_interval=self.auto_save_interval,
+                last_find_text=self.last_find_text,
+                last_find_position=self.last_find_position,
+                last_case_sensitive=self.last_case_sensitive,
+            )
+        if 'program' in sections:
+            # Sync program manager from editor content before serializing
+            # This ensures we capture any edits that haven't been run yet
+            self._sync_program_from_editor()
+            values.update(
+                program_lines=self._serialize_program(),
+                current_file=self.current_file,
+                last_save_content=self.last_save_content,
+                editor_content=self.editor.value if self.editor else "",
+                editor_cursor=None,
+                last_edited_line_index=self.last_edited_line_index,
+                last_edited_line_text=self.last_edited_line_text,
+            )
+        if 'runtime' in sections:
+            values.update(
+                runtime_state=self._serialize_runtime(),
+                running=self.running,
+                paused=self.paused,
+            )
+        if 'output' in sections:
+            values['output_text'] = self.output_text
+        if 'files' in sections:
+            values['sandbox_files'] = self.sandboxed_fs.export_files()
+        return values
+
     def serialize_state(self) -> dict:
         """Serialize backend state for storage.
 
@@ -3768,37 +3988,46 @@ class NiceGUIBackend(UIBackend):
         Returns:
             dict: Serializable state dictionary
         """
-        from src.ui.web.session_state import SessionState
-
-        # Sync program manager from editor content before serializing
-        # This ensures we capture any edits that haven't been run yet
-        self._sync_program_from_editor()
-
         # Close any open files before serialization
         self._close_all_files()
 
-        state = SessionState(
-            session_id=self.sandboxed_fs.user_id,
-            program_lines=self._serialize_program(),
-            runtime_state=self._serialize_runtime(),
-            running=self.running,
-            paused=self.paused,
-            output_text=self.output_text,
-            current_file=self.current_file,
-            recent_files=self.recent_files.copy() if self.recent_files else [],
-            last_save_content=self.last_save_content,
-            max_recent_files=self.max_recent_files,
-            auto_save_enabled=self.auto_save_enabled,
-            auto_save_interval=self.auto_save_interval,
-            last_find_text=self.last_find_text,
-            last_find_position=self.last_find_position,
-            last_case_sensitive=self.last_case_sensitive,
-            editor_content=self.editor.value if self.editor else "",
-            last_edited_line_index=self.last_edited_line_index,
-            last_edited_line_text=self.last_edited_line_text,
-        )
+        return SessionState(**self._collect_state(SECTION_FIELDS)).to_dict()
+
+    def save_state(self, store: SessionStore, final: bool = False) -> int:
+        """Persist the state sections changed since the last save.
+
+        Sections are marked dirty by the code that changes them (output,
+        program runs, immediate commands, breakpoints); editor edits are
+        detected by comparing the editor text. The small 'session' section is
+        always compared. When nothing changed this does no serialization and
+        no storage writes.
+
+        Args:
+            store: SessionStore wrapping app.storage.client
+            final: True when the client disconnects - open files are closed
+                instead of just flushed
+
+        Returns:
+            int: Number of sections written
+        """
+        if self.hibernated:
+            return 0  # Everything was saved by hibernate()
+
+        editor_content = self.editor.value if self.editor else ""
+        if editor_content != self._saved_editor_content:
+            self._dirty_sections.add('program')
+
+        if final:
+            self._close_all_files()
+        elif self.interpreter:
+            # Files stay open across periodic saves; make their data durable
+            self.interpreter.flush_files()
 
-        return state.to_dict()
+        sections = self._dirty_sections | {'session'}
+        written = store.save(self._collect_state(sections), sections)
+        self._dirty_sections = set()
+        self._saved_editor_content = editor_content
+        return written
 
     def restore_state(self, state_dict: dict) -> None:
         """Restore backend state from storage.
@@ -3806,8 +4035,6 @@ class NiceGUIBackend(UIBackend):
         Args:
             state_dict: State dictionary from serialize_state()
         """
-        from src.ui.web.session_state import SessionState
-
         state = SessionState.from_dict(state_dict)
 
         # Restore session ID (critical for Redis settings and filesystem)
@@ -3823,6 +4050,15 @@ class NiceGUIBackend(UIBackend):
             settings_backend = create_settings_backend(session_id=state.session_id)
             self.settings_manager = SettingsManager(backend=settings_backend)
 
+        # Restore sandboxed files saved by hibernate(), unless this process
+        # still has the session's files. The live files are authoritative
+        # from now on, so the stored snapshot is dropped before it goes stale
+        # (hibernate() writes a fresh one).
+        if state.sandbox_files and not self.sandboxed_fs.export_files():
+            self.sandboxed_fs.import_files(state.sandbox_files)
+        if self.session_store is not None:
+            self.session_store.discard('files')
+
         # Restore program
         self._restore_program(state.program_lines)
 
@@ -3856,6 +4092,62 @@ class NiceGUIBackend(UIBackend):
         self.last_edited_line_index = state.last_edited_line_index
         self.last_edited_line_text = state.last_edited_line_text
 
+    def note_activity(self) -> None:
+        """Record a user event; restores the session if it is hibernated."""
+        self.last_activity = time.monotonic()
+        if self.hibernated:
+            try:
+                self.wake()
+            except Exception as e:
+                self._log_error("wake", e)
+
+    def hibernate_if_idle(self, idle_seconds: float) -> bool:
+        """Hibernate the session if it had no user events for idle_seconds.
+
+        Sessions running a program (including one waiting for INPUT) are
+        never hibernated.
+
+        Returns:
+            bool: True if the session was hibernated by this call
+        """
+        if self.hibernated or self.running or self.session_store is None:
+            return False
+        if time.monotonic() - self.last_activity < idle_seconds:
+            return False
+        self.hibernate()
+        return True
+
+    def hibernate(self) -> None:
+        """Save the whole session to the session store and release its memory.
+
+        The program, runtime, interpreter, output buffer and sandboxed files
+        are dropped; the page and its UI elements stay. wake() rebuilds them
+        from the store on the next user event.
+        """
+        self._mark_dirty(*SECTION_FIELDS)
+        self.save_state(self.session_store, final=True)
+
+        self.sandboxed_fs.clear_user_filesystem(self.sandboxed_fs.user_id)
+        self.program.clear()
+        self.runtime = Runtime({}, {})
+        self.interpreter = None
+        self.exec_io = None
+        self.output_buffer = OutputBuffer(self.output_max_lines)
+        self._dirty_sections = set()
+        self.hibernated = True
+
+        # Make the next key press or click report activity immediately
+        ui.run_javascript('window.mbasicHibernated = true;')
+
+    def wake(self) -> None:
+        """Rebuild a hibernated session from the session store."""
+        state_dict = self.session_store.load()
+        self.hibernated = False
+        if state_dict:
+            self.restore_state(state_dict)
+        else:
+            self._recreate_interpreter()
+
     def _sync_program_from_editor(self) -> None:
         """Sync program manager from editor content.
 
@@ -3922,38 +4214,30 @@ class NiceGUIBackend(UIBackend):
     def _serialize_runtime(self) -> dict:
         """Serialize runtime state.
 
-        Uses pickle for complex objects:
-        - statement_table: Contains StatementTable with AST statement nodes (pickled)
-        - user_functions: Contains DefFnStatementNode AST nodes (pickled)
-        Other fields use direct serialization (dicts, lists, primitives).
+        No AST nodes are stored: the statement table and DEF FN definitions
+        are rebuilt on restore by parsing line_text_map (the source the
+        runtime was built from), so user_functions is saved as a list of
+        names. Open files are not part of the state.
 
         Returns:
             dict: Serialized runtime state
         """
-        import pickle
-
-        # Close open files first
-        self._close_all_files()
-
         return {
-            'variables': self.runtime._variables,
-            'arrays': self.runtime._arrays,
-            'variable_case_variants': self.runtime._variable_case_variants,
-            'array_element_tracking': self.runtime._array_element_tracking,
+            'variables': self.runtime.get_variable_state(),
+            'arrays': self.runtime.get_array_state(),
             'common_vars': self.runtime.common_vars,
             'array_base': self.runtime.array_base,
             'option_base_executed': self.runtime.option_base_executed,
             'pc': {'line': self.runtime.pc.line_num, 'stmt': self.runtime.pc.stmt_offset} if self.runtime.pc else None,
             'npc': {'line': self.runtime.npc.line_num, 'stmt': self.runtime.npc.stmt_offset} if self.runtime.npc else None,
-            'statement_table': pickle.dumps(self.runtime.statement_table).hex(),
             # Note: halted flag removed - PC is now immutable and indicates running state
             'execution_stack': self.runtime.execution_stack,
-            'for_loop_states': pickle.dumps(self.runtime.for_loop_states).hex(),
+            'for_loop_states': self.runtime.for_loop_states,
             'line_text_map': self.runtime.line_text_map,
             'data_items': self.runtime.data_items,
             'data_pointer': self.runtime.data_pointer,
             'data_line_map': self.runtime.data_line_map,
-            'user_functions': pickle.dumps(self.runtime.user_functions).hex(),
+            'user_functions': sorted(self.runtime.user_functions),
             'field_buffers': self.runtime.field_buffers,
             'error_handler': self.runtime.error_handler,
             'error_handler_is_gosub': self.runtime.error_handler_is_gosub,
@@ -3974,22 +4258,29 @@ class NiceGUIBackend(UIBackend):
         import pickle
         from src.pc import PC
 
-        self.runtime._variables = state['variables']
-        self.runtime._arrays = state['arrays']
-        self.runtime._variable_case_variants = state['variable_case_variants']
-        self.runtime._array_element_tracking = state['array_element_tracking']
-        self.runtime.common_vars = state['common_vars']
+        # Access tracking and case variants are not persisted (older saves may still
+        # include them); variable display case is part of the variable state
+        self.runtime.restore_variable_state(state['variables'])
         self.runtime.array_base = state['array_base']
+        self.runtime.restore_array_state(state['arrays'])
+        self.runtime.common_vars = state['common_vars']
         self.runtime.option_base_executed = state['option_base_executed']
         self.runtime.pc = PC(state['pc']['line'], state['pc']['stmt']) if state['pc'] else PC.halted()
         self.runtime.npc = PC(state['npc']['line'], state['npc']['stmt']) if state['npc'] else None
-        self.runtime.statement_table = pickle.loads(bytes.fromhex(state['statement_table']))
+        if 'statement_table' in state:
+            # Old save format: pickled AST nodes
+            self.runtime.statement_table = pickle.loads(bytes.fromhex(state['statement_table']))
+            self.runtime.user_functions = pickle.loads(bytes.fromhex(state['user_functions']))
+        else:
+            self._rebuild_runtime_program(state['line_text_map'], state['user_functions'])
         # Note: halted flag removed - PC is now immutable and indicates running state
         # Ignore 'halted' key if present (backwards compatibility with old saved states)
         self.runtime.execution_stack = state['execution_stack']
         # Backwards compatibility: old saves have for_loop_vars, new saves have for_loop_states
-        if 'for_loop_states' in state:
+        if isinstance(state.get('for_loop_states'), str):
             self.runtime.for_loop_states = pickle.loads(bytes.fromhex(state['for_loop_states']))
+        elif 'for_loop_states' in state:
+            self.runtime.for_loop_states = state['for_loop_states']
         else:
             # Old save format - for_loop_vars existed but was part of old stack-based system
             # Can't migrate old saves, so just start with empty for_loop_states
@@ -3998,7 +4289,6 @@ class NiceGUIBackend(UIBackend):
         self.runtime.data_items = state['data_items']
         self.runtime.data_pointer = state['data_pointer']
         self.runtime.data_line_map = state['data_line_map']
-        self.runtime.user_functions = pickle.loads(bytes.fromhex(state['user_functions']))
         self.runtime.field_buffers = state['field_buffers']
         self.runtime.error_handler = state['error_handler']
         self.runtime.error_handler_is_gosub = state['error_handler_is_gosub']
@@ -4010,13 +4300,44 @@ class NiceGUIBackend(UIBackend):
         self.runtime.trace_on = state['trace_on']
         self.runtime.trace_detail = state['trace_detail']
 
+    def _rebuild_runtime_program(self, line_text_map: Dict[int, str], function_names) -> None:
+        """Rebuild the statement table and DEF FN table from program source.
+
+        Parsing goes through the program cache, so restoring an unchanged
+        program does not lex or parse it again.
+
+        Args:
+            line_text_map: line_number -> source text the runtime was built from
+            function_names: Names of the user functions that were defined
+        """
+        from src.editing.manager import ProgramManager
+        from src.ast_nodes import DefFnStatementNode, TypeInfo
+        from src.pc import StatementTable
+
+        parser = ProgramManager({letter: TypeInfo.SINGLE for letter in 'abcdefghijklmnopqrstuvwxyz'})
+        source = '\n'.join(line_text_map[line_num] for line_num in sorted(line_text_map))
+        line_asts = {line_num: line_ast for line_num, _, line_ast, _ in parser.parse_program_text(source)
+                     if line_ast is not None}
+
+        table = StatementTable()
+        definitions = {}
+        for line_num in sorted(line_asts):
+            for stmt_offset, stmt in enumerate(line_asts[line_num].statements):
+                table.add(PC(line_num, stmt_offset), stmt)
+                if isinstance(stmt, DefFnStatementNode):
+                    definitions[stmt.name] = stmt
+
+        self.runtime._ast_or_line_table = line_asts
+        self.runtime.statement_table = table
+        self.runtime.user_functions = {name: definitions[name] for name in function_names if name in definitions}
+
     def _close_all_files(self) -> None:
         """Close all open file handles before serialization."""
         if hasattr(self.runtime, 'files'):
             open_file_numbers = list(self.runtime.files.keys())
             for file_num in open_file_numbers:
                 try:
-                    self.runtime.files[file_num].close()
+                    self.runtime.files[file_num]['handle'].close()
                 except Exception:
                     pass  # Ignore errors closing files
             self.runtime.files.clear()
@@ -4037,7 +4358,8 @@ class NiceGUIBackend(UIBackend):
             immediate_io,
             limits=create_local_limits(),
             file_io=sandboxed_file_io,
-            filesystem_provider=self.sandboxed_fs
+            filesystem_provider=self.sandboxed_fs,
+            settings_manager=self.settings_manager
         )
 
     # =========================================================================
@@ -4063,6 +4385,31 @@ class NiceGUIBackend(UIBackend):
         app.shutdown()
 
 
+def _start_hibernation_timer(backend):
+    """Periodically hibernate the page's backend once it has been idle."""
+    from src.multiuser_config import get_config
+
+    hibernation = get_config().hibernation
+    if not hibernation.enabled:
+        return
+
+    def hibernate_if_idle():
+        try:
+            backend.hibernate_if_idle(hibernation.idle_seconds)
+        except Exception as e:
+            sys.stderr.write(f"Warning: Failed to hibernate session: {e}\n")
+            sys.stderr.flush()
+
+    ui.timer(hibernation.check_interval_seconds, hibernate_if_idle)
+
+
+def _busy_response(admission):
+    """503 response with the admission controller's retry page."""
+    from fastapi.responses import HTMLResponse
+    return HTMLResponse(admission.busy_page_html(), status_code=503,
+                        headers={'Retry-After': str(admission.retry_after)})
+
+
 # Module-level function for proper multi-user web architecture
 def start_web_ui(port=8080):
     """Start the NiceGUI web server with per-client backend instances.
@@ -4139,85 +4486,114 @@ def start_web_ui(port=8080):
         from src.ast_nodes import TypeInfo
         from nicegui import context
 
-        # Detect tablet/mobile devices via user-agent
-        request = context.client.request if context.client else None
-        user_agent = request.headers.get('user-agent', '').lower() if request else ''
-        is_tablet = any(keyword in user_agent for keyword in ['ipad', 'android', 'tablet'])
-
-        # Try to restore existing session state
-        saved_state = app.storage.client.get('session_state')
+        # Over the session limit: serve the busy page without building a backend
+        admission = get_admission_controller()
+        client_id = context.client.id
+        if not admission.admit(client_id):
+            return _busy_response(admission)
 
-        # Initialize DEF type map with all letters as SINGLE precision
-        def_type_map = {}
-        for letter in 'abcdefghijklmnopqrstuvwxyz':
-            def_type_map[letter] = TypeInfo.SINGLE
+        # Hold the slot across reconnects until NiceGUI deletes the client;
+        # a page that never connects gives it back after CONNECT_TIMEOUT
+        ui.context.client.on_connect(lambda: admission.connected(client_id))
+        ui.context.client.on_delete(lambda: admission.release(client_id))
 
-        # Create new program manager for this client
-        program_manager = ProgramManager(def_type_map)
-
-        # Create new backend instance
-        backend = NiceGUIBackend(None, program_manager)
-
-        # Track IDE session start
-        tracker = get_usage_tracker()
-        if tracker:
-            try:
-                from nicegui import context
-                # Use context.client.id for session ID (not app.storage.client.id)
-                session_id = context.client.id if context.client else 'unknown'
-                user_agent = context.client.request.headers.get('user-agent') if context.client and context.client.request else None
-                # Get real client IP (handles X-Forwarded-For from nginx ingress)
-                ip = get_client_ip(context.client.request) if context.client and context.client.request else 'unknown'
-                tracker.start_ide_session(session_id, user_agent, ip)
-            except Exception as e:
-                sys.stderr.write(f"ERROR: Failed to track session start: {e}\n")
-                import traceback
-                sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                sys.stderr.flush()
+        try:
+            # Detect tablet/mobile devices via user-agent
+            request = context.client.request if context.client else None
+            user_agent = request.headers.get('user-agent', '').lower() if request else ''
+            is_tablet = any(keyword in user_agent for keyword in ['ipad', 'android', 'tablet'])
 
-        # Restore state if available
-        if saved_state:
-            try:
-                backend.restore_state(saved_state)
-            except Exception as e:
-                sys.stderr.write(f"Warning: Failed to restore session state: {e}\n")
-                sys.stderr.flush()
-                # Continue with fresh state
+            # Try to restore existing session state
+            session_store = SessionStore(app.storage.client)
+            saved_state = session_store.load()
 
-        # Build the UI for this client (mobile layout for tablets, desktop for others)
-        backend.build_ui(mobile_layout=is_tablet)
+            # Initialize DEF type map with all letters as SINGLE precision
+            def_type_map = {}
+            for letter in 'abcdefghijklmnopqrstuvwxyz':
+                def_type_map[letter] = TypeInfo.SINGLE
 
-        # Set up periodic state saving (every 5 seconds while connected)
-        def save_state_periodic():
-            try:
-                app.storage.client['session_state'] = backend.serialize_state()
-            except Exception as e:
-                sys.stderr.write(f"Warning: Failed to save session state: {e}\n")
-                sys.stderr.flush()
+            # Create new program manager for this client
+            program_manager = ProgramManager(def_type_map)
 
-        # Save state periodically (errors are caught and logged, won't crash the UI)
-        ui.timer(5.0, save_state_periodic)
+            # Create new backend instance
+            backend = NiceGUIBackend(None, program_manager)
+            backend.session_store = session_store
 
-        # Save state on disconnect
-        def save_on_disconnect():
-            try:
-                app.storage.client['session_state'] = backend.serialize_state()
-            except Exception as e:
-                sys.stderr.write(f"Warning: Failed to save final session state: {e}\n")
-                sys.stderr.flush()
-
-            # Track session end
+            # Track IDE session start
             tracker = get_usage_tracker()
             if tracker:
                 try:
                     from nicegui import context
+                    # Use context.client.id for session ID (not app.storage.client.id)
                     session_id = context.client.id if context.client else 'unknown'
-                    tracker.end_ide_session(session_id)
+                    user_agent = context.client.request.headers.get('user-agent') if context.client and context.client.request else None
+                    # Get real client IP (handles X-Forwarded-For from nginx ingress)
+                    ip = get_client_ip(context.client.request) if context.client and context.client.request else 'unknown'
+                    tracker.start_ide_session(session_id, user_agent, ip)
+                except Exception as e:
+                    sys.stderr.write(f"ERROR: Failed to track session start: {e}\n")
+                    import traceback
+                    sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
+                    sys.stderr.flush()
+
+            # Restore state if available
+            if saved_state:
+                try:
+                    backend.restore_state(saved_state)
+                except Exception as e:
+                    sys.stderr.write(f"Warning: Failed to restore session state: {e}\n")
+                    sys.stderr.flush()
+                    # Continue with fresh state
+
+            # Build the UI for this client (mobile layout for tablets, desktop for others)
+            backend.build_ui(mobile_layout=is_tablet)
+
+            # Set up periodic state saving (every 5 seconds while connected;
+            # only changed sections are written)
+            def save_state_periodic():
+                try:
+                    backend.save_state(session_store)
                 except Exception as e:
-                    sys.stderr.write(f"Warning: Failed to track session end: {e}\n")
+                    sys.stderr.write(f"Warning: Failed to save session state: {e}\n")
                     sys.stderr.flush()
 
-        ui.context.client.on_disconnect(save_on_disconnect)
+            # Save state periodically (errors are caught and logged, won't crash the UI)
+            ui.timer(5.0, save_state_periodic)
+
+            # Hibernate the session when idle (see MultiUserConfig.hibernation)
+            _start_hibernation_timer(backend)
+
+            # Save state on disconnect
+            def save_on_disconnect():
+                # Unlike a ui.timer, the scheduler does not know the client is gone
+                if backend.exec_timer:
+                    backend.exec_timer.cancel()
+                    backend.exec_timer = None
+                if backend.remote_run:
+                    backend.remote_run.stop()
+
+                try:
+                    backend.save_state(session_store, final=True)
+                except Exception as e:
+                    sys.stderr.write(f"Warning: Failed to save final session state: {e}\n")
+                    sys.stderr.flush()
+
+                # Track session end
+                tracker = get_usage_tracker()
+                if tracker:
+                    try:
+                        from nicegui import context
+                        session_id = context.client.id if context.client else 'unknown'
+                        tracker.end_ide_session(session_id)
+                    except Exception as e:
+                        sys.stderr.write(f"Warning: Failed to track session end: {e}\n")
+                        sys.stderr.flush()
+
+            ui.context.client.on_disconnect(save_on_disconnect)
+        except Exception:
+            # No client will connect to a page that failed to build
+            admission.release(client_id)
+            raise
 
     # Serve mobile-optimized IDE on /mobile path (mobile layout: output on top, editor on bottom)
     @ui.page('/mobile', viewport='width=device-width, initial-scale=1.0')
@@ -4227,80 +4603,121 @@ def start_web_ui(port=8080):
         from src.editing.manager import ProgramManager
         from src.ast_nodes import TypeInfo
 
-        # Try to restore existing session state
-        saved_state = app.storage.client.get('session_state')
-
-        # Initialize DEF type map with all letters as SINGLE precision
-        def_type_map = {}
-        for letter in 'abcdefghijklmnopqrstuvwxyz':
-            def_type_map[letter] = TypeInfo.SINGLE
-
-        # Create new program manager for this client
-        program_manager = ProgramManager(def_type_map)
+        # Over the session limit: serve the busy page without building a backend
+        admission = get_admission_controller()
+        client_id = ui.context.client.id
+        if not admission.admit(client_id):
+            return _busy_response(admission)
 
-        # Create new backend instance
-        backend = NiceGUIBackend(None, program_manager)
+        # Hold the slot across reconnects until NiceGUI deletes the client;
+        # a page that never connects gives it back after CONNECT_TIMEOUT
+        ui.context.client.on_connect(lambda: admission.connected(client_id))
+        ui.context.client.on_delete(lambda: admission.release(client_id))
 
-        # Track IDE session start
-        tracker = get_usage_tracker()
-        if tracker:
-            try:
-                from nicegui import context
-                # Use context.client.id for session ID (not app.storage.client.id)
-                session_id = context.client.id if context.client else 'unknown'
-                user_agent = context.client.request.headers.get('user-agent') if context.client and context.client.request else None
-                # Get real client IP (handles X-Forwarded-For from nginx ingress)
-                ip = get_client_ip(context.client.request) if context.client and context.client.request else 'unknown'
-                tracker.start_ide_session(session_id, user_agent, ip)
-            except Exception as e:
-                sys.stderr.write(f"ERROR: Failed to track session start: {e}\n")
-                import traceback
-                sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                sys.stderr.flush()
-
-        # Restore state if available
-        if saved_state:
-            try:
-                backend.restore_state(saved_state)
-            except Exception as e:
-                sys.stderr.write(f"Warning: Failed to restore session state: {e}\n")
-                sys.stderr.flush()
-                # Continue with fresh state
-
-        # Build the UI for this client WITH MOBILE LAYOUT (swapped panes)
-        backend.build_ui(mobile_layout=True)
+        try:
+            # Try to restore existing session state
+            session_store = SessionStore(app.storage.client)
+            saved_state = session_store.load()
 
-        # Set up periodic state saving (every 5 seconds while connected)
-        def save_state_periodic():
-            try:
-                app.storage.client['session_state'] = backend.serialize_state()
-            except Exception as e:
-                sys.stderr.write(f"Warning: Failed to save session state: {e}\n")
-                sys.stderr.flush()
+            # Initialize DEF type map with all letters as SINGLE precision
+            def_type_map = {}
+            for letter in 'abcdefghijklmnopqrstuvwxyz':
+                def_type_map[letter] = TypeInfo.SINGLE
 
-        # Save state periodically (errors are caught and logged, won't crash the UI)
-        ui.timer(5.0, save_state_periodic)
+            # Create new program manager for this client
+            program_manager = ProgramManager(def_type_map)
 
-        # Save state on disconnect
-        def save_on_disconnect():
-            try:
-                app.storage.client['session_state'] = backend.serialize_state()
-            except Exception as e:
-                sys.stderr.write(f"Warning: Failed to save final session state: {e}\n")
-                sys.stderr.flush()
+            # Create new backend instance
+            backend = NiceGUIBackend(None, program_manager)
+            backend.session_store = session_store
 
-            # Track session end
+            # Track IDE session start
             tracker = get_usage_tracker()
             if tracker:
                 try:
                     from nicegui import context
+                    # Use context.client.id for session ID (not app.storage.client.id)
                     session_id = context.client.id if context.client else 'unknown'
-                    tracker.end_ide_session(session_id)
+                    user_agent = context.client.request.headers.get('user-agent') if context.client and context.client.request else None
+                    # Get real client IP (handles X-Forwarded-For from nginx ingress)
+                    ip = get_client_ip(context.client.request) if context.client and context.client.request else 'unknown'
+                    tracker.start_ide_session(session_id, user_agent, ip)
+                except Exception as e:
+                    sys.stderr.write(f"ERROR: Failed to track session start: {e}\n")
+                    import traceback
+                    sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
+                    sys.stderr.flush()
+
+            # Restore state if available
+            if saved_state:
+                try:
+                    backend.restore_state(saved_state)
                 except Exception as e:
-                    sys.stderr.write(f"Warning: Failed to track session end: {e}\n")
+                    sys.stderr.write(f"Warning: Failed to restore session state: {e}\n")
                     sys.stderr.flush()
+                    # Continue with fresh state
 
-        ui.context.client.on_disconnect(save_on_disconnect)
+            # Build the UI for this client WITH MOBILE LAYOUT (swapped panes)
+            backend.build_ui(mobile_layout=True)
+
+            # Set up periodic state saving (every 5 seconds while connected;
+            # only changed sections are written)
+            def save_state_periodic():
+                try:
+                    backend.save_state(session_store)
+                except Exception as e:
+                    sys.stderr.write(f"Warning: Failed to save session state: {e}\n")
+                    sys.stderr.flush()
+
+            # Save state periodically (errors are caught and logged, won't crash the UI)
+            ui.timer(5.0, save_state_periodic)
+
+            # Hibernate the session when idle (see MultiUserConfig.hibernation)
+            _start_hibernation_timer(backend)
+
+            # Save state on disconnect
+            def save_on_disconnect():
+                # Unlike a ui.timer, the scheduler does not know the client is gone
+                if backend.exec_timer:
+                    backend.exec_timer.cancel()
+                    backend.exec_timer = None
+                if backend.remote_run:
+                    backend.remote_run.stop()
+
+                try:
+                    backend.save_state(session_store, final=True)
+                except Exception as e:
+                    sys.stderr.write(f"Warning: Failed to save final session state: {e}\n")
+                    sys.stderr.flush()
+
+                # Track session end
+                tracker = get_usage_tracker()
+                if tracker:
+                    try:
+                        from nicegui import context
+                        session_id = context.client.id if context.client else 'unknown'
+                        tracker.end_ide_session(session_id)
+                    except Exception as e:
+                        sys.stderr.write(f"Warning: Failed to track session end: {e}\n")
+                        sys.stderr.flush()
+
+            ui.context.client.on_disconnect(save_on_disconnect)
+        except Exception:
+            # No client will connect to a page that failed to build
+            admission.release(client_id)
+            raise
+
+    # Per-session CPU accounting of running programs
+    @app.get('/metrics/scheduler')
+    def scheduler_metrics():
+        """Scheduler time slices and CPU seconds per running session."""
+        return get_scheduler().stats()
+
+    # Session counts, rejections and load shedding
+    @app.get('/metrics/admission')
+    def admission_metrics():
+        """Live sessions, running programs and event-loop lag of this process."""
+        return get_admission_controller().stats()
 
     # Health check endpoint for Kubernetes liveness/readiness probes
     @app.get('/health')
@@ -0,0 +1,224 @@
+"""Server-wide scheduler for running web session programs.
+
+Every web session that is running a program registers its tick callback
+here instead of owning a ui.timer. One asyncio task runs the callbacks
+round-robin, so the whole server has a single view of interpreter CPU use:
+
+- Each callback gets a time slice (passed as time_budget) and the loop
+  yields to the event loop after every slice, so user events wait at most
+  one slice.
+- The time each slice actually blocks the event loop is measured (a
+  statement or output flush can overrun the budget). When it exceeds the
+  latency target, slices shrink (halved); while below, they grow back.
+- Sessions using more than their share of recent CPU get proportionally
+  shorter slices and run after lighter sessions in each round.
+- CPU time per session is accumulated with time.perf_counter() and
+  reported by stats().
+- Under overload (see src/ui/web/admission.py) the heaviest sessions can be
+  paused with pause_heaviest() and resumed later with resume_one().
+
+The scheduler does not depend on NiceGUI; callers pass a context manager
+(the NiceGUI client) that is entered around each callback.
+"""
+
+import asyncio
+import contextlib
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class ScheduledTask:
+    """A registered tick callback; cancel() removes it (same API as ui.timer)."""
+
+    def __init__(self, scheduler, name: str, callback: Callable, context=None,
+                 on_pause: Optional[Callable[[bool], None]] = None):
+        self.scheduler = scheduler
+        self.name = name
+        self.callback = callback
+        self.context = context
+        self.on_pause = on_pause
+        self.cancelled = False
+        self.paused = False      # Skipped by the scheduler (load shedding)
+        self.paused_at = 0.0
+        self.cpu_seconds = 0.0   # Total time spent in callback
+        self.recent_cpu = 0.0    # Exponentially decayed CPU seconds per round
+        self.slices = 0
+        self.busy = False        # Used most of its last slice (CPU-bound)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self.scheduler._remove(self)
+
+
+class SessionScheduler:
+    """Round-robin scheduler with time budgets and an event-loop latency target.
+
+    Args:
+        target_latency: Event-loop latency goal in seconds (also the longest slice)
+        min_slice: Shortest slice given to a session, in seconds
+        round_interval: Pause after each full round, in seconds
+        decay: Weight of history in each session's recent CPU figure
+    """
+
+    def __init__(self, target_latency: float = 0.02, min_slice: float = 0.002,
+                 round_interval: float = 0.005, decay: float = 0.9):
+        self.target_latency = target_latency
+        self.min_slice = min_slice
+        self.round_interval = round_interval
+        self.decay = decay
+        self.slice = target_latency   # Current base slice (adapted to blocking time)
+        self.max_block = 0.0          # Longest slice in the last round
+        self.tasks: List[ScheduledTask] = []
+        self._runner: Optional[asyncio.Task] = None
+
+    def add(self, name: str, callback: Callable, context=None,
+            on_pause: Optional[Callable[[bool], None]] = None) -> ScheduledTask:
+        """Register callback(time_budget=...) to run until cancelled.
+
+        Args:
+            name: Session name used in stats()
+            callback: Called with the slice length in seconds as time_budget
+            context: Optional context manager entered around each call
+            on_pause: Optional callback(paused) told when load shedding
+                pauses or resumes the task (called inside context)
+
+        Returns:
+            ScheduledTask: Handle whose cancel() unregisters the callback
+        """
+        task = ScheduledTask(self, name, callback, context, on_pause)
+        self.tasks.append(task)
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_event_loop().create_task(self._run())
+        return task
+
+    def _remove(self, task: ScheduledTask) -> None:
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def _set_paused(self, task: ScheduledTask, paused: bool) -> None:
+        task.paused = paused
+        task.paused_at = time.monotonic()
+        if task.on_pause is not None:
+            try:
+                with (task.context if task.context is not None else contextlib.nullcontext()):
+                    task.on_pause(paused)
+            except Exception:
+                pass  # The client may be gone; the pause itself still applies
+
+    def pause_heaviest(self) -> Optional[ScheduledTask]:
+        """Pause the running CPU-bound task with the most recent CPU use.
+
+        Tasks waiting for INPUT cost almost nothing and are never paused.
+
+        Returns:
+            The paused task, or None if no task could be paused
+        """
+        candidates = [t for t in self.tasks if t.busy and not t.paused]
+        if not candidates:
+            return None
+        task = max(candidates, key=lambda t: t.recent_cpu)
+        self._set_paused(task, True)
+        return task
+
+    def resume_one(self) -> Optional[ScheduledTask]:
+        """Resume the task that has been paused longest.
+
+        Returns:
+            The resumed task, or None if no task was paused
+        """
+        paused = [t for t in self.tasks if t.paused]
+        if not paused:
+            return None
+        task = min(paused, key=lambda t: t.paused_at)
+        self._set_paused(task, False)
+        return task
+
+    def slice_for(self, task: ScheduledTask) -> float:
+        """Time budget for a task's next slice.
+
+        A task whose recent CPU is above the fair share of the CPU-bound
+        tasks gets its slice scaled down in proportion (but never below
+        min_slice). Tasks that are mostly waiting (e.g. for INPUT) do not
+        lower the fair share.
+        """
+        busy = [t for t in self.tasks if t.busy and not t.paused]
+        if len(busy) < 2 or not task.busy:
+            return self.slice
+        fair = sum(t.recent_cpu for t in busy) / len(busy)
+        if task.recent_cpu <= fair:
+            return self.slice
+        return max(self.min_slice, self.slice * fair / task.recent_cpu)
+
+    def _round_order(self) -> List[ScheduledTask]:
+        # Lighter sessions first, so heavy ones cannot delay them
+        return sorted(self.tasks, key=lambda t: t.recent_cpu)
+
+    def _run_task(self, task: ScheduledTask) -> float:
+        """Run one slice of a task; returns how long it blocked."""
+        if task.cancelled or task.paused:
+            return 0.0
+        budget = self.slice_for(task)
+        start = time.perf_counter()
+        try:
+            with (task.context if task.context is not None else contextlib.nullcontext()):
+                task.callback(time_budget=budget)
+        except Exception:
+            # A failing session must not stop the others
+            task.cancel()
+        elapsed = time.perf_counter() - start
+        task.cpu_seconds += elapsed
+        task.recent_cpu = task.recent_cpu * self.decay + elapsed
+        task.slices += 1
+        task.busy = elapsed >= budget / 2
+        return elapsed
+
+    def _adapt(self, blocked: float) -> None:
+        """Adjust the base slice to keep event-loop latency near the target."""
+        if blocked > self.target_latency:
+            self.slice = max(self.min_slice, self.slice / 2)
+        else:
+            self.slice = min(self.target_latency, self.slice * 1.25)
+
+    async def _run(self) -> None:
+        while self.tasks:
+            self.max_block = 0.0
+            for task in self._round_order():
+                blocked = self._run_task(task)
+                self.max_block = max(self.max_block, blocked)
+                self._adapt(blocked)
+                # Let pending UI events run between sessions
+                await asyncio.sleep(0)
+            await asyncio.sleep(self.round_interval)
+
+    def stats(self) -> Dict[str, object]:
+        """CPU accounting per session, for monitoring."""
+        return {
+            'target_latency_ms': self.target_latency * 1000,
+            'slice_ms': round(self.slice * 1000, 3),
+            'max_block_ms': round(self.max_block * 1000, 3),
+            'sessions': [
+                {
+                    'name': task.name,
+                    'cpu_seconds': round(task.cpu_seconds, 6),
+                    'recent_cpu_seconds': round(task.recent_cpu, 6),
+                    'slices': task.slices,
+                    'paused': task.paused,
+                    'next_slice_ms': round(self.slice_for(task) * 1000, 3),
+                }
+                for task in self.tasks
+            ],
+        }
+
+
+_scheduler: Optional[SessionScheduler] = None
+
+
+def get_scheduler() -> SessionScheduler:
+    """Get the process-wide scheduler (created on first use from MultiUserConfig)."""
+    global _scheduler
+    if _scheduler is None:
+        from src.multiuser_config import get_config
+        config = get_config().scheduler
+        _scheduler = SessionScheduler(target_latency=config.target_latency_ms / 1000,
+                                      min_slice=config.min_slice_ms / 1000)
+    return _scheduler
@@ -2,11 +2,20 @@
 
 This module provides a serializable data structure for storing web UI session state,
 enabling support for both in-memory and Redis-based session storage.
+
+State is stored in sections (see SECTION_FIELDS), each under its own storage
+key as a compressed blob. SessionStore writes only the sections the backend
+marked dirty, and skips those whose encoded contents did not change, so an
+idle session costs no storage writes.
 """
 
-from dataclasses import dataclass, field, asdict
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Iterable
+import base64
+import hashlib
 import json
+import pickle
+import zlib
 
 
 @dataclass
@@ -18,7 +27,7 @@ class SessionState:
     """
 
     # Version for future compatibility
-    version: str = "1.0"
+    version: str = "2.0"
 
     # Session identification
     session_id: str = ""
@@ -55,13 +64,20 @@ class SessionState:
     last_edited_line_index: Optional[int] = None
     last_edited_line_text: Optional[str] = None
 
+    # Sandboxed filesystem contents (filename -> content); saved when the
+    # session is hibernated and its in-process files are released
+    sandbox_files: Dict[str, Any] = field(default_factory=dict)
+
     def to_dict(self) -> dict:
         """Convert to dictionary for storage.
 
+        The conversion is shallow: runtime_state may hold PC objects (FOR loop
+        state), which must not be turned into dicts the way asdict() would.
+
         Returns:
             dict: Serializable dictionary representation
         """
-        return asdict(self)
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
 
     @classmethod
     def from_dict(cls, data: dict) -> 'SessionState':
@@ -95,3 +111,89 @@ class SessionState:
             SessionState: Restored session state
         """
         return cls.from_dict(json.loads(json_str))
+
+
+# Storage sections and the SessionState fields each one holds. Sections are
+# saved independently, so a busy output pane does not rewrite the program.
+SECTION_FIELDS = {
+    'session': ('version', 'session_id', 'recent_files', 'max_recent_files',
+                'auto_save_enabled', 'auto_save_interval', 'last_find_text',
+                'last_find_position', 'last_case_sensitive'),
+    'program': ('program_lines', 'current_file', 'last_save_content', 'editor_content',
+                'editor_cursor', 'last_edited_line_index', 'last_edited_line_text'),
+    'runtime': ('runtime_state', 'running', 'paused'),
+    'output': ('output_text',),
+    'files': ('sandbox_files',),
+}
+
+
+def encode_section(data: dict) -> str:
+    """Pickle, compress and base85-encode a section for a string-valued store."""
+    return base64.b85encode(zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))).decode('ascii')
+
+
+def decode_section(blob: str) -> dict:
+    """Inverse of encode_section()."""
+    return pickle.loads(zlib.decompress(base64.b85decode(blob)))
+
+
+class SessionStore:
+    """Section-wise, write-if-changed persistence of SessionState dicts.
+
+    storage is any mutable mapping (app.storage.client in the web UI). Section
+    blobs live under '<key>.<section>'; a single dict under <key> is the
+    pre-section format and is still accepted by load().
+    """
+
+    def __init__(self, storage, key: str = 'session_state'):
+        self.storage = storage
+        self.key = key
+        self.digests = {}  # section -> digest of the blob last written/read
+        self.writes = 0    # Sections actually written (for tests/monitoring)
+
+    def _section_key(self, section: str) -> str:
+        return f'{self.key}.{section}'
+
+    def load(self) -> Optional[dict]:
+        """Return the stored state dict (for SessionState.from_dict), or None."""
+        legacy = self.storage.get(self.key)
+        if isinstance(legacy, dict):
+            return legacy
+        state = {}
+        for section in SECTION_FIELDS:
+            blob = self.storage.get(self._section_key(section))
+            if blob is None:
+                continue
+            state.update(decode_section(blob))
+            self.digests[section] = hashlib.blake2b(blob.encode('ascii'), digest_size=16).digest()
+        return state or None
+
+    def save(self, state: dict, sections: Iterable[str] = None) -> int:
+        """Write the given sections of a state dict (default: all).
+
+        Args:
+            state: Dict with (at least) the fields of the given sections
+            sections: Section names to consider
+
+        Returns:
+            int: Number of sections written (unchanged ones are skipped)
+        """
+        written = 0
+        for section in (SECTION_FIELDS if sections is None else sections):
+            blob = encode_section({name: state[name] for name in SECTION_FIELDS[section]})
+            digest = hashlib.blake2b(blob.encode('ascii'), digest_size=16).digest()
+            if self.digests.get(section) == digest:
+                continue
+            self.storage[self._section_key(section)] = blob
+            self.digests[section] = digest
+            written += 1
+        if written and self.key in self.storage:
+            # Superseded by the section keys
+            del self.storage[self.key]
+        self.writes += written
+        return written
+
+    def discard(self, section: str) -> None:
+        """Remove a stored section; load() then leaves its fields at their defaults."""
+        self.storage.pop(self._section_key(section), None)
+        self.digests.pop(section, None)
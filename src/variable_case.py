@@ -0,0 +1,201 @@
+"""
+Variable name case-conflict resolution (settings.case_conflict).
+
+BASIC variable names are case-insensitive, but MBASIC keeps the case the
+programmer typed for display (variables window, error messages). When the
+same name is spelled several ways, the case_conflict policy picks the
+canonical spelling:
+
+- first_wins:   first spelling in program order
+- error:        any second spelling is an error (reported with line:column)
+- prefer_upper: spelling with the most uppercase letters
+- prefer_lower: spelling with the most lowercase letters
+- prefer_mixed: first mixed-case (camelCase/PascalCase) spelling
+
+The spellings of an identifier are fixed once a line has been parsed, so
+the table is built when a program is loaded (Runtime.setup()) and updated
+one line at a time as lines are edited (ProgramManager.add_line()). Variable
+access at run time only reads the resolved canonical case.
+"""
+
+from src.ast_nodes import iter_variable_nodes
+
+
+CASE_CONFLICT_POLICIES = ('first_wins', 'error', 'prefer_upper', 'prefer_lower', 'prefer_mixed')
+
+# Older settings files used these names
+_POLICY_ALIASES = {'upper': 'prefer_upper', 'lower': 'prefer_lower'}
+
+
+class CaseConflictError(RuntimeError):
+    """Raised under the 'error' policy when a variable is spelled two ways"""
+
+    def __init__(self, first, conflict):
+        first_case, first_line, first_col = first
+        case, line, col = conflict
+        super().__init__(
+            f"Variable name case conflict: '{first_case}' at line {first_line}:{first_col}"
+            f" vs '{case}' at line {line}:{col}"
+        )
+        self.line_number = line
+        self.column = col
+
+
+def line_spellings(line_node):
+    """
+    Collect the variable spellings used in one program line.
+
+    Args:
+        line_node: Parsed LineNode
+
+    Returns:
+        list of (normalized_name, original_case, column) in source order
+    """
+    spellings = []
+    for statement in line_node.statements:
+        for node in iter_variable_nodes(statement):
+            # Some statements (INPUT, READ, FOR, ...) don't record the typed
+            # spelling; they don't take part in case resolution
+            original_case = getattr(node, 'original_case', None)
+            if node.name and original_case:
+                spellings.append((node.name, original_case, getattr(node, 'column', 0)))
+    spellings.sort(key=lambda spelling: spelling[2] or 0)
+    return spellings
+
+
+def _score(policy, case):
+    if policy == 'prefer_upper':
+        return sum(1 for c in case if c.isupper())
+    if policy == 'prefer_lower':
+        return sum(1 for c in case if c.islower())
+    # prefer_mixed
+    return 1 if any(c.isupper() for c in case) and any(c.islower() for c in case) else 0
+
+
+class VariableCaseTable:
+    """Canonical display case for every variable name in a program"""
+
+    def __init__(self, policy='first_wins'):
+        self.policy = policy
+        # normalized name -> {line_number: [(case, column), ...]}
+        self._occurrences = {}
+        # line_number -> spellings on that line (see line_spellings())
+        self._lines = {}
+        # normalized name -> canonical case
+        self.canonical = {}
+
+    @property
+    def policy(self):
+        return self._policy
+
+    @policy.setter
+    def policy(self, value):
+        value = _POLICY_ALIASES.get(value, value)
+        # Unknown policy - default to first_wins
+        self._policy = value if value in CASE_CONFLICT_POLICIES else 'first_wins'
+
+    def clear(self):
+        self._occurrences.clear()
+        self._lines.clear()
+        self.canonical.clear()
+
+    def get(self, name, default=None):
+        """Canonical case for a normalized (lowercase) name"""
+        return self.canonical.get(name, default)
+
+    def build(self, line_nodes):
+        """
+        Rebuild the table for a whole program.
+
+        Args:
+            line_nodes: Iterable of LineNode
+
+        Raises:
+            CaseConflictError: Under the 'error' policy, for the first conflict
+                in program order
+        """
+        self.clear()
+        for line_node in line_nodes:
+            self._add_line(line_node.line_number, line_spellings(line_node))
+        self._resolve(list(self._occurrences))
+
+    def set_line(self, line_number, line_node):
+        """
+        Replace the spellings of one line (None deletes the line).
+
+        Under the 'error' policy a conflicting line is rejected and the table
+        is left unchanged.
+
+        Raises:
+            CaseConflictError: If the line conflicts under the 'error' policy
+        """
+        spellings = line_spellings(line_node) if line_node is not None else []
+        previous = self._lines.get(line_number, [])
+        affected = self._remove_line(line_number) | self._add_line(line_number, spellings)
+        try:
+            self._resolve(affected)
+        except CaseConflictError:
+            self._remove_line(line_number)
+            self._add_line(line_number, previous)
+            self._resolve(affected)
+            raise
+
+    def renumber(self, line_map):
+        """Move spellings to new line numbers after RENUM (old -> new)."""
+        lines = dict(self._lines)
+        self.clear()
+        for line_number in sorted(lines):
+            self._add_line(line_map.get(line_number, line_number), lines[line_number])
+        self._resolve(list(self._occurrences))
+
+    def _add_line(self, line_number, spellings):
+        names = set()
+        for name, case, column in spellings:
+            self._occurrences.setdefault(name, {}).setdefault(line_number, []).append((case, column))
+            names.add(name)
+        if spellings:
+            self._lines[line_number] = spellings
+        return names
+
+    def _remove_line(self, line_number):
+        names = {spelling[0] for spelling in self._lines.pop(line_number, [])}
+        for name in names:
+            occurrences = self._occurrences[name]
+            del occurrences[line_number]
+            if not occurrences:
+                del self._occurrences[name]
+                self.canonical.pop(name, None)
+        return names
+
+    def _variants(self, name):
+        """Distinct spellings of a name as (case, line, column), in program order"""
+        seen = set()
+        variants = []
+        occurrences = self._occurrences[name]
+        for line_number in sorted(occurrences):
+            for case, column in occurrences[line_number]:
+                if case not in seen:
+                    seen.add(case)
+                    variants.append((case, line_number, column))
+        return variants
+
+    def _resolve(self, names):
+        policy = self._policy
+        conflicts = []
+        for name in names:
+            if name not in self._occurrences:
+                continue
+            variants = self._variants(name)
+            if len(variants) == 1 or policy == 'first_wins':
+                best = variants[0]
+            elif policy == 'error':
+                conflicts.append((variants[1][1:], variants[0], variants[1]))
+                continue
+            else:
+                # max() keeps the earliest spelling on ties
+                best = max(variants, key=lambda variant: _score(policy, variant[0]))
+            self.canonical[name] = best[0]
+        if conflicts:
+            # Report the conflict that comes first in the program
+            _, first, conflict = min(conflicts, key=lambda c: c[0])
+            raise CaseConflictError(first, conflict)
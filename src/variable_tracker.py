@@ -0,0 +1,147 @@
+"""
+Variable access tracking for the variables windows.
+
+Runtime stores only variable values. Where each variable was last read or
+written is recorded by an optional observer attached to the runtime as
+runtime.variable_tracker. The Tk, curses and web variables windows attach a
+VariableTracker while they are visible; with no tracker attached, variable
+access does no bookkeeping at all.
+
+Access locations have the shape get_all_variables() has always exported:
+    {'line': int, 'position': int, 'timestamp': float}
+
+Line -1 marks accesses that did not come from program execution:
+1. System/internal variables (ERR%, ERL%) via Runtime.set_variable_raw()
+2. Debugger/interactive prompt writes via set_variable(debugger_set=True)
+
+Individual array elements are not tracked one by one (a DIM A(100,100) grid
+would need 10,000 entries); the last ELEMENT_LOG_SIZE element accesses are
+kept in a bounded log instead.
+"""
+
+import time
+from collections import deque
+
+
+# Number of array element accesses kept by VariableTracker.element_log
+ELEMENT_LOG_SIZE = 256
+
+
+class VariableTracker:
+    """Records the last read and write location of variables and arrays"""
+
+    def __init__(self):
+        # full_name -> {'last_read': location, 'last_write': location}
+        self.variables = {}
+        # full_name -> {'last_read', 'last_write', 'last_read_subscripts', 'last_write_subscripts'}
+        self.arrays = {}
+        # Most recent element accesses: (full_name, subscripts tuple, 'read'/'write', location)
+        self.element_log = deque(maxlen=ELEMENT_LOG_SIZE)
+
+    @staticmethod
+    def _location(line, position):
+        return {'line': line, 'position': position, 'timestamp': time.perf_counter()}
+
+    def clear(self):
+        """Forget all recorded accesses (RUN, NEW)."""
+        self.variables.clear()
+        self.arrays.clear()
+        self.element_log.clear()
+
+    def clear_variables(self):
+        """Forget scalar variable accesses (CLEAR)."""
+        self.variables.clear()
+
+    def clear_arrays(self):
+        """Forget array accesses (CLEAR, ERASE of all arrays)."""
+        self.arrays.clear()
+        self.element_log.clear()
+
+    # ------------------------------------------------------------------
+    # Scalar variables
+    # ------------------------------------------------------------------
+
+    def variable_read(self, full_name, line, position):
+        entry = self.variables.get(full_name)
+        if entry is None:
+            entry = self.variables[full_name] = {'last_read': None, 'last_write': None}
+        entry['last_read'] = self._location(line, position)
+
+    def variable_written(self, full_name, line, position):
+        entry = self.variables.get(full_name)
+        if entry is None:
+            entry = self.variables[full_name] = {'last_read': None, 'last_write': None}
+        entry['last_write'] = self._location(line, position)
+
+    def restore_variable(self, full_name, last_read, last_write):
+        """Restore previously exported tracking (update_variables)."""
+        self.variables[full_name] = {'last_read': last_read, 'last_write': last_write}
+
+    def get_variable(self, full_name):
+        """Return {'last_read', 'last_write'} for a variable, or None if never tracked."""
+        return self.variables.get(full_name)
+
+    # ------------------------------------------------------------------
+    # Arrays
+    # ------------------------------------------------------------------
+
+    def array_dimensioned(self, full_name, line, position):
+        """Record a DIM.
+
+        DIM is tracked as both read and write so the variables window can show
+        where an array was created even if it has never been accessed.
+        """
+        location = self._location(line, position)
+        self.arrays[full_name] = {
+            'last_read': location,
+            'last_write': location,
+            'last_read_subscripts': None,
+            'last_write_subscripts': None,
+        }
+
+    def array_erased(self, full_name):
+        """Forget an array (ERASE, or re-dimensioned without a location)."""
+        self.arrays.pop(full_name, None)
+
+    def _array_entry(self, full_name):
+        entry = self.arrays.get(full_name)
+        if entry is None:
+            entry = self.arrays[full_name] = {
+                'last_read': None,
+                'last_write': None,
+                'last_read_subscripts': None,
+                'last_write_subscripts': None,
+            }
+        return entry
+
+    def array_read(self, full_name, subscripts, line, position):
+        location = self._location(line, position)
+        entry = self._array_entry(full_name)
+        entry['last_read'] = location
+        entry['last_read_subscripts'] = subscripts = list(subscripts)
+        self.element_log.append((full_name, tuple(subscripts), 'read', location))
+
+    def array_written(self, full_name, subscripts, line, position):
+        location = self._location(line, position)
+        entry = self._array_entry(full_name)
+        entry['last_write'] = location
+        entry['last_write_subscripts'] = subscripts = list(subscripts)
+        self.element_log.append((full_name, tuple(subscripts), 'write', location))
+
+    def get_array(self, full_name):
+        """Return the array-level tracking dict, or None if never tracked."""
+        return self.arrays.get(full_name)
+
+    def get_element(self, full_name, subscripts):
+        """Return {'last_read', 'last_write'} for one element, or None if it is
+        not among the last ELEMENT_LOG_SIZE element accesses."""
+        key = (full_name, tuple(subscripts))
+        entry = None
+        for name, element, kind, location in reversed(self.element_log):
+            if (name, element) == key:
+                if entry is None:
+                    entry = {'last_read': None, 'last_write': None}
+                field = 'last_' + kind
+                if entry[field] is None:
+                    entry[field] = location
+        return entry
@@ -0,0 +1,344 @@
+"""Run BASIC programs in a pool of worker processes.
+
+The web UI can hand RUN to a worker process instead of interpreting the
+program on the event loop, so programs from different sessions use separate
+CPU cores. Each worker is a long-lived process (started with the 'spawn'
+method, so it does not inherit the server's threads and sockets) connected
+to the server by a multiprocessing Pipe. A job carries everything the
+program needs: its source lines, the session's sandboxed files and a
+snapshot of its settings. The worker parses the program (through the
+program cache), runs it and streams messages back:
+
+    ('output', text)              Program output (one message per tick)
+    ('input', prompt)             Program waits for INPUT; reply ('input', text)
+    ('state', {'line': n})        Current line, at most every STATE_INTERVAL
+    ('finished', result)          Program ended; result holds the error (or
+                                  None), final variables, arrays and files
+
+The server may send ('stop',) at any time. The server side reads the pipe
+from the asyncio event loop (loop.add_reader), so the UI never blocks on a
+worker.
+
+Programs containing STOP are not run in workers (see runs_in_worker()): only
+variables, arrays and files come back, so CONT could not resume them.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import time
+import types
+from typing import Callable, Dict, Optional
+
+from src.iohandler.base import IOHandler
+
+# Seconds between ('state', ...) messages from a running worker
+STATE_INTERVAL = 0.2
+
+
+class SettingsSnapshot:
+    """Read-only settings for a worker (SettingsManager.get() interface)."""
+
+    def __init__(self, values: Dict[str, object]):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class PipeIOHandler(IOHandler):
+    """IO handler sending program output to the server, one message per flush."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.pending = []
+
+    def output(self, text: str, end: str = '\n') -> None:
+        """Buffer output until the interpreter flushes at the end of a tick."""
+        self.pending.append(str(text) + end)
+
+    def flush(self) -> None:
+        """Send buffered output to the server."""
+        if self.pending:
+            self.conn.send(('output', ''.join(self.pending)))
+            self.pending = []
+
+    def input(self, prompt: str = '') -> str:
+        """Not used: INPUT goes through interpreter.tick()/provide_input()."""
+        return ''
+
+    def input_line(self, prompt: str = '') -> str:
+        return self.input(prompt)
+
+    def input_char(self, blocking: bool = True) -> str:
+        """INKEY$ has no keyboard in a worker."""
+        return ''
+
+    def error(self, message: str) -> None:
+        self.output(f"Error: {message}\n", end='')
+
+    def debug(self, message: str) -> None:
+        pass
+
+    def clear_screen(self) -> None:
+        pass
+
+
+def runs_in_worker(line_asts) -> bool:
+    """Whether a program (line number -> LineNode) may run in a worker.
+
+    False if it contains STOP: the position, FOR loops and GOSUB stack a
+    stopped program needs for CONT stay in the worker process.
+    """
+    from src.ast_nodes import IfStatementNode, StopStatementNode
+    pending = [stmt for line_ast in line_asts.values() for stmt in line_ast.statements]
+    while pending:
+        stmt = pending.pop()
+        if isinstance(stmt, StopStatementNode):
+            return False
+        if isinstance(stmt, IfStatementNode):
+            pending.extend(stmt.then_statements or ())
+            pending.extend(stmt.else_statements or ())
+    return True
+
+
+def _run_job(conn, job: dict) -> None:
+    """Run one program in this worker and report the result."""
+    from src.ast_nodes import TypeInfo
+    from src.editing.manager import ProgramManager
+    from src.file_io import SandboxedFileIO
+    from src.filesystem import SandboxedFileSystemProvider
+    from src.interpreter import Interpreter
+    from src.resource_limits import create_local_limits
+    from src.runtime import Runtime
+
+    settings = SettingsSnapshot(job['settings'])
+    manager = ProgramManager({letter: TypeInfo.SINGLE for letter in 'abcdefghijklmnopqrstuvwxyz'})
+    lines = job['lines']
+    line_asts = {line_num: line_ast for line_num, _, line_ast, _ in
+                 manager.parse_program_text('\n'.join(lines[n] for n in sorted(lines)))
+                 if line_ast is not None}
+
+    fs = SandboxedFileSystemProvider(job['user_id'])
+    SandboxedFileSystemProvider.clear_user_filesystem(job['user_id'])
+    fs.import_files(job['files'])
+
+    io_handler = PipeIOHandler(conn)
+    runtime = Runtime(line_asts, dict(lines))
+    interpreter = Interpreter(runtime, io_handler, limits=create_local_limits(),
+                              file_io=SandboxedFileIO(types.SimpleNamespace(sandboxed_fs=fs)),
+                              filesystem_provider=fs, settings_manager=settings)
+
+    error = None
+    stopped = False
+    try:
+        state = interpreter.start()
+        last_state = 0.0
+        while state.error_info is None:
+            if state.input_prompt is not None:
+                io_handler.flush()
+                conn.send(('input', state.input_prompt))
+                message = conn.recv()
+                if message[0] == 'stop':
+                    stopped = True
+                    break
+                interpreter.provide_input(message[1])
+            elif not runtime.pc.is_running():
+                break
+            while conn.poll():
+                if conn.recv()[0] == 'stop':
+                    stopped = True
+            if stopped:
+                break
+            state = interpreter.tick(mode='run', max_statements=1000, time_budget=0.05)
+            now = time.monotonic()
+            if now - last_state >= STATE_INTERVAL:
+                conn.send(('state', {'line': state.current_line}))
+                last_state = now
+        if state.error_info is not None:
+            error = state.error_info.error_message
+    except Exception as e:
+        error = str(e)
+    finally:
+        io_handler.flush()
+        # Sandbox files are only saved on close; the program may have left
+        # them open (in-process the next RUN or the session save closes them)
+        for file_info in runtime.files.values():
+            try:
+                file_info['handle'].close()
+            except (OSError, IOError):
+                pass
+        runtime.files.clear()
+
+    conn.send(('finished', {
+        'error': error,
+        'stopped': stopped,
+        'line': interpreter.state.current_line,
+        'variables': runtime.get_variable_state(),
+        'arrays': runtime.get_array_state(),
+        'files': fs.export_files(),
+    }))
+    SandboxedFileSystemProvider.clear_user_filesystem(job['user_id'])
+
+
+def _worker_main(conn) -> None:
+    """Worker process loop: run jobs until told to exit."""
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message[0] == 'exit':
+            return
+        if message[0] == 'run':
+            _run_job(conn, message[1])
+        # A 'stop' or 'input' arriving after the program ended is ignored
+
+
+class RemoteRun:
+    """Server-side handle for a program running in a worker process.
+
+    handlers maps message kinds ('output', 'input', 'state', 'finished') to
+    callables taking (run, payload). They run on the event loop inside the
+    optional context manager (the NiceGUI client).
+    """
+
+    def __init__(self, worker: 'Worker', handlers: Dict[str, Callable], context=None):
+        self.worker = worker
+        self.handlers = handlers
+        self.context = context
+        self.waiting_for_input = False
+        self.done = False
+        self.line = None    # Line last reported by the worker
+
+    def provide_input(self, text: str) -> None:
+        """Answer the pending INPUT request."""
+        if self.waiting_for_input:
+            self.waiting_for_input = False
+            self.worker.conn.send(('input', text))
+
+    def stop(self) -> None:
+        """Ask the worker to stop the program (it still reports 'finished')."""
+        if not self.done:
+            try:
+                self.worker.conn.send(('stop',))
+            except OSError:
+                pass  # Worker already gone; the reader reports it
+
+    def _dispatch(self, kind: str, payload) -> None:
+        if kind == 'input':
+            self.waiting_for_input = True
+        elif kind == 'state':
+            self.line = payload['line']
+        elif kind == 'finished':
+            self.done = True
+            self.line = payload['line'] or self.line
+        handler = self.handlers.get(kind)
+        if handler is not None:
+            with (self.context if self.context is not None else contextlib.nullcontext()):
+                handler(self, payload)
+
+
+class Worker:
+    """One worker process and the server end of its pipe."""
+
+    def __init__(self, pool: 'WorkerPool'):
+        self.pool = pool
+        self.conn, child_conn = pool.mp.Pipe()
+        self.process = pool.mp.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.run: Optional[RemoteRun] = None
+
+    def start(self, job: dict, handlers: Dict[str, Callable], context=None) -> RemoteRun:
+        self.run = RemoteRun(self, handlers, context)
+        asyncio.get_event_loop().add_reader(self.conn.fileno(), self._on_readable)
+        self.conn.send(('run', job))
+        return self.run
+
+    def _on_readable(self) -> None:
+        run = self.run
+        try:
+            while self.conn.poll():
+                kind, payload = self.conn.recv()
+                run._dispatch(kind, payload)
+                if kind == 'finished':
+                    self._release()
+                    return
+        except (EOFError, OSError):
+            # Worker died: report it like a program error and replace it
+            self._release(dead=True)
+            run._dispatch('finished', {'error': 'Worker process exited', 'stopped': False, 'line': None,
+                                       'variables': None, 'arrays': None, 'files': None})
+
+    def _release(self, dead: bool = False) -> None:
+        asyncio.get_event_loop().remove_reader(self.conn.fileno())
+        self.run = None
+        self.pool._release(self, dead)
+
+    def close(self) -> None:
+        try:
+            self.conn.send(('exit',))
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class WorkerPool:
+    """Fixed-size pool of worker processes, started on first use.
+
+    Args:
+        size: Number of workers (0 = one per CPU core)
+    """
+
+    def __init__(self, size: int = 0):
+        self.size = size or os.cpu_count() or 1
+        self.mp = multiprocessing.get_context('spawn')
+        self.idle = []
+        self.busy = set()
+
+    def run(self, job: dict, handlers: Dict[str, Callable], context=None) -> Optional[RemoteRun]:
+        """Start a job on an idle worker.
+
+        Returns:
+            RemoteRun, or None if every worker is busy (caller runs in-process)
+        """
+        if self.idle:
+            worker = self.idle.pop()
+        elif len(self.busy) < self.size:
+            worker = Worker(self)
+        else:
+            return None
+        self.busy.add(worker)
+        return worker.start(job, handlers, context)
+
+    def _release(self, worker: Worker, dead: bool = False) -> None:
+        self.busy.discard(worker)
+        if dead:
+            worker.close()
+        else:
+            self.idle.append(worker)
+
+    def close(self) -> None:
+        for worker in self.idle + list(self.busy):
+            worker.close()
+        self.idle = []
+        self.busy = set()
+
+
+_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> Optional[WorkerPool]:
+    """Get the process-wide worker pool, or None if it is disabled in MultiUserConfig."""
+    global _pool
+    if _pool is None:
+        from src.multiuser_config import get_config
+        config = get_config().process_pool
+        if not config.enabled:
+            return None
+        _pool = WorkerPool(config.workers)
+    return _pool
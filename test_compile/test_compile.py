@@ -28,9 +28,7 @@ import subprocess
 # Add parent directory to path to import mbasic modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.lexer import tokenize
-from src.parser import Parser
-from src.semantic_analyzer import SemanticAnalyzer
+from src.program_cache import analyze_program
 
 
 def main():
@@ -50,27 +48,14 @@ def main():
         print(f"Error reading file: {e}")
         sys.exit(1)
 
-    # Tokenize
-    print("Tokenizing...")
+    # Tokenize, parse and analyze (cached for unchanged sources)
+    print("Parsing and analyzing...")
     try:
-        tokens = tokenize(source)
-    except Exception as e:
-        print(f"Tokenization error: {e}")
-        sys.exit(1)
-
-    # Parse
-    print("Parsing...")
-    try:
-        parser = Parser(tokens)
-        program = parser.parse()
+        _, program, analyzer = analyze_program(source)
     except Exception as e:
         print(f"Parse error: {e}")
         sys.exit(1)
-
-    # Semantic analysis
-    print("Analyzing...")
-    analyzer = SemanticAnalyzer()
-    success = analyzer.analyze(program)
+    success = not analyzer.errors
 
     if not success:
         print("\nSemantic analysis failed:")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk program cache used by LOAD, CHAIN and the compilers.
+
+Entries are keyed by content and DEF type map, hits return fresh objects,
+broken entries are misses, and the least recently used entries are evicted
+when the cache grows past its size limit.
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# Add project root to path (3 levels up from tests/regression/commands/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+# Keep the global cache out of the user's cache directory
+cache_dir = tempfile.mkdtemp(prefix='mbasic_cache_test_')
+os.environ['MBASIC_CACHE_DIR'] = cache_dir
+
+from src.program_cache import ProgramCache, get_program_cache, analyze_program
+from src.editing import ProgramManager
+from src.parser import TypeInfo
+
+
+PROGRAM = """10 DEFINT I
+20 FOR I = 1 TO 3: PRINT I;: NEXT I
+30 PRINT "HELLO"
+40 PRINT (
+50 GOSUB 100
+100 RETURN
+"""
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected}, got {actual}")
+    return False
+
+
+def main():
+    ok = True
+    def_type_map = {letter: TypeInfo.SINGLE for letter in 'abcdefghijklmnopqrstuvwxyz'}
+
+    # Content addressing
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProgramCache(directory)
+        ok &= check("miss on empty cache", cache.get('lines', PROGRAM, def_type_map), None)
+        value = [1, {'a': 2}]
+        cache.put('lines', PROGRAM, def_type_map, value)
+        first = cache.get('lines', PROGRAM, def_type_map)
+        second = cache.get('lines', PROGRAM, def_type_map)
+        ok &= check("hit returns the stored value", first, value)
+        ok &= check("each hit is a fresh copy", first is not second, True)
+        other_map = dict(def_type_map, i=TypeInfo.INTEGER)
+        ok &= check("DEF type map is part of the key", cache.get('lines', PROGRAM, other_map), None)
+        ok &= check("source is part of the key", cache.get('lines', PROGRAM + ' ', def_type_map), None)
+
+        # A truncated entry is a miss and is removed
+        path = cache._path(cache.key('lines', PROGRAM, def_type_map))
+        with open(path, 'wb') as f:
+            f.write(b'\x80\x05truncated')
+        ok &= check("broken entry is a miss", cache.get('lines', PROGRAM, def_type_map), None)
+        ok &= check("broken entry removed", path.exists(), False)
+
+    # LRU eviction
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProgramCache(directory, max_bytes=3000)
+        for n in range(3):
+            cache.put('lines', f'program {n}', None, 'x' * 800)
+            time.sleep(0.01)
+        cache.get('lines', 'program 0', None)  # Now the most recently used
+        time.sleep(0.01)
+        cache.put('lines', 'program 3', None, 'x' * 800)
+        present = [cache.get('lines', f'program {n}', None) is not None for n in range(4)]
+        ok &= check("least recently used entries evicted", present, [True, False, False, True])
+
+    # LOAD through ProgramManager: second load comes from the cache
+    cache = get_program_cache()
+    with tempfile.NamedTemporaryFile('w', suffix='.bas', delete=False) as f:
+        f.write(PROGRAM)
+        filename = f.name
+    try:
+        manager = ProgramManager(dict(def_type_map))
+        first_result = manager.load_from_file(filename)
+        first_lines = manager.get_lines()
+        hits = cache.hits
+        manager = ProgramManager(dict(def_type_map))
+        second_result = manager.load_from_file(filename)
+        ok &= check("second LOAD is a cache hit", cache.hits, hits + 1)
+        ok &= check("same lines after cached LOAD", manager.get_lines(), first_lines)
+        ok &= check("same errors after cached LOAD", second_result, first_result)
+        ok &= check("syntax error reported", [line for line, _ in second_result[1]], [40])
+        ok &= check("DEFINT applied", manager.line_asts[20].statements[0].variable.type_suffix, '%')
+        ok &= check("DEFINT carried to later edits", manager.def_type_map['i'], TypeInfo.INTEGER)
+    finally:
+        os.unlink(filename)
+
+    # Compiler analysis
+    program, analyzed, analyzer = analyze_program("10 DEF FNA(X) = X * 2\n20 PRINT FNA(3)\n")
+    hits = cache.hits
+    program2, analyzed2, analyzer2 = analyze_program("10 DEF FNA(X) = X * 2\n20 PRINT FNA(3)\n")
+    ok &= check("analysis cached", cache.hits, hits + 1)
+    ok &= check("cached symbols", sorted(analyzer2.symbols.functions), sorted(analyzer.symbols.functions))
+    ok &= check("cached ASTs", (len(program2.lines), len(analyzed2.lines)), (2, 2))
+
+    if ok:
+        print("\n✅ All program cache tests passed")
+        return 0
+    print("\n❌ Program cache tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    finally:
+        import shutil
+        shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test LOAD and SAVE of MBASIC tokenized (binary) program files.
+
+Hand-assembled token streams in the style of real MBASIC files must decode
+to parseable text, and SAVE without ,A followed by LOAD must reproduce the
+program text exactly.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add project root to path (3 levels up from tests/regression/commands/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+# Keep the program cache out of the user's cache directory
+os.environ['MBASIC_CACHE_DIR'] = tempfile.mkdtemp(prefix='mbasic_cache_test_')
+
+from src.tokenized_program import (decode_line, decode_program, encode_program,
+                                   mbf_to_float, float_to_mbf)
+from src.editing import ProgramManager
+from src.parser import TypeInfo
+
+
+PROGRAM = [
+    '10 REM tokenized round trip',
+    '20 DEFINT I: DIM A(10), B$(3)',
+    '30 FOR I = 1 TO 10 STEP 2: A(I) = I * 1.5 + 0.5 - .25: NEXT I',
+    '40 IF A(3) > 4 THEN 60 ELSE PRINT "no": GOTO 70',
+    '50 PRINT LEFT$("HELLO", 2); TAB(5); INPUT$(1); CHR$(65)',
+    "60 ON I GOSUB 100, 200 ' comment",
+    '70 DATA 1, "a:b", hello: PRINT &HFF; &O17; 1E+20; 3.14159265358979; 5#; 40000',
+    '80 X = FNA(2) AND NOT Y OR 3 MOD 2 \\ 1 ^ 2: print lower',
+    '100 RETURN',
+    '200 RESUME NEXT',
+]
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def main():
+    ok = True
+
+    # Microsoft Binary Format
+    ok &= check("MBF single 1.5", mbf_to_float(bytes([0x00, 0x00, 0x40, 0x81])), 1.5)
+    ok &= check("MBF single -0.25", mbf_to_float(bytes([0x00, 0x00, 0x80, 0x7F])), -0.25)
+    ok &= check("MBF zero exponent", mbf_to_float(bytes([0x12, 0x34, 0x56, 0x00])), 0.0)
+    ok &= check("MBF double round trip", mbf_to_float(float_to_mbf(0.1, 8)), 0.1)
+
+    # Crunched line as MBASIC stores it: FORI=1TO10:PRINTI;:NEXT:REM' done
+    line = (b'\x82I\xf0\x12\xce\x0f\x0a:\x91I;:\x83:\x8f\xdb done\x00')
+    ok &= check("crunched keywords spaced", decode_line(line)[0], "FOR I=1 TO 10:PRINT I;:NEXT' done")
+    line = (b'\x8b A\xef\x1d\x00\x00\x40\x81 \xcf\x0e\x10\x27:\xa2\x91 "X":\x84 1,2:\x91 \xff\x96(65)\x00')
+    ok &= check("constants, ELSE, DATA and functions", decode_line(line)[0],
+                'IF A>1.5 THEN 10000 ELSE PRINT "X":DATA 1,2:PRINT CHR$(65)')
+
+    # Line number bytes may be 0x00; lines must not end there
+    data = encode_program(['256 GOTO 256'])
+    ok &= check("0x00 inside a constant", decode_program(data), '256 GOTO 256\n')
+
+    # Encode/decode reproduces the text
+    data = encode_program(PROGRAM)
+    ok &= check("round trip", decode_program(data).splitlines(), PROGRAM)
+    ok &= check("tokenized file is smaller", len(data) < sum(len(line) + 1 for line in PROGRAM), True)
+
+    # Control characters in strings, REM and DATA are stored as they are
+    lines = ['10 PRINT "DING\x07"; CHR$(7)', '20 REM \x1b[2J', "30 DATA \x07: X = 1 ' \x08"]
+    ok &= check("control characters kept", decode_program(encode_program(lines)).splitlines(), lines)
+
+    def_type_map = {letter: TypeInfo.SINGLE for letter in 'abcdefghijklmnopqrstuvwxyz'}
+    with tempfile.TemporaryDirectory() as directory:
+        text_file = os.path.join(directory, 'text.bas')
+        binary_file = os.path.join(directory, 'binary.bas')
+        with open(text_file, 'w') as f:
+            f.write('\n'.join(PROGRAM) + '\n')
+
+        manager = ProgramManager(dict(def_type_map))
+        manager.load_from_file(text_file)
+        manager.save_to_file(binary_file, tokenized=True)
+        with open(binary_file, 'rb') as f:
+            ok &= check("SAVE writes tokenized file", f.read(1), b'\xff')
+
+        loaded = ProgramManager(dict(def_type_map))
+        success, errors = loaded.load_from_file(binary_file)
+        ok &= check("LOAD of tokenized file", (success, errors), (True, []))
+        ok &= check("same lines", loaded.get_lines(), manager.get_lines())
+        ok &= check("lines parsed", sorted(loaded.line_asts), sorted(manager.line_asts))
+        ok &= check("DEFINT applied", loaded.def_type_map['i'], TypeInfo.INTEGER)
+
+        # MERGE needs an ASCII file
+        try:
+            loaded.merge_from_file(binary_file)
+            ok &= check("MERGE of tokenized file rejected", None, "Bad file mode")
+        except RuntimeError as e:
+            ok &= check("MERGE of tokenized file rejected", str(e), "Bad file mode")
+
+        # A damaged file leaves the program in memory alone
+        with open(binary_file, 'wb') as f:
+            f.write(b'\xff\x10\x00\x0a\x00\x1f\x00\x00')
+        try:
+            loaded.load_from_file(binary_file)
+            ok &= check("truncated file rejected", None, "Bad file mode")
+        except RuntimeError as e:
+            ok &= check("truncated file rejected", str(e), "Bad file mode")
+        ok &= check("program kept after failed LOAD", len(loaded.get_lines()), len(PROGRAM))
+
+    if ok:
+        print("\n✅ All tokenized program tests passed")
+        return 0
+    print("\n❌ Tokenized program tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    finally:
+        import shutil
+        shutil.rmtree(os.environ['MBASIC_CACHE_DIR'], ignore_errors=True)
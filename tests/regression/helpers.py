@@ -0,0 +1,93 @@
+"""
+Helpers shared by the regression test scripts.
+
+Test scripts put the project root on sys.path and import from here:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+    from tests.regression.helpers import CaptureIOHandler, check, parse, load_program, run_program
+"""
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.runtime import Runtime
+from src.interpreter import Interpreter
+from src.iohandler.base import IOHandler
+from src.resource_limits import create_unlimited_limits
+
+
+class CaptureIOHandler(IOHandler):
+    """IO handler that records all output.
+
+    With a list of inputs, INPUT echoes its prompt and takes the next entry,
+    raising EOFError when the list is used up; without one it returns ''.
+    """
+
+    def __init__(self, inputs=None):
+        self.lines = []
+        self.inputs = None if inputs is None else list(inputs)
+
+    @property
+    def text(self):
+        return ''.join(self.lines)
+
+    def output(self, text, end='\n'):
+        self.lines.append(str(text) + end)
+
+    def input(self, prompt=''):
+        if self.inputs is None:
+            return ''
+        if prompt:
+            self.output(prompt, end='')
+        if not self.inputs:
+            raise EOFError()
+        return self.inputs.pop(0)
+
+    def input_line(self, prompt=''):
+        return self.input(prompt)
+
+    def input_char(self, blocking=True):
+        return ''
+
+    def clear_screen(self):
+        pass
+
+    def error(self, message):
+        self.lines.append(message + '\n')
+
+    def debug(self, message):
+        pass
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+def load_program(source, io_handler=None, limits=None, **interpreter_args):
+    """Parse a program and create its runtime and interpreter (not started).
+
+    Returns:
+        (runtime, interpreter, io_handler); io_handler defaults to a new
+        CaptureIOHandler and limits to unlimited
+    """
+    ast = parse(source)
+    runtime = Runtime({line.line_number: line for line in ast.lines})
+    if io_handler is None:
+        io_handler = CaptureIOHandler()
+    interp = Interpreter(runtime, io_handler, limits=limits or create_unlimited_limits(),
+                         **interpreter_args)
+    return runtime, interp, io_handler
+
+
+def run_program(source, **kwargs):
+    """Run a program with interpreter.run() and return its captured output."""
+    _, interp, io_handler = load_program(source, **kwargs)
+    interp.run()
+    return io_handler.text
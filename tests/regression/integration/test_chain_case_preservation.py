@@ -35,7 +35,7 @@ def test_update_variables_preserves_case():
     runtime1.set_variable('message', '$', 'Hello', token=token3, original_case='MESSAGE', settings_manager=settings)
 
     print(f"  Original runtime variables:")
-    for name, var_entry in runtime1._variables.items():
+    for name, var_entry in runtime1.get_variable_state().items():
         print(f"    {name}: value={var_entry['value']}, original_case={var_entry.get('original_case')}")
 
     # Get all variables (simulating CHAIN ALL)
@@ -52,26 +52,27 @@ def test_update_variables_preserves_case():
     runtime2.update_variables(variables)
 
     print(f"\n  Restored runtime variables:")
-    for name, var_entry in runtime2._variables.items():
+    restored = runtime2.get_variable_state()
+    for name, var_entry in restored.items():
         print(f"    {name}: value={var_entry['value']}, original_case={var_entry.get('original_case')}")
 
     # Verify original_case was preserved
-    assert 'myvar!' in runtime2._variables, "myvar! not found"
-    assert runtime2._variables['myvar!']['original_case'] == 'MyVar', \
-        f"Expected 'MyVar', got '{runtime2._variables['myvar!']['original_case']}'"
+    assert 'myvar!' in restored, "myvar! not found"
+    assert restored['myvar!']['original_case'] == 'MyVar', \
+        f"Expected 'MyVar', got '{restored['myvar!']['original_case']}'"
 
-    assert 'counter%' in runtime2._variables, "counter% not found"
-    assert runtime2._variables['counter%']['original_case'] == 'Counter', \
-        f"Expected 'Counter', got '{runtime2._variables['counter%']['original_case']}'"
+    assert 'counter%' in restored, "counter% not found"
+    assert restored['counter%']['original_case'] == 'Counter', \
+        f"Expected 'Counter', got '{restored['counter%']['original_case']}'"
 
-    assert 'message$' in runtime2._variables, "message$ not found"
-    assert runtime2._variables['message$']['original_case'] == 'MESSAGE', \
-        f"Expected 'MESSAGE', got '{runtime2._variables['message$']['original_case']}'"
+    assert 'message$' in restored, "message$ not found"
+    assert restored['message$']['original_case'] == 'MESSAGE', \
+        f"Expected 'MESSAGE', got '{restored['message$']['original_case']}'"
 
     # Verify values were preserved
-    assert runtime2._variables['myvar!']['value'] == 100
-    assert runtime2._variables['counter%']['value'] == 42
-    assert runtime2._variables['message$']['value'] == 'Hello'
+    assert restored['myvar!']['value'] == 100
+    assert restored['counter%']['value'] == 42
+    assert restored['message$']['value'] == 'Hello'
 
     print("\n  ✓ All original_case values preserved correctly!")
     print("  ✓ All variable values preserved correctly!")
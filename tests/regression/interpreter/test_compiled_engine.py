@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the closure-compiled execution engine.
+
+Runs the same programs with engine='ast' and engine='compiled' and checks
+that output, variables and errors are identical.
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from tests.regression.helpers import load_program
+
+
+PROGRAMS = {
+    'arithmetic': """
+10 A = 7: B% = 3: C# = 1.5
+20 PRINT A + B%, A - B%, A * C#, A / 2, A \\ 2, A ^ 2, A MOD 3
+30 PRINT A = 7, A <> 7, A < B%, A > B%, A <= 7, A >= 8
+40 PRINT NOT 0, -A, +A, 5 AND 3, 5 OR 3, 5 XOR 3, 5 EQV 3, 5 IMP 3
+50 X% = 7.9: PRINT X%
+""",
+    'strings': """
+10 A$ = "HELLO": B$ = A$ + ", WORLD"
+20 PRINT B$; LEN(B$); LEFT$(B$, 3); MID$(B$, 2, 3); CHR$(65)
+30 IF A$ = "HELLO" THEN PRINT "EQUAL" ELSE PRINT "DIFFERENT"
+""",
+    'control': """
+10 DIM T(10)
+20 FOR I = 1 TO 10: T(I) = I * I: NEXT I
+30 S = 0: I = 1
+40 IF I > 10 THEN 70
+50 S = S + T(I): I = I + 1
+60 GOTO 40
+70 PRINT "SUM"; S
+80 DEF FNSQ(X) = X * X
+90 PRINT FNSQ(12); X
+100 ON 2 GOSUB 200, 300
+110 END
+200 PRINT "ONE": RETURN
+300 PRINT "TWO": RETURN
+""",
+    'error': """
+10 ON ERROR GOTO 100
+20 PRINT 1 / 0
+30 PRINT "NOT REACHED"
+100 PRINT "ERR"; ERR; "AT"; ERL
+""",
+    'string_limit': """
+10 Z$ = STRING$(200, "X") + STRING$(100, "Y")
+""",
+}
+
+
+def run_program(source, engine):
+    """Run a program to completion and return (output, variables, error)"""
+    runtime, interp, io = load_program(source, engine=engine)
+    state = interp.start()
+    error = None
+    try:
+        while runtime.pc.is_running() and not state.error_info:
+            state = interp.tick(mode='run', max_statements=100)
+    except RuntimeError as e:
+        # Unhandled BASIC errors propagate out of tick()
+        error = str(e)
+    interp._restore_break_handler()
+
+    variables = sorted(
+        (v['name'], v['type_suffix'], repr(v.get('value')))
+        for v in runtime.get_all_variables()
+    )
+    return io.text, variables, error
+
+
+def main():
+    failed = 0
+    for name, source in PROGRAMS.items():
+        expected = run_program(source, 'ast')
+        actual = run_program(source, 'compiled')
+        if expected == actual:
+            print(f"✓ {name}: compiled engine matches AST engine")
+        else:
+            failed += 1
+            print(f"❌ {name}: compiled engine differs")
+            print(f"   ast:      {expected}")
+            print(f"   compiled: {actual}")
+
+    if failed:
+        print(f"\n❌ {failed} program(s) differ")
+        return 1
+    print("\n✅ All programs produce identical results")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test the buffered console output of ConsoleIOHandler.
+
+Output is collected and written in blocks (by line count and age on a
+terminal, by size when piped), but always before input and whenever the
+interpreter finishes a tick. The tracked cursor column keeps POS, TAB and
+the print zones right across PRINT statements ending in ; or ,.
+"""
+
+import sys
+import os
+import io
+import gc
+import weakref
+import contextlib
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.runtime import Runtime
+from src.interpreter import Interpreter
+from src.resource_limits import create_unlimited_limits
+from src.iohandler import console
+from src.iohandler.console import ConsoleIOHandler
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts writes and can pretend to be a terminal"""
+
+    def __init__(self, tty=False):
+        super().__init__()
+        self.tty = tty
+        self.writes = 0
+
+    def isatty(self):
+        return self.tty
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def run(source, stream):
+    ast = Parser(Lexer(source).tokenize()).parse()
+    runtime = Runtime({line.line_number: line for line in ast.lines})
+    interp = Interpreter(runtime, ConsoleIOHandler(stream=stream), limits=create_unlimited_limits())
+    interp.run()
+    return stream.getvalue()
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def main():
+    ok = True
+
+    # Piped: fully buffered until BUFFER_SIZE
+    stream = CountingStream()
+    handler = ConsoleIOHandler(stream=stream)
+    for n in range(1000):
+        handler.output(f"line {n}")
+    ok &= check("piped output buffered", stream.writes, 0)
+    handler.output('x' * console.BUFFER_SIZE)
+    ok &= check("written when buffer is full", stream.writes, 1)
+    handler.output("tail", end='')
+    handler.flush()
+    ok &= check("flush writes the rest", (stream.writes, stream.getvalue().endswith('x\ntail')), (2, True))
+    ok &= check("column tracked", handler.get_cursor_position(), (1, 5))
+
+    # Terminal: written every LINE_THRESHOLD lines
+    stream = CountingStream(tty=True)
+    handler = ConsoleIOHandler(stream=stream)
+    for n in range(console.LINE_THRESHOLD * 3):
+        handler.output(f"line {n}")
+    ok &= check("terminal output in blocks of lines", stream.writes, 3)
+
+    # Output is written before an error message
+    stream = CountingStream()
+    handler = ConsoleIOHandler(stream=stream)
+    handler.output("before error")
+    stderr, sys.stderr = sys.stderr, io.StringIO()
+    try:
+        handler.error("oops")
+    finally:
+        sys.stderr = stderr
+    ok &= check("flushed before error", stream.getvalue(), "before error\n")
+
+    # Interpreter: every tick ends with the output written
+    stream = CountingStream()
+    output = run('''
+10 PRINT "AB";
+20 PRINT TAB(5); "X";
+30 PRINT POS(0)
+40 PRINT "12345678901234567",
+50 PRINT 2
+60 FOR I = 1 TO 3: PRINT "*";: NEXT I: PRINT POS(0)
+70 PRINT SPC(3); "Y",: PRINT "Z"
+''', stream)
+    ok &= check("TAB, POS and zones across PRINTs", output,
+                'AB  X6\n12345678901234567            2 \n***4\n   Y          Z\n')
+    ok &= check("one write for the whole program", stream.writes, 1)
+
+    # Pending output is flushed at exit without keeping handlers alive
+    stream = CountingStream()
+    handler = ConsoleIOHandler(stream=stream)
+    handler.output("BYE")
+    console._flush_handlers()
+    ok &= check("exit hook flushes live handlers", stream.getvalue(), 'BYE\n')
+    ref = weakref.ref(handler)
+    del handler
+    gc.collect()
+    ok &= check("deleted handler collected", ref(), None)
+
+    # A handler collected with output pending writes it out
+    stream = CountingStream()
+    handler = ConsoleIOHandler(stream=stream)
+    handler.output("LAST")
+    del handler
+    gc.collect()
+    ok &= check("collected handler writes pending output", stream.getvalue(), 'LAST\n')
+
+    # Command messages print()ed while a program runs come after its output
+    # (InteractiveMode imports modules relative to src/, like mbasic does)
+    sys.path.insert(1, os.path.join(os.path.dirname(__file__), '../../../src'))
+    from src.interactive import InteractiveMode
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        mode = InteractiveMode(ConsoleIOHandler())
+        mode.process_line('10 PRINT "BEFORE"')
+        mode.process_line('20 LOAD "/nonexistent/missing"')
+        mode.cmd_run()
+    ok &= check("program output before command messages", stdout.getvalue(),
+                'BEFORE\n?File not found: /nonexistent/missing.bas\n')
+
+    if ok:
+        print("\n✅ All console output tests passed")
+        return 0
+    print("\n❌ Console output tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
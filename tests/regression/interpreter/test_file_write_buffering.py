@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test write-back buffering of PRINT#, WRITE# and PUT.
+
+Output files are written to disk in large blocks instead of once per
+statement. Nothing may be lost: the buffer is written out when the program
+stops (END, STOP, an error or running off the end), on CLOSE and CLEAR, and
+before a GET reads a record that a PUT has just written.
+"""
+
+import sys
+import os
+import io
+import tempfile
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.filesystem import WriteBufferedHandle
+from src.filesystem.real_fs import RealFileHandle
+from tests.regression.helpers import check, run_program
+
+
+class CountingHandle(RealFileHandle):
+    """RealFileHandle that counts write calls"""
+
+    def __init__(self, file_obj, binary=False):
+        super().__init__(file_obj, binary)
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+def read_file(filename):
+    with open(filename, 'rb') as f:
+        return f.read()
+
+
+def main():
+    ok = True
+
+    # Handle level: writes are collected, then passed on in one call
+    raw = CountingHandle(io.StringIO())
+    handle = WriteBufferedHandle(raw, buffer_size=1000)
+    for n in range(100):
+        handle.write(f'{n:5d}\n')
+    ok &= check("writes collected below buffer size", raw.writes, 0)
+    handle.write('x' * 400)
+    ok &= check("buffer written out when full", raw.writes, 1)
+    handle.flush()
+    ok &= check("all data written", raw.file_obj.getvalue(),
+                ''.join(f'{n:5d}\n' for n in range(100)) + 'x' * 400)
+
+    raw = CountingHandle(io.StringIO())
+    handle = WriteBufferedHandle(raw, durable=True)
+    handle.write('a')
+    handle.write('b')
+    ok &= check("durable mode writes through", (raw.writes, raw.file_obj.getvalue()), (2, 'ab'))
+
+    # Consecutive records stay buffered; a seek elsewhere or a read writes them out
+    raw = CountingHandle(io.BytesIO(), binary=True)
+    handle = WriteBufferedHandle(raw)
+    for n in range(10):
+        handle.seek(n * 4)
+        handle.write(b'%04d' % n)
+    ok &= check("sequential PUTs buffered", raw.writes, 0)
+    handle.seek(8)
+    ok &= check("read after write sees the record", handle.read(4), b'0002')
+    ok &= check("one write for ten records", raw.writes, 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'OUT.TXT')
+
+        # END without CLOSE
+        run_program(f'''
+10 OPEN "O", #1, "{filename}"
+20 FOR I = 1 TO 500: PRINT #1, I: NEXT I
+30 WRITE #1, "DONE", 1
+40 END
+''')
+        data = read_file(filename)
+        ok &= check("END writes out unclosed file", (data.count(b'\n'), data.endswith(b'"DONE",1\n')), (501, True))
+
+        # Running off the end and stopping on an error
+        run_program(f'''
+10 OPEN "A", #1, "{filename}"
+20 PRINT #1, "APPENDED"
+''')
+        ok &= check("end of program writes out file", read_file(filename).endswith(b'APPENDED\n'), True)
+        try:
+            run_program(f'''
+10 OPEN "O", #1, "{filename}"
+20 PRINT #1, "BEFORE ERROR"
+30 ERROR 200
+''')
+        except RuntimeError:
+            pass
+        ok &= check("error stop writes out file", read_file(filename), b'BEFORE ERROR\n')
+
+        # CLEAR closes (and writes out) open files
+        output = run_program(f'''
+10 OPEN "O", #1, "{filename}"
+20 PRINT #1, "CLEARED"
+30 CLEAR
+40 OPEN "I", #1, "{filename}"
+50 LINE INPUT #1, L$: PRINT L$
+60 CLOSE
+''')
+        ok &= check("CLEAR writes out file", output, 'CLEARED\n')
+
+        # Random file: GET after PUT, and the records on disk
+        random_file = os.path.join(directory, 'RANDOM.DAT')
+        output = run_program(f'''
+10 OPEN "R", #1, "{random_file}", 8
+20 FIELD #1, 8 AS R$
+30 FOR I = 1 TO 20: LSET R$ = "REC " + CHR$(64 + I): PUT #1, I: NEXT I
+40 GET #1, 7: PRINT R$
+50 LSET R$ = "CHANGED": PUT #1, 3
+60 GET #1, 3: PRINT R$
+70 PRINT LOF(1)
+80 CLOSE #1
+''')
+        ok &= check("GET after PUT", output, 'REC G   \nCHANGED \n160\n')
+        data = read_file(random_file)
+        ok &= check("random records on disk", (data[16:24], data[152:160]), (b'CHANGED ', b'REC T   '))
+
+    if ok:
+        print("\n✅ All file write buffering tests passed")
+        return 0
+    print("\n❌ File write buffering tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test FOR/NEXT loop linkage.
+
+NEXT jumps to the loop body resolved when FOR executed; the link is
+re-validated only after the program is edited. Also covers NEXT without
+a variable, which is paired with its FOR when the plan is built.
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from tests.regression.helpers import parse, load_program
+
+
+def start(source):
+    runtime, interp, io = load_program(source)
+    interp.start()
+    return runtime, interp, io
+
+
+def run_to_end(runtime, interp):
+    state = interp.state
+    while runtime.pc.is_running() and not state.error_info:
+        state = interp.tick(mode='run', max_statements=100)
+    interp._restore_break_handler()
+
+
+def main():
+    ok = True
+
+    # NEXT without variable closes the innermost FOR
+    runtime, interp, io = start("""
+10 FOR I = 1 TO 2: FOR J = 1 TO 3: C = C + 1: NEXT: NEXT
+20 PRINT C
+""")
+    run_to_end(runtime, interp)
+    output = ''.join(io.lines)
+    if output.split() == ['6']:
+        print("✓ NEXT without variable pairs with innermost FOR")
+    else:
+        print(f"❌ NEXT without variable: got {output!r}")
+        ok = False
+
+    # Edit the program while paused inside a loop: NEXT must follow the new body
+    runtime, interp, io = start("""
+10 FOR I = 1 TO 3
+20 PRINT "OLD"; I
+30 NEXT I
+""")
+    interp.tick(mode='run', max_statements=3)  # FOR, PRINT, NEXT -> back at line 20
+    runtime.statement_table.replace_line(20, parse('20 PRINT "NEW"; I').lines[0])
+    run_to_end(runtime, interp)
+    output = ''.join(io.lines)
+    if output.split() == ['OLD', '1', 'NEW', '2', 'NEW', '3']:
+        print("✓ Loop body re-resolved after edit")
+    else:
+        print(f"❌ Loop body after edit: got {output!r}")
+        ok = False
+
+    # Deleting the FOR line while the loop is active is reported at NEXT
+    runtime, interp, io = start("""
+10 FOR I = 1 TO 3
+20 PRINT I
+30 NEXT I
+""")
+    interp.tick(mode='run', max_statements=2)
+    runtime.statement_table.delete_line(10)
+    try:
+        run_to_end(runtime, interp)
+        error = None
+    except RuntimeError as e:
+        error = str(e)
+    if error and 'no longer exists' in error:
+        print("✓ Deleted FOR line detected at NEXT")
+    else:
+        print(f"❌ Deleted FOR line: expected error, got {error!r}")
+        ok = False
+
+    if ok:
+        print("\n✅ All FOR/NEXT linkage tests passed")
+        return 0
+    print("\n❌ FOR/NEXT linkage tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
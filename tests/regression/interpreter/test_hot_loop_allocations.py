@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test that the interpreter's hot loop does not allocate per statement.
+
+Once a program has warmed up, running more statements must not grow traced
+memory: PCs come from the statement table, token info is kept on the AST
+nodes, and debug messages are not formatted in run mode. Python still
+creates transient numbers, so the check is that nothing accumulates and the
+peak stays a small constant, independent of the number of statements run.
+"""
+
+import sys
+import os
+import gc
+import tracemalloc
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.runtime import Runtime
+from src.interpreter import Interpreter
+from src.iohandler.base import IOHandler
+from src.resource_limits import create_unlimited_limits
+
+
+class NullIOHandler(IOHandler):
+    """IO handler that discards all output"""
+
+    def output(self, text, end='\n'):
+        pass
+
+    def input(self, prompt=''):
+        return ''
+
+    def input_line(self, prompt=''):
+        return ''
+
+    def input_char(self, blocking=True):
+        return ''
+
+    def clear_screen(self):
+        pass
+
+    def error(self, message):
+        pass
+
+    def debug(self, message):
+        pass
+
+
+# FOR/NEXT (with and without variable), WHILE/WEND, GOSUB/RETURN, IF/GOTO and arrays
+PROGRAM = """
+10 DIM A(10)
+20 K = 0
+30 FOR I = 1 TO 10: A(I) = A(I) + I: NEXT I
+40 FOR J = 1 TO 2: NEXT
+50 J = 0: WHILE J < 3: J = J + 1: WEND
+60 GOSUB 100
+70 K = K + 1: IF K < 1E9 THEN 30
+80 END
+100 X = X + 1: RETURN
+"""
+
+# Bytes allowed to stay allocated / to be in use at once while running
+MAX_GROWTH = 4096
+MAX_PEAK = 8192
+
+
+def measure(engine, ticks):
+    ast = Parser(Lexer(PROGRAM).tokenize()).parse()
+    runtime = Runtime({line.line_number: line for line in ast.lines})
+    interp = Interpreter(runtime, NullIOHandler(), limits=create_unlimited_limits(), engine=engine)
+    interp.start()
+    for _ in range(20):
+        interp.tick(mode='run', max_statements=1000)
+
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(ticks):
+            interp.tick(mode='run', max_statements=1000)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+        interp._restore_break_handler()
+    return after - before, peak - before
+
+
+def main():
+    ok = True
+
+    for engine in ('ast', 'compiled'):
+        growth, peak = measure(engine, 20)
+        if growth <= MAX_GROWTH and peak <= MAX_PEAK:
+            print(f"✓ {engine}: 20000 statements, growth {growth} B, peak {peak} B")
+        else:
+            print(f"❌ {engine}: 20000 statements, growth {growth} B, peak {peak} B "
+                  f"(limits {MAX_GROWTH} B / {MAX_PEAK} B)")
+            ok = False
+
+    if ok:
+        print("\n✅ Hot loop allocation tests passed")
+        return 0
+    print("\n❌ Hot loop allocation tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
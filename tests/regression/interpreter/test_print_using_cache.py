@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the PRINT USING formatter cache and compiled numeric fields.
+
+Compiled numeric fields must format exactly like format_numeric_field() for
+every kind of mask (#, ., comma, $$, **, **$, ^^^^, leading +, trailing +
+and -). Formatters are shared per format string, and constant masks are
+parsed when the program is set up.
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.basic_builtins import UsingFormatter, get_using_formatter
+from tests.regression.helpers import check, load_program
+
+
+MASKS = ['#', '###', '##.##', '.##', '#,###', '#,###.##', '$$###.##', '**####', '**$###.##',
+         '+###.#', '###.#+', '###.#-', '+$$#,###.##', '**###-', '##.##^^^^', '+.##^^^^', '#.#^^^^-',
+         '+##-', '+###.#+', '+$$##.##-', '+.-###-', 'X+#-#']
+VALUES = [0, 1, -1, 0.5, -0.5, -0.001, 0.004, 3.14159, -3.14159, 12.345, 999.995, -999.995,
+          1234, -1234.5, 98765.4321, 1e10, -2.5e-7, 7, 100000]
+
+
+def main():
+    ok = True
+
+    # Compiled fields match the generic formatter
+    mismatches = []
+    for mask in MASKS:
+        formatter = UsingFormatter(mask)
+        numeric = [spec for field_type, spec in formatter.fields if field_type == 'numeric']
+        compiled = [item for field_type, item in formatter.compiled if field_type == 'numeric']
+        for spec, format_field in zip(numeric, compiled):
+            for value in VALUES:
+                expected = formatter.format_numeric_field(value, spec)
+                if format_field(value) != expected:
+                    mismatches.append((mask, value, format_field(value), expected))
+    ok &= check("compiled numeric fields match format_numeric_field", mismatches, [])
+
+    formatter = UsingFormatter('Name: \\   \\ Qty ### Cost $$#,###.## _#!')
+    ok &= check("literals merged", [field_type for field_type, _ in formatter.compiled],
+                ['literal', 'string', 'literal', 'numeric', 'literal', 'numeric', 'literal', 'string'])
+    ok &= check("mixed mask", formatter.format_values(['WIDGETS', 12, 1234.5, 'yes']),
+                'Name: WIDGE Qty  12 Cost  $1,234.50 #y')
+    ok &= check("leading + with a trailing sign", UsingFormatter('+##-|').format_values([5]), ' +5 |')
+    ok &= check("missing values leave fields empty", formatter.format_values(['AB']), 'Name: AB    Qty  Cost  #')
+
+    # One shared formatter per format string
+    ok &= check("formatter cached", get_using_formatter('##.#') is get_using_formatter('##.#'), True)
+
+    # Constant masks are parsed at setup
+    source = '''
+10 FOR I = 1 TO 3
+20 PRINT USING "Row ## = $$###.##"; I; I * 10.5
+30 A$ = "+##.#": PRINT USING A$; -I
+40 NEXT I
+'''
+    runtime, interp, io_handler = load_program(source)
+    get_using_formatter.cache_clear()
+    interp.run()
+    info = get_using_formatter.cache_info()
+    ok &= check("output", io_handler.text,
+                'Row  1 =   $10.50\n -1.0\nRow  2 =   $21.00\n -2.0\nRow  3 =   $31.50\n -3.0\n')
+    ok &= check("each mask parsed once", (info.misses, info.hits), (2, 5))
+
+    if ok:
+        print("\n✅ All PRINT USING cache tests passed")
+        return 0
+    print("\n❌ PRINT USING cache tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
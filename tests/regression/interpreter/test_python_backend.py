@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test the Python code generation backend.
+
+Compiled programs must produce the same output as the interpreter, including
+error messages, ON ERROR handling and the line numbers errors are reported
+at, and must run a CPU-bound loop much faster.
+"""
+
+import sys
+import os
+import copy
+import subprocess
+import time
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.resource_limits import create_local_limits
+from src.semantic_analyzer import SemanticAnalyzer
+from src.codegen_py_backend import PythonBackend
+from tests.regression.helpers import CaptureIOHandler, parse, load_program
+
+
+PROGRAMS = {
+    'loops and arrays': """
+10 DIM A(20), B%(3, 3)
+20 FOR I = 1 TO 20: A(I) = I * I: NEXT I
+30 FOR I = 20 TO 1 STEP -3: S = S + A(I): NEXT
+40 FOR I = 0 TO 3: FOR J = 0 TO 3: B%(I, J) = I * J + 0.6: NEXT J: NEXT I
+50 PRINT S, B%(3, 2); B%(2, 2)
+60 FOR K = 1 TO 0: PRINT "never": NEXT K: PRINT K
+70 W = 0: WHILE W < 3: W = W + 1: PRINT W;: WEND: PRINT
+80 C(5) = 7: PRINT C(5) + C(4)
+""",
+    'gosub, on goto and if': """
+10 FOR I = 1 TO 3
+20 ON I GOSUB 100, 200, 300
+30 NEXT I
+40 IF I = 4 AND NOT (I < 2) THEN PRINT "A" ELSE PRINT "B"
+50 IF I > 3 THEN 70
+60 PRINT "skipped"
+70 ON 5 GOTO 100, 200: PRINT "fell through": END
+100 PRINT "one";: RETURN
+200 PRINT "two";: RETURN
+300 PRINT "three": RETURN
+""",
+    'strings and functions': """
+10 DEF FNA(X) = X * X + 1
+20 DEF FNS$(A$) = A$ + "!"
+30 N$ = "HELLO": MID$(N$, 2, 1) = "A"
+40 PRINT FNA(3); FNS$(N$); LEN(N$); LEFT$(N$, 2); CHR$(66)
+50 PRINT STR$(12.5); VAL("3.25") + 1; INSTR(N$, "L")
+60 PRINT 7 \\ 2, 7 MOD 3, 5 AND 3, 2 ^ 10, -7 / 2
+70 C% = 7.6: SWAP C%, D%: PRINT C%; D%
+80 PRINT USING "##.##"; 3.14159
+90 WRITE 1, "two", 3.5
+100 PRINT TAB(10); "x"; SPC(3); "y"
+""",
+    'read and data': """
+10 READ A, B$, C%
+20 PRINT A; B$; C%
+30 RESTORE 60
+40 READ D: PRINT D
+50 DATA 1.5, hello, 3
+60 DATA -42
+""",
+    'error handling': """
+10 ON ERROR GOTO 100
+20 X = 1 / 0
+30 PRINT "resumed"; ERR; ERL
+40 ERROR 25
+50 PRINT "after error 25"
+60 ON ERROR GOTO 0
+70 A$ = "x" + 1
+100 PRINT "error"; ERR; "at"; ERL
+110 RESUME NEXT
+""",
+    'uncaught error line': """
+10 DEF FNR(X) = 1 / X
+20 PRINT "start"
+30 Y = 2: PRINT FNR(Y)
+40 PRINT FNR(0)
+""",
+    'errors from control flow': """
+10 GOSUB 30
+20 RETURN
+30 PRINT "in sub": RETURN
+""",
+}
+
+# The interpreter waits for INPUT between ticks, so this one is checked
+# against its expected output
+INPUT_PROGRAM = """
+10 INPUT "Name"; N$
+20 INPUT A, B
+30 LINE INPUT L$
+40 PRINT N$; A + B; L$
+50 INPUT X
+"""
+
+INPUTS = ['Ada', '1, 2.5', 'a, line']
+
+LOOP = """
+10 DIM A(100)
+20 FOR I = 1 TO 20000
+30 J = I MOD 100
+40 A(J) = A(J) + I * 2
+50 S = S + J
+60 NEXT I
+70 PRINT S; A(5)
+"""
+
+
+def interpret(source):
+    """Run a program in the interpreter; uncaught errors are formatted like the CLI"""
+    runtime, interp, io = load_program(source, CaptureIOHandler(INPUTS), create_local_limits())
+    try:
+        interp.run()
+    except EOFError:
+        io.output("")
+    except Exception as e:
+        io.output(f"?{type(e).__name__} in {runtime.pc.line_num}: {e}")
+    return io.text
+
+
+def compile_program(source):
+    ast = parse(source)
+    analyzer = SemanticAnalyzer()
+    assert analyzer.analyze(copy.deepcopy(ast)), analyzer.errors
+    backend = PythonBackend(analyzer.symbols, {'source_file': 'test.bas'})
+    code = backend.generate(ast)
+    assert not backend.errors, backend.errors
+    namespace = {'__name__': 'compiled_test'}
+    exec(compile(code, 'test.bas.py', 'exec'), namespace)
+    return namespace['run']
+
+
+def run_compiled(source):
+    io = CaptureIOHandler(INPUTS)
+    compile_program(source)(io)
+    return io.text
+
+
+def main():
+    ok = True
+
+    for name, source in PROGRAMS.items():
+        expected = interpret(source)
+        actual = run_compiled(source)
+        if actual == expected:
+            print(f"✓ {name}")
+        else:
+            print(f"❌ {name}\n--- interpreter ---\n{expected}--- compiled ---\n{actual}")
+            ok = False
+
+    actual = run_compiled(INPUT_PROGRAM)
+    if actual == 'Name? ? Ada 3.5 a, line\n? \n':
+        print("✓ input")
+    else:
+        print(f"❌ input: {actual!r}")
+        ok = False
+
+    # Unsupported statements are reported instead of generated
+    ast = parse('10 OPEN "O", #1, "X"\n20 CLOSE\n')
+    backend = PythonBackend(None)
+    backend.generate(ast)
+    if len(backend.errors) == 2:
+        print("✓ unsupported statements reported")
+    else:
+        print(f"❌ unsupported statements: {backend.errors}")
+        ok = False
+
+    # Speed: the compiled program must clearly beat the interpreter
+    start = time.perf_counter()
+    expected = interpret(LOOP)
+    interpreted_time = time.perf_counter() - start
+    run = compile_program(LOOP)
+    io = CaptureIOHandler()
+    start = time.perf_counter()
+    run(io)
+    compiled_time = time.perf_counter() - start
+    speedup = interpreted_time / compiled_time
+    if io.text == expected and speedup > 3:
+        print(f"✓ compiled loop is {speedup:.0f}x faster")
+    else:
+        print(f"❌ compiled loop: {speedup:.1f}x, output {io.text!r} vs {expected!r}")
+        ok = False
+
+    # mbasic --run-compiled writes the program's output before exiting
+    root = os.path.join(os.path.dirname(__file__), '../../..')
+    result = subprocess.run([sys.executable, os.path.join(root, 'mbasic'), '--run-compiled',
+                             os.path.join(root, 'basic/dev/tests_with_results/test_simple.bas')],
+                            capture_output=True, text=True, timeout=60)
+    expected = 'Hello, MBASIC!\nA = 5 \nB = 10 \nA + B = 15 \n'
+    if (result.returncode, result.stdout) == (0, expected):
+        print("✓ mbasic --run-compiled")
+    else:
+        print(f"❌ mbasic --run-compiled: exit {result.returncode}, output {result.stdout!r}")
+        ok = False
+
+    if ok:
+        print("\n✅ All Python backend tests passed")
+        return 0
+    print("\n❌ Python backend tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
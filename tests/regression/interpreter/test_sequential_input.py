@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test buffered sequential file input (INPUT#, LINE INPUT#, INPUT$, EOF).
+
+Lines may end in LF, CR+LF or a lone CR, and ^Z ends the file (CP/M). The
+buffered reader must split lines the same way at any chunk size, including
+a CR+LF pair split across two chunks, and share its position and EOF state
+between INPUT#, LINE INPUT#, INPUT$, EOF(), LOC() and LOF().
+"""
+
+import sys
+import os
+import io
+import random
+import tempfile
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.filesystem import SequentialInputHandle
+from src.filesystem.real_fs import RealFileHandle
+from tests.regression.helpers import check, run_program
+
+
+def reference_lines(data):
+    """Lines as the byte-at-a-time reader returned them"""
+    lines = []
+    pos = 0
+    while True:
+        line = bytearray()
+        while True:
+            if pos >= len(data) or data[pos] == 26:
+                if line:
+                    lines.append(line.decode('latin-1'))
+                return lines
+            b = data[pos]
+            pos += 1
+            if b == 10:
+                break
+            if b == 13:
+                if pos < len(data) and data[pos] == 10:
+                    pos += 1
+                break
+            line.append(b)
+        lines.append(line.decode('latin-1'))
+
+
+def buffered_lines(data, chunk_size):
+    handle = SequentialInputHandle(RealFileHandle(io.BytesIO(data), binary=True), chunk_size)
+    lines = []
+    while not handle.at_eof():
+        line = handle.read_line()
+        if line is None:
+            break
+        lines.append(line)
+    return lines
+
+
+def main():
+    ok = True
+
+    # Line splitting matches the byte-at-a-time reader at every chunk size
+    rng = random.Random(5)
+    alphabet = b'ab,\r\n\r\n\x1a'
+    mismatches = 0
+    for _ in range(300):
+        data = bytes(rng.choice(alphabet) for _ in range(rng.randrange(40)))
+        expected = reference_lines(data)
+        for chunk_size in (1, 2, 3, 7, 64):
+            if buffered_lines(data, chunk_size) != expected:
+                mismatches += 1
+    ok &= check("line splitting at any chunk size", mismatches, 0)
+    ok &= check("CR+LF split across chunks", buffered_lines(b'one\r\ntwo\r\n', 4), ['one', 'two'])
+    ok &= check("text after ^Z ignored", buffered_lines(b'one\r\n\x1a\x1a\x1agarbage\r\n', 3), ['one'])
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'DATA.TXT')
+        with open(filename, 'wb') as f:
+            f.write(b'1,2,HELLO\r\nsecond line\rthird\nABCDEFG\r\n\x1a\x1a\x1a\x1a')
+
+        output = run_program(f'''
+10 OPEN "I", #1, "{filename}"
+20 INPUT #1, A, B, C$
+30 PRINT A + B; C$; EOF(1); LOF(1)
+40 LINE INPUT #1, L$: PRINT L$
+50 LINE INPUT #1, L$: PRINT L$
+60 PRINT INPUT$(3, 1); LOC(1)
+70 LINE INPUT #1, L$: PRINT L$; EOF(1)
+80 CLOSE #1
+''')
+        ok &= check("INPUT#, LINE INPUT#, INPUT$ share one position", output,
+                    ' 3 HELLO042\nsecond line\nthird\nABC0\nDEFG-1\n')
+
+        # Large file: many chunks, counted with EOF()
+        with open(filename, 'wb') as f:
+            for n in range(20000):
+                f.write(b'%d,LINE %d\r\n' % (n, n))
+            f.write(b'\x1a')
+        output = run_program(f'''
+10 OPEN "I", #1, "{filename}"
+20 WHILE NOT EOF(1)
+30 INPUT #1, N, T$: S = S + N: C = C + 1
+40 WEND
+50 PRINT C; S; T$
+60 CLOSE #1
+''')
+        ok &= check("multi-chunk file read to ^Z", output, ' 20000  199990000 LINE 19999\n')
+
+        # Reading past ^Z is an error
+        with open(filename, 'wb') as f:
+            f.write(b'only\r\n\x1a')
+        output = run_program(f'''
+10 ON ERROR GOTO 100
+20 OPEN "I", #1, "{filename}"
+30 LINE INPUT #1, L$: PRINT L$; EOF(1)
+40 LINE INPUT #1, L$: PRINT "not reached"
+50 END
+100 PRINT "error in"; ERL: RESUME 50
+''')
+        ok &= check("input past ^Z", output, 'only-1\nerror in40\n')
+
+    if ok:
+        print("\n✅ All sequential input tests passed")
+        return 0
+    print("\n❌ Sequential input tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test StatementTable navigation and in-place editing.
+
+Covers next_pc/prev_pc, REM/DATA skipping in next_executable_pc, WHILE/WEND
+matching, and that replace_line/delete_line keep the table in line-number
+order.
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.runtime import Runtime
+from src.pc import PC
+
+
+def parse_line(source):
+    """Parse a single numbered line and return its LineNode"""
+    return Parser(Lexer(source).tokenize()).parse().lines[0]
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected}, got {actual}")
+    return False
+
+
+def main():
+    program = """
+10 A = 1: B = 2
+20 REM comment
+30 DATA 1, 2, 3
+40 PRINT A
+"""
+    ast = Parser(Lexer(program).tokenize()).parse()
+    runtime = Runtime({line.line_number: line for line in ast.lines})
+    runtime.setup()
+    table = runtime.statement_table
+
+    ok = True
+    ok &= check("first_pc", table.first_pc(), PC(10, 0))
+    ok &= check("next_pc within line", table.next_pc(PC(10, 0)), PC(10, 1))
+    ok &= check("next_pc to next line", table.next_pc(PC(10, 1)), PC(20, 0))
+    ok &= check("next_pc at end halts", table.next_pc(PC(40, 0)).is_running(), False)
+    ok &= check("prev_pc", table.prev_pc(PC(20, 0)), PC(10, 1))
+    ok &= check("next_executable_pc skips REM and DATA", table.next_executable_pc(PC(10, 1)), PC(40, 0))
+    ok &= check("line_exists", (table.line_exists(30), table.line_exists(35)), (True, False))
+    ok &= check("get_line_statements", len(table.get_line_statements(10)), 2)
+
+    # WHILE/WEND pairs are part of the plan
+    nested = Parser(Lexer("""
+10 WHILE A: WHILE B
+20 WEND
+30 WEND: WHILE C
+""").tokenize()).parse()
+    loops = Runtime({line.line_number: line for line in nested.lines})
+    loops.setup()
+    ok &= check("matching_wend outer", loops.statement_table.matching_wend(PC(10, 0)), PC(30, 0))
+    ok &= check("matching_wend inner", loops.statement_table.matching_wend(PC(10, 1)), PC(20, 0))
+    ok &= check("matching_wend unmatched", loops.statement_table.matching_wend(PC(30, 1)), None)
+
+    # Insert a line between existing lines, then run navigation again
+    generation = table.generation
+    table.replace_line(25, parse_line("25 PRINT B"))
+    ok &= check("generation changes on edit", table.generation != generation, True)
+    ok &= check("inserted line is reachable", table.next_executable_pc(PC(10, 1)), PC(25, 0))
+    ok &= check("statements stay in line order",
+                [pc.line for pc in table.statements], [10, 10, 20, 25, 30, 40])
+
+    table.delete_line(25)
+    table.delete_line(20)
+    ok &= check("deleted lines are gone", table.next_pc(PC(10, 1)), PC(30, 0))
+    ok &= check("get_line_statements of deleted line", table.get_line_statements(20), [])
+
+    table.clear()
+    ok &= check("clear empties table", table.first_pc().is_running(), False)
+
+    if ok:
+        print("\n✅ All statement table tests passed")
+        return 0
+    print("\n❌ Statement table tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the run-mode fast path of Interpreter.tick().
+
+With no breakpoints, TRON or step mode, tick() runs statements without the
+per-statement debugger checks. Breakpoints, TRON, pause and Ctrl+C must
+still take effect, and breakpoints are looked up by line.
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.interpreter import Interpreter
+from src.pc import PC, BreakpointSet
+from tests.regression.helpers import check, load_program
+
+
+LOOP = """
+10 FOR I = 1 TO 1000
+20 X = X + I
+30 NEXT I
+40 PRINT X
+"""
+
+
+def load(source):
+    runtime, interp, io = load_program(source)
+    interp.start()
+    return runtime, interp, io
+
+
+def main():
+    ok = True
+
+    # Quantum size and statement count are the same as on the slow path
+    runtime, interp, io = load(LOOP)
+    state = interp.tick(mode='run', max_statements=100)
+    ok &= check("quantum of 100 statements", (state.statements_executed, runtime.pc.is_running()), (100, True))
+    while runtime.pc.is_running():
+        state = interp.tick(mode='run', max_statements=1000)
+    interp._restore_break_handler()
+    ok &= check("program result", io.lines[-1].strip(), '500500')
+
+    # Breakpoint set between quanta halts at its line
+    runtime, interp, io = load(LOOP)
+    interp.tick(mode='run', max_statements=10)
+    runtime.breakpoints.add(PC(30, 0))
+    interp.tick(mode='run', max_statements=1000)
+    ok &= check("breakpoint halts", (runtime.pc.stop_reason, runtime.pc.line), ('BREAK', 30))
+    interp._restore_break_handler()
+
+    # Bare line numbers (as assigned by the Tk UI) are line breakpoints
+    runtime.breakpoints = {20}
+    ok &= check("bare line number stored as PC", (PC(20, 0) in runtime.breakpoints,
+                                                   runtime.breakpoints.has_line(20),
+                                                   runtime.breakpoints.has_line(30)), (True, True, False))
+
+    # Line index follows add/discard of several breakpoints on one line
+    breakpoints = BreakpointSet([PC(100, 0), PC(100, 2)])
+    breakpoints.discard(PC(100, 0))
+    ok &= check("line kept while a breakpoint remains", breakpoints.has_line(100), True)
+    breakpoints -= {PC(100, 2)}
+    ok &= check("line dropped with its last breakpoint", (breakpoints.has_line(100), len(breakpoints)), (False, 0))
+
+    # TRON inside the program switches to traced execution immediately
+    runtime, interp, io = load("10 X = 1\n20 TRON\n30 X = 2\n40 X = 3\n")
+    interp.tick(mode='run', max_statements=1000)
+    interp._restore_break_handler()
+    ok &= check("TRON traces following lines", [line.strip() for line in io.lines], ['[30]', '[40]'])
+
+    # Ctrl+C and pause are noticed within INTERRUPT_CHECK_INTERVAL statements
+    runtime, interp, io = load("10 GOTO 10\n")
+    interp.tick(mode='run', max_statements=10)
+    runtime.break_requested = True
+    interp.tick(mode='run', max_statements=10 * Interpreter.INTERRUPT_CHECK_INTERVAL)
+    ok &= check("break requested", runtime.pc.stop_reason, 'BREAK')
+    ok &= check("break noticed promptly", interp.state.statements_executed <= 10 + Interpreter.INTERRUPT_CHECK_INTERVAL, True)
+    interp._restore_break_handler()
+
+    # An exhausted time budget ends the quantum at the next interrupt check
+    runtime, interp, io = load("10 GOTO 10\n")
+    state = interp.tick(mode='run', max_statements=100000, time_budget=0)
+    interp._restore_break_handler()
+    ok &= check("time budget", (state.statements_executed, runtime.pc.is_running()),
+                (Interpreter.INTERRUPT_CHECK_INTERVAL, True))
+
+    # ON ERROR GOTO works on the fast path
+    runtime, interp, io = load("10 ON ERROR GOTO 100\n20 X = 1 / 0\n30 END\n100 PRINT ERR: RESUME NEXT\n")
+    interp.tick(mode='run', max_statements=1000)
+    interp._restore_break_handler()
+    ok &= check("error handler", io.lines[-1].strip(), '11')
+
+    if ok:
+        print("\n✅ All fast path tests passed")
+        return 0
+    print("\n❌ Fast path tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
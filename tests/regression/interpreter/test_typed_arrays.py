@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test typed array storage (src/basic_array.py).
+
+Numeric arrays are kept in typed buffers with strides fixed at DIM time:
+every subscript is bounds-checked against its own dimension, INTEGER arrays
+overflow like MBASIC, and array element tracking is a bounded log.
+"""
+
+import sys
+import os
+from array import array
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.basic_array import BasicArray
+from src.variable_tracker import ELEMENT_LOG_SIZE
+from tests.regression.helpers import check, load_program
+
+
+def run(source, track=False):
+    runtime, interp, io = load_program(source)
+    if track:
+        runtime.enable_variable_tracking()
+    state = interp.start()
+    while runtime.pc.is_running() and not state.error_info:
+        state = interp.tick(mode='run', max_statements=1000)
+    interp._restore_break_handler()
+    return runtime, io.text
+
+
+def main():
+    ok = True
+
+    runtime, _ = run("10 DIM A%(3,4), B(5), C#(2), S$(2)\n20 A%(2,3) = 7.9: B(1) = 5: S$(2) = \"HI\"\n")
+    arrays = runtime._arrays
+    ok &= check("INTEGER array buffer", arrays['a%'].data.typecode, 'h')
+    ok &= check("SINGLE array buffer", arrays['b!'].data.typecode, 'd')
+    ok &= check("DOUBLE array buffer", arrays['c#'].data.typecode, 'd')
+    ok &= check("STRING array storage", type(arrays['s$'].data), list)
+    ok &= check("strides", arrays['a%'].strides, [5, 1])
+    ok &= check("element values", (runtime.get_array_element('a', '%', [2, 3]),
+                                   runtime.get_array_element('b', '!', [1]),
+                                   runtime.get_array_element('s', '$', [2])), (7, 5.0, "HI"))
+
+    # Each subscript is checked against its own dimension (no wrapping into the next row)
+    _, output = run("10 DIM A(3,4)\n20 ON ERROR GOTO 100\n30 A(0,5) = 1\n40 A%(1) = 40000\n50 END\n"
+                    "100 PRINT ERR: PRINT ERL: RESUME NEXT\n")
+    ok &= check("subscript out of range and overflow", output.split(), ['9', '30', '6', '40'])
+
+    # OPTION BASE 1 arrays start at 1
+    runtime, _ = run("10 OPTION BASE 1\n20 DIM M(2,3)\n30 M(2,3) = 9\n")
+    ok &= check("OPTION BASE 1 size", len(runtime._arrays['m!'].data), 6)
+    ok &= check("OPTION BASE 1 last element", runtime._arrays['m!'].data[-1], 9.0)
+
+    # Session persistence round trip, including the older {'dims', 'data'} form
+    state = runtime.get_array_state()
+    restored = BasicArray.from_state('m!', state['m!'])
+    ok &= check("state round trip", (restored.base, list(restored.data)), (1, list(runtime._arrays['m!'].data)))
+    legacy = BasicArray.from_state('n%', {'dims': [2], 'data': [1, 2.0, 3]})
+    ok &= check("legacy state", legacy.data, array('h', [1, 2, 3]))
+
+    # Element tracking is bounded
+    runtime, _ = run("10 DIM G(40,40)\n20 FOR I = 0 TO 40: FOR J = 0 TO 40: G(I,J) = I*J: NEXT J, I\n",
+                     track=True)
+    tracker = runtime.variable_tracker
+    ok &= check("element log bounded", len(tracker.element_log), ELEMENT_LOG_SIZE)
+    ok &= check("last element tracked", tracker.get_element('g!', [40, 40])['last_write'] is not None, True)
+    ok &= check("old element dropped", tracker.get_element('g!', [0, 0]), None)
+
+    if ok:
+        print("\n✅ All typed array tests passed")
+        return 0
+    print("\n❌ Typed array tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
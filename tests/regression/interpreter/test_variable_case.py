@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test load-time variable name case resolution (settings.case_conflict).
+
+The canonical case of each variable is resolved when the program is loaded
+and updated per edited line by ProgramManager; the 'error' policy reports
+conflicts with line and column before the program runs.
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.runtime import Runtime
+from src.interpreter import Interpreter
+from src.iohandler.base import IOHandler
+from src.resource_limits import create_unlimited_limits
+from src.settings import SettingsManager
+from src.editing import ProgramManager
+from src.variable_case import VariableCaseTable, CaseConflictError
+
+
+class NullIOHandler(IOHandler):
+    """IO handler that discards all output"""
+
+    def output(self, text, end='\n'):
+        pass
+
+    def input(self, prompt=''):
+        return ''
+
+    def input_line(self, prompt=''):
+        return ''
+
+    def input_char(self, blocking=True):
+        return ''
+
+    def clear_screen(self):
+        pass
+
+    def error(self, message):
+        pass
+
+    def debug(self, message):
+        pass
+
+
+PROGRAM = """
+10 targetangle = 1
+20 TargetAngle = TargetAngle + 1
+30 TARGETANGLE = TARGETANGLE + 1
+"""
+
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+def canonical(policy):
+    table = VariableCaseTable(policy)
+    table.build(parse(PROGRAM).lines)
+    return table.get('targetangle')
+
+
+def run(source, policy):
+    settings = SettingsManager()
+    settings.set('case_conflict', policy)
+    runtime = Runtime({line.line_number: line for line in parse(source).lines})
+    interp = Interpreter(runtime, NullIOHandler(), limits=create_unlimited_limits(), settings_manager=settings)
+    state = interp.start()
+    while runtime.pc.is_running() and not state.error_info:
+        state = interp.tick(mode='run', max_statements=100)
+    interp._restore_break_handler()
+    return runtime, state
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected}, got {actual}")
+    return False
+
+
+def main():
+    ok = True
+
+    ok &= check("first_wins", canonical('first_wins'), 'targetangle')
+    ok &= check("prefer_upper", canonical('prefer_upper'), 'TARGETANGLE')
+    ok &= check("prefer_lower", canonical('prefer_lower'), 'targetangle')
+    ok &= check("prefer_mixed", canonical('prefer_mixed'), 'TargetAngle')
+
+    # The runtime reports the resolved case, whatever order lines execute in
+    runtime, state = run("10 GOTO 30\n20 Count = 1\n30 COUNT = 2\n", 'first_wins')
+    variables = {v['name']: v for v in runtime.get_all_variables()}
+    ok &= check("runtime uses load-time case", variables['count']['original_case'], 'Count')
+
+    # 'error' policy: reported at load with line and column, nothing executes
+    runtime, state = run(PROGRAM, 'error')
+    message = state.error_info.error_message if state.error_info else None
+    ok &= check("error policy reported at load",
+                message is not None and "'targetangle' at line 10:" in message and "at line 20:" in message, True)
+    ok &= check("error policy stops before running", runtime.get_variable_raw('targetangle!'), None)
+
+    # ProgramManager updates the table per edited line
+    settings = SettingsManager()
+    settings.set('case_conflict', 'first_wins')
+    manager = ProgramManager({}, settings_manager=settings)
+    manager.add_line(10, "10 Total = 1")
+    manager.add_line(20, "20 PRINT TOTAL")
+    ok &= check("manager first_wins", manager.variable_case.get('total'), 'Total')
+    manager.delete_line(10)
+    ok &= check("manager after delete", manager.variable_case.get('total'), 'TOTAL')
+
+    settings.set('case_conflict', 'error')
+    success, error = manager.add_line(30, "30 total = 3")
+    ok &= check("manager rejects conflicting line", (success, 'line 30:' in (error or '')), (False, True))
+    ok &= check("rejected line not stored", manager.get_line(30), None)
+    success, error = manager.add_line(20, "20 PRINT Total")
+    ok &= check("manager accepts replacement of only spelling", success, True)
+
+    try:
+        VariableCaseTable('error').build(parse(PROGRAM).lines)
+        ok &= check("CaseConflictError raised", False, True)
+    except CaseConflictError as e:
+        ok &= check("CaseConflictError location", (e.line_number, e.column > 0), (20, True))
+
+    if ok:
+        print("\n✅ All variable case tests passed")
+        return 0
+    print("\n❌ Variable case tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
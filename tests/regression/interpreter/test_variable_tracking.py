@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test slot-based variable storage and the optional access tracker.
+
+Variables referenced by the program get slots at load time, bound to their
+VariableNodes so execution does no name lookups, but only show up in
+get_all_variables() once created. Access locations are recorded only
+while a VariableTracker is attached (the variables windows do this while
+they are visible).
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/interpreter/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.runtime import Runtime
+from src.interpreter import Interpreter
+from src.iohandler.base import IOHandler
+from src.resource_limits import create_unlimited_limits
+
+
+class NullIOHandler(IOHandler):
+    """IO handler that discards all output"""
+
+    def output(self, text, end='\n'):
+        pass
+
+    def input(self, prompt=''):
+        return ''
+
+    def input_line(self, prompt=''):
+        return ''
+
+    def input_char(self, blocking=True):
+        return ''
+
+    def clear_screen(self):
+        pass
+
+    def error(self, message):
+        pass
+
+    def debug(self, message):
+        pass
+
+
+PROGRAM = """
+10 A% = 5: DIM T(3)
+20 B$ = "X" + STR$(A%)
+30 T(2) = A%
+40 IF 0 THEN C = 1
+"""
+
+
+def run(track, ast=None):
+    ast = ast or Parser(Lexer(PROGRAM).tokenize()).parse()
+    runtime = Runtime({line.line_number: line for line in ast.lines})
+    if track:
+        runtime.enable_variable_tracking()
+    interp = Interpreter(runtime, NullIOHandler(), limits=create_unlimited_limits())
+    state = interp.start()
+    while runtime.pc.is_running() and not state.error_info:
+        state = interp.tick(mode='run', max_statements=100)
+    interp._restore_break_handler()
+    return runtime, {v['name'] + v['type_suffix']: v for v in runtime.get_all_variables()}
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected}, got {actual}")
+    return False
+
+
+def main():
+    ok = True
+
+    runtime, variables = run(track=False)
+    ok &= check("values stored", (variables['a%']['value'], variables['b$']['value']), (5, "X 5"))
+    ok &= check("unassigned variable not listed", 'c!' in variables, False)
+    ok &= check("no tracking without tracker", variables['a%']['last_write'], None)
+    ok &= check("debugger read", runtime.get_variable_for_debugger('a', '%'), 5)
+    ok &= check("debugger read of unknown variable", runtime.get_variable_for_debugger('zz', '$'), "")
+
+    runtime, variables = run(track=True)
+    write, read = variables['a%']['last_write'], variables['a%']['last_read']
+    ok &= check("write and read recorded", (write is not None, read is not None), (True, True))
+    ok &= check("read after write", read['timestamp'] > write['timestamp'], True)
+    ok &= check("array write subscripts", variables['t!']['last_write_subscripts'], [2])
+    ok &= check("array last accessed value", variables['t!']['last_accessed_value'], 5)
+    runtime.set_variable('a', '%', 7, debugger_set=True)
+    variables = {v['name'] + v['type_suffix']: v for v in runtime.get_all_variables()}
+    ok &= check("debugger write marked line -1", variables['a%']['last_write']['line'], -1)
+
+    runtime.disable_variable_tracking()
+    variables = {v['name'] + v['type_suffix']: v for v in runtime.get_all_variables()}
+    ok &= check("tracking dropped when disabled", variables['a%']['last_read'], None)
+
+    runtime.clear_variables()
+    ok &= check("CLEAR empties variables", [v for v in runtime.get_all_variables() if not v['is_array']], [])
+
+    # Program variables are bound to their nodes at load: no lookups by name
+    ast = Parser(Lexer(PROGRAM).tokenize()).parse()
+    runtime = Runtime({line.line_number: line for line in ast.lines})
+    interp = Interpreter(runtime, NullIOHandler(), limits=create_unlimited_limits())
+    state = interp.start()
+    lookups = []
+    resolve = runtime._variable_slot
+    runtime._variable_slot = lambda *args: lookups.append(args) or resolve(*args)
+    while runtime.pc.is_running() and not state.error_info:
+        state = interp.tick(mode='run', max_statements=100)
+    interp._restore_break_handler()
+    ok &= check("program variables accessed by slot", lookups, [])
+    ok &= check("values stored by slot", runtime.get_variable_for_debugger('b', '$'), "X 5")
+
+    # Another runtime loading the same AST (slots numbered differently) rebinds
+    # the nodes; the first one then resolves them by name
+    other = Runtime({line.line_number: line for line in ast.lines})
+    other.set_variable_raw('zz!', 0)
+    other.setup()
+    node = ast.lines[0].statements[0].variable
+    ok &= check("node bound to the latest runtime", other.variable_slot(node), other._var_slots['a%'])
+    ok &= check("earlier runtime resolves by name", runtime.variable_slot(node), runtime._var_slots['a%'])
+
+    if ok:
+        print("\n✅ All variable tracking tests passed")
+        return 0
+    print("\n❌ Variable tracking tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test line-based output of CursesIOHandler against a simulated window.
+
+Whole lines are written with addnstr() (wrapping at the right edge), only
+the last screenful of a burst is drawn, refreshes are coalesced into one
+doupdate() per frame, and a bounded scrollback ring keeps the output.
+"""
+
+import sys
+import os
+import curses
+
+# Add project root to path (3 levels up from tests/regression/ui/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.iohandler import curses_io
+from src.iohandler.curses_io import CursesIOHandler
+
+
+class FakeWindow:
+    """Character grid with the curses window calls the handler uses"""
+
+    def __init__(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.grid = [[' '] * cols for _ in range(rows)]
+        self.y = self.x = 0
+        self.addnstr_calls = 0
+
+    def getmaxyx(self):
+        return self.rows, self.cols
+
+    def getyx(self):
+        return self.y, self.x
+
+    def move(self, y, x):
+        self.y, self.x = y, x
+
+    def addnstr(self, text, n, attr=0):
+        self.addnstr_calls += 1
+        for ch in text[:n]:
+            self.grid[self.y][self.x] = ch
+            if self.x == self.cols - 1:
+                if self.y == self.rows - 1:
+                    raise curses.error("bottom-right corner")
+                self.y, self.x = self.y + 1, 0
+            else:
+                self.x += 1
+
+    def scroll(self, n):
+        self.grid = self.grid[n:] + [[' '] * self.cols for _ in range(n)]
+
+    def erase(self):
+        self.grid = [[' '] * self.cols for _ in range(self.rows)]
+
+    def clear(self):
+        self.erase()
+
+    def noutrefresh(self):
+        pass
+
+    def screen(self):
+        return [''.join(row).rstrip() for row in self.grid]
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def main():
+    ok = True
+    updates = []
+    now = [100.0]
+    curses_io.curses.doupdate = lambda: updates.append(now[0])
+    curses_io.time.monotonic = lambda: now[0]
+
+    # Wrapping and newlines
+    window = FakeWindow(4, 10)
+    handler = CursesIOHandler(window)
+    handler.output("HELLO", end='')
+    handler.output(" WORLD, THIS WRAPS")
+    handler.output("NEXT", end='')
+    ok &= check("lines wrap at the right edge", window.screen(), ['HELLO WORL', 'D, THIS WR', 'APS', 'NEXT'])
+    handler.output("")
+    handler.output("MORE", end='')
+    ok &= check("bottom line scrolls", window.screen(), ['D, THIS WR', 'APS', 'NEXT', 'MORE'])
+    handler.output("")
+    handler.output("0123456789", end='')
+    handler.output("X", end='')
+    ok &= check("full row at the bottom wraps", window.screen(), ['NEXT', 'MORE', '0123456789', 'X'])
+
+    # A burst draws only the last screenful
+    window = FakeWindow(5, 20)
+    handler = CursesIOHandler(window, scrollback_lines=100)
+    handler.output('\n'.join(f"LINE {n}" for n in range(1000)))
+    ok &= check("burst shows the last lines", window.screen(),
+                ['LINE 996', 'LINE 997', 'LINE 998', 'LINE 999', ''])
+    ok &= check("burst drawn with one addnstr per visible line", window.addnstr_calls, 4)
+
+    # Scrollback ring
+    ok &= check("scrollback bounded", len(handler.scrollback), 100)
+    ok &= check("scrollback keeps the newest lines", handler.get_scrollback()[-3:], ['LINE 998', 'LINE 999', ''])
+
+    # Refreshes coalesced to the frame rate
+    updates.clear()
+    now[0] += 1
+    for n in range(50):
+        handler.output(f"FAST {n}")
+    ok &= check("one update per frame", len(updates), 1)
+    handler.flush()
+    ok &= check("flush sends the pending frame", len(updates), 2)
+    handler.flush()
+    ok &= check("nothing pending after flush", len(updates), 2)
+    ok &= check("screen up to date", window.screen()[-2], 'FAST 49')
+
+    # Output before the window exists is kept, drawn later and recorded once
+    handler = CursesIOHandler()
+    handler.output("hello")
+    handler.output("world")
+    ok &= check("buffered output in scrollback", handler.get_scrollback(), ['hello', 'world', ''])
+    window = FakeWindow(3, 10)
+    handler.set_output_window(window)
+    ok &= check("buffered output drawn", window.screen(), ['hello', 'world', ''])
+    ok &= check("scrollback not doubled when drawn", handler.get_scrollback(), ['hello', 'world', ''])
+
+    if ok:
+        print("\n✅ All curses output tests passed")
+        return 0
+    print("\n❌ Curses output tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test the Tk output pane queue: program output is collected, drawn with one
+insert per frame from a single after() callback, and the widget is trimmed
+to output_max_lines from the top.
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/ui/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.ui.tk_ui import TkBackend, OUTPUT_FRAME_MS
+
+
+class FakeRoot:
+    """Records after() callbacks instead of running a Tk event loop"""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = (ms, callback)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for _, callback in callbacks.values():
+            callback()
+
+
+class FakeText:
+    """Text widget model: a list of lines, indexes as 'line.col'"""
+
+    def __init__(self):
+        self.lines = ['']
+        self.inserts = 0
+
+    def config(self, **kwargs):
+        pass
+
+    def insert(self, index, text):
+        self.inserts += 1
+        parts = text.split('\n')
+        self.lines[-1] += parts[0]
+        self.lines.extend(parts[1:])
+
+    def index(self, index):
+        assert index == 'end-1c'
+        return f"{len(self.lines)}.{len(self.lines[-1])}"
+
+    def delete(self, start, end):
+        assert start == '1.0' and end.endswith('.0')
+        del self.lines[:int(end.split('.')[0]) - 1]
+
+    def see(self, index):
+        pass
+
+
+class FakeBackend:
+    _add_output = TkBackend._add_output
+    _flush_output = TkBackend._flush_output
+
+    def __init__(self, max_lines):
+        self.root = FakeRoot()
+        self.output_text = FakeText()
+        self.output_max_lines = max_lines
+        self.output_queue = []
+        self.output_flush_id = None
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def main():
+    ok = True
+
+    backend = FakeBackend(max_lines=100)
+    for n in range(1000):
+        backend._add_output(f"LINE {n}\n")
+    ok &= check("one after() callback for many fragments", len(backend.root.callbacks), 1)
+    ok &= check("frame interval", list(backend.root.callbacks.values())[0][0], OUTPUT_FRAME_MS)
+    ok &= check("nothing drawn before the frame", backend.output_text.inserts, 0)
+    backend.root.run_pending()
+    ok &= check("one insert per frame", backend.output_text.inserts, 1)
+    ok &= check("trimmed to the line limit", len(backend.output_text.lines), 100)
+    ok &= check("newest lines kept", backend.output_text.lines[-2:], ['LINE 999', ''])
+
+    # Output before an input prompt is drawn at once
+    backend._add_output("Name? ")
+    backend._flush_output()
+    ok &= check("explicit flush draws and cancels the frame",
+                (backend.output_text.lines[-1], backend.root.callbacks), ('Name? ', {}))
+    backend._add_output("X")
+    ok &= check("next output schedules a new frame", len(backend.root.callbacks), 1)
+
+    if ok:
+        print("\n✅ All Tk output queue tests passed")
+        return 0
+    print("\n❌ Tk output queue tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
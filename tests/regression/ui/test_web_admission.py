@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test web session admission control and load shedding (src/ui/web/admission.py).
+
+Sessions beyond max_concurrent_sessions are refused with a retry page,
+and slots of pages that never connect expire; when event-loop lag is
+above the threshold the scheduler pauses the heaviest CPU-bound programs,
+and resumes them once the lag stays low.
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# Add project root to path (3 levels up from tests/regression/ui/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.ui.web import admission as admission_module
+from src.ui.web.admission import AdmissionController
+from src.ui.web.scheduler import SessionScheduler, ScheduledTask
+from src.multiuser_config import _parse_config_dict
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def make_task(scheduler, name, recent_cpu, busy, events):
+    calls = []
+    task = ScheduledTask(scheduler, name, lambda time_budget: calls.append(time_budget),
+                         on_pause=lambda paused: events.append((name, paused)))
+    task.recent_cpu, task.busy, task.calls = recent_cpu, busy, calls
+    scheduler.tasks.append(task)
+    return task
+
+
+async def monitor_scenario():
+    """Lag from a blocked event loop pauses a program; the monitor ends with the sessions."""
+    admission_module.CHECK_INTERVAL = 0.01
+    scheduler = SessionScheduler()
+    events = []
+    heavy = make_task(scheduler, 'heavy', 0.5, True, events)
+    controller = AdmissionController(max_lag=0.02, scheduler=scheduler)
+    controller.admit('a')
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)          # Block the event loop like an overloaded server
+    await asyncio.sleep(0.02)
+    paused = heavy.paused
+    controller.release('a')
+    await asyncio.sleep(0.05)
+    return paused, heavy.paused, controller._monitor.done()
+
+
+def main():
+    ok = True
+
+    # Configuration
+    config = _parse_config_dict({'rate_limiting': {'enabled': True, 'max_concurrent_sessions': 2,
+                                                   'max_event_loop_lag_ms': 100}})
+    limits = config.rate_limiting
+    ok &= check("limits parsed from multiuser.json",
+                (limits.max_concurrent_sessions, limits.max_event_loop_lag_ms, limits.retry_after_seconds),
+                (2, 100, 15))
+
+    # Admission
+    scheduler = SessionScheduler()
+    controller = AdmissionController(max_sessions=2, retry_after=7, scheduler=scheduler)
+    ok &= check("first session admitted", controller.admit('a'), True)
+    ok &= check("second session admitted", controller.admit('b'), True)
+    ok &= check("third session refused", controller.admit('c'), False)
+    ok &= check("admitted session may reload", controller.admit('a'), True)
+    ok &= check("rejections counted", controller.rejected, 1)
+    page = controller.busy_page_html()
+    ok &= check("busy page retries", '<meta http-equiv="refresh" content="7">' in page, True)
+    ok &= check("busy page shows load", '(2 active sessions)' in page, True)
+    controller.release('b')
+    ok &= check("released slot reused", controller.admit('c'), True)
+    ok &= check("unlimited by default", all(AdmissionController().admit(str(i)) for i in range(500)), True)
+
+    # Slots of pages that never connect expire; connected sessions keep theirs
+    expiring = AdmissionController(max_sessions=2, scheduler=SessionScheduler())
+    expiring.admit('a')
+    expiring.admit('b')
+    expiring.connected('a')
+    admission_module.CONNECT_TIMEOUT = 0.01
+    time.sleep(0.02)
+    ok &= check("unconnected slot expires", (expiring.admit('c'), sorted(expiring.sessions)),
+                (True, ['a', 'c']))
+    expiring.release('c')
+    ok &= check("released slot not expired again", expiring._pending, {})
+    admission_module.CONNECT_TIMEOUT = 30.0
+
+    # Load shedding picks the heaviest CPU-bound program
+    events = []
+    light = make_task(scheduler, 'light', 0.1, True, events)
+    heavy = make_task(scheduler, 'heavy', 0.9, True, events)
+    waiting = make_task(scheduler, 'input', 2.0, False, events)
+    controller.max_lag = 0.1
+    ok &= check("running programs counted", controller.running_programs(), 3)
+    controller.check_lag(0.3)
+    ok &= check("heaviest program paused", (heavy.paused, light.paused, waiting.paused), (True, False, False))
+    ok &= check("paused program skipped", (scheduler._run_task(heavy), heavy.calls), (0.0, []))
+    ok &= check("fair share ignores paused", scheduler.slice_for(light), scheduler.slice)
+    controller.check_lag(0.3)
+    controller.check_lag(0.3)
+    ok &= check("INPUT wait never paused", waiting.paused, False)
+    ok &= check("paused count", controller.stats()['paused_programs'], 2)
+    controller.check_lag(0.07)
+    ok &= check("no change between thresholds", (heavy.paused, light.paused), (True, True))
+    for _ in range(admission_module.RESUME_CHECKS - 1):
+        controller.check_lag(0.01)
+    ok &= check("resume waits for sustained low lag", (heavy.paused, light.paused), (True, True))
+    controller.check_lag(0.01)
+    ok &= check("longest paused resumes first", (heavy.paused, light.paused), (False, True))
+    controller.check_lag(0.01)
+    ok &= check("sessions told about pauses", events,
+                [('heavy', True), ('light', True), ('heavy', False), ('light', False)])
+
+    # Real event-loop lag
+    paused_under_lag, paused_after, monitor_done = asyncio.run(monitor_scenario())
+    ok &= check("blocked event loop pauses heavy program", paused_under_lag, True)
+    ok &= check("programs resumed when sessions gone", paused_after, False)
+    ok &= check("monitor stops without sessions", monitor_done, True)
+
+    if ok:
+        print("\n✅ All web admission tests passed")
+        return 0
+    print("\n❌ Web admission tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
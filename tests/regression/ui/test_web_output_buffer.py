@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test the line ring buffer behind the web UI output pane.
+
+OutputBuffer must hold exactly the text the old whole-buffer split/trim
+produced for any sequence of appends, so the browser (which applies the
+same trim to the deltas it receives) and the server stay in step.
+"""
+
+import sys
+import os
+import random
+
+# Add project root to path (3 levels up from tests/regression/ui/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.ui.output_buffer import OutputBuffer, TRUNCATION_MARKER, OUTPUT_APPEND_JS
+
+
+def reference_append(text, batch, max_lines):
+    """Whole-buffer version formerly used by _flush_output_batch"""
+    text += batch
+    lines = text.split('\n')
+    if len(lines) > max_lines:
+        lines = lines[-max_lines:]
+        text = '\n'.join(lines)
+        if not text.startswith('[... output truncated'):
+            text = TRUNCATION_MARKER + text
+    return text
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def main():
+    ok = True
+
+    buffer = OutputBuffer(3, 'banner\n')
+    ok &= check("initial text", buffer.text, 'banner\n')
+    buffer.append('a')
+    buffer.append('b\nc')
+    ok &= check("partial lines joined", buffer.text, 'banner\nab\nc')
+    ok &= check("line count", len(buffer), 3)
+    buffer.append('\nd\n')
+    ok &= check("oldest lines dropped", buffer.text, TRUNCATION_MARKER + 'c\nd\n')
+    buffer.clear()
+    ok &= check("clear", (buffer.text, buffer.truncated), ('', False))
+
+    # Same text as the old algorithm for random appends
+    rng = random.Random(20)
+    mismatches = 0
+    for _ in range(300):
+        max_lines = rng.randrange(1, 8)
+        buffer = OutputBuffer(max_lines)
+        reference = ''
+        for _ in range(rng.randrange(1, 20)):
+            batch = ''.join(rng.choice('ab\n') for _ in range(rng.randrange(6)))
+            buffer.append(batch)
+            reference = reference_append(reference, batch, max_lines)
+            if buffer.text != reference:
+                mismatches += 1
+    ok &= check("matches whole-buffer trim", mismatches, 0)
+
+    # Restored session text keeps its marker without counting it as a line
+    restored = OutputBuffer(3, TRUNCATION_MARKER + 'x\ny\n')
+    ok &= check("restored truncated text", (restored.text, len(restored)), (TRUNCATION_MARKER + 'x\ny\n', 3))
+
+    # Many lines, bounded memory
+    buffer = OutputBuffer(1000)
+    for n in range(100000):
+        buffer.append(f'LINE {n}\n')
+    ok &= check("bounded line count", len(buffer), 1000)
+    ok &= check("newest lines kept", buffer.text.split('\n')[-2], 'LINE 99999')
+
+    ok &= check("client append function", 'window.mbasicAppendOutput' in OUTPUT_APPEND_JS, True)
+    ok &= check("client marker matches", '"[... output truncated ...]\\n"' in OUTPUT_APPEND_JS, True)
+
+    if ok:
+        print("\n✅ All web output buffer tests passed")
+        return 0
+    print("\n❌ Web output buffer tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test the server-wide scheduler that runs web session programs.
+
+Sessions are fake tick callbacks that spin for their time budget (CPU-bound)
+or return at once (waiting for INPUT). The scheduler must keep every slice
+near the latency target, share CPU evenly between CPU-bound sessions, give
+waiting sessions their turn, and stop calling a session once cancelled.
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+# Add project root to path (3 levels up from tests/regression/ui/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.ui.web.scheduler import SessionScheduler, ScheduledTask
+
+
+class Session:
+    """Tick callback recording the budgets it was given"""
+
+    def __init__(self, cost=None):
+        self.cost = cost      # None: use the whole budget; else fixed seconds
+        self.budgets = []
+
+    def tick(self, time_budget):
+        self.budgets.append(time_budget)
+        end = time.perf_counter() + (time_budget if self.cost is None else self.cost)
+        while time.perf_counter() < end:
+            pass
+
+
+class Recorder:
+    """Context manager counting how often it was entered"""
+
+    def __init__(self):
+        self.entered = 0
+
+    def __enter__(self):
+        self.entered += 1
+
+    def __exit__(self, *args):
+        return False
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+async def scenario():
+    results = {}
+    scheduler = SessionScheduler(target_latency=0.01, min_slice=0.001, round_interval=0.001)
+    heavy1, heavy2, idle = Session(), Session(), Session(cost=0)
+    context = Recorder()
+    t1 = scheduler.add('heavy1', heavy1.tick, context=context)
+    t2 = scheduler.add('heavy2', heavy2.tick)
+    t3 = scheduler.add('idle', idle.tick)
+
+    # Measure how late a UI-style event loop callback runs while programs run
+    lags = []
+    for _ in range(20):
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append(time.perf_counter() - start - 0.005)
+
+    stats = scheduler.stats()
+    results['max_budget'] = max(heavy1.budgets + heavy2.budgets)
+    results['lag'] = max(lags)
+    results['share'] = t1.cpu_seconds / (t1.cpu_seconds + t2.cpu_seconds)
+    results['idle_slices'] = t3.slices
+    results['context'] = context.entered == t1.slices
+    results['stats_names'] = sorted(s['name'] for s in stats['sessions'])
+
+    t1.cancel()
+    slices = t1.slices
+    await asyncio.sleep(0.05)
+    results['cancelled'] = t1.slices == slices
+    t2.cancel()
+    t3.cancel()
+    await asyncio.sleep(0.01)
+    results['stopped'] = scheduler._runner.done()
+
+    # A session that raises is dropped without stopping the others
+    def broken(time_budget):
+        raise ValueError('boom')
+    survivor = Session(cost=0)
+    bad = scheduler.add('broken', broken)
+    good = scheduler.add('good', survivor.tick)
+    await asyncio.sleep(0.02)
+    results['broken_removed'] = bad not in scheduler.tasks and good in scheduler.tasks
+    good.cancel()
+    return results
+
+
+def main():
+    ok = True
+    results = asyncio.run(scenario())
+
+    ok &= check("slices never exceed the latency target", results['max_budget'] <= 0.01, True)
+    ok &= check("event loop stays responsive", results['lag'] < 0.03, True)
+    ok &= check("CPU-bound sessions share evenly", 0.35 < results['share'] < 0.65, True)
+    ok &= check("waiting session keeps getting turns", results['idle_slices'] > 5, True)
+    ok &= check("callback runs inside its context", results['context'], True)
+    ok &= check("stats list every session", results['stats_names'], ['heavy1', 'heavy2', 'idle'])
+    ok &= check("cancelled session not called", results['cancelled'], True)
+    ok &= check("scheduler stops when empty", results['stopped'], True)
+    ok &= check("failing session dropped", results['broken_removed'], True)
+
+    # Sessions above the fair share of CPU get shorter slices
+    scheduler = SessionScheduler(target_latency=0.02, min_slice=0.002)
+    a, b = Session(), Session()
+    heavy = ScheduledTask(scheduler, 'heavy', a.tick)
+    lighter = ScheduledTask(scheduler, 'lighter', b.tick)
+    scheduler.tasks = [heavy, lighter]
+    heavy.busy = lighter.busy = True
+    heavy.recent_cpu, lighter.recent_cpu = 0.3, 0.1
+    ok &= check("heavy session slice reduced", round(scheduler.slice_for(heavy), 4), 0.0133)
+    ok &= check("lighter session full slice", scheduler.slice_for(lighter), 0.02)
+    lighter.busy = False
+    ok &= check("no reduction against a waiting session", scheduler.slice_for(heavy), 0.02)
+
+    if ok:
+        print("\n✅ All web scheduler tests passed")
+        return 0
+    print("\n❌ Web scheduler tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
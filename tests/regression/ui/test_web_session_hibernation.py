@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the pieces of idle web session hibernation that do not need NiceGUI.
+
+Covers the hibernation settings in MultiUserConfig, saving and releasing a
+session's sandboxed files, restoring them from the session store, and
+dropping the stored snapshot once the files are live again.
+"""
+
+import sys
+import os
+
+# Add project root to path (3 levels up from tests/regression/ui/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.multiuser_config import MultiUserConfig, HibernationConfig, _parse_config_dict
+from src.filesystem import SandboxedFileSystemProvider
+from src.ui.web.session_state import SessionState, SessionStore
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def main():
+    ok = True
+
+    # Configuration
+    ok &= check("disabled by default", MultiUserConfig().hibernation, HibernationConfig())
+    ok &= check("default disabled", HibernationConfig().enabled, False)
+    config = _parse_config_dict({'hibernation': {'enabled': True, 'idle_seconds': 120}})
+    ok &= check("parsed from multiuser.json",
+                (config.hibernation.enabled, config.hibernation.idle_seconds,
+                 config.hibernation.check_interval_seconds), (True, 120, 60))
+
+    # Files are exported, released and imported again
+    fs = SandboxedFileSystemProvider('hibernation-test')
+    handle = fs.open('DATA.TXT', 'w', binary=False)
+    handle.write('HELLO\n')
+    handle.close()
+    files = fs.export_files()
+    ok &= check("files exported", list(files), ['DATA.TXT'])
+
+    storage = {}
+    store = SessionStore(storage)
+    store.save(SessionState(session_id='hibernation-test', sandbox_files=files).to_dict())
+
+    SandboxedFileSystemProvider.clear_user_filesystem('hibernation-test')
+    ok &= check("files released", 'hibernation-test' in SandboxedFileSystemProvider._user_filesystems, False)
+    ok &= check("nothing to export after release", fs.export_files(), {})
+
+    state = SessionState.from_dict(SessionStore(storage).load())
+    fs.import_files(state.sandbox_files)
+    handle = fs.open('DATA.TXT', 'r', binary=False)
+    ok &= check("files restored from the store", handle.read(), 'HELLO\n')
+    handle.close()
+
+    # After waking the live files are authoritative: the snapshot is dropped
+    # so a later restore cannot bring back deleted or old files
+    store = SessionStore(storage)
+    store.load()
+    store.discard('files')
+    state = SessionState.from_dict(SessionStore(storage).load())
+    ok &= check("snapshot dropped after wake", (state.sandbox_files, state.session_id),
+                ({}, 'hibernation-test'))
+    ok &= check("next hibernation writes a new snapshot",
+                store.save(SessionState(session_id='hibernation-test', sandbox_files=files).to_dict(),
+                           ['files']), 1)
+
+    SandboxedFileSystemProvider.clear_user_filesystem('hibernation-test')
+
+    if ok:
+        print("\n✅ All web session hibernation tests passed")
+        return 0
+    print("\n❌ Web session hibernation tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
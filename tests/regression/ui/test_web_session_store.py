@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test section-wise web session persistence (src/ui/web/session_state.py).
+
+State is split into sections stored as compressed blobs under their own
+keys; saving rewrites only sections whose contents changed, and stores in
+the old single-dict format still load.
+"""
+
+import sys
+import os
+import json
+
+# Add project root to path (3 levels up from tests/regression/ui/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.ui.web.session_state import (SessionState, SessionStore, SECTION_FIELDS,
+                                      encode_section, decode_section)
+from src.pc import PC
+
+
+class CountingStorage(dict):
+    """Mapping that counts writes, like app.storage.client backed by Redis"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.sets = 0
+
+    def __setitem__(self, key, value):
+        self.sets += 1
+        super().__setitem__(key, value)
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def sample_state():
+    state = SessionState(session_id='abc', program_lines={10: '10 PRINT "HI"', 20: '20 GOTO 10'},
+                         output_text='HI\n' * 500, editor_content='10 PRINT "HI"\n20 GOTO 10')
+    state.runtime_state = {
+        'variables': {'a!': {'value': 1.5, 'original_case': 'A'}},
+        'for_loop_states': {'i!': {'pc': PC(10, 0), 'end': 10, 'step': 1, 'body_pc': PC(10, 1),
+                                   'generation': 3}},
+        'line_text_map': {10: '10 PRINT "HI"', 20: '20 GOTO 10'},
+        'user_functions': ['fna'],
+    }
+    return state.to_dict()
+
+
+def main():
+    ok = True
+
+    # Every field belongs to exactly one section
+    fields = [name for names in SECTION_FIELDS.values() for name in names]
+    ok &= check("sections cover SessionState", sorted(fields), sorted(SessionState.__dataclass_fields__))
+    ok &= check("no field in two sections", len(fields), len(set(fields)))
+
+    state = sample_state()
+    blob = encode_section({'output_text': state['output_text']})
+    ok &= check("section blob is a string", isinstance(blob, str), True)
+    ok &= check("section compressed", len(blob) < len(json.dumps(state['output_text'])) // 4, True)
+    runtime = decode_section(encode_section({'runtime_state': state['runtime_state']}))['runtime_state']
+    ok &= check("PCs survive encoding", runtime['for_loop_states']['i!']['body_pc'], PC(10, 1))
+
+    # First save writes every section, a repeat writes nothing
+    storage = CountingStorage()
+    store = SessionStore(storage)
+    ok &= check("empty store", store.load(), None)
+    ok &= check("first save", store.save(state), len(SECTION_FIELDS))
+    sets = storage.sets
+    ok &= check("unchanged save skipped", (store.save(state), storage.sets), (0, sets))
+
+    # Only the changed section is written
+    state['output_text'] += 'MORE\n'
+    ok &= check("one section changed", store.save(state, ['output', 'session']), 1)
+    ok &= check("only output key written", storage.sets, sets + 1)
+
+    # A new store (page reload) loads the same state and skips identical writes
+    reloaded = SessionStore(storage)
+    loaded = reloaded.load()
+    ok &= check("state round trip", SessionState.from_dict(loaded).to_dict(), state)
+    ok &= check("reload does not rewrite", reloaded.save(state), 0)
+
+    # Old single-dict format still loads, and is replaced on the next save
+    legacy = CountingStorage({'session_state': {'version': '1.0', 'output_text': 'old\n'}})
+    store = SessionStore(legacy)
+    ok &= check("legacy format loads", store.load()['output_text'], 'old\n')
+    store.save(state)
+    ok &= check("legacy key removed after save", 'session_state' in legacy, False)
+    ok &= check("sections readable", SessionStore(legacy).load()['output_text'], state['output_text'])
+
+    if ok:
+        print("\n✅ All web session store tests passed")
+        return 0
+    print("\n❌ Web session store tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
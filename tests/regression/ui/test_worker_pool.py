@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test running programs in worker processes (src/worker_pool.py).
+
+Programs run in real spawned workers; the test plays the web UI's part,
+reading messages from the event loop. Covers streamed output, an INPUT
+round trip, stopping an endless loop, errors, files going to and coming
+back from the worker (also when the program leaves them open), and falling
+back when every worker is busy. Programs with STOP stay in-process.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add project root to path (3 levels up from tests/regression/ui/)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+
+from src.worker_pool import WorkerPool, runs_in_worker
+from src.editing.manager import ProgramManager
+from src.ast_nodes import TypeInfo
+from src.multiuser_config import MultiUserConfig, ProcessPoolConfig, _parse_config_dict
+
+
+class Session:
+    """Collects the messages of one remote run, like the web backend"""
+
+    def __init__(self, inputs=()):
+        self.inputs = list(inputs)
+        self.output = ''
+        self.prompts = []
+        self.result = None
+        self.finished = asyncio.Event()
+
+    def handlers(self):
+        return {'output': self.on_output, 'input': self.on_input, 'finished': self.on_finished}
+
+    def on_output(self, run, text):
+        self.output += text
+
+    def on_input(self, run, prompt):
+        self.prompts.append(prompt)
+        run.provide_input(self.inputs.pop(0))
+
+    def on_finished(self, run, result):
+        self.result = result
+        self.finished.set()
+
+
+def job(program, files=None):
+    lines = {int(line.split()[0]): line for line in program.strip().splitlines()}
+    return {'lines': lines, 'files': files or {}, 'user_id': 'worker-pool-test', 'settings': {}}
+
+
+async def run_program(pool, program, files=None, inputs=()):
+    session = Session(inputs)
+    run = pool.run(job(program, files), session.handlers())
+    await asyncio.wait_for(session.finished.wait(), 30)
+    return session, run
+
+
+async def scenario():
+    results = {}
+    pool = WorkerPool(size=2)
+    try:
+        session, _ = await run_program(pool, """
+10 FOR I = 1 TO 3
+20 PRINT "LINE"; I
+30 NEXT I
+40 A$ = "DONE"
+""")
+        results['output'] = session.output
+        results['error'] = session.result['error']
+        results['variables'] = {name: entry['value'] for name, entry in session.result['variables'].items()}
+
+        session, _ = await run_program(pool, """
+10 INPUT "NAME"; N$
+20 PRINT "HELLO "; N$
+""", inputs=['ADA'])
+        results['prompts'] = session.prompts
+        results['greeting'] = 'HELLO ADA' in session.output
+
+        session, _ = await run_program(pool, '10 PRINT 1/0: X = Y(20)')
+        results['runtime_error'] = session.result['error']
+
+        session, _ = await run_program(pool, """
+10 OPEN "I", 1, "IN.TXT"
+20 LINE INPUT #1, L$
+30 CLOSE 1
+40 OPEN "O", 1, "OUT.TXT"
+50 PRINT #1, L$; "!"
+60 CLOSE 1
+""", files={'IN.TXT': 'HI\n'})
+        results['files'] = session.result['files']
+
+        session, _ = await run_program(pool, '10 OPEN "O", 1, "OPEN.TXT": PRINT #1, "KEPT"')
+        results['unclosed_file'] = session.result['files']
+
+        # Stop an endless loop, and fill the pool meanwhile
+        endless = Session()
+        run = pool.run(job('10 GOTO 10'), endless.handlers())
+        other = Session()
+        pool.run(job('10 GOTO 10'), other.handlers())
+        results['pool_full'] = pool.run(job('10 END'), {}) is None
+        await asyncio.sleep(0.5)
+        run.stop()
+        await asyncio.wait_for(endless.finished.wait(), 30)
+        results['stopped'] = (endless.result['stopped'], endless.result['line'])
+        results['worker_reused'] = pool.run(job('10 END'), Session().handlers()) is not None
+    finally:
+        pool.close()
+    return results
+
+
+def check(description, actual, expected):
+    if actual == expected:
+        print(f"✓ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def parse(program):
+    manager = ProgramManager({letter: TypeInfo.SINGLE for letter in 'abcdefghijklmnopqrstuvwxyz'})
+    return {line_num: line_ast for line_num, _, line_ast, _ in manager.parse_program_text(program)}
+
+
+def main():
+    ok = True
+
+    ok &= check("pool disabled by default", MultiUserConfig().process_pool, ProcessPoolConfig())
+    config = _parse_config_dict({'process_pool': {'enabled': True, 'workers': 4}})
+    ok &= check("parsed from multiuser.json",
+                (config.process_pool.enabled, config.process_pool.workers), (True, 4))
+
+    ok &= check("program without STOP runs in a worker",
+                runs_in_worker(parse('10 FOR I = 1 TO 3: GOSUB 30: NEXT: END\n30 PRINT I: RETURN')), True)
+    ok &= check("STOP keeps the program in-process (for CONT)",
+                runs_in_worker(parse('10 PRINT 1\n20 IF X THEN PRINT 2 ELSE STOP')), False)
+
+    results = asyncio.run(scenario())
+    ok &= check("output streamed from worker", results['output'], 'LINE 1 \nLINE 2 \nLINE 3 \n')
+    ok &= check("program finished without error", results['error'], None)
+    ok &= check("final variables returned", results['variables'].get('a$'), 'DONE')
+    ok &= check("INPUT prompt sent to server", results['prompts'], ['NAME? '])
+    ok &= check("INPUT answer reaches program", results['greeting'], True)
+    ok &= check("runtime error reported", results['runtime_error'], 'Division by zero')
+    ok &= check("files sent and returned", results['files'], {'IN.TXT': 'HI\n', 'OUT.TXT': 'HI!\n'})
+    ok &= check("file left open is returned", results['unclosed_file'], {'OPEN.TXT': 'KEPT\n'})
+    ok &= check("full pool refuses work", results['pool_full'], True)
+    ok &= check("endless loop stopped", results['stopped'], (True, 10))
+    ok &= check("stopped worker reused", results['worker_reused'], True)
+
+    if ok:
+        print("\n✅ All worker pool tests passed")
+        return 0
+    print("\n❌ Worker pool tests failed")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())